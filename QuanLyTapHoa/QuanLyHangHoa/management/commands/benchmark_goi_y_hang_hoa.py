@@ -0,0 +1,78 @@
+"""
+Lệnh đo thời gian gợi ý hàng hóa khi gõ trên dữ liệu thật.
+
+Dựng chỉ mục tiền tố từ CSDL, sinh các tiền tố ngẫu nhiên từ tên hàng
+(như thu ngân gõ từng ký tự) rồi báo cáo p50 / p99 / max. Ví dụ:
+    python manage.py benchmark_goi_y_hang_hoa
+    python manage.py benchmark_goi_y_hang_hoa --so-lan 20000 --thu "sua t"
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from QuanLyHangHoa.services.goi_y_service import goi_y_hang_hoa
+
+
+class Command(BaseCommand):
+    help = (
+        "Dựng chỉ mục gợi ý hàng hóa từ CSDL và đo thời gian gợi ý "
+        "(p50 / p99) với các tiền tố ngẫu nhiên."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--so-lan", type=int, default=10000,
+            help="Số tiền tố ngẫu nhiên cần đo"
+        )
+        parser.add_argument(
+            "--n", type=int, default=10,
+            help="Số gợi ý mỗi lần"
+        )
+        parser.add_argument(
+            "--thu", action="append", default=[],
+            help="Tiền tố gợi ý thử (có thể lặp lại)"
+        )
+
+    def handle(self, *args, **options):
+        thoi_gian = goi_y_hang_hoa.lam_moi()
+        thong_ke = goi_y_hang_hoa.thong_ke()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Đã dựng chỉ mục {thong_ke['so_hang_hoa']} hàng hóa trong {thoi_gian:.2f} giây"
+        ))
+        self.stdout.write(f"  Khóa:            {thong_ke['so_khoa']}")
+        self.stdout.write(f"  Tiền tố nặng:    {thong_ke['so_tien_to_nang']}")
+
+        cac_ten = [ten for _, ten, _ in goi_y_hang_hoa._tai_lieu.values()]
+        if not cac_ten:
+            return
+
+        rng = random.Random(0)
+        cac_tien_to = []
+        for _ in range(max(1, options["so_lan"])):
+            cac_tu = rng.choice(cac_ten).split()
+            if not cac_tu:
+                continue
+            phan_sau = " ".join(cac_tu[rng.randrange(len(cac_tu)):])
+            cac_tien_to.append(phan_sau[:rng.randint(1, min(12, len(phan_sau)))])
+
+        do = []
+        for tien_to in cac_tien_to:
+            bat_dau = time.perf_counter()
+            goi_y_hang_hoa.goi_y(tien_to, options["n"])
+            do.append(time.perf_counter() - bat_dau)
+        do.sort()
+
+        self.stdout.write(
+            f"\n{len(do)} tiền tố: "
+            f"p50 {do[len(do) // 2] * 1000:.3f} ms, "
+            f"p99 {do[int(len(do) * 0.99)] * 1000:.3f} ms, "
+            f"max {do[-1] * 1000:.3f} ms"
+        )
+
+        for tien_to in options["thu"]:
+            self.stdout.write(f"\n\"{tien_to}\":")
+            for item in goi_y_hang_hoa.goi_y(tien_to, options["n"]):
+                self.stdout.write(f"  {item['ma_hang']:>8}  {item['ten_hang']}")
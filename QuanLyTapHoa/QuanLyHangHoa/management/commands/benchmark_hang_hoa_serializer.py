@@ -0,0 +1,126 @@
+"""
+Lệnh đo chi phí serialize danh sách hàng hóa trên mỗi phần tử:
+HangHoaSerializer (DRF, object lồng) so với HangHoaProjection (values()).
+
+Dữ liệu được dựng sẵn trong bộ nhớ nên chỉ đo phần serialize,
+không cần và không truy vấn CSDL. Ví dụ:
+    python manage.py benchmark_hang_hoa_serializer
+    python manage.py benchmark_hang_hoa_serializer --so-luong 100000 --lap 5
+"""
+
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from QuanLyHangHoa.models.don_vi_tinh import DonViTinh
+from QuanLyHangHoa.models.hang_hoa import HangHoa
+from QuanLyHangHoa.models.loai_hang import LoaiHang
+from QuanLyHangHoa.models.thuong_hieu import ThuongHieu
+from QuanLyHangHoa.serializers import HangHoaProjection, HangHoaSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Đo thời gian serialize N hàng hóa (mặc định 50.000) bằng "
+        "HangHoaSerializer và HangHoaProjection, in chi phí trên mỗi phần tử."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--so-luong", type=int, default=50000, help="Số hàng hóa")
+        parser.add_argument("--lap", type=int, default=3, help="Số lần đo, lấy lần nhanh nhất")
+
+    def handle(self, *args, **options):
+        so_luong = options["so_luong"]
+        lap = options["lap"]
+        if so_luong <= 0 or lap <= 0:
+            raise CommandError("--so-luong và --lap phải > 0")
+
+        hang_hoas, rows = self._tao_du_lieu(so_luong)
+
+        ket_qua_drf, t_drf = self._do(
+            lambda: HangHoaSerializer(hang_hoas, many=True).data, lap
+        )
+        ket_qua_nhanh, t_nhanh = self._do(
+            lambda: HangHoaProjection.many(rows), lap
+        )
+
+        if [dict(item) for item in ket_qua_drf] != ket_qua_nhanh:
+            raise CommandError("Output của HangHoaProjection khác HangHoaSerializer")
+
+        self.stdout.write(f"Số hàng hóa: {so_luong}, lấy lần nhanh nhất trong {lap} lần đo")
+        for ten, t in (("HangHoaSerializer", t_drf), ("HangHoaProjection", t_nhanh)):
+            self.stdout.write(
+                f"  {ten:<18} {t * 1000:10.1f} ms  {t / so_luong * 1e6:8.2f} µs/phần tử"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Output giống hệt nhau, đường nhanh gấp {t_drf / t_nhanh:.1f} lần"
+        ))
+
+    @staticmethod
+    def _do(ham, lap):
+        tot_nhat = None
+        ket_qua = None
+        for _ in range(lap):
+            bat_dau = time.perf_counter()
+            ket_qua = ham()
+            thoi_gian = time.perf_counter() - bat_dau
+            tot_nhat = thoi_gian if tot_nhat is None else min(tot_nhat, thoi_gian)
+        return ket_qua, tot_nhat
+
+    @staticmethod
+    def _tao_du_lieu(so_luong):
+        """
+        Dựng so_luong hàng hóa (model đã gắn sẵn quan hệ, như sau
+        select_related) và các dict values() tương ứng.
+        """
+        dvts = [DonViTinh(ma_dvt=i, ten_dvt=f"DVT {i}") for i in range(1, 11)]
+        loais = [
+            LoaiHang(ma_loai=i, ten_loai=f"Loại {i}", mo_ta=f"Mô tả loại {i}")
+            for i in range(1, 51)
+        ]
+        thuong_hieus = [
+            ThuongHieu(
+                ma_thuong_hieu=i, ten_thuong_hieu=f"Thương hiệu {i}",
+                quoc_gia="Việt Nam", mo_ta=None
+            )
+            for i in range(1, 201)
+        ]
+
+        hang_hoas, rows = [], []
+        for i in range(1, so_luong + 1):
+            dvt = dvts[i % len(dvts)]
+            loai = loais[i % len(loais)]
+            # Một phần hàng hóa không có thương hiệu
+            thuong_hieu = None if i % 17 == 0 else thuong_hieus[i % len(thuong_hieus)]
+            gia_nhap = Decimal(i % 1000) + Decimal("0.50")
+            gia_ban = gia_nhap * Decimal("1.2")
+
+            hang_hoas.append(HangHoa(
+                ma_hang=i,
+                ten_hang=f"Hàng hóa {i}",
+                ma_dvt=dvt,
+                ma_loai_hang=loai,
+                ma_thuong_hieu=thuong_hieu,
+                gia_nhap=gia_nhap,
+                gia_ban=gia_ban,
+                so_luong_ton=i % 500,
+            ))
+            rows.append({
+                "ma_hang": i,
+                "ten_hang": f"Hàng hóa {i}",
+                "gia_nhap": gia_nhap,
+                "gia_ban": gia_ban,
+                "so_luong_ton": i % 500,
+                "ma_dvt_id": dvt.ma_dvt,
+                "ma_dvt__ten_dvt": dvt.ten_dvt,
+                "ma_loai_hang_id": loai.ma_loai,
+                "ma_loai_hang__ten_loai": loai.ten_loai,
+                "ma_loai_hang__mo_ta": loai.mo_ta,
+                "ma_thuong_hieu_id": thuong_hieu.ma_thuong_hieu if thuong_hieu else None,
+                "ma_thuong_hieu__ten_thuong_hieu": thuong_hieu.ten_thuong_hieu if thuong_hieu else None,
+                "ma_thuong_hieu__quoc_gia": thuong_hieu.quoc_gia if thuong_hieu else None,
+                "ma_thuong_hieu__mo_ta": thuong_hieu.mo_ta if thuong_hieu else None,
+            })
+
+        return hang_hoas, rows
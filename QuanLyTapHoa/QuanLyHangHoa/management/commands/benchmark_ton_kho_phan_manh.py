@@ -0,0 +1,126 @@
+"""
+Lệnh đo thông lượng thanh toán khi nhiều quầy cùng bán một hàng hóa:
+trừ tồn kho trên dòng HANG_HOA (mặc định) so với trừ trên phân mảnh
+tồn kho (TonKhoPhanManhService).
+
+Mỗi quầy là một luồng, mỗi lần thanh toán là một transaction:
+HangHoaService.tru_ton_kho_hang_loat rồi giữ khóa thêm --giu-khoa-ms
+(phần còn lại của tạo hóa đơn: ghi HOA_DON, CHI_TIET_HOA_DON...).
+Lệnh bán trên một hàng hóa tạm tạo riêng cho lần đo (xóa khi xong),
+không đụng tới hàng hóa thật; sổ biến động kho của hàng tạm được giữ.
+Cần có sẵn ít nhất một đơn vị tính và một loại hàng.
+
+Ví dụ:
+    python manage.py benchmark_ton_kho_phan_manh
+    python manage.py benchmark_ton_kho_phan_manh --quay 32 --phan-manh 16
+"""
+
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from QuanLyHangHoa.models.don_vi_tinh import DonViTinhRepository
+from QuanLyHangHoa.models.hang_hoa import HangHoaRepository
+from QuanLyHangHoa.models.loai_hang import LoaiHangRepository
+from QuanLyHangHoa.services.hang_hoa_service import HangHoaService
+from QuanLyHangHoa.services.ton_kho_phan_manh_service import TonKhoPhanManhService
+
+
+class Command(BaseCommand):
+    help = (
+        "Đo số lần thanh toán / giây khi N quầy cùng bán một hàng hóa, "
+        "có và không có phân mảnh tồn kho."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--quay", type=int, default=32, help="Số quầy (luồng) đồng thời")
+        parser.add_argument("--so-lan", type=int, default=50, help="Số lần thanh toán mỗi quầy")
+        parser.add_argument("--phan-manh", type=int, default=16, help="Số phân mảnh tồn kho")
+        parser.add_argument(
+            "--giu-khoa-ms", type=float, default=5,
+            help="Thời gian còn lại của transaction tạo hóa đơn sau khi trừ tồn kho (ms)"
+        )
+
+    def handle(self, *args, **options):
+        so_quay = options["quay"]
+        so_lan = options["so_lan"]
+        if so_quay <= 0 or so_lan <= 0 or options["phan_manh"] <= 0:
+            raise CommandError("--quay, --so-lan và --phan-manh phải > 0")
+
+        cac_dvt = DonViTinhRepository.get_all()
+        cac_loai = LoaiHangRepository.get_all()
+        if not cac_dvt or not cac_loai:
+            raise CommandError("Cần có ít nhất một đơn vị tính và một loại hàng")
+
+        # Mỗi lượt đo bán tong hàng: hàng tạm có đủ cho hai lượt
+        tong = so_quay * so_lan
+        ma_hang = HangHoaRepository.create(
+            ten_hang=f"benchmark-{uuid.uuid4().hex[:12]}",
+            ma_dvt=cac_dvt[0].ma_dvt,
+            ma_loai_hang=cac_loai[0].ma_loai,
+            so_luong_ton=2 * tong,
+        ).ma_hang
+
+        self.stdout.write(
+            f"{so_quay} quầy x {so_lan} lần thanh toán (hàng tạm {ma_hang}), "
+            f"giữ khóa thêm {options['giu_khoa_ms']} ms mỗi hóa đơn"
+        )
+        try:
+            ket_qua = {}
+            for ten, so_phan_manh in (
+                ("Một dòng HANG_HOA", 0),
+                (f"{options['phan_manh']} phân mảnh", options["phan_manh"]),
+            ):
+                TonKhoPhanManhService.dat(ma_hang, so_phan_manh)
+                thoi_gian = self._chay(ma_hang, so_quay, so_lan, options["giu_khoa_ms"] / 1000)
+                ket_qua[ten] = thoi_gian
+                self.stdout.write(
+                    f"  {ten:<20} {thoi_gian:7.2f} s  {tong / thoi_gian:8.0f} hóa đơn/s"
+                )
+
+            TonKhoPhanManhService.dat(ma_hang, 0)
+            con_lai = HangHoaRepository.get_by_id(ma_hang, dung_bo_nho_dem=False).so_luong_ton
+        finally:
+            HangHoaService.delete(ma_hang)
+
+        if con_lai != 0:
+            raise CommandError(f"Tồn kho sau khi bán lệch {con_lai}")
+
+        t_dong, t_phan_manh = ket_qua.values()
+        self.stdout.write(self.style.SUCCESS(
+            f"Tồn kho khớp, phân mảnh nhanh gấp {t_dong / t_phan_manh:.1f} lần"
+        ))
+
+    @staticmethod
+    def _chay(ma_hang: int, so_quay: int, so_lan: int, giu_khoa: float) -> float:
+        bat_dau_cung_luc = threading.Barrier(so_quay + 1)
+        loi = []
+
+        def quay():
+            try:
+                bat_dau_cung_luc.wait()
+                for _ in range(so_lan):
+                    with transaction.atomic():
+                        HangHoaService.tru_ton_kho_hang_loat({ma_hang: 1})
+                        time.sleep(giu_khoa)
+            except Exception as e:
+                loi.append(e)
+            finally:
+                # Mỗi luồng có kết nối CSDL riêng
+                connection.close()
+
+        cac_quay = [threading.Thread(target=quay) for _ in range(so_quay)]
+        for luong in cac_quay:
+            luong.start()
+        bat_dau_cung_luc.wait()
+        bat_dau = time.perf_counter()
+        for luong in cac_quay:
+            luong.join()
+        thoi_gian = time.perf_counter() - bat_dau
+
+        if loi:
+            raise CommandError(f"Quầy bị lỗi: {loi[0]!r}")
+        return thoi_gian
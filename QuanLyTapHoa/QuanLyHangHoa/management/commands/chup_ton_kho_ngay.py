@@ -0,0 +1,31 @@
+"""
+Lệnh chụp tồn kho cuối ngày của mọi hàng hóa vào TON_KHO_NGAY
+(xem LichSuTonKhoService). Chạy hằng đêm sau 0 giờ; chạy lại trong
+ngày không chụp trùng.
+
+Ví dụ:
+    python manage.py chup_ton_kho_ngay
+    python manage.py chup_ton_kho_ngay --ngay 2025-03-01
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from QuanLyHangHoa.services.lich_su_ton_kho_service import LichSuTonKhoService
+
+
+class Command(BaseCommand):
+    help = "Chụp tồn kho cuối ngày (mặc định hôm qua) của mọi hàng hóa."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ngay", help="Ngày cần chụp (YYYY-MM-DD), mặc định hôm qua")
+
+    def handle(self, *args, **options):
+        try:
+            ngay = date.fromisoformat(options["ngay"]) if options["ngay"] else None
+            so_hang = LichSuTonKhoService.chup_ton_kho_ngay(ngay)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f"Đã chụp tồn kho của {so_hang} hàng hóa"))
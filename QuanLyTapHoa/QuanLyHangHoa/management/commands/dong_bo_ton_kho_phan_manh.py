@@ -0,0 +1,35 @@
+"""
+Lệnh cập nhật bản sao tồn kho (HANG_HOA.SoLuongTon) của các hàng hóa
+đang phân mảnh tồn kho từ tổng các phân mảnh.
+
+Chạy một lần, hoặc lặp mỗi N giây trong khi có hàng hóa phân mảnh:
+    python manage.py dong_bo_ton_kho_phan_manh
+    python manage.py dong_bo_ton_kho_phan_manh --lap 5
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from QuanLyHangHoa.services.ton_kho_phan_manh_service import TonKhoPhanManhService
+
+
+class Command(BaseCommand):
+    help = "Ghi tổng tồn kho các phân mảnh vào HANG_HOA.SoLuongTon để hiển thị."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lap", type=float, default=0,
+            help="Lặp lại sau mỗi ngần ấy giây (mặc định chạy một lần)"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            so_hang = TonKhoPhanManhService.dong_bo_ton_kho()
+            if so_hang or not options["lap"]:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Đã cập nhật tồn kho của {so_hang} hàng hóa"
+                ))
+            if not options["lap"]:
+                break
+            time.sleep(options["lap"])
@@ -0,0 +1,21 @@
+"""
+Lệnh nén nhật ký thay đổi hàng hóa (HANG_HOA_THAY_DOI): chỉ giữ dòng
+mới nhất của mỗi hàng hóa. Client ở token nào cũng vẫn đồng bộ đúng.
+
+Chạy định kỳ (vd. mỗi đêm):
+    python manage.py nen_thay_doi_hang_hoa
+"""
+
+from django.core.management.base import BaseCommand
+
+from QuanLyHangHoa.models.hang_hoa_thay_doi import HangHoaThayDoiRepository
+
+
+class Command(BaseCommand):
+    help = "Nén nhật ký thay đổi hàng hóa, chỉ giữ thay đổi mới nhất của mỗi hàng hóa."
+
+    def handle(self, *args, **options):
+        so_dong = HangHoaThayDoiRepository.nen()
+        self.stdout.write(self.style.SUCCESS(
+            f"Đã xóa {so_dong} dòng nhật ký cũ"
+        ))
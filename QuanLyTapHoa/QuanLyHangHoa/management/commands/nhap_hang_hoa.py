@@ -0,0 +1,50 @@
+"""
+Lệnh nhập danh mục hàng hóa hàng loạt từ file CSV / XLSX
+(cùng nghiệp vụ với API /api/hanghoa/import/).
+
+Ví dụ:
+    python manage.py nhap_hang_hoa catalog_ncc.csv
+    python manage.py nhap_hang_hoa catalog_ncc.xlsx --chunk-size 5000
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from QuanLyHangHoa.services.nhap_hang_hoa_service import NhapHangHoaService
+
+
+class Command(BaseCommand):
+    help = "Nhập danh mục hàng hóa từ file CSV / XLSX (upsert theo mã vạch hoặc tên + thương hiệu)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("duong_dan", help="Đường dẫn file .csv hoặc .xlsx")
+        parser.add_argument(
+            "--chunk-size", type=int, default=2000,
+            help="Số dòng mỗi khối / transaction (mặc định 2000)"
+        )
+        parser.add_argument(
+            "--so-loi", type=int, default=20,
+            help="Số dòng lỗi in ra (mặc định 20)"
+        )
+
+    def handle(self, *args, **options):
+        bat_dau = time.perf_counter()
+        try:
+            with open(options["duong_dan"], "rb") as f:
+                bao_cao = NhapHangHoaService.nhap(
+                    f, options["duong_dan"], chunk_size=options["chunk_size"]
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        thoi_gian = time.perf_counter() - bat_dau
+
+        for loi in bao_cao["loi"][:options["so_loi"]]:
+            self.stdout.write(self.style.WARNING(f"Dòng {loi['dong']}: {loi['loi']}"))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{bao_cao['so_dong']} dòng trong {thoi_gian:.1f}s "
+            f"({bao_cao['so_dong'] / thoi_gian if thoi_gian else 0:.0f} dòng/s): "
+            f"tạo mới {bao_cao['so_tao_moi']}, cập nhật {bao_cao['so_cap_nhat']}, "
+            f"lỗi {bao_cao['so_loi']}"
+        ))
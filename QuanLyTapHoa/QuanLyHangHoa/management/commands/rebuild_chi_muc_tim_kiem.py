@@ -0,0 +1,66 @@
+"""
+Lệnh dựng (nguội) chỉ mục tìm kiếm hàng hóa từ CSDL, in thời gian dựng,
+bộ nhớ ước tính và thời gian tìm mẫu.
+
+Chỉ mục sống trong bộ nhớ của từng process web và tự nạp ở lần tìm đầu;
+lệnh này dùng để đo và kiểm tra trên dữ liệu thật. Ví dụ:
+    python manage.py rebuild_chi_muc_tim_kiem
+    python manage.py rebuild_chi_muc_tim_kiem --thu "sua tuoi" --thu "mi hao hao"
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from QuanLyHangHoa.services.tim_kiem_service import chi_muc_hang_hoa
+
+
+class Command(BaseCommand):
+    help = (
+        "Dựng lại chỉ mục tìm kiếm hàng hóa từ CSDL, báo cáo bộ nhớ "
+        "và thời gian tìm kiếm mẫu."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--thu", action="append", default=[],
+            help="Từ khóa tìm thử (có thể lặp lại)"
+        )
+        parser.add_argument(
+            "--lap", type=int, default=200,
+            help="Số lần lặp mỗi từ khóa khi đo thời gian tìm"
+        )
+
+    def handle(self, *args, **options):
+        thoi_gian = chi_muc_hang_hoa.lam_moi()
+        thong_ke = chi_muc_hang_hoa.thong_ke()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Đã dựng chỉ mục {thong_ke['so_hang_hoa']} hàng hóa trong {thoi_gian:.2f} giây"
+        ))
+        self.stdout.write(f"  Từ vựng:         {thong_ke['so_tu_vung']} từ")
+        self.stdout.write(f"  Trigram:         {thong_ke['so_trigram']}")
+        self.stdout.write(f"  Biến thể:        {thong_ke['so_bien_the']}")
+        self.stdout.write(f"  Posting:         {thong_ke['so_posting']}")
+        for khoa, ten in (
+            ("bo_nho_tai_lieu_byte", "Tên hàng"),
+            ("bo_nho_chi_muc_tu_byte", "Chỉ mục từ"),
+            ("bo_nho_chi_muc_trigram_byte", "Chỉ mục trigram"),
+            ("bo_nho_chi_muc_bien_the_byte", "Chỉ mục biến thể"),
+            ("bo_nho_tong_byte", "Tổng bộ nhớ"),
+        ):
+            self.stdout.write(f"  {ten + ':':<16} {thong_ke[khoa] / 1024 / 1024:.1f} MB")
+
+        lap = max(1, options["lap"])
+        for tu_khoa in options["thu"]:
+            bat_dau = time.perf_counter()
+            for _ in range(lap):
+                ket_qua = chi_muc_hang_hoa.tim(tu_khoa, 10)
+            trung_binh = (time.perf_counter() - bat_dau) / lap
+
+            self.stdout.write(
+                f"\n\"{tu_khoa}\": {trung_binh * 1000:.3f} ms / lần, "
+                f"{len(ket_qua)} kết quả"
+            )
+            for item in ket_qua:
+                self.stdout.write(f"  {item['diem']:.3f}  {item['ma_hang']:>8}  {item['ten_hang']}")
@@ -1,4 +1,9 @@
 from .hang_hoa import *
 from .thuong_hieu import *
 from .loai_hang import *
-from .don_vi_tinh import *
\ No newline at end of file
+from .don_vi_tinh import *
+from .ma_vach import *
+from .hang_hoa_thay_doi import *
+from .ton_kho_phan_manh import *
+from .bien_dong_kho import *
+from .ton_kho_ngay import *
\ No newline at end of file
@@ -0,0 +1,159 @@
+from datetime import datetime
+from django.db import models
+from django.db.models import Sum
+from typing import Dict, Optional
+
+# =========================
+# Models cho bảng BIEN_DONG_KHO
+# =========================
+class BienDongKho(models.Model):
+    """
+    Lớp Model biểu diễn một dòng sổ biến động kho (chỉ thêm, không sửa):
+    số lượng tồn kho của một hàng hóa tăng / giảm bao nhiêu, lúc nào,
+    vì lý do gì. Xem sql/09_bien_dong_kho.sql.
+    """
+
+    LOAI_BAN = 'B'
+    LOAI_DIEU_CHINH = 'D'
+    LOAI_NHAP = 'N'
+    LOAI_KIEM_KE = 'K'
+    CAC_LOAI = (LOAI_BAN, LOAI_DIEU_CHINH, LOAI_NHAP, LOAI_KIEM_KE)
+
+    ma_bien_dong = models.BigAutoField(
+        primary_key=True,
+        db_column='MaBienDong'
+    )
+
+    # Không khóa ngoại: sổ giữ lịch sử cả hàng hóa đã xóa
+    ma_hang = models.IntegerField(
+        db_column='MaHang'
+    )
+
+    thoi_diem = models.DateTimeField(
+        auto_now_add=True,
+        db_column='ThoiDiem'
+    )
+
+    loai = models.CharField(
+        max_length=1,
+        db_column='Loai'
+    )
+
+    so_luong = models.IntegerField(
+        db_column='SoLuong'
+    )
+
+    # Mã hóa đơn với dòng bán
+    ma_tham_chieu = models.IntegerField(
+        null=True,
+        db_column='MaThamChieu'
+    )
+
+    class Meta:
+        db_table = 'BIEN_DONG_KHO'
+        managed = False
+
+    def __str__(self):
+        """
+        Trả về mô tả ngắn của biến động.
+
+        Returns:
+            str: Loại, mã hàng và số lượng.
+        """
+        return f"{self.loai}:{self.ma_hang}:{self.so_luong:+d}"
+
+
+##############################################
+# BienDongKhoRepository
+##############################################
+class BienDongKhoRepository:
+    """
+    Lớp Repository chịu trách nhiệm ghi và đọc sổ biến động kho.
+    """
+
+    @staticmethod
+    def kiem_tra_loai(loai: str) -> None:
+        """
+        Kiểm tra loại biến động. Cột Loai không có CHECK constraint
+        (bảng đích của OUTPUT ... INTO không được có), nên mọi hàm ghi
+        sổ phải gọi hàm này trước.
+
+        Raises:
+            ValueError: Loại không thuộc BienDongKho.CAC_LOAI.
+        """
+        if loai not in BienDongKho.CAC_LOAI:
+            raise ValueError(f"Loại biến động kho không hợp lệ: {loai!r}")
+
+    @staticmethod
+    def output_into(cot_ma_hang: str, cot_so_luong: str) -> str:
+        """
+        Mệnh đề OUTPUT ... INTO BIEN_DONG_KHO cho các câu UPDATE tồn kho
+        viết bằng SQL: sổ được ghi ngay trong câu lệnh (không thêm lượt
+        đi về CSDL), chỉ cho các dòng thật sự được cập nhật.
+
+        Tham số của mệnh đề theo thứ tự: loại, [số lượng nếu cot_so_luong
+        là '%s'], mã tham chiếu. Loại phải được kiểm tra trước bằng
+        kiem_tra_loai.
+
+        Args:
+            cot_ma_hang (str): Biểu thức mã hàng, vd. 'INSERTED.MaHang'.
+            cot_so_luong (str): Biểu thức số lượng thay đổi, vd. 'v.SoLuong'.
+
+        Returns:
+            str: Mệnh đề SQL.
+        """
+        return (
+            f"OUTPUT {cot_ma_hang}, %s, {cot_so_luong}, %s "
+            "INTO BIEN_DONG_KHO (MaHang, Loai, SoLuong, MaThamChieu)"
+        )
+
+    @staticmethod
+    def ghi(
+        so_luong_map: Dict[int, int],
+        loai: str,
+        ma_tham_chieu: Optional[int] = None,
+        chunk_size: int = 500
+    ) -> None:
+        """
+        Ghi biến động cho nhiều hàng hóa (INSERT nhiều dòng),
+        bỏ qua số lượng 0. Phải chạy cùng transaction với thay đổi tồn kho.
+
+        Args:
+            so_luong_map (Dict[int, int]): {mã hàng: số lượng thay đổi}.
+            loai (str): Một trong các BienDongKho.LOAI_*.
+            ma_tham_chieu (int, optional): Mã hóa đơn với dòng bán.
+            chunk_size (int): Số dòng mỗi câu INSERT.
+
+        Raises:
+            ValueError: Loại không hợp lệ.
+        """
+        BienDongKhoRepository.kiem_tra_loai(loai)
+        BienDongKho.objects.bulk_create(
+            [
+                BienDongKho(ma_hang=ma_hang, loai=loai, so_luong=so_luong, ma_tham_chieu=ma_tham_chieu)
+                for ma_hang, so_luong in so_luong_map.items()
+                if so_luong
+            ],
+            batch_size=chunk_size
+        )
+
+    @staticmethod
+    def tong(ma_hang: int, tu: Optional[datetime] = None, den: Optional[datetime] = None) -> int:
+        """
+        Tổng số lượng thay đổi của hàng hóa trong [tu, den)
+        (seek trên chỉ mục (MaHang, ThoiDiem)).
+
+        Args:
+            ma_hang (int): Mã hàng hóa.
+            tu (datetime, optional): Từ thời điểm (bao gồm).
+            den (datetime, optional): Tới thời điểm (không bao gồm).
+
+        Returns:
+            int: Tổng số lượng, 0 nếu không có biến động.
+        """
+        qs = BienDongKho.objects.filter(ma_hang=ma_hang)
+        if tu is not None:
+            qs = qs.filter(thoi_diem__gte=tu)
+        if den is not None:
+            qs = qs.filter(thoi_diem__lt=den)
+        return qs.aggregate(tong=Sum('so_luong'))['tong'] or 0
@@ -33,6 +33,12 @@ class DonViTinh(models.Model):
         return self.ten_dvt
 
 from typing import List, Optional
+from QuanLyTapHoa.du_lieu_tham_chieu import DuLieuThamChieu
+
+# Bản chụp bất biến của bảng trong bộ nhớ process (xem QuanLyTapHoa/du_lieu_tham_chieu.py)
+du_lieu_don_vi_tinh = DuLieuThamChieu(
+    "donvitinh", lambda: list(DonViTinh.objects.order_by("ma_dvt"))
+)
 
 class DonViTinhRepository:
     """
@@ -46,9 +52,10 @@ class DonViTinhRepository:
         Lấy danh sách tất cả đơn vị tính trong hệ thống.
 
         Returns:
-            List[DonViTinh]: Danh sách các đối tượng đơn vị tính.
+            List[DonViTinh]: Danh sách các đối tượng đơn vị tính
+            (đọc từ bản chụp trong bộ nhớ, chỉ được đọc).
         """
-        return list(DonViTinh.objects.all())
+        return list(du_lieu_don_vi_tinh.danh_sach())
 
     @staticmethod
     def get_by_id(ma_dvt: int) -> Optional[DonViTinh]:
@@ -62,10 +69,7 @@ class DonViTinhRepository:
             DonViTinh | None: Đối tượng đơn vị tính nếu tồn tại,
             ngược lại trả về None.
         """
-        try:
-            return DonViTinh.objects.get(pk=ma_dvt)
-        except DonViTinh.DoesNotExist:
-            return None
+        return du_lieu_don_vi_tinh.get(ma_dvt)
 
     @staticmethod
     def create(ten_dvt: str) -> DonViTinh:
@@ -80,6 +84,7 @@ class DonViTinhRepository:
         """
         obj = DonViTinh(ten_dvt=ten_dvt)
         obj.save()
+        du_lieu_don_vi_tinh.da_thay_doi()
         return obj
 
     @staticmethod
@@ -95,11 +100,12 @@ class DonViTinhRepository:
             DonViTinh | None: Đối tượng đơn vị tính sau khi cập nhật,
             hoặc None nếu không tồn tại.
         """
-        obj = DonViTinhRepository.get_by_id(ma_dvt)
+        obj = DonViTinh.objects.filter(pk=ma_dvt).first()
         if not obj:
             return None
         obj.ten_dvt = ten_dvt
         obj.save()
+        du_lieu_don_vi_tinh.da_thay_doi()
         return obj
 
     @staticmethod
@@ -113,8 +119,9 @@ class DonViTinhRepository:
         Returns:
             bool: True nếu xóa thành công, False nếu không tồn tại.
         """
-        obj = DonViTinhRepository.get_by_id(ma_dvt)
+        obj = DonViTinh.objects.filter(pk=ma_dvt).first()
         if not obj:
             return False
         obj.delete()
+        du_lieu_don_vi_tinh.da_thay_doi()
         return True
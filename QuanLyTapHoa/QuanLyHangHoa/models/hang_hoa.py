@@ -1,9 +1,16 @@
 from django.db import models
-from .thuong_hieu import ThuongHieu
-from .loai_hang import LoaiHang
-from .don_vi_tinh import DonViTinh
-from typing import List, Optional
-from django.db.models import QuerySet
+from .thuong_hieu import ThuongHieu, du_lieu_thuong_hieu
+from .loai_hang import LoaiHang, du_lieu_loai_hang
+from .don_vi_tinh import DonViTinh, du_lieu_don_vi_tinh
+from .hang_hoa_thay_doi import HangHoaThayDoi, HangHoaThayDoiRepository, dong_bo_bo_nho_dem
+from .bien_dong_kho import BienDongKho, BienDongKhoRepository
+from .ton_kho_phan_manh import TonKhoPhanManhRepository
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, QuerySet, Value, When
+from QuanLyTapHoa.bo_nho_dem import BoNhoDemLRU, tao_bo_nho_dem
 
 # =========================
 # Models cho bảng HANGHOA
@@ -64,6 +71,20 @@ class HangHoa(models.Model):
         db_column='SoLuongTon'
     )
 
+    # > 0: tồn kho chia thành ngần ấy phân mảnh (TON_KHO_PHAN_MANH),
+    # so_luong_ton chỉ là bản sao để hiển thị. Xem TonKhoPhanManhService.
+    so_phan_manh = models.IntegerField(
+        default=0,
+        db_column='SoPhanManh'
+    )
+
+    # Mức đặt lại: tồn kho <= mức này thì vào danh sách cần đặt lại,
+    # 0 là không cảnh báo. Xem sql/10_canh_bao_ton_kho.sql.
+    muc_dat_lai = models.IntegerField(
+        default=0,
+        db_column='MucDatLai'
+    )
+
     class Meta:
         db_table = 'HANG_HOA'
         managed = False   # 🔥 BẮT BUỘC khi dùng DB có sẵn
@@ -78,6 +99,26 @@ class HangHoa(models.Model):
         return self.ten_hang
 
 
+# Bộ nhớ đệm hàng hóa (kèm đơn vị tính, loại hàng, thương hiệu) theo mã hàng,
+# dùng cho HangHoaRepository.get_by_id. Xem settings.HANG_HOA_CACHE_*.
+bo_nho_dem_hang_hoa = tao_bo_nho_dem(
+    "hanghoa",
+    alias=getattr(settings, "HANG_HOA_CACHE_BACKEND", None),
+    so_muc_toi_da=getattr(settings, "HANG_HOA_CACHE_SO_MUC_TOI_DA", 10000),
+    ttl=getattr(settings, "HANG_HOA_CACHE_TTL", 300),
+)
+
+# Hàng hóa được đệm kèm đơn vị tính, loại hàng, thương hiệu:
+# sửa các bảng này thì hủy toàn bộ
+for _du_lieu in (du_lieu_don_vi_tinh, du_lieu_loai_hang, du_lieu_thuong_hieu):
+    _du_lieu.dang_ky_khi_thay_doi(bo_nho_dem_hang_hoa.xoa_tat_ca)
+
+# Bản trong process: hủy theo nhật ký thay đổi khi worker khác sửa
+# (backend dùng chung được hủy trực tiếp bởi worker sửa)
+if isinstance(bo_nho_dem_hang_hoa, BoNhoDemLRU):
+    dong_bo_bo_nho_dem.dang_ky(bo_nho_dem_hang_hoa.xoa, bo_nho_dem_hang_hoa.xoa_tat_ca)
+
+
 ##############################################
 # HangHoaRepository
 ##############################################
@@ -87,34 +128,295 @@ class HangHoaRepository:
     liên quan đến bảng Hàng Hóa trong cơ sở dữ liệu.
     """
 
+    # Các quan hệ mà HangHoaSerializer trả về dạng object lồng
+    QUAN_HE_LONG = ('ma_dvt', 'ma_loai_hang', 'ma_thuong_hieu')
+
+    # Các cột cho danh sách dạng projection (values()),
+    # đủ để dựng lại đúng output của HangHoaSerializer
+    # (so_phan_manh để thay tồn kho của hàng phân mảnh, xem gan_ton_kho_phan_manh)
+    COT_DANH_SACH = (
+        'ma_hang',
+        'ten_hang',
+        'gia_nhap',
+        'gia_ban',
+        'so_luong_ton',
+        'so_phan_manh',
+        'muc_dat_lai',
+        'ma_dvt_id',
+        'ma_dvt__ten_dvt',
+        'ma_loai_hang_id',
+        'ma_loai_hang__ten_loai',
+        'ma_loai_hang__mo_ta',
+        'ma_thuong_hieu_id',
+        'ma_thuong_hieu__ten_thuong_hieu',
+        'ma_thuong_hieu__quoc_gia',
+        'ma_thuong_hieu__mo_ta',
+    )
+
     @staticmethod
     def get_all() -> QuerySet[HangHoa]:
         """
         Lấy danh sách tất cả hàng hóa trong hệ thống.
 
+        Đơn vị tính, loại hàng, thương hiệu được JOIN sẵn (select_related),
+        serialize danh sách chỉ tốn đúng một truy vấn.
+
         Returns:
             QuerySet[HangHoa]: Danh sách hàng hóa dưới dạng QuerySet.
         """
-        return HangHoa.objects.all()
+        return HangHoa.objects.select_related(*HangHoaRepository.QUAN_HE_LONG)
+
+    @staticmethod
+    def get_all_values() -> QuerySet:
+        """
+        Lấy danh sách hàng hóa dạng dict phẳng (values()), đã JOIN sẵn
+        đơn vị tính, loại hàng, thương hiệu.
+
+        Không khởi tạo model instance; dùng cho đường serialize nhanh
+        (xem QuanLyHangHoa.serializers.HangHoaProjection).
+
+        Returns:
+            QuerySet: Các dict với khóa là COT_DANH_SACH.
+        """
+        return HangHoa.objects.values(*HangHoaRepository.COT_DANH_SACH)
+
+    @staticmethod
+    def iter_ten_hang() -> Iterator[Tuple[int, str]]:
+        """
+        Duyệt (mã hàng, tên hàng) của toàn bộ danh mục theo khối,
+        dùng để dựng chỉ mục tìm kiếm trong bộ nhớ.
+
+        Returns:
+            Iterator[Tuple[int, str]]: Các cặp (ma_hang, ten_hang).
+        """
+        return (
+            HangHoa.objects
+            .order_by()
+            .values_list('ma_hang', 'ten_hang')
+            .iterator(chunk_size=5000)
+        )
+
+    @staticmethod
+    def get_values_theo_ma(
+        cac_ma_hang: Iterable[int],
+        cot: Iterable[str],
+        chunk_size: int = 2000,
+        khoa: bool = False
+    ) -> Dict[int, Dict]:
+        """
+        Lấy một số cột của nhiều hàng hóa theo mã (values(), theo khối
+        để không vượt giới hạn 2100 tham số của SQL Server).
+
+        Args:
+            cac_ma_hang (Iterable[int]): Mã các hàng hóa.
+            cot (Iterable[str]): Các cột cần lấy (luôn kèm ma_hang).
+            chunk_size (int): Số mã hàng mỗi truy vấn.
+            khoa (bool): Khóa các dòng đọc được (SELECT ... WITH UPDLOCK)
+                tới hết transaction, để giá trị đọc không bị ghi đè
+                trước khi nơi gọi cập nhật. Phải chạy trong transaction.
+
+        Returns:
+            Dict[int, Dict]: {mã hàng: dict các cột}, hàng hóa không tồn tại
+            thì không có trong kết quả.
+        """
+        cac_ma_hang = list(cac_ma_hang)
+        cot = ('ma_hang', *cot)
+        ket_qua = {}
+        qs = HangHoa.objects.select_for_update() if khoa else HangHoa.objects
+        for i in range(0, len(cac_ma_hang), chunk_size):
+            for row in qs.filter(
+                ma_hang__in=cac_ma_hang[i:i + chunk_size]
+            ).values(*cot):
+                ket_qua[row['ma_hang']] = row
+        return ket_qua
+
+    @staticmethod
+    def gan_ton_kho_phan_manh(items: Iterable) -> None:
+        """
+        Thay bản sao so_luong_ton của các hàng hóa phân mảnh tồn kho
+        bằng tồn kho thật (tổng các phân mảnh), tại chỗ.
+
+        Một truy vấn cho mọi hàng hóa phân mảnh trong items, không truy
+        vấn nào nếu không có. Hàng hóa vừa tắt phân mảnh (không còn
+        phân mảnh nào) giữ nguyên giá trị, lúc đó đã là tồn kho thật.
+
+        Args:
+            items (Iterable): Các HangHoa hoặc dict có ma_hang,
+                so_phan_manh, so_luong_ton (vd. dòng của get_all_values()).
+        """
+        def doc(item, ten):
+            return item[ten] if isinstance(item, dict) else getattr(item, ten)
+
+        phan_manh = [item for item in items if doc(item, 'so_phan_manh')]
+        if not phan_manh:
+            return
+
+        tong = TonKhoPhanManhRepository.tong({doc(item, 'ma_hang') for item in phan_manh})
+        for item in phan_manh:
+            so_luong_ton = tong.get(doc(item, 'ma_hang'))
+            if so_luong_ton is None:
+                continue
+            if isinstance(item, dict):
+                item['so_luong_ton'] = so_luong_ton
+            else:
+                item.so_luong_ton = so_luong_ton
+
+    @staticmethod
+    def loc(
+        qs: QuerySet,
+        ma_loai_hang: Optional[int] = None,
+        ma_thuong_hieu: Optional[int] = None,
+        gia_tu: Optional[Decimal] = None,
+        gia_den: Optional[Decimal] = None,
+        ton_kho_toi_da: Optional[int] = None,
+        ten_bat_dau: Optional[str] = None
+    ) -> QuerySet:
+        """
+        Áp dụng các điều kiện lọc danh mục hàng hóa lên một QuerySet
+        (dùng được cho cả get_all() và get_all_values()).
+
+        Mọi điều kiện đều sargable, phục vụ bởi các chỉ mục trong
+        sql/05_hang_hoa_indexes.sql; tên hàng chỉ lọc theo tiền tố
+        (LIKE 'abc%') để vẫn seek được trên chỉ mục TenHang.
+
+        Args:
+            qs (QuerySet): QuerySet hàng hóa nguồn.
+            ma_loai_hang (int, optional): Mã loại hàng.
+            ma_thuong_hieu (int, optional): Mã thương hiệu.
+            gia_tu (Decimal, optional): Giá bán tối thiểu (bao gồm).
+            gia_den (Decimal, optional): Giá bán tối đa (bao gồm).
+            ton_kho_toi_da (int, optional): Chỉ lấy hàng có tồn kho <= giá trị này.
+            ten_bat_dau (str, optional): Tiền tố tên hàng.
+
+        Returns:
+            QuerySet: QuerySet đã lọc.
+        """
+        if ma_loai_hang is not None:
+            qs = qs.filter(ma_loai_hang_id=ma_loai_hang)
+        if ma_thuong_hieu is not None:
+            qs = qs.filter(ma_thuong_hieu_id=ma_thuong_hieu)
+        if gia_tu is not None:
+            qs = qs.filter(gia_ban__gte=gia_tu)
+        if gia_den is not None:
+            qs = qs.filter(gia_ban__lte=gia_den)
+        if ton_kho_toi_da is not None:
+            qs = qs.filter(so_luong_ton__lte=ton_kho_toi_da)
+        if ten_bat_dau:
+            qs = qs.filter(ten_hang__startswith=ten_bat_dau)
+        return qs
 
     @staticmethod
-    def get_by_id(ma_hang: int) -> Optional[HangHoa]:
+    def can_dat_lai() -> List[Dict]:
+        """
+        Các hàng hóa cần đặt lại (so_luong_ton <= muc_dat_lai, muc_dat_lai > 0),
+        theo mã hàng.
+
+        Hàng hóa không phân mảnh: trên SQL Server đọc indexed view
+        V_HANG_HOA_CAN_DAT_LAI (được cập nhật trong chính các câu lệnh
+        sửa tồn kho), chi phí theo số cảnh báo; backend khác lọc trên
+        HANG_HOA. Hàng hóa phân mảnh tồn kho (ít, có mức đặt lại) được
+        đánh giá trên tổng các phân mảnh, không trên bản sao SoLuongTon.
+
+        Returns:
+            List[Dict]: Các dict {ma_hang, ten_hang, so_luong_ton, muc_dat_lai}.
+        """
+        cot = ('ma_hang', 'ten_hang', 'so_luong_ton', 'muc_dat_lai')
+        if connection.vendor != 'microsoft':
+            danh_sach = list(
+                HangHoa.objects
+                .filter(muc_dat_lai__gt=0, so_luong_ton__lte=F('muc_dat_lai'), so_phan_manh=0)
+                .values(*cot)
+            )
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT MaHang, TenHang, SoLuongTon, MucDatLai
+                    FROM V_HANG_HOA_CAN_DAT_LAI WITH (NOEXPAND)
+                    """
+                )
+                danh_sach = [dict(zip(cot, row)) for row in cursor.fetchall()]
+
+        # Chỉ mục lọc IX_HANG_HOA_PhanManh (sql/10): không quét danh mục
+        phan_manh = list(
+            HangHoa.objects
+            .filter(so_phan_manh__gt=0, muc_dat_lai__gt=0)
+            .values(*cot, 'so_phan_manh')
+        )
+        HangHoaRepository.gan_ton_kho_phan_manh(phan_manh)
+        for row in phan_manh:
+            if row['so_luong_ton'] <= row['muc_dat_lai']:
+                del row['so_phan_manh']
+                danh_sach.append(row)
+
+        danh_sach.sort(key=lambda row: row['ma_hang'])
+        return danh_sach
+
+    @staticmethod
+    def get_by_id(ma_hang: int, dung_bo_nho_dem: bool = True) -> Optional[HangHoa]:
         """
         Lấy thông tin hàng hóa theo mã hàng.
 
+        Mặc định đọc xuyên qua bo_nho_dem_hang_hoa. Trước khi đọc, các
+        thay đổi đã commit ở mọi worker được áp dụng lên bộ nhớ đệm của
+        process (dong_bo_bo_nho_dem, một truy vấn nhật ký), nên giá trị
+        đệm không cũ hơn lần thay đổi đã commit gần nhất. Nơi cần giá trị
+        trong transaction (kiểm tra tồn kho, sửa rồi ghi lại) phải truyền
+        dung_bo_nho_dem=False.
+
+        so_luong_ton của hàng hóa phân mảnh là bản sao HANG_HOA; nơi
+        hiển thị dùng HangHoaService.get_by_id (tồn kho thật).
+
         Args:
             ma_hang (int): Mã định danh của hàng hóa.
+            dung_bo_nho_dem (bool): False để luôn đọc từ CSDL.
 
         Returns:
             HangHoa | None: Đối tượng hàng hóa nếu tồn tại,
             ngược lại trả về None.
         """
+        if dung_bo_nho_dem:
+            moc = dong_bo_bo_nho_dem.kiem_tra()
+            obj = bo_nho_dem_hang_hoa.lay(ma_hang)
+            if obj is not None:
+                return obj
+
         try:
-            return HangHoa.objects.get(pk=ma_hang)
+            obj = HangHoa.objects.select_related(
+                *HangHoaRepository.QUAN_HE_LONG
+            ).get(pk=ma_hang)
         except HangHoa.DoesNotExist:
             return None
 
+        # Có thay đổi được áp dụng trong lúc đọc: obj có thể là bản cũ
+        # của một mục vừa bị hủy, không lưu
+        if dung_bo_nho_dem and dong_bo_bo_nho_dem.kiem_tra(bat_buoc=True) == moc:
+            bo_nho_dem_hang_hoa.dat(ma_hang, obj)
+        return obj
+
     @staticmethod
+    def huy_bo_nho_dem(cac_ma_hang: Iterable[int]) -> None:
+        """
+        Hủy bộ nhớ đệm của các hàng hóa vừa bị sửa.
+
+        Hủy ngay, và hủy lại sau khi transaction commit: request khác
+        có thể đã nạp lại giá trị cũ (chưa commit) vào bộ nhớ đệm
+        trong lúc transaction còn chạy.
+
+        Args:
+            cac_ma_hang (Iterable[int]): Mã các hàng hóa đã thay đổi.
+        """
+        cac_ma_hang = list(cac_ma_hang)
+
+        def huy():
+            for ma_hang in cac_ma_hang:
+                bo_nho_dem_hang_hoa.xoa(ma_hang)
+
+        huy()
+        transaction.on_commit(huy)
+
+    @staticmethod
+    @transaction.atomic
     def create(
         ten_hang: str,
         ma_thuong_hieu: int = None,
@@ -122,7 +424,8 @@ class HangHoaRepository:
         ma_dvt: int = None,
         gia_nhap: float = 0,
         gia_ban: float = 0,
-        so_luong_ton: int = 0
+        so_luong_ton: int = 0,
+        muc_dat_lai: int = 0
     ) -> HangHoa:
         """
         Tạo mới một hàng hóa.
@@ -135,6 +438,7 @@ class HangHoaRepository:
             gia_nhap (float): Giá nhập hàng hóa.
             gia_ban (float): Giá bán hàng hóa.
             so_luong_ton (int): Số lượng tồn kho ban đầu.
+            muc_dat_lai (int): Mức đặt lại, 0 là không cảnh báo.
 
         Returns:
             HangHoa: Đối tượng hàng hóa vừa được tạo.
@@ -146,12 +450,16 @@ class HangHoaRepository:
             ma_dvt_id=ma_dvt,
             gia_nhap=gia_nhap,
             gia_ban=gia_ban,
-            so_luong_ton=so_luong_ton
+            so_luong_ton=so_luong_ton,
+            muc_dat_lai=muc_dat_lai
         )
         obj.save()
+        HangHoaThayDoiRepository.ghi([obj.ma_hang])
+        BienDongKhoRepository.ghi({obj.ma_hang: so_luong_ton}, BienDongKho.LOAI_NHAP)
         return obj
 
     @staticmethod
+    @transaction.atomic
     def update(ma_hang: int, **kwargs) -> Optional[HangHoa]:
         """
         Cập nhật thông tin hàng hóa theo mã hàng.
@@ -160,20 +468,38 @@ class HangHoaRepository:
             ma_hang (int): Mã định danh của hàng hóa cần cập nhật.
             **kwargs: Các trường cần cập nhật và giá trị tương ứng.
 
+        Raises:
+            ValueError: Sửa so_luong_ton của hàng hóa đang phân mảnh tồn kho.
+
         Returns:
             HangHoa | None: Đối tượng hàng hóa sau khi cập nhật,
             hoặc None nếu không tồn tại.
         """
-        obj = HangHoaRepository.get_by_id(ma_hang)
+        if 'so_luong_ton' in kwargs:
+            # Ghi tuyệt đối so_luong_ton: khóa dòng trước khi đọc tồn kho
+            # cũ (như NhapHangHoaService), để hóa đơn commit giữa lúc đọc và
+            # lúc ghi không bị ghi đè và biến động kho tính đúng chênh lệch
+            if not HangHoaRepository.get_values_theo_ma([ma_hang], (), khoa=True):
+                return None
+        obj = HangHoaRepository.get_by_id(ma_hang, dung_bo_nho_dem=False)
         if not obj:
             return None
-        for key, value in kwargs.items():
-            if hasattr(obj, key):
-                setattr(obj, key, value)
-        obj.save()
+        if 'so_luong_ton' in kwargs and obj.so_phan_manh:
+            raise ValueError("Hàng hóa đang chia tồn kho theo phân mảnh, không sửa trực tiếp so_luong_ton")
+        truong = [key for key in kwargs if hasattr(obj, key)]
+        ton_cu = obj.so_luong_ton
+        for key in truong:
+            setattr(obj, key, kwargs[key])
+        # Chỉ ghi các trường được sửa, không ghi đè tồn kho / phân mảnh
+        # do thao tác khác thay đổi sau khi đọc
+        obj.save(update_fields=truong)
+        HangHoaThayDoiRepository.ghi([ma_hang])
+        BienDongKhoRepository.ghi({ma_hang: obj.so_luong_ton - ton_cu}, BienDongKho.LOAI_DIEU_CHINH)
+        HangHoaRepository.huy_bo_nho_dem([ma_hang])
         return obj
 
     @staticmethod
+    @transaction.atomic
     def delete(ma_hang: int) -> bool:
         """
         Xóa một hàng hóa theo mã hàng.
@@ -184,16 +510,33 @@ class HangHoaRepository:
         Returns:
             bool: True nếu xóa thành công, False nếu không tồn tại.
         """
-        obj = HangHoaRepository.get_by_id(ma_hang)
+        obj = HangHoaRepository.get_by_id(ma_hang, dung_bo_nho_dem=False)
         if not obj:
             return False
         obj.delete()
+        HangHoaThayDoiRepository.ghi([ma_hang], HangHoaThayDoi.LOAI_XOA)
+        HangHoaRepository.huy_bo_nho_dem([ma_hang])
         return True
 
     @staticmethod
+    @transaction.atomic
     def adjust_stock(ma_hang: int, so_luong: int) -> Optional[HangHoa]:
         """
-        Điều chỉnh số lượng tồn kho của hàng hóa (cộng hoặc trừ).
+        Điều chỉnh số lượng tồn kho của hàng hóa (cộng hoặc trừ) bằng
+        một câu UPDATE có điều kiện, không đọc - sửa - ghi:
+
+            UPDATE HANG_HOA SET SoLuongTon = SoLuongTon + @so_luong
+            OUTPUT INSERTED.MaHang, 'D', @so_luong, NULL INTO BIEN_DONG_KHO (...)
+            OUTPUT INSERTED.*
+            WHERE MaHang = @ma_hang AND SoLuongTon >= -@so_luong
+              AND SoPhanManh = 0
+
+        Kiểm tra và ghi nằm trong cùng câu lệnh (khóa dòng của UPDATE),
+        nên các lần điều chỉnh đồng thời không ghi đè lên nhau và tồn
+        kho không bao giờ âm. Trên SQL Server, dòng sau cập nhật được
+        trả về từ chính câu lệnh (OUTPUT INSERTED), sổ biến động kho
+        cũng được ghi trong câu lệnh đó; backend khác đọc lại theo khóa
+        chính và ghi sổ bằng một câu INSERT.
 
         Args:
             ma_hang (int): Mã định danh của hàng hóa.
@@ -201,11 +544,255 @@ class HangHoaRepository:
 
         Returns:
             HangHoa | None: Đối tượng hàng hóa sau khi cập nhật tồn kho,
-            hoặc None nếu không tồn tại.
+            hoặc None nếu không tồn tại, không đủ tồn kho hoặc đang
+            phân mảnh tồn kho (không dòng nào được cập nhật).
         """
-        obj = HangHoaRepository.get_by_id(ma_hang)
-        if not obj:
+        if connection.vendor == 'microsoft':
+            obj = HangHoaRepository._adjust_stock_output(ma_hang, so_luong)
+        else:
+            so_dong = HangHoa.objects.filter(
+                ma_hang=ma_hang, so_luong_ton__gte=-so_luong, so_phan_manh=0
+            ).update(so_luong_ton=F('so_luong_ton') + so_luong)
+            obj = HangHoaRepository.get_by_id(ma_hang, dung_bo_nho_dem=False) if so_dong else None
+            if obj is not None:
+                BienDongKhoRepository.ghi({ma_hang: so_luong}, BienDongKho.LOAI_DIEU_CHINH)
+
+        if obj is None:
             return None
-        obj.so_luong_ton += so_luong
-        obj.save()
+        HangHoaThayDoiRepository.ghi([ma_hang])
+        HangHoaRepository.huy_bo_nho_dem([ma_hang])
         return obj
+
+    @staticmethod
+    def _adjust_stock_output(ma_hang: int, so_luong: int) -> Optional[HangHoa]:
+        """
+        UPDATE ... OUTPUT INSERTED của SQL Server: cập nhật, ghi sổ
+        biến động kho và trả về dòng mới trong một lượt đi về CSDL.
+        """
+        truong = HangHoa._meta.concrete_fields
+        qn = connection.ops.quote_name
+        ton = qn(HangHoa._meta.get_field('so_luong_ton').column)
+        phan_manh = qn(HangHoa._meta.get_field('so_phan_manh').column)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {qn(HangHoa._meta.db_table)} "
+                f"SET {ton} = {ton} + %s "
+                f"{BienDongKhoRepository.output_into('INSERTED.' + qn(HangHoa._meta.pk.column), '%s')} "
+                f"OUTPUT {', '.join('INSERTED.' + qn(f.column) for f in truong)} "
+                f"WHERE {qn(HangHoa._meta.pk.column)} = %s AND {ton} >= %s AND {phan_manh} = 0",
+                [so_luong, BienDongKho.LOAI_DIEU_CHINH, so_luong, None, ma_hang, -so_luong]
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        return HangHoa.from_db(connection.alias, [f.attname for f in truong], row)
+
+    @staticmethod
+    def tim_theo_ten_thuong_hieu(
+        cac_ten: Iterable[str],
+        chunk_size: int = 1000
+    ) -> Dict[Tuple[str, Optional[int]], int]:
+        """
+        Tìm hàng hóa theo khóa tự nhiên (tên hàng, thương hiệu).
+
+        Args:
+            cac_ten (Iterable[str]): Các tên hàng cần tìm.
+            chunk_size (int): Số tên mỗi truy vấn.
+
+        Returns:
+            Dict: {(tên hàng đã casefold, mã thương hiệu | None): mã hàng}.
+        """
+        cac_ten = list(set(cac_ten))
+        ket_qua = {}
+        for i in range(0, len(cac_ten), chunk_size):
+            for ma_hang, ten_hang, ma_thuong_hieu in (
+                HangHoa.objects
+                .filter(ten_hang__in=cac_ten[i:i + chunk_size])
+                .order_by('ma_hang')
+                .values_list('ma_hang', 'ten_hang', 'ma_thuong_hieu_id')
+            ):
+                ket_qua.setdefault((ten_hang.strip().casefold(), ma_thuong_hieu), ma_hang)
+        return ket_qua
+
+    @staticmethod
+    def tao_hang_loat(danh_sach: List[HangHoa], batch_size: int = 250) -> List[HangHoa]:
+        """
+        Tạo nhiều hàng hóa bằng INSERT nhiều dòng (bulk_create), ghi
+        nhật ký thay đổi. Nơi gọi nên chạy trong transaction.atomic.
+
+        Args:
+            danh_sach (List[HangHoa]): Các hàng hóa chưa lưu.
+            batch_size (int): Số dòng mỗi câu INSERT (8 tham số mỗi dòng,
+                dưới giới hạn 2100 tham số của SQL Server).
+
+        Returns:
+            List[HangHoa]: Các hàng hóa đã lưu, có mã hàng.
+        """
+        danh_sach = HangHoa.objects.bulk_create(danh_sach, batch_size=batch_size)
+        HangHoaThayDoiRepository.ghi(obj.ma_hang for obj in danh_sach)
+        BienDongKhoRepository.ghi(
+            {obj.ma_hang: obj.so_luong_ton for obj in danh_sach}, BienDongKho.LOAI_NHAP
+        )
+        return danh_sach
+
+    @staticmethod
+    def cap_nhat_hang_loat(
+        danh_sach: List[HangHoa],
+        truong: Iterable[str],
+        batch_size: int = 100
+    ) -> int:
+        """
+        Cập nhật các trường chỉ định của nhiều hàng hóa (bulk_update,
+        UPDATE ... CASE theo khối), ghi nhật ký thay đổi và hủy bộ nhớ đệm.
+        Nơi gọi nên chạy trong transaction.atomic.
+
+        Args:
+            danh_sach (List[HangHoa]): Hàng hóa có mã hàng và giá trị mới
+                (không cần nạp từ CSDL).
+            truong (Iterable[str]): Các trường được ghi.
+            batch_size (int): Số dòng mỗi câu UPDATE.
+
+        Returns:
+            int: Số dòng đã cập nhật.
+        """
+        so_dong = HangHoa.objects.bulk_update(danh_sach, list(truong), batch_size=batch_size)
+        cac_ma_hang = [obj.ma_hang for obj in danh_sach]
+        HangHoaThayDoiRepository.ghi(cac_ma_hang)
+        HangHoaRepository.huy_bo_nho_dem(cac_ma_hang)
+        return so_dong
+
+    @staticmethod
+    def dieu_chinh_ton_kho_hang_loat(
+        so_luong_map: Dict[int, int],
+        chunk_size: int = 400,
+        loai: str = BienDongKho.LOAI_DIEU_CHINH,
+        ma_tham_chieu: Optional[int] = None
+    ) -> Dict[int, Tuple[int, int, int]]:
+        """
+        Điều chỉnh tồn kho của nhiều hàng hóa bằng UPDATE có điều kiện
+        theo tập hợp (set-based), thay vì đọc - sửa - ghi từng dòng,
+        và ghi sổ biến động kho.
+
+        Trên SQL Server, câu lệnh có dạng (sổ được ghi ngay trong câu
+        UPDATE, tồn kho trước / sau trả về từ chính câu lệnh, không
+        thêm lượt đi về CSDL):
+            UPDATE h SET SoLuongTon = h.SoLuongTon + v.SoLuong
+            OUTPUT INSERTED.MaHang, @loai, v.SoLuong, ... INTO BIEN_DONG_KHO (...)
+            OUTPUT INSERTED.MaHang, DELETED.SoLuongTon, INSERTED.SoLuongTon,
+                   INSERTED.MucDatLai
+            FROM HANG_HOA h JOIN (VALUES (...), ...) v (MaHang, SoLuong)
+                ON v.MaHang = h.MaHang
+            WHERE h.SoLuongTon + v.SoLuong >= 0 AND h.SoPhanManh = 0
+
+        Backend khác khóa và đọc các dòng (SELECT ... FOR UPDATE), rồi
+        UPDATE ... CASE MaHang WHEN ... END của ORM các dòng hợp lệ
+        và INSERT sổ.
+
+        Dòng nào sau điều chỉnh bị âm tồn kho, hoặc hàng hóa đang phân
+        mảnh tồn kho (so_phan_manh > 0, tồn kho nằm ở TON_KHO_PHAN_MANH),
+        sẽ không được cập nhật và không có trong kết quả. Hàm không tự
+        rollback; nơi gọi phải chạy trong transaction và hủy toàn bộ
+        khi kết quả không đủ.
+
+        Args:
+            so_luong_map (Dict[int, int]): {mã hàng: số lượng điều chỉnh
+                (dương hoặc âm)}.
+            chunk_size (int): Số hàng hóa tối đa trong một câu lệnh
+                (SQL Server giới hạn 2100 tham số mỗi câu lệnh).
+            loai (str): Loại biến động ghi vào sổ (BienDongKho.LOAI_*).
+            ma_tham_chieu (int, optional): Mã hóa đơn với biến động bán.
+
+        Returns:
+            Dict[int, Tuple[int, int, int]]: {mã hàng đã cập nhật:
+            (tồn kho trước, tồn kho sau, mức đặt lại)}, đọc trong chính
+            lần cập nhật (dùng cho cảnh báo tồn kho, không cần đọc lại).
+
+        Raises:
+            ValueError: Loại biến động không hợp lệ.
+        """
+        BienDongKhoRepository.kiem_tra_loai(loai)
+        items = list(so_luong_map.items())
+        ket_qua = {}
+
+        for i in range(0, len(items), chunk_size):
+            chunk = items[i:i + chunk_size]
+
+            if connection.vendor == 'microsoft':
+                ket_qua.update(HangHoaRepository._dieu_chinh_output(chunk, loai, ma_tham_chieu))
+                continue
+
+            ton_truoc = {
+                ma_hang: (so_luong_ton, muc_dat_lai)
+                for ma_hang, so_luong_ton, muc_dat_lai in
+                HangHoa.objects
+                .select_for_update()
+                .filter(ma_hang__in=[ma_hang for ma_hang, _ in chunk], so_phan_manh=0)
+                .values_list('ma_hang', 'so_luong_ton', 'muc_dat_lai')
+            }
+            hop_le = [
+                (ma_hang, so_luong) for ma_hang, so_luong in chunk
+                if ma_hang in ton_truoc and ton_truoc[ma_hang][0] + so_luong >= 0
+            ]
+            if not hop_le:
+                continue
+
+            HangHoa.objects.filter(
+                ma_hang__in=[ma_hang for ma_hang, _ in hop_le]
+            ).update(so_luong_ton=models.F('so_luong_ton') + Case(
+                *[When(ma_hang=ma_hang, then=Value(so_luong))
+                  for ma_hang, so_luong in hop_le],
+                output_field=models.IntegerField()
+            ))
+            BienDongKhoRepository.ghi(dict(hop_le), loai, ma_tham_chieu)
+            for ma_hang, so_luong in hop_le:
+                truoc, muc_dat_lai = ton_truoc[ma_hang]
+                ket_qua[ma_hang] = (truoc, truoc + so_luong, muc_dat_lai)
+
+        HangHoaThayDoiRepository.ghi(so_luong_map)
+        HangHoaRepository.huy_bo_nho_dem(so_luong_map)
+        return ket_qua
+
+    @staticmethod
+    def _dieu_chinh_output(
+        chunk: List[Tuple[int, int]],
+        loai: str,
+        ma_tham_chieu: Optional[int]
+    ) -> Dict[int, Tuple[int, int, int]]:
+        """
+        Một khối của dieu_chinh_ton_kho_hang_loat trên SQL Server:
+        UPDATE ... FROM (VALUES ...) kèm OUTPUT ... INTO BIEN_DONG_KHO
+        và OUTPUT tồn kho trước / sau, mức đặt lại về client.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE h SET SoLuongTon = h.SoLuongTon + v.SoLuong
+                {BienDongKhoRepository.output_into('INSERTED.MaHang', 'v.SoLuong')}
+                OUTPUT INSERTED.MaHang, DELETED.SoLuongTon, INSERTED.SoLuongTon, INSERTED.MucDatLai
+                FROM HANG_HOA h
+                JOIN (VALUES {', '.join(['(%s, %s)'] * len(chunk))}) AS v (MaHang, SoLuong)
+                    ON v.MaHang = h.MaHang
+                WHERE h.SoLuongTon + v.SoLuong >= 0 AND h.SoPhanManh = 0
+                """,
+                [loai, ma_tham_chieu] + [x for cap in chunk for x in cap]
+            )
+            return {ma_hang: (truoc, sau, muc) for ma_hang, truoc, sau, muc in cursor.fetchall()}
+
+    @staticmethod
+    def dat_phan_manh(ma_hang: int, so_phan_manh: int, so_luong_ton: Optional[int] = None) -> None:
+        """
+        Ghi số phân mảnh tồn kho (và tồn kho, nếu có) của hàng hóa.
+        Nơi gọi phải chạy trong transaction cùng thao tác trên
+        TON_KHO_PHAN_MANH.
+
+        Args:
+            ma_hang (int): Mã hàng hóa.
+            so_phan_manh (int): Số phân mảnh, 0 là tắt.
+            so_luong_ton (int, optional): Tồn kho mới.
+        """
+        gia_tri = {'so_phan_manh': so_phan_manh}
+        if so_luong_ton is not None:
+            gia_tri['so_luong_ton'] = so_luong_ton
+        HangHoa.objects.filter(pk=ma_hang).update(**gia_tri)
+        HangHoaThayDoiRepository.ghi([ma_hang])
+        HangHoaRepository.huy_bo_nho_dem([ma_hang])
@@ -0,0 +1,256 @@
+import threading
+import time
+from django.conf import settings
+from django.db import connection, models
+from typing import Callable, Iterable, List, Optional, Tuple
+
+# =========================
+# Models cho bảng HANG_HOA_THAY_DOI
+# =========================
+class HangHoaThayDoi(models.Model):
+    """
+    Lớp Model biểu diễn một dòng nhật ký thay đổi hàng hóa,
+    dùng cho đồng bộ gia tăng (delta sync) của máy bán hàng.
+
+    Bảng còn cột PhienBan kiểu ROWVERSION (xem sql/07_hang_hoa_thay_doi.sql)
+    do SQL Server tự tăng khi ghi; cột này không khai báo trong model
+    (Django không được ghi vào), chỉ đọc bằng SQL trong repository.
+    """
+
+    LOAI_CAP_NHAT = 'U'
+    LOAI_XOA = 'D'
+
+    ma_thay_doi = models.BigAutoField(
+        primary_key=True,
+        db_column='MaThayDoi'
+    )
+
+    # Không khóa ngoại: dòng xóa (tombstone) vẫn giữ mã hàng đã bị xóa
+    ma_hang = models.IntegerField(
+        db_column='MaHang'
+    )
+
+    loai = models.CharField(
+        max_length=1,
+        db_column='LoaiThayDoi'
+    )
+
+    thoi_diem = models.DateTimeField(
+        auto_now_add=True,
+        db_column='ThoiDiem'
+    )
+
+    class Meta:
+        db_table = 'HANG_HOA_THAY_DOI'
+        managed = False
+
+    def __str__(self):
+        """
+        Trả về mô tả ngắn của thay đổi.
+
+        Returns:
+            str: Loại thay đổi và mã hàng.
+        """
+        return f"{self.loai}:{self.ma_hang}"
+
+
+##############################################
+# HangHoaThayDoiRepository
+##############################################
+class HangHoaThayDoiRepository:
+    """
+    Lớp Repository chịu trách nhiệm ghi và đọc nhật ký thay đổi hàng hóa.
+    """
+
+    @staticmethod
+    def ghi(cac_ma_hang: Iterable[int], loai: str = HangHoaThayDoi.LOAI_CAP_NHAT, chunk_size: int = 500) -> None:
+        """
+        Ghi nhật ký thay đổi cho các hàng hóa (INSERT nhiều dòng).
+
+        Phải chạy cùng transaction với thay đổi trên HANG_HOA, để
+        nhật ký và dữ liệu cùng commit hoặc cùng rollback.
+
+        Args:
+            cac_ma_hang (Iterable[int]): Mã các hàng hóa đã thay đổi.
+            loai (str): LOAI_CAP_NHAT (tạo / sửa) hoặc LOAI_XOA.
+            chunk_size (int): Số dòng mỗi câu INSERT.
+        """
+        HangHoaThayDoi.objects.bulk_create(
+            [HangHoaThayDoi(ma_hang=ma_hang, loai=loai) for ma_hang in set(cac_ma_hang)],
+            batch_size=chunk_size
+        )
+
+    @staticmethod
+    def phien_ban_hien_tai() -> int:
+        """
+        Phiên bản lớn nhất mà mọi thay đổi tới đó đều đã commit.
+
+        MIN_ACTIVE_ROWVERSION() là rowversion nhỏ nhất còn thuộc một
+        transaction chưa commit (hoặc rowversion kế tiếp nếu không có),
+        nên mọi thứ nhỏ hơn nó đã ổn định.
+
+        Returns:
+            int: Token đồng bộ.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT CAST(MIN_ACTIVE_ROWVERSION() AS BIGINT) - 1")
+            return cursor.fetchone()[0]
+
+    @staticmethod
+    def phien_ban_moi_nhat() -> int:
+        """
+        Phiên bản của thay đổi đã commit mới nhất trong nhật ký: đổi
+        mỗi khi có hàng hóa được tạo / sửa / xóa / đổi tồn kho, ở bất kỳ
+        worker nào. Một lần seek cuối chỉ mục clustered theo PhienBan
+        (nén nhật ký không xóa dòng mới nhất của hàng hóa nào).
+
+        Returns:
+            int: Phiên bản, 0 nếu nhật ký rỗng.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT CAST(MAX(PhienBan) AS BIGINT) FROM HANG_HOA_THAY_DOI
+                WHERE PhienBan < MIN_ACTIVE_ROWVERSION()
+                """
+            )
+            return cursor.fetchone()[0] or 0
+
+    @staticmethod
+    def doc_tu(tu_phien_ban: int, gioi_han: int) -> List[Tuple[int, int, str]]:
+        """
+        Đọc các thay đổi có phiên bản lớn hơn tu_phien_ban, theo thứ tự
+        phiên bản, chỉ tới trước transaction đang mở sớm nhất: thay đổi
+        của transaction commit muộn không bao giờ bị token vượt qua.
+
+        Seek trên chỉ mục clustered theo PhienBan.
+
+        Args:
+            tu_phien_ban (int): Token đồng bộ của client.
+            gioi_han (int): Số dòng tối đa.
+
+        Returns:
+            List[Tuple[int, int, str]]: Các bộ (phiên bản, mã hàng, loại).
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT TOP (%s) CAST(PhienBan AS BIGINT), MaHang, LoaiThayDoi
+                FROM HANG_HOA_THAY_DOI
+                WHERE PhienBan > CAST(CAST(%s AS BIGINT) AS BINARY(8))
+                  AND PhienBan < MIN_ACTIVE_ROWVERSION()
+                ORDER BY PhienBan
+                """,
+                [gioi_han, tu_phien_ban]
+            )
+            return [(int(pb), ma_hang, loai) for pb, ma_hang, loai in cursor.fetchall()]
+
+    @staticmethod
+    def nen() -> int:
+        """
+        Nén nhật ký: xóa các dòng đã có dòng mới hơn của cùng hàng hóa.
+
+        Client ở bất kỳ token nào vẫn nhận đủ trạng thái mới nhất của
+        từng hàng hóa, nên việc nén không làm hỏng đồng bộ.
+        Ghi của cùng một hàng hóa bị khóa dòng HANG_HOA tuần tự hóa,
+        nên MaThayDoi lớn hơn là thay đổi mới hơn.
+
+        Returns:
+            int: Số dòng đã xóa.
+        """
+        moi_hon = HangHoaThayDoi.objects.filter(
+            ma_hang=models.OuterRef('ma_hang'),
+            ma_thay_doi__gt=models.OuterRef('ma_thay_doi')
+        )
+        so_dong, _ = HangHoaThayDoi.objects.filter(models.Exists(moi_hon)).delete()
+        return so_dong
+
+
+##############################################
+# Đồng bộ bộ nhớ đệm trong process theo nhật ký
+##############################################
+class DongBoBoNhoDem:
+    """
+    Hủy các bộ nhớ đệm hàng hóa trong process theo nhật ký thay đổi
+    HANG_HOA_THAY_DOI, để thay đổi ở worker khác có hiệu lực ngay ở lần
+    đọc sau thay vì chờ hết thời gian sống của mục đệm.
+
+    Mỗi process giữ một mốc (phiên bản nhật ký đã áp dụng). kiem_tra()
+    đọc các thay đổi đã commit sau mốc (seek cuối chỉ mục clustered theo
+    PhienBan, không có thay đổi thì trả về rỗng), hủy mục đệm của các
+    hàng hóa đó rồi dời mốc. Nhiều thay đổi quá thì hủy toàn bộ.
+
+    Mặc định kiểm tra ở mỗi lần đọc bộ nhớ đệm;
+    settings.HANG_HOA_CACHE_THOI_GIAN_KIEM_TRA > 0 giãn khoảng kiểm tra
+    (đổi lấy độ trễ tối đa ngần ấy giây).
+    """
+
+    # Số dòng nhật ký tối đa đọc mỗi lần, nhiều hơn thì hủy toàn bộ
+    SO_THAY_DOI_TOI_DA = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._moc: Optional[int] = None
+        self._lan_kiem_tra = 0.0
+        # (hủy một hàng hóa, hủy toàn bộ) của các bộ nhớ đệm đã đăng ký
+        self._cac_ham: List[Tuple[Callable[[int], None], Callable[[], None]]] = []
+
+    def dang_ky(self, xoa: Callable[[int], None], xoa_tat_ca: Callable[[], None]) -> None:
+        """
+        Đăng ký một bộ nhớ đệm theo mã hàng.
+
+        Args:
+            xoa: Hàm hủy mục đệm của một hàng hóa.
+            xoa_tat_ca: Hàm hủy toàn bộ.
+        """
+        self._cac_ham.append((xoa, xoa_tat_ca))
+
+    def kiem_tra(self, bat_buoc: bool = False) -> Optional[int]:
+        """
+        Áp dụng các thay đổi đã commit từ mốc hiện tại.
+
+        Args:
+            bat_buoc (bool): Kiểm tra cả khi chưa hết khoảng
+                HANG_HOA_CACHE_THOI_GIAN_KIEM_TRA.
+
+        Returns:
+            int: Mốc sau khi áp dụng. Nơi nạp mục đệm từ CSDL so mốc
+            trước và sau khi đọc: khác nhau thì giá trị vừa đọc có thể
+            đã bị hủy trong lúc đọc, không nên lưu.
+        """
+        khoang = getattr(settings, "HANG_HOA_CACHE_THOI_GIAN_KIEM_TRA", 0)
+        with self._lock:
+            bay_gio = time.monotonic()
+            if (
+                not bat_buoc and khoang and self._moc is not None
+                and bay_gio - self._lan_kiem_tra < khoang
+            ):
+                return self._moc
+            self._lan_kiem_tra = bay_gio
+
+            if self._moc is None:
+                # Lần đầu: mục đệm (nếu có) chưa được đối chiếu với nhật ký
+                self._moc = HangHoaThayDoiRepository.phien_ban_hien_tai()
+                self._huy_tat_ca()
+                return self._moc
+
+            thay_dois = HangHoaThayDoiRepository.doc_tu(
+                self._moc, DongBoBoNhoDem.SO_THAY_DOI_TOI_DA
+            )
+            if len(thay_dois) == DongBoBoNhoDem.SO_THAY_DOI_TOI_DA:
+                self._moc = HangHoaThayDoiRepository.phien_ban_hien_tai()
+                self._huy_tat_ca()
+            elif thay_dois:
+                self._moc = thay_dois[-1][0]
+                for ma_hang in {ma_hang for _, ma_hang, _ in thay_dois}:
+                    for xoa, _ in self._cac_ham:
+                        xoa(ma_hang)
+            return self._moc
+
+    def _huy_tat_ca(self) -> None:
+        for _, xoa_tat_ca in self._cac_ham:
+            xoa_tat_ca()
+
+
+# Dùng chung cho các bộ nhớ đệm hàng hóa của process
+dong_bo_bo_nho_dem = DongBoBoNhoDem()
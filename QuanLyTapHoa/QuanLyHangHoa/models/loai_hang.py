@@ -41,6 +41,12 @@ class LoaiHang(models.Model):
 
 
 from typing import List, Optional
+from QuanLyTapHoa.du_lieu_tham_chieu import DuLieuThamChieu
+
+# Bản chụp bất biến của bảng trong bộ nhớ process (xem QuanLyTapHoa/du_lieu_tham_chieu.py)
+du_lieu_loai_hang = DuLieuThamChieu(
+    "loaihang", lambda: list(LoaiHang.objects.order_by("ma_loai"))
+)
 
 class LoaiHangRepository:
     """
@@ -54,9 +60,10 @@ class LoaiHangRepository:
         Lấy danh sách tất cả loại hàng trong hệ thống.
 
         Returns:
-            List[LoaiHang]: Danh sách các đối tượng loại hàng.
+            List[LoaiHang]: Danh sách các đối tượng loại hàng
+            (đọc từ bản chụp trong bộ nhớ, chỉ được đọc).
         """
-        return list(LoaiHang.objects.all())
+        return list(du_lieu_loai_hang.danh_sach())
 
     @staticmethod
     def get_by_id(ma_loai: int) -> Optional[LoaiHang]:
@@ -70,10 +77,7 @@ class LoaiHangRepository:
             LoaiHang | None: Đối tượng loại hàng nếu tồn tại,
             ngược lại trả về None.
         """
-        try:
-            return LoaiHang.objects.get(pk=ma_loai)
-        except LoaiHang.DoesNotExist:
-            return None
+        return du_lieu_loai_hang.get(ma_loai)
 
     @staticmethod
     def create(ten_loai: str, mo_ta: str = None) -> LoaiHang:
@@ -89,6 +93,7 @@ class LoaiHangRepository:
         """
         obj = LoaiHang(ten_loai=ten_loai, mo_ta=mo_ta)
         obj.save()
+        du_lieu_loai_hang.da_thay_doi()
         return obj
 
     @staticmethod
@@ -104,13 +109,14 @@ class LoaiHangRepository:
             LoaiHang | None: Đối tượng loại hàng sau khi cập nhật,
             hoặc None nếu không tồn tại.
         """
-        obj = LoaiHangRepository.get_by_id(ma_loai)
+        obj = LoaiHang.objects.filter(pk=ma_loai).first()
         if not obj:
             return None
         for key, value in kwargs.items():
             if hasattr(obj, key):
                 setattr(obj, key, value)
         obj.save()
+        du_lieu_loai_hang.da_thay_doi()
         return obj
 
     @staticmethod
@@ -124,8 +130,9 @@ class LoaiHangRepository:
         Returns:
             bool: True nếu xóa thành công, False nếu không tồn tại.
         """
-        obj = LoaiHangRepository.get_by_id(ma_loai)
+        obj = LoaiHang.objects.filter(pk=ma_loai).first()
         if not obj:
             return False
         obj.delete()
+        du_lieu_loai_hang.da_thay_doi()
         return True
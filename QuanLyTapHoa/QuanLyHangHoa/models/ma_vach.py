@@ -0,0 +1,187 @@
+from django.db import models
+from .hang_hoa import HangHoa
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# =========================
+# Models cho bảng MA_VACH
+# =========================
+class MaVach(models.Model):
+    """
+    Lớp Model biểu diễn mã vạch (EAN-8 / UPC-A / EAN-13 / GTIN-14)
+    của hàng hóa. Một hàng hóa có thể có nhiều mã vạch
+    (nhiều quy cách đóng gói, nhiều nhà cung cấp).
+
+    Mã vạch được lưu ở dạng GTIN-14 (thêm số 0 bên trái),
+    để cùng một mã quét ra dạng UPC-A hay EAN-13 vẫn trùng khóa.
+    """
+
+    ma_vach = models.CharField(
+        primary_key=True,
+        max_length=14,
+        db_column='MaVach'
+    )
+
+    hang_hoa = models.ForeignKey(
+        HangHoa,
+        on_delete=models.CASCADE,
+        db_column='MaHang',
+        related_name='ma_vachs'
+    )
+
+    class Meta:
+        db_table = 'MA_VACH'
+        managed = False
+
+    def __str__(self):
+        """
+        Trả về mã vạch khi hiển thị đối tượng.
+
+        Returns:
+            str: Mã vạch dạng GTIN-14.
+        """
+        return self.ma_vach
+
+
+##############################################
+# MaVachRepository
+##############################################
+class MaVachRepository:
+    """
+    Lớp Repository chịu trách nhiệm truy xuất và thao tác dữ liệu
+    liên quan đến bảng Mã Vạch trong cơ sở dữ liệu.
+    """
+
+    # Các cột hàng hóa trả về khi quét mã vạch
+    COT_QUET = (
+        'ma_vach',
+        'hang_hoa_id',
+        'hang_hoa__ten_hang',
+        'hang_hoa__gia_ban',
+        'hang_hoa__so_luong_ton',
+        'hang_hoa__so_phan_manh',
+    )
+
+    @staticmethod
+    def tra_cuu(ma_vach: str) -> Optional[Dict]:
+        """
+        Tra cứu hàng hóa theo mã vạch: một lần seek trên khóa chính
+        MA_VACH rồi JOIN khóa chính HANG_HOA.
+
+        Args:
+            ma_vach (str): Mã vạch dạng GTIN-14.
+
+        Returns:
+            dict | None: Dict với khóa là COT_QUET, None nếu không tồn tại.
+        """
+        return (
+            MaVach.objects
+            .filter(pk=ma_vach)
+            .values(*MaVachRepository.COT_QUET)
+            .first()
+        )
+
+    @staticmethod
+    def tra_cuu_nhieu(cac_ma_vach: Iterable[str], chunk_size: int = 1000) -> Dict[str, int]:
+        """
+        Tra cứu mã hàng của nhiều mã vạch.
+
+        Args:
+            cac_ma_vach (Iterable[str]): Các mã vạch dạng GTIN-14.
+            chunk_size (int): Số mã vạch mỗi truy vấn.
+
+        Returns:
+            Dict[str, int]: {mã vạch: mã hàng}, mã vạch chưa gán thì không có.
+        """
+        cac_ma_vach = list(set(cac_ma_vach))
+        ket_qua = {}
+        for i in range(0, len(cac_ma_vach), chunk_size):
+            ket_qua.update(
+                MaVach.objects
+                .filter(pk__in=cac_ma_vach[i:i + chunk_size])
+                .values_list('ma_vach', 'hang_hoa_id')
+            )
+        return ket_qua
+
+    @staticmethod
+    def tao_hang_loat(cap: Iterable[Tuple[str, int]], batch_size: int = 500) -> None:
+        """
+        Gán nhiều mã vạch (INSERT nhiều dòng).
+
+        Args:
+            cap (Iterable[Tuple[str, int]]): Các cặp (mã vạch, mã hàng).
+            batch_size (int): Số dòng mỗi câu INSERT.
+        """
+        MaVach.objects.bulk_create(
+            [MaVach(ma_vach=ma_vach, hang_hoa_id=ma_hang) for ma_vach, ma_hang in cap],
+            batch_size=batch_size
+        )
+
+    @staticmethod
+    def get_by_hang_hoa(ma_hang: int) -> List[str]:
+        """
+        Lấy các mã vạch của một hàng hóa.
+
+        Args:
+            ma_hang (int): Mã hàng hóa.
+
+        Returns:
+            List[str]: Các mã vạch dạng GTIN-14.
+        """
+        return list(
+            MaVach.objects
+            .filter(hang_hoa_id=ma_hang)
+            .order_by('ma_vach')
+            .values_list('ma_vach', flat=True)
+        )
+
+    @staticmethod
+    def get_by_id(ma_vach: str) -> Optional[MaVach]:
+        """
+        Lấy mã vạch theo giá trị mã vạch.
+
+        Args:
+            ma_vach (str): Mã vạch dạng GTIN-14.
+
+        Returns:
+            MaVach | None: Đối tượng mã vạch nếu tồn tại,
+            ngược lại trả về None.
+        """
+        try:
+            return MaVach.objects.get(pk=ma_vach)
+        except MaVach.DoesNotExist:
+            return None
+
+    @staticmethod
+    def create(ma_vach: str, ma_hang: int) -> MaVach:
+        """
+        Gán một mã vạch cho hàng hóa.
+
+        Args:
+            ma_vach (str): Mã vạch dạng GTIN-14.
+            ma_hang (int): Mã hàng hóa.
+
+        Returns:
+            MaVach: Đối tượng mã vạch vừa được tạo.
+        """
+        obj = MaVach(ma_vach=ma_vach, hang_hoa_id=ma_hang)
+        obj.save(force_insert=True)
+        return obj
+
+    @staticmethod
+    def delete(ma_vach: str) -> Optional[int]:
+        """
+        Xóa một mã vạch.
+
+        Args:
+            ma_vach (str): Mã vạch dạng GTIN-14.
+
+        Returns:
+            int | None: Mã hàng hóa từng gắn với mã vạch,
+            None nếu mã vạch không tồn tại.
+        """
+        obj = MaVachRepository.get_by_id(ma_vach)
+        if not obj:
+            return None
+        ma_hang = obj.hang_hoa_id
+        obj.delete()
+        return ma_hang
@@ -49,6 +49,12 @@ class ThuongHieu(models.Model):
 
 # =========================
 from typing import List, Optional
+from QuanLyTapHoa.du_lieu_tham_chieu import DuLieuThamChieu
+
+# Bản chụp bất biến của bảng trong bộ nhớ process (xem QuanLyTapHoa/du_lieu_tham_chieu.py)
+du_lieu_thuong_hieu = DuLieuThamChieu(
+    "thuonghieu", lambda: list(ThuongHieu.objects.order_by("ma_thuong_hieu"))
+)
 
 class ThuongHieuRepository:
     """
@@ -62,9 +68,10 @@ class ThuongHieuRepository:
         Lấy danh sách tất cả thương hiệu trong hệ thống.
 
         Returns:
-            List[ThuongHieu]: Danh sách các đối tượng thương hiệu.
+            List[ThuongHieu]: Danh sách các đối tượng thương hiệu
+            (đọc từ bản chụp trong bộ nhớ, chỉ được đọc).
         """
-        return list(ThuongHieu.objects.all())
+        return list(du_lieu_thuong_hieu.danh_sach())
 
     @staticmethod
     def get_by_id(ma_thuong_hieu: int) -> Optional[ThuongHieu]:
@@ -78,10 +85,7 @@ class ThuongHieuRepository:
             ThuongHieu | None: Đối tượng thương hiệu nếu tồn tại,
             ngược lại trả về None.
         """
-        try:
-            return ThuongHieu.objects.get(pk=ma_thuong_hieu)
-        except ThuongHieu.DoesNotExist:
-            return None
+        return du_lieu_thuong_hieu.get(ma_thuong_hieu)
 
     @staticmethod
     def create(
@@ -106,6 +110,7 @@ class ThuongHieuRepository:
             mo_ta=mo_ta
         )
         obj.save()
+        du_lieu_thuong_hieu.da_thay_doi()
         return obj
 
     @staticmethod
@@ -121,13 +126,14 @@ class ThuongHieuRepository:
             ThuongHieu | None: Đối tượng thương hiệu sau khi cập nhật,
             hoặc None nếu không tồn tại.
         """
-        obj = ThuongHieuRepository.get_by_id(ma_thuong_hieu)
+        obj = ThuongHieu.objects.filter(pk=ma_thuong_hieu).first()
         if not obj:
             return None
         for key, value in kwargs.items():
             if hasattr(obj, key):
                 setattr(obj, key, value)
         obj.save()
+        du_lieu_thuong_hieu.da_thay_doi()
         return obj
 
     @staticmethod
@@ -141,8 +147,9 @@ class ThuongHieuRepository:
         Returns:
             bool: True nếu xóa thành công, False nếu không tồn tại.
         """
-        obj = ThuongHieuRepository.get_by_id(ma_thuong_hieu)
+        obj = ThuongHieu.objects.filter(pk=ma_thuong_hieu).first()
         if not obj:
             return False
         obj.delete()
+        du_lieu_thuong_hieu.da_thay_doi()
         return True
@@ -0,0 +1,87 @@
+from datetime import date, datetime
+from django.db import connection
+from typing import Optional, Tuple
+
+# =========================
+# Bảng TON_KHO_NGAY
+# =========================
+# Khóa chính ghép (MaHang, Ngay) nên không khai báo Django model;
+# repository thao tác bằng SQL (xem sql/09_bien_dong_kho.sql).
+
+
+##############################################
+# TonKhoNgayRepository
+##############################################
+class TonKhoNgayRepository:
+    """
+    Lớp Repository chịu trách nhiệm chụp và đọc tồn kho cuối ngày.
+    """
+
+    @staticmethod
+    def chup(ngay: date, cuoi_ngay_utc: datetime) -> int:
+        """
+        Chụp tồn kho cuối ngày của mọi hàng hóa chưa có ảnh chụp ngày đó
+        (một câu INSERT ... SELECT):
+
+            tồn kho cuối ngày = tồn kho hiện tại - biến động từ cuối ngày tới nay
+
+        Tồn kho hiện tại của hàng hóa phân mảnh là tổng các phân mảnh.
+
+        Args:
+            ngay (date): Ngày chụp (giờ Việt Nam).
+            cuoi_ngay_utc (datetime): 0 giờ ngày hôm sau, giờ UTC không múi giờ
+                (cùng kiểu với BIEN_DONG_KHO.ThoiDiem).
+
+        Returns:
+            int: Số hàng hóa đã chụp.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO TON_KHO_NGAY (MaHang, Ngay, SoLuongTon)
+                SELECT h.MaHang, %s, COALESCE(p.Tong, h.SoLuongTon) - ISNULL(b.Tong, 0)
+                FROM HANG_HOA h
+                LEFT JOIN (
+                    SELECT MaHang, SUM(SoLuong) AS Tong
+                    FROM TON_KHO_PHAN_MANH
+                    GROUP BY MaHang
+                ) p ON p.MaHang = h.MaHang AND h.SoPhanManh > 0
+                LEFT JOIN (
+                    SELECT MaHang, SUM(SoLuong) AS Tong
+                    FROM BIEN_DONG_KHO
+                    WHERE ThoiDiem >= %s
+                    GROUP BY MaHang
+                ) b ON b.MaHang = h.MaHang
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM TON_KHO_NGAY t
+                    WHERE t.MaHang = h.MaHang AND t.Ngay = %s
+                )
+                """,
+                [ngay, cuoi_ngay_utc, ngay]
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def gan_nhat(ma_hang: int, truoc_ngay: date) -> Optional[Tuple[date, int]]:
+        """
+        Ảnh chụp gần nhất của hàng hóa trước một ngày (một lần seek
+        trên khóa chính (MaHang, Ngay)).
+
+        Args:
+            ma_hang (int): Mã hàng hóa.
+            truoc_ngay (date): Ngày giới hạn (không bao gồm).
+
+        Returns:
+            tuple | None: (ngày chụp, tồn kho cuối ngày đó), None nếu chưa có.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT TOP 1 Ngay, SoLuongTon FROM TON_KHO_NGAY
+                WHERE MaHang = %s AND Ngay < %s
+                ORDER BY Ngay DESC
+                """,
+                [ma_hang, truoc_ngay]
+            )
+            row = cursor.fetchone()
+        return tuple(row) if row else None
@@ -0,0 +1,200 @@
+import random
+from django.db import connection
+from typing import Dict, Iterable, List, Optional, Tuple
+from .bien_dong_kho import BienDongKhoRepository
+
+# =========================
+# Bảng TON_KHO_PHAN_MANH
+# =========================
+# Khóa chính ghép (MaHang, PhanManh) nên không khai báo Django model;
+# repository thao tác bằng SQL (xem sql/08_ton_kho_phan_manh.sql).
+
+
+def chia_deu(tong: int, so_phan: int) -> List[int]:
+    """
+    Chia tong thành so_phan phần nguyên chênh nhau tối đa 1.
+
+    Returns:
+        List[int]: Các phần, phần đầu lớn hơn khi không chia hết.
+    """
+    thuong, du = divmod(tong, so_phan)
+    return [thuong + (1 if i < du else 0) for i in range(so_phan)]
+
+
+##############################################
+# TonKhoPhanManhRepository
+##############################################
+class TonKhoPhanManhRepository:
+    """
+    Lớp Repository chịu trách nhiệm thao tác tồn kho phân mảnh
+    của các hàng hóa bán chạy.
+
+    Các hàm ghi phải chạy trong transaction của nghiệp vụ gọi tới
+    (vd. tạo hóa đơn): khóa phân mảnh được giữ tới khi commit.
+    """
+
+    @staticmethod
+    def tao(ma_hang: int, cac_so_luong: List[int]) -> None:
+        """
+        Tạo các phân mảnh 0..N-1 của hàng hóa.
+
+        Args:
+            ma_hang (int): Mã hàng hóa.
+            cac_so_luong (List[int]): Số lượng của từng phân mảnh.
+        """
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO TON_KHO_PHAN_MANH (MaHang, PhanManh, SoLuong) VALUES (%s, %s, %s)",
+                [(ma_hang, i, so_luong) for i, so_luong in enumerate(cac_so_luong)]
+            )
+
+    @staticmethod
+    def xoa(ma_hang: int) -> int:
+        """
+        Xóa mọi phân mảnh của hàng hóa.
+
+        Returns:
+            int: Tổng số lượng của các phân mảnh đã xóa.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM TON_KHO_PHAN_MANH OUTPUT DELETED.SoLuong WHERE MaHang = %s",
+                [ma_hang]
+            )
+            return sum(so_luong for so_luong, in cursor.fetchall())
+
+    @staticmethod
+    def tong(cac_ma_hang: Iterable[int]) -> Dict[int, int]:
+        """
+        Tồn kho thật (tổng các phân mảnh) của các hàng hóa.
+
+        Returns:
+            Dict[int, int]: {mã hàng: tổng}, hàng hóa không phân mảnh thì không có.
+        """
+        cac_ma_hang = list(cac_ma_hang)
+        if not cac_ma_hang:
+            return {}
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT MaHang, SUM(SoLuong) FROM TON_KHO_PHAN_MANH
+                WHERE MaHang IN ({', '.join(['%s'] * len(cac_ma_hang))})
+                GROUP BY MaHang
+                """,
+                cac_ma_hang
+            )
+            return dict(cursor.fetchall())
+
+    @staticmethod
+    def dieu_chinh(
+        ma_hang: int,
+        so_phan_manh: int,
+        so_luong: int,
+        loai: str,
+        ma_tham_chieu: Optional[int] = None
+    ) -> Optional[bool]:
+        """
+        Cộng / trừ tồn kho của hàng hóa phân mảnh, ghi sổ biến động kho
+        trong cùng câu lệnh.
+
+        Chỉ khóa một phân mảnh chọn ngẫu nhiên (UPDATE có điều kiện
+        không âm). Phân mảnh đó không đủ thì cân bằng lại: khóa mọi
+        phân mảnh, trừ trên tổng rồi chia đều phần còn lại.
+
+        Args:
+            ma_hang (int): Mã hàng hóa.
+            so_phan_manh (int): Số phân mảnh của hàng hóa.
+            so_luong (int): Số lượng điều chỉnh (dương hoặc âm).
+            loai (str): Loại biến động (BienDongKho.LOAI_*).
+            ma_tham_chieu (int, optional): Mã hóa đơn với biến động bán.
+
+        Returns:
+            bool | None: False nếu tổng các phân mảnh không đủ; None nếu
+            hàng hóa không còn phân mảnh nào (vừa bị tắt phân mảnh, tồn
+            kho đã về HANG_HOA), nơi gọi điều chỉnh lại trên HANG_HOA.
+            Không dòng nào bị sửa trong hai trường hợp này.
+
+        Raises:
+            ValueError: Loại biến động không hợp lệ.
+        """
+        BienDongKhoRepository.kiem_tra_loai(loai)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE TON_KHO_PHAN_MANH SET SoLuong = SoLuong + %s
+                {BienDongKhoRepository.output_into('INSERTED.MaHang', '%s')}
+                WHERE MaHang = %s AND PhanManh = %s AND SoLuong >= %s
+                """,
+                [so_luong, loai, so_luong, ma_tham_chieu,
+                 ma_hang, random.randrange(so_phan_manh), -so_luong]
+            )
+            if cursor.rowcount == 1:
+                return True
+        return TonKhoPhanManhRepository._can_bang(ma_hang, so_luong, loai, ma_tham_chieu)
+
+    @staticmethod
+    def _can_bang(
+        ma_hang: int,
+        so_luong: int,
+        loai: str,
+        ma_tham_chieu: Optional[int]
+    ) -> Optional[bool]:
+        """
+        Gom mọi phân mảnh của hàng hóa (khóa UPDLOCK theo thứ tự phân
+        mảnh), áp dụng điều chỉnh rồi chia đều lại. Kết quả như dieu_chinh.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT SoLuong FROM TON_KHO_PHAN_MANH WITH (UPDLOCK, ROWLOCK)
+                WHERE MaHang = %s ORDER BY PhanManh
+                """,
+                [ma_hang]
+            )
+            cac_so_luong = [so_luong for so_luong, in cursor.fetchall()]
+            if not cac_so_luong:
+                return None
+            tong = sum(cac_so_luong) + so_luong
+            if tong < 0:
+                return False
+
+            moi = chia_deu(tong, len(cac_so_luong))
+            # Chia lại và ghi sổ trong cùng một lô lệnh
+            cursor.execute(
+                f"""
+                UPDATE TON_KHO_PHAN_MANH
+                SET SoLuong = CASE PhanManh {' '.join(['WHEN %s THEN %s'] * len(moi))} END
+                WHERE MaHang = %s;
+                INSERT INTO BIEN_DONG_KHO (MaHang, Loai, SoLuong, MaThamChieu)
+                VALUES (%s, %s, %s, %s);
+                """,
+                [x for i, phan in enumerate(moi) for x in (i, phan)]
+                + [ma_hang, ma_hang, loai, so_luong, ma_tham_chieu]
+            )
+        return True
+
+    @staticmethod
+    def dong_bo_hang_hoa() -> Dict[int, Tuple[int, int, int]]:
+        """
+        Ghi tổng các phân mảnh vào bản sao HANG_HOA.SoLuongTon của
+        những hàng hóa phân mảnh đã lệch.
+
+        Returns:
+            Dict[int, Tuple[int, int, int]]: {mã hàng đã cập nhật:
+            (bản sao cũ, bản sao mới, mức đặt lại)}.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE h SET SoLuongTon = t.Tong
+                OUTPUT INSERTED.MaHang, DELETED.SoLuongTon, INSERTED.SoLuongTon, INSERTED.MucDatLai
+                FROM HANG_HOA h
+                JOIN (
+                    SELECT MaHang, SUM(SoLuong) AS Tong
+                    FROM TON_KHO_PHAN_MANH
+                    GROUP BY MaHang
+                ) t ON t.MaHang = h.MaHang
+                WHERE h.SoPhanManh > 0 AND h.SoLuongTon <> t.Tong
+                """
+            )
+            return {ma_hang: (cu, moi, muc) for ma_hang, cu, moi, muc in cursor.fetchall()}
@@ -1,9 +1,13 @@
+from decimal import Decimal
+from typing import Dict, Iterable, List
+
 from rest_framework import serializers
 
-from QuanLyHangHoa.models.don_vi_tinh import DonViTinh
-from QuanLyHangHoa.models.loai_hang import LoaiHang
-from QuanLyHangHoa.models.thuong_hieu import ThuongHieu
+from QuanLyHangHoa.models.don_vi_tinh import DonViTinh, du_lieu_don_vi_tinh
+from QuanLyHangHoa.models.loai_hang import LoaiHang, du_lieu_loai_hang
+from QuanLyHangHoa.models.thuong_hieu import ThuongHieu, du_lieu_thuong_hieu
 from QuanLyHangHoa.models.hang_hoa import HangHoa
+from QuanLyTapHoa.du_lieu_tham_chieu import DuLieuThamChieu
 
 
 # =========================
@@ -48,6 +52,33 @@ class ThuongHieuSerializer(serializers.ModelSerializer):
         fields = ["ma_thuong_hieu", "ten_thuong_hieu", "quoc_gia", "mo_ta"]
 
 
+# =========================
+# Khóa ngoại tới bảng tham chiếu
+# =========================
+class ThamChieuPrimaryKeyField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField kiểm tra khóa trên bản chụp trong bộ nhớ
+    (DuLieuThamChieu) thay vì truy vấn CSDL mỗi lần validate.
+    """
+
+    def __init__(self, du_lieu: DuLieuThamChieu, **kwargs):
+        self.du_lieu = du_lieu
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            khoa = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        obj = self.du_lieu.get(khoa)
+        if obj is None:
+            self.fail("does_not_exist", pk_value=data)
+        return obj
+
+
 # =========================
 # HangHoa Serializer (LỒNG OBJECT)
 # =========================
@@ -81,17 +112,20 @@ class HangHoaSerializer(serializers.ModelSerializer):
     # =====================
     # WRITE: nhận ID
     # =====================
-    ma_dvt = serializers.PrimaryKeyRelatedField(
+    ma_dvt = ThamChieuPrimaryKeyField(
+        du_lieu_don_vi_tinh,
         queryset=DonViTinh.objects.all(),
         write_only=True
     )
 
-    ma_loai_hang = serializers.PrimaryKeyRelatedField(
+    ma_loai_hang = ThamChieuPrimaryKeyField(
+        du_lieu_loai_hang,
         queryset=LoaiHang.objects.all(),
         write_only=True
     )
 
-    ma_thuong_hieu = serializers.PrimaryKeyRelatedField(
+    ma_thuong_hieu = ThamChieuPrimaryKeyField(
+        du_lieu_thuong_hieu,
         queryset=ThuongHieu.objects.all(),
         write_only=True,
         allow_null=True,
@@ -117,4 +151,98 @@ class HangHoaSerializer(serializers.ModelSerializer):
             "gia_nhap",
             "gia_ban",
             "so_luong_ton",
+            "muc_dat_lai",
         ]
+        extra_kwargs = {
+            # 0 là không cảnh báo tồn kho thấp
+            "muc_dat_lai": {"min_value": 0},
+        }
+
+
+# =========================
+# Kiểm kê Serializer
+# =========================
+class DongKiemKeSerializer(serializers.Serializer):
+    """
+    Một dòng kiểm kê: số lượng đếm được (so_luong_dem) hoặc số lượng
+    điều chỉnh (so_luong), đúng một trong hai. Số lượng phải là số
+    nguyên (1.5 bị từ chối, không bị cắt thành 1).
+    """
+
+    ma_hang = serializers.IntegerField()
+    so_luong_dem = serializers.IntegerField(min_value=0, required=False)
+    so_luong = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        if ("so_luong_dem" in attrs) == ("so_luong" in attrs):
+            raise serializers.ValidationError("Cần đúng một trong so_luong_dem hoặc so_luong")
+        return attrs
+
+
+class KiemKeSerializer(serializers.Serializer):
+    """
+    Body của POST /api/hanghoa/stocktake/: {"items": [dòng kiểm kê, ...]}.
+    """
+
+    items = DongKiemKeSerializer(many=True, allow_empty=False)
+
+
+# =========================
+# HangHoa Projection (ĐƯỜNG NHANH CHO DANH SÁCH)
+# =========================
+class HangHoaProjection:
+    """
+    Dựng output giống hệt HangHoaSerializer (chế độ READ) từ các dict
+    của HangHoaRepository.get_all_values(), không qua bộ máy field của DRF.
+
+    Dùng cho danh sách lớn khi bật settings.HANG_HOA_DANH_SACH_NHANH.
+    Khi thêm / bớt field ở HangHoaSerializer phải sửa tương ứng ở đây
+    và ở HangHoaRepository.COT_DANH_SACH.
+    """
+
+    # DecimalField(decimal_places=2) của DRF trả chuỗi đã làm tròn 2 chữ số
+    _HAI_CHU_SO = Decimal("0.01")
+
+    @staticmethod
+    def thap_phan(value):
+        if value is None:
+            return None
+        return format(value.quantize(HangHoaProjection._HAI_CHU_SO), "f")
+
+    @staticmethod
+    def to_representation(row: Dict) -> Dict:
+        """
+        Chuyển một dict values() thành output của HangHoaSerializer.
+        """
+        thap_phan = HangHoaProjection.thap_phan
+        return {
+            "ma_hang": row["ma_hang"],
+            "ten_hang": row["ten_hang"],
+            "don_vi_tinh": {
+                "ma_dvt": row["ma_dvt_id"],
+                "ten_dvt": row["ma_dvt__ten_dvt"],
+            },
+            "loai_hang": {
+                "ma_loai": row["ma_loai_hang_id"],
+                "ten_loai": row["ma_loai_hang__ten_loai"],
+                "mo_ta": row["ma_loai_hang__mo_ta"],
+            },
+            "thuong_hieu": None if row["ma_thuong_hieu_id"] is None else {
+                "ma_thuong_hieu": row["ma_thuong_hieu_id"],
+                "ten_thuong_hieu": row["ma_thuong_hieu__ten_thuong_hieu"],
+                "quoc_gia": row["ma_thuong_hieu__quoc_gia"],
+                "mo_ta": row["ma_thuong_hieu__mo_ta"],
+            },
+            "gia_nhap": thap_phan(row["gia_nhap"]),
+            "gia_ban": thap_phan(row["gia_ban"]),
+            "so_luong_ton": row["so_luong_ton"],
+            "muc_dat_lai": row["muc_dat_lai"],
+        }
+
+    @staticmethod
+    def many(rows: Iterable[Dict]) -> List[Dict]:
+        """
+        Chuyển danh sách dict values() thành danh sách output.
+        """
+        to_representation = HangHoaProjection.to_representation
+        return [to_representation(row) for row in rows]
@@ -0,0 +1,219 @@
+"""
+Cảnh báo tồn kho thấp: danh sách hàng hóa cần đặt lại
+(so_luong_ton <= muc_dat_lai, muc_dat_lai > 0).
+
+Tập hàng cần đặt lại là indexed view V_HANG_HOA_CAN_DAT_LAI
+(sql/10_canh_bao_ton_kho.sql): SQL Server cập nhật view trong chính các
+câu lệnh sửa tồn kho (bán, điều chỉnh, nhập file, kiểm kê), nên đọc
+danh sách chỉ tốn chi phí theo số cảnh báo, không quét danh mục.
+
+Khi cấu hình settings.CANH_BAO_TON_KHO_WEBHOOKS, sau mỗi thay đổi tồn
+kho đã commit, các hàng hóa vừa vào / ra danh sách được POST tới từng
+URL:
+
+    {"vao": [{"ma_hang", "ten_hang", "so_luong_ton", "muc_dat_lai"}, ...],
+     "ra": [ma_hang, ...]}
+
+Tồn kho trước / sau lấy từ chính câu UPDATE (OUTPUT DELETED / INSERTED,
+xem HangHoaRepository.dieu_chinh_ton_kho_hang_loat), không đọc lại sau
+commit. Việc gửi chạy trên một thread nền duy nhất với hàng đợi giới hạn
+(CANH_BAO_TON_KHO_HANG_DOI); hàng đợi đầy thì bỏ thông báo và ghi log.
+
+Thông báo chỉ là gợi ý (có thể bị bỏ khi quá tải);
+GET /api/hanghoa/can-dat-lai/ luôn là danh sách chính xác.
+"""
+
+import json
+import logging
+import queue
+import threading
+import urllib.request
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+
+from QuanLyHangHoa.models.hang_hoa import HangHoaRepository
+
+logger = logging.getLogger(__name__)
+
+
+def can_dat_lai(so_luong_ton: int, muc_dat_lai: int) -> bool:
+    """
+    Hàng hóa có cần đặt lại không (cùng điều kiện với V_HANG_HOA_CAN_DAT_LAI).
+    """
+    return muc_dat_lai > 0 and so_luong_ton <= muc_dat_lai
+
+
+class HangDoiGuiNen:
+    """
+    Một thread nền chạy lần lượt các công việc trong hàng đợi giới hạn
+    (settings.CANH_BAO_TON_KHO_HANG_DOI phần tử). Thread được tạo ở lần
+    thêm đầu tiên; công việc lỗi chỉ ghi log.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hang_doi: Optional[queue.Queue] = None
+
+    def them(self, cong_viec: Callable[[], None]) -> bool:
+        """
+        Thêm công việc vào hàng đợi, không chờ.
+
+        Returns:
+            bool: False khi hàng đợi đầy (công việc bị bỏ).
+        """
+        with self._lock:
+            if self._hang_doi is None:
+                self._hang_doi = queue.Queue(
+                    maxsize=getattr(settings, "CANH_BAO_TON_KHO_HANG_DOI", 1000)
+                )
+                threading.Thread(target=self._chay, args=(self._hang_doi,), daemon=True).start()
+        try:
+            self._hang_doi.put_nowait(cong_viec)
+        except queue.Full:
+            return False
+        return True
+
+    @staticmethod
+    def _chay(hang_doi: queue.Queue) -> None:
+        while True:
+            cong_viec = hang_doi.get()
+            try:
+                cong_viec()
+            except Exception:
+                logger.exception("Gửi cảnh báo tồn kho lỗi")
+            finally:
+                # Thread nền tự mở kết nối CSDL, phải tự đóng
+                connections.close_all()
+                hang_doi.task_done()
+
+
+hang_doi_canh_bao = HangDoiGuiNen()
+
+
+class CanhBaoTonKhoService:
+    """
+    Lớp Service đọc danh sách hàng cần đặt lại và đẩy thay đổi
+    cho các hệ thống back-office đăng ký.
+    """
+
+    @staticmethod
+    def danh_sach() -> List[Dict]:
+        """
+        Các hàng hóa cần đặt lại, theo mã hàng.
+
+        Returns:
+            List[Dict]: {ma_hang, ten_hang, so_luong_ton, muc_dat_lai,
+            can_nhap}; can_nhap là số lượng cần nhập để vượt mức đặt lại.
+        """
+        danh_sach = HangHoaRepository.can_dat_lai()
+        for row in danh_sach:
+            row["can_nhap"] = row["muc_dat_lai"] - row["so_luong_ton"] + 1
+        return danh_sach
+
+    @staticmethod
+    def thong_bao(
+        cac_ma_hang: Iterable[int],
+        ton_kho_map: Optional[Dict[int, Tuple[int, int, int]]] = None
+    ) -> None:
+        """
+        Đẩy các hàng hóa vừa vào / ra danh sách cần đặt lại tới các
+        webhook (gọi sau khi transaction commit). Không cấu hình webhook
+        thì không làm gì; có thì đưa vào hàng đợi của thread gửi nền,
+        không làm chậm request.
+
+        Args:
+            cac_ma_hang (Iterable[int]): Mã các hàng hóa vừa thay đổi.
+            ton_kho_map (Dict[int, Tuple[int, int, int]], optional):
+                {mã hàng: (tồn kho trước, tồn kho sau, mức đặt lại)} lấy
+                từ câu UPDATE; có thì chỉ gửi hàng hóa đổi trạng thái,
+                không có (tạo / sửa / nhập file) thì gửi trạng thái hiện
+                tại của mọi hàng hóa đã thay đổi.
+        """
+        webhooks = getattr(settings, "CANH_BAO_TON_KHO_WEBHOOKS", None)
+        if not webhooks:
+            return
+
+        cac_ma_hang = list(cac_ma_hang)
+        if not hang_doi_canh_bao.them(
+            lambda: CanhBaoTonKhoService._gui(webhooks, cac_ma_hang, ton_kho_map)
+        ):
+            logger.warning(
+                "Hàng đợi cảnh báo tồn kho đầy, bỏ thông báo của %d hàng hóa", len(cac_ma_hang)
+            )
+
+    @staticmethod
+    def _gui(
+        webhooks: List[str],
+        cac_ma_hang: List[int],
+        ton_kho_map: Optional[Dict[int, Tuple[int, int, int]]]
+    ) -> None:
+        noi_dung = CanhBaoTonKhoService._thay_doi(cac_ma_hang, ton_kho_map)
+        if not noi_dung["vao"] and not noi_dung["ra"]:
+            return
+
+        du_lieu = json.dumps(noi_dung, ensure_ascii=False).encode("utf-8")
+        thoi_gian_cho = getattr(settings, "CANH_BAO_TON_KHO_THOI_GIAN_CHO", 5)
+        for url in webhooks:
+            yeu_cau = urllib.request.Request(
+                url, data=du_lieu, method="POST",
+                headers={"Content-Type": "application/json; charset=utf-8"}
+            )
+            try:
+                with urllib.request.urlopen(yeu_cau, timeout=thoi_gian_cho):
+                    pass
+            except OSError as e:
+                logger.warning("Gửi cảnh báo tồn kho tới %s thất bại: %s", url, e)
+
+    @staticmethod
+    def _thay_doi(
+        cac_ma_hang: List[int],
+        ton_kho_map: Optional[Dict[int, Tuple[int, int, int]]]
+    ) -> Dict:
+        """
+        Tách các hàng hóa thành vào / ra danh sách cần đặt lại: theo tồn
+        kho trước / sau của câu UPDATE khi có ton_kho_map, ngược lại theo
+        trạng thái hiện tại. Chỉ đọc CSDL để lấy tên (và trạng thái khi
+        không có ton_kho_map).
+        """
+        vao, ra = [], []
+        if ton_kho_map is not None:
+            doi = {}
+            for ma_hang in cac_ma_hang:
+                truoc, sau, muc_dat_lai = ton_kho_map[ma_hang]
+                hien_tai = can_dat_lai(sau, muc_dat_lai)
+                if can_dat_lai(truoc, muc_dat_lai) == hien_tai:
+                    continue
+                if hien_tai:
+                    doi[ma_hang] = (sau, muc_dat_lai)
+                else:
+                    ra.append(ma_hang)
+            ten = HangHoaRepository.get_values_theo_ma(doi, ("ten_hang",)) if doi else {}
+            for ma_hang, (so_luong_ton, muc_dat_lai) in doi.items():
+                vao.append({
+                    "ma_hang": ma_hang,
+                    "ten_hang": ten.get(ma_hang, {}).get("ten_hang"),
+                    "so_luong_ton": so_luong_ton,
+                    "muc_dat_lai": muc_dat_lai,
+                })
+            return {"vao": vao, "ra": ra}
+
+        rows = HangHoaRepository.get_values_theo_ma(
+            cac_ma_hang, ("ten_hang", "so_luong_ton", "muc_dat_lai")
+        )
+        for ma_hang in cac_ma_hang:
+            row = rows.get(ma_hang)
+            if row is None:
+                # Đã bị xóa
+                ra.append(ma_hang)
+            elif can_dat_lai(row["so_luong_ton"], row["muc_dat_lai"]):
+                vao.append({
+                    "ma_hang": ma_hang,
+                    "ten_hang": row["ten_hang"],
+                    "so_luong_ton": row["so_luong_ton"],
+                    "muc_dat_lai": row["muc_dat_lai"],
+                })
+            else:
+                ra.append(ma_hang)
+        return {"vao": vao, "ra": ra}
@@ -0,0 +1,120 @@
+"""
+Đồng bộ gia tăng (delta sync) danh mục hàng hóa cho máy bán hàng offline.
+
+Luồng của client:
+1. Lần đầu: GET /api/hanghoa/changes/ (không có since) để lấy token,
+   rồi mới tải toàn bộ danh mục qua /api/hanghoa/. Thay đổi xảy ra
+   giữa hai bước sẽ được gửi lại ở lần đồng bộ sau (áp dụng lặp lại
+   không sao vì upsert / tombstone đều idempotent).
+2. Các lần sau: GET /api/hanghoa/changes/?since=<token>, áp dụng
+   upserts / tombstones, lưu token mới; lặp lại khi con_nua = true.
+"""
+
+from typing import Dict, Optional
+
+from QuanLyHangHoa.models.hang_hoa import HangHoaRepository
+from QuanLyHangHoa.models.hang_hoa_thay_doi import HangHoaThayDoi, HangHoaThayDoiRepository
+from QuanLyHangHoa.serializers import HangHoaProjection
+
+
+class DongBoHangHoaService:
+    """
+    Service đọc nhật ký thay đổi hàng hóa thành gói đồng bộ gọn.
+    """
+
+    # Cột của mỗi dòng upsert (dạng mảng, không lặp tên khóa)
+    COT_UPSERT = (
+        "ma_hang",
+        "ten_hang",
+        "gia_ban",
+        "so_luong_ton",
+        "ma_dvt",
+        "ma_loai_hang",
+        "ma_thuong_hieu",
+    )
+
+    GIOI_HAN_MAC_DINH = 1000
+    GIOI_HAN_TOI_DA = 10000
+
+    # Token là PhienBan (ROWVERSION) đổi sang BIGINT
+    TOKEN_TOI_DA = 2 ** 63 - 1
+
+    @staticmethod
+    def thay_doi_tu(since: Optional[int], gioi_han: int = GIOI_HAN_MAC_DINH) -> Dict:
+        """
+        Lấy các hàng hóa thay đổi sau token since.
+
+        Nhiều thay đổi của cùng một hàng hóa được gộp: upsert mang giá trị
+        hiện tại, hàng hóa đã bị xóa trả về trong tombstones.
+
+        Args:
+            since (int, optional): Token của lần đồng bộ trước;
+                None để chỉ lấy token hiện tại.
+            gioi_han (int): Số dòng nhật ký tối đa đọc trong một lần.
+
+        Raises:
+            ValueError: since hoặc gioi_han không hợp lệ.
+
+        Returns:
+            dict: {"token": str, "con_nua": bool, "cot": [...],
+                   "upserts": [[...], ...], "tombstones": [ma_hang, ...]}
+        """
+        if not 1 <= gioi_han <= DongBoHangHoaService.GIOI_HAN_TOI_DA:
+            raise ValueError(
+                f"limit phải trong khoảng 1..{DongBoHangHoaService.GIOI_HAN_TOI_DA}"
+            )
+
+        if since is None:
+            return {
+                "token": str(HangHoaThayDoiRepository.phien_ban_hien_tai()),
+                "con_nua": False,
+                "cot": list(DongBoHangHoaService.COT_UPSERT),
+                "upserts": [],
+                "tombstones": [],
+            }
+        if not 0 <= since <= DongBoHangHoaService.TOKEN_TOI_DA:
+            # Ngoài khoảng BIGINT thì CAST trong doc_tu báo lỗi tràn số
+            raise ValueError("since không hợp lệ")
+
+        thay_dois = HangHoaThayDoiRepository.doc_tu(since, gioi_han)
+
+        # Thay đổi cuối cùng của mỗi hàng hóa quyết định upsert hay tombstone
+        cuoi_cung: Dict[int, str] = {}
+        for _, ma_hang, loai in thay_dois:
+            cuoi_cung[ma_hang] = loai
+
+        can_doc = [
+            ma_hang for ma_hang, loai in cuoi_cung.items()
+            if loai != HangHoaThayDoi.LOAI_XOA
+        ]
+        rows = HangHoaRepository.get_values_theo_ma(can_doc, (
+            "ten_hang", "gia_ban", "so_luong_ton", "so_phan_manh",
+            "ma_dvt_id", "ma_loai_hang_id", "ma_thuong_hieu_id",
+        ))
+        # Hàng hóa phân mảnh: tồn kho thật, không phải bản sao trong HANG_HOA
+        HangHoaRepository.gan_ton_kho_phan_manh(rows.values())
+
+        upserts, tombstones = [], []
+        for ma_hang, loai in cuoi_cung.items():
+            row = rows.get(ma_hang)
+            if row is None:
+                # Đã xóa (có thể sau token mới, tombstone sẽ đến lại - vô hại)
+                tombstones.append(ma_hang)
+                continue
+            upserts.append([
+                row["ma_hang"],
+                row["ten_hang"],
+                HangHoaProjection.thap_phan(row["gia_ban"]),
+                row["so_luong_ton"],
+                row["ma_dvt_id"],
+                row["ma_loai_hang_id"],
+                row["ma_thuong_hieu_id"],
+            ])
+
+        return {
+            "token": str(thay_dois[-1][0] if thay_dois else since),
+            "con_nua": len(thay_dois) == gioi_han,
+            "cot": list(DongBoHangHoaService.COT_UPSERT),
+            "upserts": upserts,
+            "tombstones": tombstones,
+        }
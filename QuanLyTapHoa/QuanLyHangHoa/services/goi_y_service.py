@@ -0,0 +1,454 @@
+"""
+Gợi ý hàng hóa khi gõ (autocomplete) cho màn hình bán hàng.
+
+Cấu trúc trong bộ nhớ, không truy vấn CSDL trên đường nóng:
+- Mảng khóa đã sắp xếp: mỗi hàng hóa có một khóa cho mỗi vị trí từ
+  trong tên đã chuẩn hóa ("sua tuoi vinamilk", "tuoi vinamilk",
+  "vinamilk"), nên gõ từ giữa tên cũng khớp. Tra tiền tố bằng bisect.
+- Các tiền tố "nặng" (khớp nhiều hơn NGUONG_NUT_NANG khóa) giữ sẵn
+  top K + DU_PHONG hàng hóa theo độ phổ biến (số lượng bán gần đây,
+  lấy từ bảng tổng hợp DOANH_SO_HANG_NGAY); tiền tố còn lại chỉ quét
+  một đoạn ngắn của mảng.
+
+Tạo / sửa / xóa hàng hóa cập nhật ngay (sau commit, xem HangHoaService).
+Xóa một hàng hóa khỏi top chỉ bớt một phần dự phòng; khi top còn ít
+hơn K, nó được tính lại ở thread nền, không chặn request dưới khóa.
+Tiền tố trở nên nặng sau khi dựng được thêm top ngay khi vượt ngưỡng.
+Độ phổ biến được làm mới định kỳ (settings.GOI_Y_THOI_GIAN_LAM_MOI)
+bằng một thread nền, request vẫn dùng cấu trúc cũ trong lúc dựng lại;
+các thay đổi xảy ra trong lúc dựng được ghi lại và áp dụng lên cấu
+trúc mới khi hoán đổi.
+"""
+
+import bisect
+import heapq
+import threading
+import time
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from QuanLyHangHoa.models.hang_hoa import HangHoaRepository
+from QuanLyHangHoa.services.tim_kiem_service import chuan_hoa
+
+
+# Ký tự lớn hơn mọi ký tự của chuỗi đã chuẩn hóa ([0-9a-z ]),
+# khóa có tiền tố p nằm trong [p, p + _KY_TU_CAN_TREN)
+_KY_TU_CAN_TREN = "{"
+
+
+def _nap_do_pho_bien() -> Dict[int, int]:
+    """
+    Số lượng bán của từng hàng hóa trong GOI_Y_SO_NGAY_PHO_BIEN ngày gần nhất.
+    """
+    # Import tại chỗ: QuanLyHoaDon phụ thuộc QuanLyHangHoa, không ngược lại
+    from QuanLyHoaDon.models.doanh_so_hang_ngay import DoanhSoHangNgayRepository
+
+    so_ngay = getattr(settings, "GOI_Y_SO_NGAY_PHO_BIEN", 90)
+    return DoanhSoHangNgayRepository.so_luong_ban_theo_hang_hoa(
+        timezone.localdate() - timedelta(days=so_ngay)
+    )
+
+
+class ChiMucGoiY:
+    """
+    Chỉ mục tiền tố cho gợi ý khi gõ, dùng chung trong một process.
+    """
+
+    # Số gợi ý tối đa; mỗi tiền tố nặng giữ sẵn thêm DU_PHONG hàng hóa
+    # để xóa hàng hóa không buộc phải tính lại top ngay
+    SO_GOI_Y_LUU = 20
+    DU_PHONG = 20
+    # Tiền tố khớp nhiều hơn ngần này khóa thì giữ sẵn top K
+    NGUONG_NUT_NANG = 256
+    # Số từ đầu tiên của tên được làm điểm bắt đầu khóa
+    SO_KHOA_TOI_DA = 6
+    # Độ dài tối đa của một khóa (đủ cho tiền tố người dùng gõ)
+    DO_DAI_KHOA = 32
+
+    def __init__(
+        self,
+        nap_ten_hang: Callable[[], Iterable[Tuple[int, str]]],
+        nap_do_pho_bien: Callable[[], Dict[int, int]]
+    ):
+        """
+        Args:
+            nap_ten_hang: Hàm trả về các cặp (ma_hang, ten_hang).
+            nap_do_pho_bien: Hàm trả về {ma_hang: độ phổ biến}.
+        """
+        self._nap_ten_hang = nap_ten_hang
+        self._nap_do_pho_bien = nap_do_pho_bien
+        self._lock = threading.Lock()
+        self._lock_nap = threading.Lock()
+        self._lock_tinh_lai = threading.Lock()
+        self._nap_luc: Optional[float] = None
+        # Tăng mỗi lần chỉ mục bị sửa (tính top ngoài khóa so giá trị này)
+        self._so_lan_sua = 0
+        # Tiền tố nặng có top thiếu, chờ thread nền tính lại
+        self._can_tinh_lai: Set[str] = set()
+        # Khi đang dựng lại: các thay đổi (ma_hang, ten_hang | None) cần
+        # áp dụng lên cấu trúc mới
+        self._nhat_ky: Optional[List[Tuple[int, Optional[str]]]] = None
+        self._dat_du_lieu([], [], {}, {}, {})
+
+    def _dat_du_lieu(self, khoa, ma, tai_lieu, do_pho_bien, top):
+        # Mảng khóa đã sắp xếp và mã hàng tương ứng (song song)
+        self._khoa: List[str] = khoa
+        self._ma: List[int] = ma
+        # ma_hang -> (ten_hang, ten đã chuẩn hóa, các khóa)
+        self._tai_lieu: Dict[int, Tuple[str, str, Tuple[str, ...]]] = tai_lieu
+        self._do_pho_bien: Dict[int, int] = do_pho_bien
+        # Tiền tố nặng -> top mã hàng đã sắp xếp: luôn là những hàng hóa
+        # đứng đầu đoạn của tiền tố (có thể ít hơn sức chứa sau khi xóa)
+        self._top: Dict[str, List[int]] = top
+
+    # =====================
+    # Dựng chỉ mục
+    # =====================
+    def _cac_khoa(self, ten_chuan_hoa: str) -> Tuple[str, ...]:
+        cac_tu = ten_chuan_hoa.split()
+        return tuple(dict.fromkeys(
+            " ".join(cac_tu[i:])[:self.DO_DAI_KHOA]
+            for i in range(min(len(cac_tu), self.SO_KHOA_TOI_DA))
+        ))
+
+    def _hang(self, ma_hang: int):
+        """
+        Khóa sắp xếp gợi ý: phổ biến hơn trước, cùng độ phổ biến thì mã nhỏ trước.
+        """
+        return (-self._do_pho_bien.get(ma_hang, 0), ma_hang)
+
+    def _top_cua_doan(self, lo: int, hi: int) -> List[int]:
+        """
+        Top hàng hóa (không trùng) trong đoạn [lo, hi) của mảng khóa.
+        """
+        return heapq.nsmallest(
+            self.SO_GOI_Y_LUU + self.DU_PHONG, set(self._ma[lo:hi]), key=self._hang
+        )
+
+    def _doan(self, tien_to: str) -> Tuple[int, int]:
+        return (
+            bisect.bisect_left(self._khoa, tien_to),
+            bisect.bisect_left(self._khoa, tien_to + _KY_TU_CAN_TREN),
+        )
+
+    def lam_moi(self) -> float:
+        """
+        Dựng lại toàn bộ chỉ mục (tên hàng và độ phổ biến) rồi hoán đổi.
+
+        Returns:
+            float: Thời gian dựng (giây).
+        """
+        bat_dau = time.perf_counter()
+        with self._lock:
+            self._nhat_ky = []
+
+        try:
+            do_pho_bien = dict(self._nap_do_pho_bien())
+            tai_lieu = {}
+            cap = []
+            for ma_hang, ten_hang in self._nap_ten_hang():
+                ten_chuan_hoa = chuan_hoa(ten_hang)
+                cac_khoa = self._cac_khoa(ten_chuan_hoa)
+                tai_lieu[ma_hang] = (ten_hang, ten_chuan_hoa, cac_khoa)
+                cap.extend((khoa, ma_hang) for khoa in cac_khoa)
+            cap.sort()
+
+            moi = ChiMucGoiY(self._nap_ten_hang, self._nap_do_pho_bien)
+            moi._dat_du_lieu(
+                [khoa for khoa, _ in cap], [ma for _, ma in cap],
+                tai_lieu, do_pho_bien, {}
+            )
+            moi._tinh_nut_nang(0, len(cap), 0)
+        except BaseException:
+            with self._lock:
+                self._nhat_ky = None
+            raise
+
+        with self._lock:
+            self._dat_du_lieu(moi._khoa, moi._ma, tai_lieu, do_pho_bien, moi._top)
+            self._so_lan_sua += 1
+            self._can_tinh_lai.clear()
+            # Thay đổi đã áp dụng lên cấu trúc cũ trong lúc dựng: áp dụng
+            # lại (thay đổi đã có trong dữ liệu vừa đọc thì không đổi gì)
+            nhat_ky, self._nhat_ky = self._nhat_ky, None
+            for ma_hang, ten_hang in nhat_ky:
+                if ten_hang is None:
+                    self._xoa_khong_khoa(ma_hang)
+                else:
+                    self._cap_nhat_khong_khoa(ma_hang, ten_hang)
+            self._nap_luc = time.monotonic()
+        self._bat_dau_tinh_lai()
+
+        return time.perf_counter() - bat_dau
+
+    def _tinh_nut_nang(self, lo: int, hi: int, do_sau: int) -> None:
+        """
+        Chia đoạn [lo, hi) (các khóa chung tiền tố độ dài do_sau) theo ký tự
+        thứ do_sau; nút con nào vẫn nặng thì lưu top K và chia tiếp.
+        """
+        khoa = self._khoa
+        i = lo
+        # Bỏ các khóa kết thúc đúng tại do_sau (đã thuộc nút cha)
+        while i < hi and len(khoa[i]) <= do_sau:
+            i += 1
+
+        while i < hi:
+            tien_to = khoa[i][:do_sau + 1]
+            j = bisect.bisect_left(khoa, tien_to + _KY_TU_CAN_TREN, i, hi)
+            if j - i > self.NGUONG_NUT_NANG:
+                self._top[tien_to] = self._top_cua_doan(i, j)
+                self._tinh_nut_nang(i, j, do_sau + 1)
+            i = j
+
+    # =====================
+    # Cập nhật từng hàng hóa
+    # =====================
+    def _dam_bao_da_nap(self) -> None:
+        """
+        Nạp chỉ mục lần đầu (chặn), hoặc làm mới định kỳ bằng thread nền.
+        """
+        if self._nap_luc is None:
+            with self._lock_nap:
+                if self._nap_luc is None:
+                    self.lam_moi()
+            return
+
+        thoi_gian_lam_moi = getattr(settings, "GOI_Y_THOI_GIAN_LAM_MOI", None)
+        if (
+            thoi_gian_lam_moi
+            and time.monotonic() - self._nap_luc > thoi_gian_lam_moi
+            and self._lock_nap.acquire(blocking=False)
+        ):
+            threading.Thread(target=self._lam_moi_nen, daemon=True).start()
+
+    def _lam_moi_nen(self) -> None:
+        try:
+            self.lam_moi()
+        finally:
+            self._lock_nap.release()
+            # Thread nền tự mở kết nối CSDL, phải tự đóng
+            connections.close_all()
+
+    def danh_dau_cu(self) -> None:
+        """
+        Đánh dấu chỉ mục đã cũ sau một thay đổi hàng loạt (nhập file):
+        lần dùng kế tiếp dựng lại theo cơ chế làm mới định kỳ
+        (GOI_Y_THOI_GIAN_LAM_MOI), thay vì cập nhật từng hàng hóa.
+        """
+        if self._nap_luc is not None:
+            self._nap_luc = float("-inf")
+
+    def cap_nhat(self, ma_hang: int, ten_hang: str) -> None:
+        """
+        Thêm hoặc đổi tên một hàng hóa. Bỏ qua khi chỉ mục chưa được nạp.
+        """
+        if self._nap_luc is None:
+            return
+
+        with self._lock:
+            if self._nhat_ky is not None:
+                self._nhat_ky.append((ma_hang, ten_hang))
+            self._cap_nhat_khong_khoa(ma_hang, ten_hang)
+        self._bat_dau_tinh_lai()
+
+    def _cap_nhat_khong_khoa(self, ma_hang: int, ten_hang: str) -> None:
+        ten_chuan_hoa = chuan_hoa(ten_hang)
+        cac_khoa = self._cac_khoa(ten_chuan_hoa)
+        self._xoa_khong_khoa(ma_hang)
+        self._so_lan_sua += 1
+        self._tai_lieu[ma_hang] = (ten_hang, ten_chuan_hoa, cac_khoa)
+
+        for khoa in cac_khoa:
+            k = self._vi_tri(khoa, ma_hang)
+            self._khoa.insert(k, khoa)
+            self._ma.insert(k, ma_hang)
+
+        suc_chua = self.SO_GOI_Y_LUU + self.DU_PHONG
+        hang = self._hang(ma_hang)
+        for tien_to in self._cac_tien_to_nang(cac_khoa, them_nut_moi=True):
+            top = self._top[tien_to]
+            # Chỉ chèn khi đứng trước phần tử cuối: sau phần tử cuối có
+            # thể còn hàng hóa chưa có trong top xếp trên hàng hóa này
+            if top and ma_hang not in top and hang < self._hang(top[-1]):
+                bisect.insort(top, ma_hang, key=self._hang)
+                del top[suc_chua:]
+
+    def xoa(self, ma_hang: int) -> None:
+        """
+        Xóa một hàng hóa khỏi chỉ mục.
+        """
+        with self._lock:
+            if self._nhat_ky is not None:
+                self._nhat_ky.append((ma_hang, None))
+            self._xoa_khong_khoa(ma_hang)
+        self._bat_dau_tinh_lai()
+
+    def _xoa_khong_khoa(self, ma_hang: int) -> None:
+        cu = self._tai_lieu.pop(ma_hang, None)
+        if cu is None:
+            return
+        self._so_lan_sua += 1
+
+        for khoa in cu[2]:
+            k = self._vi_tri(khoa, ma_hang)
+            if k < len(self._khoa) and self._khoa[k] == khoa and self._ma[k] == ma_hang:
+                del self._khoa[k]
+                del self._ma[k]
+
+        for tien_to in self._cac_tien_to_nang(cu[2]):
+            top = self._top[tien_to]
+            if ma_hang in top:
+                # Phần còn lại vẫn là top của đoạn, chỉ ngắn đi; hết dự
+                # phòng thì tính lại ở thread nền
+                top.remove(ma_hang)
+                if len(top) < self.SO_GOI_Y_LUU:
+                    self._can_tinh_lai.add(tien_to)
+
+    # =====================
+    # Tính lại top ở thread nền
+    # =====================
+    def _bat_dau_tinh_lai(self) -> None:
+        if self._can_tinh_lai and self._lock_tinh_lai.acquire(blocking=False):
+            threading.Thread(target=self._tinh_lai_nen, daemon=True).start()
+
+    def _tinh_lai_nen(self) -> None:
+        """
+        Tính lại top của các tiền tố trong self._can_tinh_lai. Chỉ sao
+        chép đoạn mảng dưới khóa; việc xếp hạng (tốn thời gian với tiền
+        tố rất nặng) chạy ngoài khóa, kết quả chỉ được ghi nếu chỉ mục
+        không bị sửa trong lúc tính (nếu bị sửa thì tính lại).
+        """
+        try:
+            while True:
+                with self._lock:
+                    if not self._can_tinh_lai:
+                        break
+                    tien_to = self._can_tinh_lai.pop()
+                    if tien_to not in self._top:
+                        continue
+                    lo, hi = self._doan(tien_to)
+                    cac_ma = set(self._ma[lo:hi])
+                    so_lan_sua = self._so_lan_sua
+
+                top = heapq.nsmallest(
+                    self.SO_GOI_Y_LUU + self.DU_PHONG, cac_ma, key=self._hang
+                )
+
+                with self._lock:
+                    if self._so_lan_sua == so_lan_sua:
+                        self._top[tien_to] = top
+                    elif tien_to in self._top:
+                        self._can_tinh_lai.add(tien_to)
+        finally:
+            self._lock_tinh_lai.release()
+        # Tiền tố được thêm sau khi vòng lặp kết thúc
+        self._bat_dau_tinh_lai()
+
+    def _vi_tri(self, khoa: str, ma_hang: int) -> int:
+        """
+        Vị trí của cặp (khoa, ma_hang) trong mảng, sắp theo khóa rồi mã hàng.
+        """
+        i = bisect.bisect_left(self._khoa, khoa)
+        j = bisect.bisect_right(self._khoa, khoa, i)
+        return bisect.bisect_left(self._ma, ma_hang, i, j)
+
+    def _cac_tien_to_nang(self, cac_khoa: Iterable[str], them_nut_moi: bool = False) -> Set[str]:
+        """
+        Các tiền tố nặng của các khóa. Với them_nut_moi, tiền tố đầu tiên
+        chưa nặng của mỗi khóa mà nay đã vượt NGUONG_NUT_NANG (do thêm
+        hàng hóa sau khi dựng) được thêm top; đoạn của nó chỉ vừa qua
+        ngưỡng nên tính ngay rẻ.
+        """
+        cac_tien_to = set()
+        for khoa in cac_khoa:
+            for d in range(1, len(khoa) + 1):
+                tien_to = khoa[:d]
+                if tien_to not in self._top:
+                    if them_nut_moi:
+                        lo, hi = self._doan(tien_to)
+                        if hi - lo > self.NGUONG_NUT_NANG:
+                            self._top[tien_to] = self._top_cua_doan(lo, hi)
+                    break
+                cac_tien_to.add(tien_to)
+        return cac_tien_to
+
+    # =====================
+    # Gợi ý
+    # =====================
+    def goi_y(self, tien_to: str, n: int = 10) -> List[Dict]:
+        """
+        Gợi ý n hàng hóa có một từ trong tên bắt đầu bằng tien_to
+        (tiền tố có thể gồm nhiều từ), phổ biến nhất trước.
+
+        Returns:
+            list[dict]: [{"ma_hang", "ten_hang"}, ...]
+        """
+        tien_to = chuan_hoa(tien_to)
+        if not tien_to:
+            return []
+
+        self._dam_bao_da_nap()
+
+        khoa_tra = tien_to[:self.DO_DAI_KHOA]
+        with self._lock:
+            if khoa_tra in self._top and len(tien_to) <= self.DO_DAI_KHOA:
+                # Có thể ngắn hơn n trong lúc chờ tính lại ở thread nền
+                top = self._top[khoa_tra]
+            else:
+                top = self._top_cua_doan(*self._doan(khoa_tra))
+
+            if len(tien_to) > self.DO_DAI_KHOA:
+                # Khóa bị cắt ngắn: lọc lại trên tên đầy đủ
+                top = [
+                    ma_hang for ma_hang in top
+                    if (" " + self._tai_lieu[ma_hang][1]).find(" " + tien_to) >= 0
+                ]
+
+            return [
+                {"ma_hang": ma_hang, "ten_hang": self._tai_lieu[ma_hang][0]}
+                for ma_hang in top[:n]
+            ]
+
+    def thong_ke(self) -> Dict:
+        """
+        Kích thước chỉ mục.
+        """
+        with self._lock:
+            return {
+                "so_hang_hoa": len(self._tai_lieu),
+                "so_khoa": len(self._khoa),
+                "so_tien_to_nang": len(self._top),
+            }
+
+
+# Chỉ mục dùng chung của process
+goi_y_hang_hoa = ChiMucGoiY(HangHoaRepository.iter_ten_hang, _nap_do_pho_bien)
+
+
+class GoiYHangHoaService:
+    """
+    Service gợi ý hàng hóa khi gõ.
+    """
+
+    @staticmethod
+    def goi_y(tien_to: str, n: int = 10) -> List[Dict]:
+        """
+        Gợi ý hàng hóa theo tiền tố đang gõ.
+
+        Args:
+            tien_to (str): Chuỗi người dùng đã gõ.
+            n (int): Số gợi ý.
+
+        Raises:
+            ValueError: n không hợp lệ.
+
+        Returns:
+            list[dict]: [{"ma_hang", "ten_hang"}, ...], rỗng khi tien_to rỗng.
+        """
+        if not 1 <= n <= ChiMucGoiY.SO_GOI_Y_LUU:
+            raise ValueError(f"n phải trong khoảng 1..{ChiMucGoiY.SO_GOI_Y_LUU}")
+        return goi_y_hang_hoa.goi_y(tien_to or "", n)
@@ -1,6 +1,17 @@
-from typing import Optional
+import copy
+import operator
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+from django.db import transaction
 from django.db.models import QuerySet
-from QuanLyHangHoa.models.hang_hoa import HangHoaRepository, HangHoa
+from QuanLyHangHoa.models.bien_dong_kho import BienDongKho
+from QuanLyHangHoa.models.hang_hoa import HangHoaRepository, HangHoa, bo_nho_dem_hang_hoa
+from QuanLyHangHoa.models.hang_hoa_thay_doi import HangHoaThayDoiRepository
+from QuanLyHangHoa.models.ton_kho_phan_manh import TonKhoPhanManhRepository
+from QuanLyHangHoa.services.canh_bao_ton_kho_service import CanhBaoTonKhoService
+from QuanLyHangHoa.services.goi_y_service import goi_y_hang_hoa
+from QuanLyHangHoa.services.ma_vach_service import bo_nho_dem_ma_vach
+from QuanLyHangHoa.services.tim_kiem_service import chi_muc_hang_hoa
 
 
 class HangHoaService:
@@ -10,24 +21,88 @@ class HangHoaService:
     đảm bảo logic nghiệp vụ không nằm ở View hay Serializer.
     """
 
+    # Các cách sắp xếp danh mục được phép: tham số sap_xep -> ordering.
+    # Luôn kết thúc bằng mã hàng (duy nhất) để phân trang keyset ổn định.
+    CAC_CACH_SAP_XEP = {
+        "ma_hang": ("ma_hang",),
+        "-ma_hang": ("-ma_hang",),
+        "ten_hang": ("ten_hang", "ma_hang"),
+        "-ten_hang": ("-ten_hang", "-ma_hang"),
+        "gia_ban": ("gia_ban", "ma_hang"),
+        "-gia_ban": ("-gia_ban", "-ma_hang"),
+        "so_luong_ton": ("so_luong_ton", "ma_hang"),
+        "-so_luong_ton": ("-so_luong_ton", "-ma_hang"),
+    }
+
     @staticmethod
-    def get_all() -> QuerySet[HangHoa]:
+    def get_all(**bo_loc) -> QuerySet[HangHoa]:
         """
-        Lấy danh sách tất cả hàng hóa.
+        Lấy danh sách hàng hóa, có thể kèm điều kiện lọc.
 
         Trả về QuerySet để giữ cơ chế lazy loading,
         cho phép View hoặc DRF tự xử lý paginate, filter và serialize.
 
+        Args:
+            **bo_loc: Điều kiện lọc, xem HangHoaRepository.loc
+                (ma_loai_hang, ma_thuong_hieu, gia_tu, gia_den,
+                ton_kho_toi_da, ten_bat_dau).
+
         Returns:
             QuerySet[HangHoa]: Danh sách hàng hóa.
+
+        Raises:
+            ValueError: Khi điều kiện lọc không hợp lệ.
+        """
+        HangHoaService._kiem_tra_bo_loc(bo_loc)
+        return HangHoaRepository.loc(HangHoaRepository.get_all(), **bo_loc)
+
+    @staticmethod
+    def get_all_values(**bo_loc) -> QuerySet:
+        """
+        Lấy danh sách hàng hóa dạng dict phẳng (values()),
+        dùng cho đường serialize nhanh của API danh sách.
+
+        Args:
+            **bo_loc: Điều kiện lọc giống get_all.
+
+        Returns:
+            QuerySet: Các dict hàng hóa đã JOIN đơn vị tính,
+            loại hàng, thương hiệu.
+
+        Raises:
+            ValueError: Khi điều kiện lọc không hợp lệ.
+        """
+        HangHoaService._kiem_tra_bo_loc(bo_loc)
+        return HangHoaRepository.loc(HangHoaRepository.get_all_values(), **bo_loc)
+
+    @staticmethod
+    def _kiem_tra_bo_loc(bo_loc: Dict) -> None:
+        """
+        Kiểm tra ràng buộc nghiệp vụ của điều kiện lọc danh mục.
+
+        Raises:
+            ValueError: Khi điều kiện lọc không hợp lệ.
         """
-        return HangHoaRepository.get_all()
+        gia_tu: Optional[Decimal] = bo_loc.get("gia_tu")
+        gia_den: Optional[Decimal] = bo_loc.get("gia_den")
+
+        if gia_tu is not None and gia_tu < 0:
+            raise ValueError("gia_tu không được âm")
+        if gia_tu is not None and gia_den is not None and gia_tu > gia_den:
+            raise ValueError("gia_tu phải nhỏ hơn hoặc bằng gia_den")
+
+    # Số lần thử lại khi hàng hóa vừa được bật / tắt phân mảnh tồn kho
+    # giữa câu UPDATE trên HANG_HOA và câu UPDATE trên phân mảnh
+    SO_LAN_THU_LAI_PHAN_MANH = 3
 
     @staticmethod
     def get_by_id(ma_hang: int) -> Optional[HangHoa]:
         """
         Lấy thông tin hàng hóa theo mã hàng.
 
+        Đọc qua bộ nhớ đệm; hàng hóa phân mảnh tồn kho trả về bản sao
+        của đối tượng đệm với so_luong_ton là tổng các phân mảnh.
+
         Args:
             ma_hang (int): Mã định danh của hàng hóa.
 
@@ -35,7 +110,45 @@ class HangHoaService:
             HangHoa | None: Đối tượng hàng hóa nếu tồn tại,
             ngược lại trả về None.
         """
-        return HangHoaRepository.get_by_id(ma_hang)
+        obj = HangHoaRepository.get_by_id(ma_hang)
+        if obj is not None and obj.so_phan_manh:
+            # Không sửa đối tượng đang nằm trong bộ nhớ đệm
+            obj = copy.copy(obj)
+            HangHoaRepository.gan_ton_kho_phan_manh([obj])
+        return obj
+
+    @staticmethod
+    def gan_ton_kho_phan_manh(items) -> None:
+        """
+        Thay bản sao tồn kho của các hàng hóa phân mảnh trong một trang
+        danh sách (HangHoa hoặc dòng values()) bằng tồn kho thật.
+        Xem HangHoaRepository.gan_ton_kho_phan_manh.
+        """
+        HangHoaRepository.gan_ton_kho_phan_manh(items)
+
+    @staticmethod
+    def phien_ban() -> int:
+        """
+        Phiên bản hiện tại của danh mục hàng hóa, đổi sau mỗi thay đổi
+        đã commit (kể cả tồn kho) ở mọi worker: phiên bản mới nhất của
+        nhật ký thay đổi HANG_HOA_THAY_DOI. Dùng để tạo ETag cho API
+        danh sách / chi tiết.
+        """
+        return HangHoaThayDoiRepository.phien_ban_moi_nhat()
+
+    @staticmethod
+    def thong_ke_bo_nho_dem() -> Dict:
+        """
+        Bộ đếm của các bộ nhớ đệm hàng hóa trong process.
+
+        Returns:
+            dict: {"hang_hoa": {...}, "ma_vach": {...}} gồm số mục,
+            số lần trúng / trượt / bị loại.
+        """
+        return {
+            "hang_hoa": bo_nho_dem_hang_hoa.thong_ke(),
+            "ma_vach": bo_nho_dem_ma_vach.thong_ke(),
+        }
 
     @staticmethod
     @staticmethod
@@ -51,7 +164,8 @@ class HangHoaService:
             'ma_thuong_hieu': ThuongHieu instance | None,
             'gia_nhap': float,
             'gia_ban': float,
-            'so_luong_ton': int
+            'so_luong_ton': int,
+            'muc_dat_lai': int
         }
 
         Service chịu trách nhiệm chuyển đổi instance
@@ -60,7 +174,7 @@ class HangHoaService:
         Returns:
             HangHoa: Đối tượng hàng hóa vừa được tạo.
         """
-        return HangHoaRepository.create(
+        obj = HangHoaRepository.create(
             ten_hang=validated_data.get("ten_hang"),
 
             ma_dvt=validated_data["ma_dvt"].ma_dvt,
@@ -74,7 +188,10 @@ class HangHoaService:
             gia_nhap=validated_data.get("gia_nhap", 0),
             gia_ban=validated_data.get("gia_ban", 0),
             so_luong_ton=validated_data.get("so_luong_ton", 0),
+            muc_dat_lai=validated_data.get("muc_dat_lai", 0),
         )
+        HangHoaService._thong_bao_thay_doi(obj.ma_hang, obj)
+        return obj
 
     @staticmethod
     def update(ma_hang: int, **validated_data) -> Optional[HangHoa]:
@@ -88,11 +205,17 @@ class HangHoaService:
             ma_hang (int): Mã định danh của hàng hóa cần cập nhật.
             **validated_data: Các trường cần cập nhật và giá trị tương ứng.
 
+        Raises:
+            ValueError: Sửa so_luong_ton của hàng hóa đang phân mảnh tồn kho.
+
         Returns:
             HangHoa | None: Đối tượng hàng hóa sau khi cập nhật,
             hoặc None nếu không tồn tại.
         """
-        return HangHoaRepository.update(ma_hang, **validated_data)
+        obj = HangHoaRepository.update(ma_hang, **validated_data)
+        if obj:
+            HangHoaService._thong_bao_thay_doi(ma_hang, obj)
+        return obj
 
     @staticmethod
     def delete(ma_hang: int) -> bool:
@@ -105,7 +228,10 @@ class HangHoaService:
         Returns:
             bool: True nếu xóa thành công, False nếu không tồn tại.
         """
-        return HangHoaRepository.delete(ma_hang)
+        success = HangHoaRepository.delete(ma_hang)
+        if success:
+            HangHoaService._thong_bao_thay_doi(ma_hang)
+        return success
 
     @staticmethod
     def adjust_stock(ma_hang: int, so_luong: int) -> Optional[HangHoa]:
@@ -116,7 +242,8 @@ class HangHoaService:
         Serializer và View không cần biết chi tiết tồn kho.
 
         Ràng buộc nghiệp vụ:
-        - Không cho phép tồn kho âm.
+        - Không cho phép tồn kho âm (kiểm tra nguyên tử trong câu
+          UPDATE, xem HangHoaRepository.adjust_stock).
 
         Args:
             ma_hang (int): Mã định danh của hàng hóa.
@@ -129,12 +256,318 @@ class HangHoaService:
         Raises:
             ValueError: Khi số lượng tồn kho sau điều chỉnh nhỏ hơn 0.
         """
-        obj = HangHoaRepository.get_by_id(ma_hang)
-        if not obj:
-            return None
+        # Kiểm tra "không âm tồn kho" nằm trong câu UPDATE có điều kiện,
+        # không đọc trước rồi mới ghi (tránh mất cập nhật khi đồng thời)
+        obj = HangHoaRepository.adjust_stock(ma_hang, so_luong)
+        phan_manh = False
+        lan_thu = 0
+        while obj is None:
+            # Chỉ đường thất bại mới cần đọc lại để biết lý do
+            hien_tai = HangHoaRepository.get_by_id(ma_hang, dung_bo_nho_dem=False)
+            if hien_tai is None:
+                return None
+
+            if hien_tai.so_phan_manh:
+                # Hàng hóa phân mảnh tồn kho: điều chỉnh trên một phân mảnh
+                with transaction.atomic():
+                    ket_qua = TonKhoPhanManhRepository.dieu_chinh(
+                        ma_hang, hien_tai.so_phan_manh, so_luong, BienDongKho.LOAI_DIEU_CHINH
+                    )
+                    if ket_qua is False:
+                        raise ValueError("Không đủ tồn kho")
+                    if ket_qua:
+                        HangHoaThayDoiRepository.ghi([ma_hang])
+                        obj = hien_tai
+                        obj.so_luong_ton = TonKhoPhanManhRepository.tong([ma_hang])[ma_hang]
+                        phan_manh = True
+                        break
+            elif hien_tai.so_luong_ton + so_luong < 0:
+                raise ValueError("Không đủ tồn kho")
+
+            # Phân mảnh vừa được bật / tắt (TonKhoPhanManhService.dat)
+            # hoặc tồn kho vừa đổi: thử lại trên HANG_HOA
+            lan_thu += 1
+            if lan_thu > HangHoaService.SO_LAN_THU_LAI_PHAN_MANH:
+                raise ValueError("Không đủ tồn kho")
+            obj = HangHoaRepository.adjust_stock(ma_hang, so_luong)
+
+        if not phan_manh:
+            # Một câu UPDATE: tồn kho trước = sau - số lượng điều chỉnh
+            HangHoaService._thong_bao_ton_kho({
+                ma_hang: (obj.so_luong_ton - so_luong, obj.so_luong_ton, obj.muc_dat_lai)
+            })
+        return obj
+
+    @staticmethod
+    def tru_ton_kho_hang_loat(so_luong_map: Dict[int, int], ma_hd: Optional[int] = None) -> None:
+        """
+        Trừ tồn kho cho nhiều hàng hóa cùng lúc (dùng khi thanh toán hóa đơn).
+
+        Toàn bộ việc kiểm tra và trừ tồn kho được thực hiện bằng
+        một câu UPDATE có điều kiện trên cơ sở dữ liệu, không đọc lại
+        từng hàng hóa. Hàng hóa đang phân mảnh tồn kho (hàng bán chạy,
+        xem TonKhoPhanManhService) được trừ trên một phân mảnh; hàng hóa
+        vừa được bật / tắt phân mảnh giữa hai bước được trừ lại trên nơi
+        đang giữ tồn kho (tối đa SO_LAN_THU_LAI_PHAN_MANH lần).
+
+        Ràng buộc nghiệp vụ:
+        - Không cho phép tồn kho âm; chỉ cần một hàng hóa không đủ
+          là toàn bộ thao tác bị hủy.
+
+        Phải được gọi bên trong transaction.atomic để việc hủy
+        có hiệu lực với các dòng đã được cập nhật.
+
+        Args:
+            so_luong_map (Dict[int, int]): {mã hàng: số lượng cần trừ (> 0)}.
+            ma_hd (int, optional): Mã hóa đơn, ghi vào sổ biến động kho.
 
-        # nghiệp vụ: không cho âm tồn kho
-        if obj.so_luong_ton + so_luong < 0:
-            raise ValueError("Không đủ tồn kho")
+        Raises:
+            ValueError: Khi có hàng hóa không tồn tại hoặc không đủ tồn kho
+                (cùng một thông báo; nơi gọi nên kiểm tra sơ bộ để báo lỗi
+                rõ hơn).
+        """
+        thay_doi = {ma_hang: -so_luong for ma_hang, so_luong in so_luong_map.items()}
+        da_tru = HangHoaRepository.dieu_chinh_ton_kho_hang_loat(
+            thay_doi, loai=BienDongKho.LOAI_BAN, ma_tham_chieu=ma_hd
+        )
+        ton_kho = dict(da_tru)
+        con_lai = [ma_hang for ma_hang in thay_doi if ma_hang not in da_tru]
+        lan_thu = 0
+        while con_lai:
+            # Hàng hóa phân mảnh tồn kho không được câu UPDATE trên trừ:
+            # trừ trên một phân mảnh ngẫu nhiên, không khóa dòng HANG_HOA
+            rows = HangHoaRepository.get_values_theo_ma(con_lai, ("so_luong_ton", "so_phan_manh"))
+            thu_lai = []
+            # Theo thứ tự mã hàng để các hóa đơn đồng thời khóa cùng thứ tự
+            for ma_hang in sorted(con_lai):
+                row = rows.get(ma_hang)
+                if row is None:
+                    raise ValueError("Không đủ tồn kho")
+                if not row["so_phan_manh"]:
+                    if row["so_luong_ton"] + thay_doi[ma_hang] < 0:
+                        raise ValueError("Không đủ tồn kho")
+                    thu_lai.append(ma_hang)
+                    continue
+
+                ket_qua = TonKhoPhanManhRepository.dieu_chinh(
+                    ma_hang, row["so_phan_manh"], thay_doi[ma_hang],
+                    BienDongKho.LOAI_BAN, ma_hd
+                )
+                if ket_qua is False:
+                    raise ValueError("Không đủ tồn kho")
+                if ket_qua is None:
+                    thu_lai.append(ma_hang)
+
+            if not thu_lai:
+                break
+            # Phân mảnh vừa được bật / tắt (TonKhoPhanManhService.dat)
+            # hoặc tồn kho vừa đổi: trừ lại trên HANG_HOA
+            lan_thu += 1
+            if lan_thu > HangHoaService.SO_LAN_THU_LAI_PHAN_MANH:
+                raise ValueError("Không đủ tồn kho")
+            da_tru = HangHoaRepository.dieu_chinh_ton_kho_hang_loat(
+                {ma_hang: thay_doi[ma_hang] for ma_hang in thu_lai},
+                loai=BienDongKho.LOAI_BAN, ma_tham_chieu=ma_hd
+            )
+            ton_kho.update(da_tru)
+            con_lai = [ma_hang for ma_hang in thu_lai if ma_hang not in da_tru]
+
+        HangHoaService._thong_bao_ton_kho(ton_kho)
+
+    # Số dòng tối đa của một lần kiểm kê
+    KIEM_KE_SO_DONG_TOI_DA = 20000
+
+    @staticmethod
+    def kiem_ke(cac_dong: List[Dict]) -> Dict:
+        """
+        Điều chỉnh tồn kho hàng loạt theo kết quả kiểm kê.
+
+        Mỗi dòng là số lượng đếm được (so_luong_dem, tồn kho mới) hoặc
+        số lượng điều chỉnh (so_luong, cộng / trừ như adjust-stock).
+        Tồn kho hiện tại được đọc một lần (khóa dòng tới hết transaction),
+        rồi ghi bằng các câu UPDATE ... CASE theo khối
+        (HangHoaRepository.dieu_chinh_ton_kho_hang_loat).
+
+        Ràng buộc nghiệp vụ:
+        - Không cho phép tồn kho âm; chỉ cần một hàng hóa bị âm
+          là toàn bộ lần kiểm kê bị hủy.
+
+        Args:
+            cac_dong (List[Dict]): [{"ma_hang", "so_luong_dem"} hoặc
+                {"ma_hang", "so_luong"}, ...] (số nguyên), mỗi mã hàng một dòng.
+
+        Raises:
+            ValueError: Dữ liệu không hợp lệ, hàng hóa không tồn tại
+                hoặc tồn kho âm sau điều chỉnh.
+
+        Returns:
+            dict: Báo cáo chênh lệch {"so_hang_hoa", "so_thay_doi",
+            "tong_chenh_lech", "gia_tri_chenh_lech", "chi_tiet": [{"ma_hang",
+            "ten_hang", "ton_truoc", "ton_sau", "chenh_lech",
+            "gia_tri_chenh_lech"}, ...]}; giá trị chênh lệch tính theo giá nhập.
+        """
+        if not cac_dong:
+            raise ValueError("Danh sách kiểm kê rỗng")
+        if len(cac_dong) > HangHoaService.KIEM_KE_SO_DONG_TOI_DA:
+            raise ValueError(
+                f"Tối đa {HangHoaService.KIEM_KE_SO_DONG_TOI_DA} dòng mỗi lần kiểm kê"
+            )
+
+        # ma_hang -> (là số đếm, số lượng)
+        # operator.index chỉ nhận số nguyên: int() sẽ cắt 1.5 thành 1
+        yeu_cau: Dict[int, tuple] = {}
+        for i, dong in enumerate(cac_dong, start=1):
+            try:
+                ma_hang = operator.index(dong["ma_hang"])
+                if "so_luong_dem" in dong:
+                    la_so_dem, so_luong = True, operator.index(dong["so_luong_dem"])
+                    if so_luong < 0:
+                        raise ValueError
+                else:
+                    la_so_dem, so_luong = False, operator.index(dong["so_luong"])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(
+                    f"Dòng {i}: cần ma_hang và so_luong_dem (>= 0) hoặc so_luong"
+                )
+            if ma_hang in yeu_cau:
+                raise ValueError(f"Dòng {i}: mã hàng {ma_hang} bị lặp")
+            yeu_cau[ma_hang] = (la_so_dem, so_luong)
+
+        with transaction.atomic():
+            hien_tai = HangHoaRepository.get_values_theo_ma(
+                yeu_cau, ("ten_hang", "gia_nhap", "so_luong_ton", "so_phan_manh"), khoa=True
+            )
+
+            khong_co = [ma_hang for ma_hang in yeu_cau if ma_hang not in hien_tai]
+            if khong_co:
+                raise ValueError(
+                    "Hàng hóa không tồn tại: " + ", ".join(map(str, khong_co[:20]))
+                )
+
+            phan_manh = [ma_hang for ma_hang, row in hien_tai.items() if row["so_phan_manh"]]
+            if phan_manh:
+                raise ValueError(
+                    "Tắt phân mảnh tồn kho trước khi kiểm kê: "
+                    + ", ".join(map(str, phan_manh[:20]))
+                )
+
+            chi_tiet = []
+            chenh_lech_map = {}
+            bi_am = []
+            for ma_hang, (la_so_dem, so_luong) in yeu_cau.items():
+                row = hien_tai[ma_hang]
+                ton_truoc = row["so_luong_ton"]
+                chenh_lech = so_luong - ton_truoc if la_so_dem else so_luong
+                if ton_truoc + chenh_lech < 0:
+                    bi_am.append(ma_hang)
+                if chenh_lech:
+                    chenh_lech_map[ma_hang] = chenh_lech
+                chi_tiet.append({
+                    "ma_hang": ma_hang,
+                    "ten_hang": row["ten_hang"],
+                    "ton_truoc": ton_truoc,
+                    "ton_sau": ton_truoc + chenh_lech,
+                    "chenh_lech": chenh_lech,
+                    "gia_tri_chenh_lech": row["gia_nhap"] * chenh_lech,
+                })
+
+            if bi_am:
+                raise ValueError(
+                    "Không đủ tồn kho: " + ", ".join(map(str, bi_am[:20]))
+                )
+
+            if chenh_lech_map:
+                da_dieu_chinh = HangHoaRepository.dieu_chinh_ton_kho_hang_loat(
+                    chenh_lech_map, loai=BienDongKho.LOAI_KIEM_KE
+                )
+                if len(da_dieu_chinh) != len(chenh_lech_map):
+                    raise ValueError("Không đủ tồn kho")
+                HangHoaService._thong_bao_ton_kho(da_dieu_chinh)
+
+        tong_gia_tri = sum((d["gia_tri_chenh_lech"] for d in chi_tiet), Decimal(0))
+        # Cùng định dạng tiền với HangHoaSerializer (chuỗi, 2 chữ số thập phân)
+        for d in chi_tiet:
+            d["gia_tri_chenh_lech"] = format(d["gia_tri_chenh_lech"].quantize(Decimal("0.01")), "f")
 
-        return HangHoaRepository.adjust_stock(ma_hang, so_luong)
+        return {
+            "so_hang_hoa": len(chi_tiet),
+            "so_thay_doi": len(chenh_lech_map),
+            "tong_chenh_lech": sum(chenh_lech_map.values()),
+            "gia_tri_chenh_lech": format(tong_gia_tri.quantize(Decimal("0.01")), "f"),
+            "chi_tiet": chi_tiet,
+        }
+
+    @staticmethod
+    def _thong_bao_thay_doi(ma_hang: int, hang_hoa: Optional[HangHoa] = None) -> None:
+        """
+        Đồng bộ các chỉ mục / bộ nhớ đệm trong process sau khi
+        hàng hóa được tạo, sửa hoặc xóa.
+
+        Chạy sau khi transaction commit (transaction.on_commit), để
+        thay đổi bị rollback không lọt vào chỉ mục.
+
+        Args:
+            ma_hang (int): Mã hàng hóa thay đổi.
+            hang_hoa (HangHoa, optional): Hàng hóa sau thay đổi,
+                None nếu đã bị xóa.
+        """
+        bo_nho_dem_ma_vach.huy_hang_hoa([ma_hang])
+        if hang_hoa is None:
+            def dong_bo():
+                chi_muc_hang_hoa.xoa(ma_hang)
+                goi_y_hang_hoa.xoa(ma_hang)
+                CanhBaoTonKhoService.thong_bao([ma_hang])
+        else:
+            ten_hang = hang_hoa.ten_hang
+
+            def dong_bo():
+                chi_muc_hang_hoa.cap_nhat(ma_hang, ten_hang)
+                goi_y_hang_hoa.cap_nhat(ma_hang, ten_hang)
+                CanhBaoTonKhoService.thong_bao([ma_hang])
+
+        transaction.on_commit(dong_bo)
+
+    @staticmethod
+    def _thong_bao_thay_doi_hang_loat(cac_ma_hang: List[int]) -> None:
+        """
+        Đồng bộ bộ nhớ đệm / chỉ mục sau một thay đổi hàng loạt (nhập file).
+
+        Chỉ mục tìm kiếm và gợi ý được đánh dấu cũ để dựng lại một lần,
+        thay vì cập nhật từng hàng hóa.
+
+        Args:
+            cac_ma_hang (List[int]): Mã các hàng hóa đã tạo / sửa.
+        """
+        bo_nho_dem_ma_vach.huy_hang_hoa(cac_ma_hang)
+
+        def dong_bo():
+            chi_muc_hang_hoa.danh_dau_cu()
+            goi_y_hang_hoa.danh_dau_cu()
+            CanhBaoTonKhoService.thong_bao(cac_ma_hang)
+
+        transaction.on_commit(dong_bo)
+
+    @staticmethod
+    def _thong_bao_ton_kho(ton_kho_map: Dict[int, Tuple[int, int, int]]) -> None:
+        """
+        Hủy mục đệm quét mã vạch của các hàng hóa (lần quét sau đọc
+        giá trị đã commit, không cộng dồn chênh lệch vào mục đệm) và
+        đẩy cảnh báo tồn kho thấp sau khi transaction commit.
+
+        Hàng hóa điều chỉnh trên phân mảnh không có ở đây: quét mã vạch
+        đọc tồn kho từ phân mảnh, bản sao HANG_HOA.SoLuongTon chưa đổi,
+        cảnh báo được gửi khi đồng bộ bản sao
+        (TonKhoPhanManhService.dong_bo_ton_kho).
+
+        Args:
+            ton_kho_map (Dict[int, Tuple[int, int, int]]): {mã hàng:
+                (tồn kho trước, tồn kho sau, mức đặt lại)} của câu UPDATE
+                trên HANG_HOA.
+        """
+        if not ton_kho_map:
+            return
+        ton_kho_map = dict(ton_kho_map)
+        bo_nho_dem_ma_vach.huy_hang_hoa(ton_kho_map)
+        transaction.on_commit(
+            lambda: CanhBaoTonKhoService.thong_bao(list(ton_kho_map), ton_kho_map)
+        )
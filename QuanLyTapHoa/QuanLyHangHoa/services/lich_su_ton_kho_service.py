@@ -0,0 +1,99 @@
+"""
+Tồn kho tại một thời điểm trong quá khứ, từ sổ biến động kho.
+
+Mọi thay đổi tồn kho (bán, điều chỉnh, nhập, kiểm kê) đều ghi một dòng
+BIEN_DONG_KHO trong cùng câu lệnh / transaction với thay đổi đó. Mỗi
+đêm, chup_ton_kho_ngay() lưu tồn kho cuối ngày hôm trước của từng hàng
+hóa vào TON_KHO_NGAY (lệnh chup_ton_kho_ngay). Tồn kho tại thời điểm T
+là ảnh chụp gần nhất trước ngày của T cộng biến động từ cuối ngày chụp
+tới T: một lần seek trên TON_KHO_NGAY và một lần quét ngắn (thường
+chưa tới một ngày biến động) trên chỉ mục (MaHang, ThoiDiem).
+"""
+
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from typing import Optional
+
+from django.utils import timezone
+
+from QuanLyHangHoa.models.bien_dong_kho import BienDongKhoRepository
+from QuanLyHangHoa.models.hang_hoa import HangHoaRepository
+from QuanLyHangHoa.models.ton_kho_ngay import TonKhoNgayRepository
+from QuanLyHangHoa.models.ton_kho_phan_manh import TonKhoPhanManhRepository
+
+
+def dau_ngay(ngay: date) -> datetime:
+    """
+    0 giờ của ngày theo giờ địa phương (TIME_ZONE), có múi giờ.
+    """
+    return timezone.make_aware(datetime.combine(ngay, time.min))
+
+
+class LichSuTonKhoService:
+    """
+    Lớp Service chụp tồn kho cuối ngày và tính tồn kho tại thời điểm.
+    """
+
+    @staticmethod
+    def ton_kho_tai(ma_hang: int, thoi_diem: datetime) -> Optional[int]:
+        """
+        Tồn kho của hàng hóa tại thời điểm (sau mọi biến động trước
+        thời điểm đó).
+
+        Có ảnh chụp trước ngày của thời điểm:
+            ảnh chụp + biến động trong [0 giờ ngày sau ngày chụp, thoi_diem)
+        Chưa có ảnh chụp (hàng hóa mới, chưa chạy lệnh chụp):
+            tồn kho hiện tại - biến động trong [thoi_diem, hiện tại)
+
+        Args:
+            ma_hang (int): Mã hàng hóa.
+            thoi_diem (datetime): Thời điểm cần tính, có múi giờ.
+
+        Returns:
+            int | None: Tồn kho, None nếu hàng hóa không tồn tại và chưa
+            có ảnh chụp.
+        """
+        ngay = timezone.localtime(thoi_diem).date()
+        anh_chup = TonKhoNgayRepository.gan_nhat(ma_hang, ngay)
+        if anh_chup is not None:
+            ngay_chup, ton_kho = anh_chup
+            return ton_kho + BienDongKhoRepository.tong(
+                ma_hang, tu=dau_ngay(ngay_chup + timedelta(days=1)), den=thoi_diem
+            )
+
+        row = HangHoaRepository.get_values_theo_ma(
+            [ma_hang], ("so_luong_ton", "so_phan_manh")
+        ).get(ma_hang)
+        if row is None:
+            return None
+
+        ton_kho = row["so_luong_ton"]
+        if row["so_phan_manh"]:
+            ton_kho = TonKhoPhanManhRepository.tong([ma_hang]).get(ma_hang, ton_kho)
+        return ton_kho - BienDongKhoRepository.tong(ma_hang, tu=thoi_diem)
+
+    @staticmethod
+    def chup_ton_kho_ngay(ngay: Optional[date] = None) -> int:
+        """
+        Chụp tồn kho cuối ngày của mọi hàng hóa (bỏ qua hàng hóa đã
+        chụp ngày đó, nên chạy lại an toàn).
+
+        Args:
+            ngay (date, optional): Ngày cần chụp, mặc định hôm qua (giờ địa phương).
+
+        Raises:
+            ValueError: Ngày chưa kết thúc.
+
+        Returns:
+            int: Số hàng hóa đã chụp.
+        """
+        if ngay is None:
+            ngay = timezone.localdate() - timedelta(days=1)
+
+        cuoi_ngay = dau_ngay(ngay + timedelta(days=1))
+        if cuoi_ngay > timezone.now():
+            raise ValueError(f"Ngày {ngay} chưa kết thúc")
+
+        # BIEN_DONG_KHO.ThoiDiem lưu giờ UTC không múi giờ
+        return TonKhoNgayRepository.chup(
+            ngay, cuoi_ngay.astimezone(dt_timezone.utc).replace(tzinfo=None)
+        )
@@ -0,0 +1,311 @@
+"""
+Quét mã vạch tại quầy thanh toán.
+
+Mã vạch -> (hàng hóa, giá bán, tồn kho) được giữ trong một dict của
+process: quét trúng bộ nhớ đệm không tốn lượt truy vấn CSDL nào, trượt
+thì tra MA_VACH theo khóa chính (một lần seek) rồi lưu lại. Riêng hàng
+hóa phân mảnh tồn kho, tồn kho luôn được đọc lại (tổng các phân mảnh).
+
+Thay đổi trong chính process hủy mục đệm của hàng hóa ngay và lần nữa
+sau commit (xem HangHoaService): sửa hàng hóa, điều chỉnh / trừ tồn
+kho, gán / bỏ mã vạch; lần quét sau đọc lại giá trị đã commit. Không
+cộng dồn chênh lệch vào mục đệm, nên mục vừa nạp lại từ CSDL không bị
+cộng hai lần. Thay đổi từ worker khác được nhận qua nhật ký thay đổi
+(dong_bo_bo_nho_dem) trước mỗi lần quét; MA_VACH_THOI_GIAN_SONG chỉ
+giới hạn tuổi của mục đệm.
+"""
+
+import threading
+import time
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from QuanLyHangHoa.models.hang_hoa import HangHoaRepository
+from QuanLyHangHoa.models.hang_hoa_thay_doi import dong_bo_bo_nho_dem
+from QuanLyHangHoa.models.ma_vach import MaVachRepository
+
+
+# Độ dài hợp lệ: EAN-8, UPC-A, EAN-13, GTIN-14
+CAC_DO_DAI_MA_VACH = (8, 12, 13, 14)
+
+
+def chuan_hoa_ma_vach(ma_vach: str) -> str:
+    """
+    Kiểm tra chữ số kiểm tra (GS1) và đưa mã vạch về dạng GTIN-14.
+
+    Chữ số kiểm tra không đổi khi đệm 0 bên trái, nên cùng một mã
+    quét ra dạng UPC-A (12 số) hay EAN-13 (0 + 12 số) đều cho cùng khóa.
+
+    Raises:
+        ValueError: Mã vạch sai định dạng hoặc sai chữ số kiểm tra.
+    """
+    ma_vach = (ma_vach or "").strip()
+    if not ma_vach.isdigit() or len(ma_vach) not in CAC_DO_DAI_MA_VACH:
+        raise ValueError("Mã vạch phải gồm 8, 12, 13 hoặc 14 chữ số")
+
+    # Trọng số 3, 1, 3, 1... tính từ chữ số sát chữ số kiểm tra
+    tong = sum(
+        int(c) * (3 if i % 2 == 0 else 1)
+        for i, c in enumerate(reversed(ma_vach[:-1]))
+    )
+    if (10 - tong % 10) % 10 != int(ma_vach[-1]):
+        raise ValueError("Mã vạch sai chữ số kiểm tra")
+
+    return ma_vach.zfill(14)
+
+
+def _gia(gia_ban) -> str:
+    # Cùng định dạng với DecimalField(decimal_places=2) của HangHoaSerializer
+    return format(Decimal(gia_ban).quantize(Decimal("0.01")), "f")
+
+
+class BoNhoDemQuetMaVach:
+    """
+    Bộ nhớ đệm mã vạch -> thông tin bán hàng, dùng chung trong một process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # ma_vach -> (hết hạn lúc, {"ma_hang", "ten_hang", "gia_ban",
+        #                          "so_luong_ton", "so_phan_manh"})
+        self._muc: Dict[str, Tuple[float, Dict]] = {}
+        # ma_hang -> các mã vạch đang được đệm, để xóa theo hàng hóa
+        self._theo_hang: Dict[int, Set[str]] = {}
+        # Bộ đếm lần hủy; mã hàng / mã vạch -> lần hủy gần nhất. Giá trị
+        # đọc từ CSDL trước một lần hủy không được lưu (có thể đã cũ).
+        self._dem_huy = 0
+        self._lan_huy: Dict[object, int] = {}
+        self._moc_toi_thieu = 0
+        self._so_lan_trung = 0
+        self._so_lan_truot = 0
+
+    @staticmethod
+    def _thoi_gian_song() -> float:
+        return getattr(settings, "MA_VACH_THOI_GIAN_SONG", 60)
+
+    def lay(self, ma_vach: str) -> Optional[Dict]:
+        """
+        Lấy thông tin đã đệm của mã vạch, None nếu chưa có hoặc đã hết hạn.
+        """
+        with self._lock:
+            muc = self._muc.get(ma_vach)
+            if muc is None or muc[0] < time.monotonic():
+                self._so_lan_truot += 1
+                return None
+            self._so_lan_trung += 1
+            return dict(muc[1])
+
+    def moc(self) -> int:
+        """
+        Mốc lấy trước khi đọc CSDL, truyền lại cho dat().
+        """
+        with self._lock:
+            return self._dem_huy
+
+    def dat(self, ma_vach: str, thong_tin: Dict, moc: int) -> None:
+        """
+        Lưu thông tin của mã vạch đọc được từ CSDL sau mốc moc; bỏ qua
+        nếu mã vạch / hàng hóa bị hủy sau mốc đó (giá trị có thể là bản
+        trước thay đổi). Đầy thì bỏ mục được lưu lâu nhất.
+        """
+        so_muc_toi_da = getattr(settings, "MA_VACH_SO_MUC_TOI_DA", 100000)
+        with self._lock:
+            if (
+                moc < self._moc_toi_thieu
+                or self._lan_huy.get(ma_vach, 0) > moc
+                or self._lan_huy.get(thong_tin["ma_hang"], 0) > moc
+            ):
+                return
+            self._xoa_ma_vach_khong_khoa(ma_vach)
+            while self._muc and len(self._muc) >= so_muc_toi_da:
+                self._xoa_ma_vach_khong_khoa(next(iter(self._muc)))
+
+            self._muc[ma_vach] = (time.monotonic() + self._thoi_gian_song(), thong_tin)
+            self._theo_hang.setdefault(thong_tin["ma_hang"], set()).add(ma_vach)
+
+    def xoa_hang_hoa(self, ma_hang: int) -> None:
+        """
+        Bỏ mọi mã vạch đang đệm của hàng hóa.
+        """
+        with self._lock:
+            self._ghi_lan_huy(ma_hang)
+            for ma_vach in list(self._theo_hang.get(ma_hang, ())):
+                self._xoa_ma_vach_khong_khoa(ma_vach)
+
+    def huy_hang_hoa(self, cac_ma_hang: Iterable[int]) -> None:
+        """
+        Hủy mục đệm của các hàng hóa đang bị sửa trong transaction hiện
+        tại: hủy ngay, và hủy lại sau khi commit (lần quét chen giữa có
+        thể đã nạp lại giá trị trước commit).
+        """
+        cac_ma_hang = list(cac_ma_hang)
+
+        def huy():
+            for ma_hang in cac_ma_hang:
+                self.xoa_hang_hoa(ma_hang)
+
+        huy()
+        transaction.on_commit(huy)
+
+    def xoa_ma_vach(self, ma_vach: str) -> None:
+        """
+        Bỏ một mã vạch khỏi bộ nhớ đệm.
+        """
+        with self._lock:
+            self._ghi_lan_huy(ma_vach)
+            self._xoa_ma_vach_khong_khoa(ma_vach)
+
+    def xoa_tat_ca(self) -> None:
+        """
+        Bỏ mọi mục đệm.
+        """
+        with self._lock:
+            self._muc.clear()
+            self._theo_hang.clear()
+            self._lan_huy.clear()
+            self._dem_huy += 1
+            self._moc_toi_thieu = self._dem_huy
+
+    def _ghi_lan_huy(self, khoa) -> None:
+        self._dem_huy += 1
+        self._lan_huy[khoa] = self._dem_huy
+        if len(self._lan_huy) > getattr(settings, "MA_VACH_SO_MUC_TOI_DA", 100000):
+            # Giữ bộ nhớ có hạn: quên các lần hủy, từ chối mọi giá trị
+            # đọc trước thời điểm này
+            self._lan_huy.clear()
+            self._moc_toi_thieu = self._dem_huy
+
+    def _xoa_ma_vach_khong_khoa(self, ma_vach: str) -> None:
+        muc = self._muc.pop(ma_vach, None)
+        if muc is None:
+            return
+        ma_hang = muc[1]["ma_hang"]
+        cac_ma_vach = self._theo_hang.get(ma_hang)
+        if cac_ma_vach is not None:
+            cac_ma_vach.discard(ma_vach)
+            if not cac_ma_vach:
+                del self._theo_hang[ma_hang]
+
+    def thong_ke(self) -> Dict:
+        """
+        Kích thước và tỉ lệ trúng của bộ nhớ đệm.
+        """
+        with self._lock:
+            tong = self._so_lan_trung + self._so_lan_truot
+            return {
+                "so_muc": len(self._muc),
+                "so_lan_trung": self._so_lan_trung,
+                "so_lan_truot": self._so_lan_truot,
+                "ti_le_trung": self._so_lan_trung / tong if tong else None,
+            }
+
+
+# Bộ nhớ đệm dùng chung của process
+bo_nho_dem_ma_vach = BoNhoDemQuetMaVach()
+dong_bo_bo_nho_dem.dang_ky(bo_nho_dem_ma_vach.xoa_hang_hoa, bo_nho_dem_ma_vach.xoa_tat_ca)
+
+
+class MaVachService:
+    """
+    Lớp Service xử lý các nghiệp vụ liên quan đến mã vạch hàng hóa.
+    """
+
+    @staticmethod
+    def quet(ma_vach: str) -> Optional[Dict]:
+        """
+        Tra cứu hàng hóa, giá bán và tồn kho theo mã vạch vừa quét.
+
+        Args:
+            ma_vach (str): Mã vạch quét được.
+
+        Raises:
+            ValueError: Mã vạch sai định dạng hoặc sai chữ số kiểm tra.
+
+        Returns:
+            dict | None: {"ma_vach", "ma_hang", "ten_hang", "gia_ban",
+            "so_luong_ton"}, None nếu mã vạch chưa được gán.
+        """
+        ma_vach = chuan_hoa_ma_vach(ma_vach)
+
+        dong_bo_bo_nho_dem.kiem_tra()
+        thong_tin = bo_nho_dem_ma_vach.lay(ma_vach)
+        if thong_tin is None:
+            moc = bo_nho_dem_ma_vach.moc()
+            row = MaVachRepository.tra_cuu(ma_vach)
+            if row is None:
+                return None
+            thong_tin = {
+                "ma_hang": row["hang_hoa_id"],
+                "ten_hang": row["hang_hoa__ten_hang"],
+                "gia_ban": _gia(row["hang_hoa__gia_ban"]),
+                "so_luong_ton": row["hang_hoa__so_luong_ton"],
+                "so_phan_manh": row["hang_hoa__so_phan_manh"],
+            }
+            bo_nho_dem_ma_vach.dat(ma_vach, dict(thong_tin), moc)
+
+        # Hàng hóa phân mảnh: tồn kho thật là tổng các phân mảnh
+        # (một truy vấn gộp theo khóa chính), không dùng bản sao
+        HangHoaRepository.gan_ton_kho_phan_manh([thong_tin])
+        del thong_tin["so_phan_manh"]
+        thong_tin["ma_vach"] = ma_vach
+        return thong_tin
+
+    @staticmethod
+    def get_by_hang_hoa(ma_hang: int) -> Optional[List[str]]:
+        """
+        Lấy các mã vạch của hàng hóa.
+
+        Returns:
+            list[str] | None: Các mã vạch dạng GTIN-14,
+            None nếu hàng hóa không tồn tại.
+        """
+        if HangHoaRepository.get_by_id(ma_hang) is None:
+            return None
+        return MaVachRepository.get_by_hang_hoa(ma_hang)
+
+    @staticmethod
+    def create(ma_hang: int, ma_vach: str) -> Optional[str]:
+        """
+        Gán mã vạch cho hàng hóa.
+
+        Raises:
+            ValueError: Mã vạch không hợp lệ hoặc đã được gán cho hàng hóa khác.
+
+        Returns:
+            str | None: Mã vạch đã chuẩn hóa, None nếu hàng hóa không tồn tại.
+        """
+        ma_vach = chuan_hoa_ma_vach(ma_vach)
+        if HangHoaRepository.get_by_id(ma_hang) is None:
+            return None
+
+        try:
+            with transaction.atomic():
+                MaVachRepository.create(ma_vach, ma_hang)
+        except IntegrityError:
+            raise ValueError("Mã vạch đã được gán cho hàng hóa khác")
+
+        bo_nho_dem_ma_vach.xoa_ma_vach(ma_vach)
+        transaction.on_commit(lambda: bo_nho_dem_ma_vach.xoa_ma_vach(ma_vach))
+        return ma_vach
+
+    @staticmethod
+    def delete(ma_vach: str) -> bool:
+        """
+        Bỏ một mã vạch.
+
+        Raises:
+            ValueError: Mã vạch sai định dạng hoặc sai chữ số kiểm tra.
+
+        Returns:
+            bool: True nếu xóa thành công, False nếu mã vạch không tồn tại.
+        """
+        ma_vach = chuan_hoa_ma_vach(ma_vach)
+        if MaVachRepository.delete(ma_vach) is None:
+            return False
+
+        bo_nho_dem_ma_vach.xoa_ma_vach(ma_vach)
+        transaction.on_commit(lambda: bo_nho_dem_ma_vach.xoa_ma_vach(ma_vach))
+        return True
@@ -0,0 +1,414 @@
+"""
+Nhập danh mục hàng hóa hàng loạt từ file CSV / XLSX (catalog nhà cung cấp).
+
+File được đọc theo luồng (không nạp cả file vào bộ nhớ) và xử lý theo
+khối: mỗi khối kiểm tra dữ liệu trên bản chụp bảng tham chiếu trong bộ
+nhớ, tra khóa tự nhiên bằng vài truy vấn IN, rồi ghi bằng bulk_create /
+bulk_update trong một transaction. Dòng lỗi bị bỏ qua và được liệt kê
+trong báo cáo, các dòng còn lại vẫn được nhập. Khối bị CSDL từ chối
+(vd. mã vạch vừa được gán ở request khác) được ghi lại từng dòng, chỉ
+dòng lỗi bị bỏ qua.
+
+Khóa tự nhiên (upsert):
+1. ma_vach đã được gán -> cập nhật hàng hóa của mã vạch đó
+2. (ten_hang, thương hiệu) đã tồn tại -> cập nhật hàng hóa đó
+3. còn lại -> tạo mới; ma_vach (nếu có) được gán cho hàng hóa
+
+Cột của file (dòng đầu là tiêu đề):
+    ten_hang, don_vi_tinh, loai_hang, thuong_hieu (tùy chọn),
+    gia_nhap, gia_ban, so_luong_ton (tùy chọn), ma_vach (tùy chọn)
+don_vi_tinh / loai_hang / thuong_hieu nhận mã hoặc tên.
+so_luong_ton để trống thì không đổi tồn kho của hàng hóa đã có; hàng hóa
+đang phân mảnh tồn kho cũng giữ nguyên tồn kho. Chênh lệch tồn kho được
+ghi vào sổ biến động kho (loại nhập).
+"""
+
+import csv
+import io
+import logging
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Dict, IO, Iterator, List, Optional, Tuple
+
+from django.db import DatabaseError, transaction
+
+from QuanLyHangHoa.models.bien_dong_kho import BienDongKho, BienDongKhoRepository
+from QuanLyHangHoa.models.don_vi_tinh import du_lieu_don_vi_tinh
+from QuanLyHangHoa.models.hang_hoa import HangHoa, HangHoaRepository
+from QuanLyHangHoa.models.loai_hang import du_lieu_loai_hang
+from QuanLyHangHoa.models.ma_vach import MaVachRepository
+from QuanLyHangHoa.models.thuong_hieu import du_lieu_thuong_hieu
+from QuanLyHangHoa.services.hang_hoa_service import HangHoaService
+from QuanLyHangHoa.services.ma_vach_service import chuan_hoa_ma_vach
+
+logger = logging.getLogger(__name__)
+
+# Giới hạn của cột INT (SoLuongTon)
+SO_NGUYEN_TOI_DA = 2 ** 31 - 1
+
+
+class NhapHangHoaService:
+    """
+    Service nhập hàng hóa hàng loạt từ file.
+    """
+
+    COT_BAT_BUOC = ("ten_hang", "don_vi_tinh", "loai_hang", "gia_nhap", "gia_ban")
+    COT_TUY_CHON = ("thuong_hieu", "so_luong_ton", "ma_vach")
+
+    # Các trường ghi khi cập nhật hàng hóa đã có
+    TRUONG_CAP_NHAT = (
+        "ten_hang", "ma_dvt", "ma_loai_hang", "ma_thuong_hieu", "gia_nhap", "gia_ban",
+    )
+
+    # Số lỗi tối đa liệt kê trong báo cáo (vẫn đếm đủ)
+    SO_LOI_TOI_DA = 1000
+
+    # =====================
+    # Đọc file
+    # =====================
+    @staticmethod
+    def doc_file(f: IO[bytes], ten_file: str) -> Iterator[Tuple[int, Dict[str, str]]]:
+        """
+        Đọc file theo luồng thành các dòng dict (khóa là tên cột viết thường).
+
+        Args:
+            f: File nhị phân (file upload hoặc file mở bằng "rb").
+            ten_file (str): Tên file, đuôi .csv hoặc .xlsx quyết định định dạng.
+
+        Raises:
+            ValueError: Định dạng không hỗ trợ, thiếu cột bắt buộc,
+                hoặc chưa cài openpyxl khi đọc .xlsx.
+
+        Returns:
+            Iterator[Tuple[int, dict]]: (số thứ tự dòng trong file, dữ liệu dòng).
+        """
+        ten_file = (ten_file or "").lower()
+        if ten_file.endswith(".csv"):
+            dong_iter = NhapHangHoaService._doc_csv(f)
+        elif ten_file.endswith(".xlsx"):
+            dong_iter = NhapHangHoaService._doc_xlsx(f)
+        else:
+            raise ValueError("Chỉ hỗ trợ file .csv hoặc .xlsx")
+
+        tieu_de = next(dong_iter, None)
+        if tieu_de is None:
+            raise ValueError("File rỗng")
+        tieu_de = [str(c or "").strip().lower() for c in tieu_de]
+
+        thieu = [c for c in NhapHangHoaService.COT_BAT_BUOC if c not in tieu_de]
+        if thieu:
+            raise ValueError("Thiếu cột: " + ", ".join(thieu))
+
+        def cac_dong():
+            for so_dong, gia_tri in enumerate(dong_iter, start=2):
+                if not any(v not in (None, "") for v in gia_tri):
+                    continue
+                yield so_dong, dict(zip(tieu_de, gia_tri))
+
+        return cac_dong()
+
+    @staticmethod
+    def _doc_csv(f: IO[bytes]) -> Iterator[List]:
+        # utf-8-sig: bỏ BOM do Excel thêm khi lưu CSV UTF-8
+        return csv.reader(io.TextIOWrapper(f, encoding="utf-8-sig", newline=""))
+
+    @staticmethod
+    def _doc_xlsx(f: IO[bytes]) -> Iterator[List]:
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError("Cần cài openpyxl để nhập file .xlsx (pip install openpyxl)")
+
+        # read_only: đọc theo luồng, không dựng toàn bộ sheet trong bộ nhớ
+        workbook = load_workbook(f, read_only=True, data_only=True)
+        return iter(workbook.active.iter_rows(values_only=True))
+
+    # =====================
+    # Kiểm tra dòng
+    # =====================
+    @staticmethod
+    def _tra_tham_chieu(du_lieu, theo_ten: Dict[str, int], gia_tri, ten_cot: str) -> int:
+        """
+        Mã của dòng tham chiếu theo mã hoặc tên (không phân biệt hoa thường).
+        """
+        if isinstance(gia_tri, float) and gia_tri.is_integer():
+            # Ô số của Excel được đọc thành float
+            gia_tri = int(gia_tri)
+        gia_tri = str(gia_tri).strip()
+        if gia_tri.isdigit() and du_lieu.get(int(gia_tri)) is not None:
+            return int(gia_tri)
+        khoa = theo_ten.get(gia_tri.casefold())
+        if khoa is None:
+            raise ValueError(f"{ten_cot} '{gia_tri}' không tồn tại")
+        return khoa
+
+    @staticmethod
+    def _so_thap_phan(gia_tri, ten_cot: str) -> Decimal:
+        """
+        Số tiền không âm vừa cột DECIMAL của HangHoa (max_digits,
+        decimal_places), để lỗi được báo theo dòng thay vì lỗi CSDL.
+        """
+        try:
+            so = Decimal(str(gia_tri).strip())
+        except InvalidOperation:
+            raise ValueError(f"{ten_cot} phải là số")
+        if not so.is_finite() or so < 0:
+            raise ValueError(f"{ten_cot} không hợp lệ")
+
+        truong = HangHoa._meta.get_field(ten_cot)
+        so_nguyen = truong.max_digits - truong.decimal_places
+        if so >= Decimal(10) ** so_nguyen:
+            raise ValueError(f"{ten_cot} có tối đa {so_nguyen} chữ số phần nguyên")
+        if so != so.quantize(Decimal(1).scaleb(-truong.decimal_places)):
+            raise ValueError(f"{ten_cot} có tối đa {truong.decimal_places} chữ số thập phân")
+        return so
+
+    @staticmethod
+    def _so_nguyen(gia_tri, ten_cot: str) -> int:
+        """
+        Số nguyên không âm vừa cột INT; số có phần lẻ (vd. "1.7") bị từ
+        chối, không làm tròn.
+        """
+        try:
+            so = Decimal(str(gia_tri).strip())
+        except InvalidOperation:
+            raise ValueError(f"{ten_cot} phải là số nguyên")
+        if not so.is_finite() or so != so.to_integral_value():
+            raise ValueError(f"{ten_cot} phải là số nguyên")
+        if so < 0:
+            raise ValueError(f"{ten_cot} không được âm")
+        if so > SO_NGUYEN_TOI_DA:
+            raise ValueError(f"{ten_cot} tối đa {SO_NGUYEN_TOI_DA}")
+        return int(so)
+
+    @staticmethod
+    def _kiem_tra_dong(dong: Dict, ten_tham_chieu: Dict) -> Dict:
+        """
+        Kiểm tra và chuyển đổi một dòng; chỉ dùng dữ liệu trong bộ nhớ.
+
+        Raises:
+            ValueError: Dòng không hợp lệ.
+        """
+        ten_hang = str(dong.get("ten_hang") or "").strip()
+        if not ten_hang:
+            raise ValueError("Thiếu ten_hang")
+        if len(ten_hang) > 150:
+            raise ValueError("ten_hang dài quá 150 ký tự")
+
+        for cot in ("don_vi_tinh", "loai_hang", "gia_nhap", "gia_ban"):
+            if dong.get(cot) in (None, ""):
+                raise ValueError(f"Thiếu {cot}")
+
+        thuong_hieu = dong.get("thuong_hieu")
+        so_luong_ton = dong.get("so_luong_ton")
+        if so_luong_ton not in (None, ""):
+            so_luong_ton = NhapHangHoaService._so_nguyen(so_luong_ton, "so_luong_ton")
+        else:
+            so_luong_ton = None
+
+        ma_vach = dong.get("ma_vach")
+        if ma_vach not in (None, ""):
+            # Excel có thể đọc mã vạch thành số
+            ma_vach = chuan_hoa_ma_vach(
+                str(int(ma_vach)) if isinstance(ma_vach, (int, float)) else str(ma_vach)
+            )
+        else:
+            ma_vach = None
+
+        return {
+            "ten_hang": ten_hang,
+            "ma_dvt": NhapHangHoaService._tra_tham_chieu(
+                du_lieu_don_vi_tinh, ten_tham_chieu["don_vi_tinh"],
+                dong["don_vi_tinh"], "don_vi_tinh"
+            ),
+            "ma_loai_hang": NhapHangHoaService._tra_tham_chieu(
+                du_lieu_loai_hang, ten_tham_chieu["loai_hang"],
+                dong["loai_hang"], "loai_hang"
+            ),
+            "ma_thuong_hieu": (
+                NhapHangHoaService._tra_tham_chieu(
+                    du_lieu_thuong_hieu, ten_tham_chieu["thuong_hieu"],
+                    thuong_hieu, "thuong_hieu"
+                ) if thuong_hieu not in (None, "") else None
+            ),
+            "gia_nhap": NhapHangHoaService._so_thap_phan(dong["gia_nhap"], "gia_nhap"),
+            "gia_ban": NhapHangHoaService._so_thap_phan(dong["gia_ban"], "gia_ban"),
+            "so_luong_ton": so_luong_ton,
+            "ma_vach": ma_vach,
+        }
+
+    # =====================
+    # Nhập
+    # =====================
+    @staticmethod
+    def nhap(f: IO[bytes], ten_file: str, chunk_size: int = 2000) -> Dict:
+        """
+        Nhập hàng hóa từ file.
+
+        Args:
+            f: File nhị phân.
+            ten_file (str): Tên file (.csv / .xlsx).
+            chunk_size (int): Số dòng mỗi khối (một transaction).
+
+        Raises:
+            ValueError: File không đọc được (định dạng, thiếu cột).
+
+        Returns:
+            dict: {"so_dong", "so_tao_moi", "so_cap_nhat", "so_loi",
+                   "loi": [{"dong", "loi"}, ...]}
+        """
+        cac_dong = NhapHangHoaService.doc_file(f, ten_file)
+
+        ten_tham_chieu = {
+            "don_vi_tinh": {o.ten_dvt.strip().casefold(): o.pk for o in du_lieu_don_vi_tinh.danh_sach()},
+            "loai_hang": {o.ten_loai.strip().casefold(): o.pk for o in du_lieu_loai_hang.danh_sach()},
+            "thuong_hieu": {o.ten_thuong_hieu.strip().casefold(): o.pk for o in du_lieu_thuong_hieu.danh_sach()},
+        }
+        bao_cao = {"so_dong": 0, "so_tao_moi": 0, "so_cap_nhat": 0, "so_loi": 0, "loi": []}
+
+        while True:
+            khoi = list(islice(cac_dong, chunk_size))
+            if not khoi:
+                break
+            bao_cao["so_dong"] += len(khoi)
+
+            hop_le = []
+            for so_dong, dong in khoi:
+                try:
+                    hop_le.append((so_dong, NhapHangHoaService._kiem_tra_dong(dong, ten_tham_chieu)))
+                except ValueError as e:
+                    NhapHangHoaService._ghi_loi(bao_cao, so_dong, str(e))
+
+            if hop_le:
+                NhapHangHoaService._nhap_khoi_an_toan(hop_le, bao_cao)
+
+        return bao_cao
+
+    @staticmethod
+    def _nhap_khoi_an_toan(hop_le: List[Tuple[int, Dict]], bao_cao: Dict) -> None:
+        """
+        Ghi một khối; CSDL từ chối khối (khối đã được rollback) thì ghi
+        lại từng dòng để chỉ những dòng lỗi vào báo cáo.
+        """
+        try:
+            cac_khoi = [NhapHangHoaService._nhap_khoi(hop_le, bao_cao)]
+        except DatabaseError:
+            logger.warning("Khối nhập hàng hóa bị CSDL từ chối, ghi lại từng dòng", exc_info=True)
+            cac_khoi = []
+            for so_dong, d in hop_le:
+                try:
+                    cac_khoi.append(NhapHangHoaService._nhap_khoi([(so_dong, d)], bao_cao))
+                except DatabaseError as e:
+                    NhapHangHoaService._ghi_loi(
+                        bao_cao, so_dong, f"Không ghi được vào CSDL: {e.__class__.__name__}"
+                    )
+
+        for so_tao_moi, so_cap_nhat in cac_khoi:
+            bao_cao["so_tao_moi"] += so_tao_moi
+            bao_cao["so_cap_nhat"] += so_cap_nhat
+
+    @staticmethod
+    def _ghi_loi(bao_cao: Dict, so_dong: int, loi: str) -> None:
+        bao_cao["so_loi"] += 1
+        if len(bao_cao["loi"]) < NhapHangHoaService.SO_LOI_TOI_DA:
+            bao_cao["loi"].append({"dong": so_dong, "loi": loi})
+
+    @staticmethod
+    @transaction.atomic
+    def _nhap_khoi(hop_le: List[Tuple[int, Dict]], bao_cao: Dict) -> Tuple[int, int]:
+        """
+        Upsert một khối dòng đã hợp lệ: 2 truy vấn tra khóa tự nhiên,
+        rồi INSERT / UPDATE nhiều dòng.
+
+        Returns:
+            tuple: (số hàng hóa tạo mới, số hàng hóa cập nhật)
+        """
+        theo_ma_vach = MaVachRepository.tra_cuu_nhieu(
+            d["ma_vach"] for _, d in hop_le if d["ma_vach"]
+        )
+        theo_ten = HangHoaRepository.tim_theo_ten_thuong_hieu(d["ten_hang"] for _, d in hop_le)
+
+        # Trong cùng khối, dòng sau ghi đè dòng trước của cùng hàng hóa
+        cap_nhat: Dict[int, Dict] = {}
+        tao_moi: Dict[Tuple[str, Optional[int]], Dict] = {}
+        ma_vach_moi: Dict[str, object] = {}
+
+        for so_dong, d in hop_le:
+            khoa_ten = (d["ten_hang"].casefold(), d["ma_thuong_hieu"])
+            ma_hang = theo_ma_vach.get(d["ma_vach"]) if d["ma_vach"] else None
+            if ma_hang is None:
+                ma_hang = theo_ten.get(khoa_ten)
+
+            if ma_hang is not None:
+                cap_nhat[ma_hang] = d
+                if d["ma_vach"] and d["ma_vach"] not in theo_ma_vach:
+                    ma_vach_moi[d["ma_vach"]] = ma_hang
+            else:
+                tao_moi[khoa_ten] = d
+                if d["ma_vach"]:
+                    # Gắn mã hàng sau khi INSERT
+                    ma_vach_moi[d["ma_vach"]] = khoa_ten
+
+        # Tạo mới
+        hang_moi = HangHoaRepository.tao_hang_loat([
+            HangHoa(
+                ten_hang=d["ten_hang"],
+                ma_dvt_id=d["ma_dvt"],
+                ma_loai_hang_id=d["ma_loai_hang"],
+                ma_thuong_hieu_id=d["ma_thuong_hieu"],
+                gia_nhap=d["gia_nhap"],
+                gia_ban=d["gia_ban"],
+                so_luong_ton=d["so_luong_ton"] or 0,
+            )
+            for d in tao_moi.values()
+        ])
+        ma_hang_moi = {khoa: obj.ma_hang for khoa, obj in zip(tao_moi, hang_moi)}
+
+        # Tồn kho hiện tại của hàng hóa có cột tồn kho, khóa tới khi commit
+        # để chênh lệch ghi sổ khớp với giá trị bị ghi đè
+        ton_kho_cu = HangHoaRepository.get_values_theo_ma(
+            [ma_hang for ma_hang, d in cap_nhat.items() if d["so_luong_ton"] is not None],
+            ("so_luong_ton", "so_phan_manh"),
+            khoa=True
+        )
+
+        # Cập nhật: hàng có / không có cột tồn kho ghi hai nhóm trường khác nhau
+        co_ton_kho, khong_ton_kho = [], []
+        chenh_lech: Dict[int, int] = {}
+        for ma_hang, d in cap_nhat.items():
+            obj = HangHoa(
+                ma_hang=ma_hang,
+                ten_hang=d["ten_hang"],
+                ma_dvt_id=d["ma_dvt"],
+                ma_loai_hang_id=d["ma_loai_hang"],
+                ma_thuong_hieu_id=d["ma_thuong_hieu"],
+                gia_nhap=d["gia_nhap"],
+                gia_ban=d["gia_ban"],
+            )
+            cu = ton_kho_cu.get(ma_hang)
+            if d["so_luong_ton"] is None or cu is None or cu["so_phan_manh"]:
+                khong_ton_kho.append(obj)
+            else:
+                obj.so_luong_ton = d["so_luong_ton"]
+                co_ton_kho.append(obj)
+                chenh_lech[ma_hang] = d["so_luong_ton"] - cu["so_luong_ton"]
+
+        if khong_ton_kho:
+            HangHoaRepository.cap_nhat_hang_loat(
+                khong_ton_kho, NhapHangHoaService.TRUONG_CAP_NHAT
+            )
+        if co_ton_kho:
+            HangHoaRepository.cap_nhat_hang_loat(
+                co_ton_kho, NhapHangHoaService.TRUONG_CAP_NHAT + ("so_luong_ton",)
+            )
+            BienDongKhoRepository.ghi(chenh_lech, BienDongKho.LOAI_NHAP)
+
+        MaVachRepository.tao_hang_loat(
+            (ma_vach, ma_hang_moi[dich] if isinstance(dich, tuple) else dich)
+            for ma_vach, dich in ma_vach_moi.items()
+        )
+
+        HangHoaService._thong_bao_thay_doi_hang_loat(
+            list(ma_hang_moi.values()) + list(cap_nhat)
+        )
+        return len(hang_moi), len(cap_nhat)
@@ -0,0 +1,48 @@
+from typing import List, Tuple
+
+from QuanLyHangHoa.models.don_vi_tinh import DonViTinh, DonViTinhRepository, du_lieu_don_vi_tinh
+from QuanLyHangHoa.models.loai_hang import LoaiHang, LoaiHangRepository, du_lieu_loai_hang
+from QuanLyHangHoa.models.thuong_hieu import ThuongHieu, ThuongHieuRepository, du_lieu_thuong_hieu
+
+
+class ThamChieuService:
+    """
+    Lớp Service cho các bảng tham chiếu của hàng hóa
+    (đơn vị tính, loại hàng, thương hiệu).
+
+    Dữ liệu đọc từ bản chụp bất biến trong bộ nhớ
+    (xem QuanLyTapHoa/du_lieu_tham_chieu.py), không truy vấn CSDL.
+    """
+
+    @staticmethod
+    def get_all_don_vi_tinh() -> List[DonViTinh]:
+        """
+        Lấy danh sách đơn vị tính, sắp theo mã.
+        """
+        return DonViTinhRepository.get_all()
+
+    @staticmethod
+    def get_all_loai_hang() -> List[LoaiHang]:
+        """
+        Lấy danh sách loại hàng, sắp theo mã.
+        """
+        return LoaiHangRepository.get_all()
+
+    @staticmethod
+    def get_all_thuong_hieu() -> List[ThuongHieu]:
+        """
+        Lấy danh sách thương hiệu, sắp theo mã.
+        """
+        return ThuongHieuRepository.get_all()
+
+    @staticmethod
+    def phien_ban() -> Tuple[int, int, int]:
+        """
+        Phiên bản bản chụp hiện tại của (đơn vị tính, loại hàng, thương hiệu),
+        dùng để tạo ETag.
+        """
+        return (
+            du_lieu_don_vi_tinh.lay().phien_ban,
+            du_lieu_loai_hang.lay().phien_ban,
+            du_lieu_thuong_hieu.lay().phien_ban,
+        )
@@ -0,0 +1,539 @@
+"""
+Tìm kiếm hàng hóa theo tên: không dấu, không phân biệt hoa thường,
+chịu được lỗi gõ.
+
+- Tên hàng được chuẩn hóa (bỏ dấu tiếng Việt, đ -> d, casefold,
+  chỉ giữ chữ và số), nên "sua tuoi" khớp "Sữa tươi".
+- Chỉ mục đảo trong bộ nhớ: từ -> tập mã hàng, cùng hai chỉ mục trên
+  từ vựng để tìm từ gõ sai: trigram (từ dài) và biến thể xóa một ký tự
+  (sai một ký tự hoặc đảo hai ký tự kề nhau, kể cả từ ngắn như
+  "sau" -> "sua"). Truy vấn không quét toàn bộ danh mục và không truy
+  vấn CSDL.
+- Chỉ mục được nạp lười ở lần tìm đầu tiên, cập nhật ngay khi
+  tạo / sửa / xóa hàng hóa (sau commit, xem HangHoaService) và
+  dựng lại định kỳ ở thread nền theo settings.TIM_KIEM_THOI_GIAN_LAM_MOI
+  để nhận thay đổi từ các worker khác.
+"""
+
+import bisect
+import heapq
+import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import connections
+
+from QuanLyHangHoa.models.hang_hoa import HangHoaRepository
+
+
+_BANG_DOI_D = str.maketrans({"đ": "d", "Đ": "D"})
+_DAU_TIENG_VIET = re.compile(r"[\u0300-\u036f]")
+_KY_TU_KHAC = re.compile(r"[^0-9a-z]+")
+
+
+def chuan_hoa(text: str) -> str:
+    """
+    Chuẩn hóa chuỗi để so khớp: bỏ dấu, đ -> d, casefold,
+    ký tự không phải chữ / số thành một khoảng trắng.
+
+    Ví dụ: "Sữa tươi Vinamilk 180ml" -> "sua tuoi vinamilk 180ml"
+    """
+    text = unicodedata.normalize("NFD", text.translate(_BANG_DOI_D))
+    text = _DAU_TIENG_VIET.sub("", text).casefold()
+    return _KY_TU_KHAC.sub(" ", text).strip()
+
+
+def trigrams(text_chuan_hoa: str) -> Set[str]:
+    """
+    Tập trigram của chuỗi đã chuẩn hóa, có đệm khoảng trắng hai đầu
+    để đầu / cuối từ cũng thành trigram riêng (" su", "oi ").
+    """
+    text = f" {text_chuan_hoa} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def bien_the_xoa(tu: str) -> Set[str]:
+    """
+    Các chuỗi thu được khi xóa đúng một ký tự của từ ("sua" -> "ua",
+    "sa", "su"). Hai từ lệch nhau một ký tự (thêm / bớt / thay) hoặc
+    đảo hai ký tự kề nhau luôn có chung một biến thể (hoặc một từ là
+    biến thể của từ kia).
+    """
+    return {tu[:i] + tu[i + 1:] for i in range(len(tu))}
+
+
+def khoang_cach_sua(a: str, b: str) -> int:
+    """
+    Số thao tác thêm / bớt / thay một ký tự hoặc đảo hai ký tự kề nhau
+    để biến a thành b (Damerau-Levenshtein, mỗi đoạn chỉ sửa một lần).
+    """
+    truoc_truoc = None
+    truoc = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        hien_tai = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            chi_phi = 0 if a[i - 1] == b[j - 1] else 1
+            hien_tai[j] = min(truoc[j] + 1, hien_tai[j - 1] + 1, truoc[j - 1] + chi_phi)
+            if (
+                i > 1 and j > 1 and a[i - 1] == b[j - 2]
+                and a[i - 2] == b[j - 1]
+            ):
+                hien_tai[j] = min(hien_tai[j], truoc_truoc[j - 2] + 1)
+        truoc_truoc, truoc = truoc, hien_tai
+    return truoc[len(b)]
+
+
+class ChiMucTrigram:
+    """
+    Chỉ mục tìm kiếm tên hàng hóa trong bộ nhớ, dùng chung trong một process.
+
+    Hai tầng chỉ mục:
+    - từ -> {ma_hang}: chỉ mục đảo theo từ (đã chuẩn hóa) của tên hàng;
+    - trên tập từ vựng (nhỏ hơn danh mục nhiều lần), để tìm các từ gần
+      đúng với từ người dùng gõ sai: trigram -> {từ} (độ tương đồng
+      Dice, hợp với từ dài) và biến thể xóa một ký tự -> {từ} (sai một
+      ký tự, hợp với từ ngắn: âm tiết tiếng Việt chỉ có vài trigram,
+      một lỗi gõ làm mất gần hết trigram chung).
+
+    Mỗi từ của từ khóa được mở rộng thành các từ trong từ vựng khớp
+    chính xác, khớp tiền tố hoặc gần đúng, kèm độ tương đồng; ứng viên
+    là giao của các danh sách hàng hóa tương ứng (phép toán tập hợp
+    chạy trong C), mọi ứng viên đều được tính điểm trước khi lấy top n.
+
+    Mọi thao tác đọc / ghi đi qua một lock; dựng lại toàn bộ tạo chỉ
+    mục mới bên ngoài lock rồi hoán đổi, các thay đổi trong lúc dựng
+    được áp dụng lại lên chỉ mục mới.
+    """
+
+    # Độ tương đồng của từ khớp tiền tố và hệ số cho từ gần đúng
+    DIEM_TIEN_TO = 0.8
+    HE_SO_GAN_DUNG = 0.9
+    # Ngưỡng Dice trên trigram để coi hai từ là gần đúng
+    NGUONG_GAN_DUNG = 0.45
+    # Từ khóa ngắn hơn thì không sửa lỗi một ký tự ("an" sẽ khớp mọi
+    # từ hai, ba chữ cái)
+    DO_DAI_SUA_LOI_TOI_THIEU = 3
+    # Giới hạn số từ mở rộng cho mỗi từ của từ khóa
+    SO_TU_TIEN_TO_TOI_DA = 50
+    SO_TU_GAN_DUNG_TOI_DA = 20
+    # Số từ tối đa của từ khóa được xét
+    SO_TU_KHOA_TOI_DA = 8
+
+    def __init__(self, nap_du_lieu: Callable[[], Iterable[Tuple[int, str]]]):
+        """
+        Args:
+            nap_du_lieu: Hàm trả về các cặp (ma_hang, ten_hang) để nạp chỉ mục.
+        """
+        self._nap_du_lieu = nap_du_lieu
+        self._lock = threading.Lock()
+        # Chỉ một thread dựng lại chỉ mục tại một thời điểm
+        self._lock_nap = threading.Lock()
+        self._nap_luc: Optional[float] = None
+        # Khi đang dựng lại: các thay đổi (ma_hang, ten_hang | None) cần
+        # áp dụng lên chỉ mục mới
+        self._nhat_ky: Optional[List[Tuple[int, Optional[str]]]] = None
+        self._dat_du_lieu({}, {}, {}, {}, [])
+
+    def _dat_du_lieu(self, tai_lieu, tu_posting, trigram_tu, bien_the_tu, tu_vung_sap_xep):
+        # ma_hang -> (ten_hang, ten đã chuẩn hóa, tuple các từ)
+        self._tai_lieu: Dict[int, Tuple[str, str, Tuple[str, ...]]] = tai_lieu
+        # từ -> {ma_hang}
+        self._tu_posting: Dict[str, Set[int]] = tu_posting
+        # trigram -> {từ}
+        self._trigram_tu: Dict[str, Set[str]] = trigram_tu
+        # biến thể xóa một ký tự -> {từ}
+        self._bien_the_tu: Dict[str, Set[str]] = bien_the_tu
+        # Từ vựng đã sắp xếp, tra tiền tố bằng bisect
+        self._tu_vung_sap_xep: List[str] = tu_vung_sap_xep
+
+    # =====================
+    # Nạp / cập nhật
+    # =====================
+    def lam_moi(self) -> float:
+        """
+        Dựng lại toàn bộ chỉ mục từ nguồn dữ liệu (chờ nếu thread khác
+        đang dựng).
+
+        Returns:
+            float: Thời gian dựng (giây).
+        """
+        with self._lock_nap:
+            return self._dung_lai()
+
+    def _dung_lai(self) -> float:
+        """
+        Dựng chỉ mục mới bên ngoài lock rồi hoán đổi; gọi khi giữ _lock_nap.
+        """
+        bat_dau = time.perf_counter()
+        with self._lock:
+            self._nhat_ky = []
+
+        try:
+            tai_lieu: Dict[int, Tuple[str, str, Tuple[str, ...]]] = {}
+            tu_posting: Dict[str, Set[int]] = {}
+
+            for ma_hang, ten_hang in self._nap_du_lieu():
+                ten_chuan_hoa = chuan_hoa(ten_hang)
+                cac_tu = tuple(ten_chuan_hoa.split())
+                tai_lieu[ma_hang] = (ten_hang, ten_chuan_hoa, cac_tu)
+                for tu in cac_tu:
+                    posting = tu_posting.get(tu)
+                    if posting is None:
+                        tu_posting[tu] = {ma_hang}
+                    else:
+                        posting.add(ma_hang)
+
+            trigram_tu: Dict[str, Set[str]] = {}
+            bien_the_tu: Dict[str, Set[str]] = {}
+            for tu in tu_posting:
+                for g in trigrams(tu):
+                    trigram_tu.setdefault(g, set()).add(tu)
+                for bien_the in self._cac_bien_the(tu):
+                    bien_the_tu.setdefault(bien_the, set()).add(tu)
+        except BaseException:
+            with self._lock:
+                self._nhat_ky = None
+            raise
+
+        with self._lock:
+            self._dat_du_lieu(tai_lieu, tu_posting, trigram_tu, bien_the_tu, sorted(tu_posting))
+            # Thay đổi đã áp dụng lên chỉ mục cũ trong lúc dựng: áp dụng
+            # lại (thay đổi đã có trong dữ liệu vừa đọc thì không đổi gì)
+            nhat_ky, self._nhat_ky = self._nhat_ky, None
+            for ma_hang, ten_hang in nhat_ky:
+                if ten_hang is None:
+                    self._xoa_khong_khoa(ma_hang)
+                else:
+                    self._cap_nhat_khong_khoa(ma_hang, ten_hang)
+            self._nap_luc = time.monotonic()
+
+        return time.perf_counter() - bat_dau
+
+    def _cac_bien_the(self, tu: str) -> Set[str]:
+        """
+        Khóa của từ trong chỉ mục biến thể: chính nó và các biến thể xóa
+        một ký tự (từ quá ngắn thì không có).
+        """
+        if len(tu) < self.DO_DAI_SUA_LOI_TOI_THIEU - 1:
+            return set()
+        return bien_the_xoa(tu) | {tu}
+
+    def _dam_bao_da_nap(self) -> None:
+        """
+        Nạp chỉ mục lần đầu (chặn), hoặc làm mới định kỳ bằng thread nền:
+        request tiếp tục tìm trên chỉ mục cũ trong lúc dựng.
+        """
+        if self._nap_luc is None:
+            with self._lock_nap:
+                if self._nap_luc is None:
+                    self._dung_lai()
+            return
+
+        thoi_gian_lam_moi = getattr(settings, "TIM_KIEM_THOI_GIAN_LAM_MOI", None)
+        if (
+            thoi_gian_lam_moi
+            and time.monotonic() - self._nap_luc > thoi_gian_lam_moi
+            and self._lock_nap.acquire(blocking=False)
+        ):
+            threading.Thread(target=self._lam_moi_nen, daemon=True).start()
+
+    def _lam_moi_nen(self) -> None:
+        try:
+            self._dung_lai()
+        finally:
+            self._lock_nap.release()
+            # Thread nền tự mở kết nối CSDL, phải tự đóng
+            connections.close_all()
+
+    def danh_dau_cu(self) -> None:
+        """
+        Đánh dấu chỉ mục đã cũ sau một thay đổi hàng loạt (nhập file):
+        lần dùng kế tiếp dựng lại theo cơ chế làm mới định kỳ
+        (TIM_KIEM_THOI_GIAN_LAM_MOI), thay vì cập nhật từng hàng hóa.
+        """
+        if self._nap_luc is not None:
+            self._nap_luc = float("-inf")
+
+    def cap_nhat(self, ma_hang: int, ten_hang: str) -> None:
+        """
+        Thêm hoặc cập nhật tên của một hàng hóa trong chỉ mục.
+        Khi chỉ mục chưa được nạp thì chỉ ghi nhận nếu đang dựng lần đầu
+        (lần nạp đầu sẽ có dữ liệu mới).
+        """
+        with self._lock:
+            if self._nhat_ky is not None:
+                self._nhat_ky.append((ma_hang, ten_hang))
+            if self._nap_luc is None:
+                return
+            self._cap_nhat_khong_khoa(ma_hang, ten_hang)
+
+    def _cap_nhat_khong_khoa(self, ma_hang: int, ten_hang: str) -> None:
+        ten_chuan_hoa = chuan_hoa(ten_hang)
+        cac_tu = tuple(ten_chuan_hoa.split())
+        self._xoa_khong_khoa(ma_hang)
+        self._tai_lieu[ma_hang] = (ten_hang, ten_chuan_hoa, cac_tu)
+        for tu in cac_tu:
+            posting = self._tu_posting.get(tu)
+            if posting is None:
+                # Từ mới: thêm vào từ vựng
+                self._tu_posting[tu] = {ma_hang}
+                bisect.insort(self._tu_vung_sap_xep, tu)
+                for g in trigrams(tu):
+                    self._trigram_tu.setdefault(g, set()).add(tu)
+                for bien_the in self._cac_bien_the(tu):
+                    self._bien_the_tu.setdefault(bien_the, set()).add(tu)
+            else:
+                posting.add(ma_hang)
+
+    def xoa(self, ma_hang: int) -> None:
+        """
+        Xóa một hàng hóa khỏi chỉ mục.
+        """
+        with self._lock:
+            if self._nhat_ky is not None:
+                self._nhat_ky.append((ma_hang, None))
+            self._xoa_khong_khoa(ma_hang)
+
+    def _xoa_khong_khoa(self, ma_hang: int) -> None:
+        cu = self._tai_lieu.pop(ma_hang, None)
+        if cu is None:
+            return
+        for tu in cu[2]:
+            posting = self._tu_posting.get(tu)
+            if posting is None:
+                continue
+            posting.discard(ma_hang)
+            if posting:
+                continue
+            # Từ không còn hàng hóa nào: bỏ khỏi từ vựng
+            del self._tu_posting[tu]
+            i = bisect.bisect_left(self._tu_vung_sap_xep, tu)
+            if i < len(self._tu_vung_sap_xep) and self._tu_vung_sap_xep[i] == tu:
+                del self._tu_vung_sap_xep[i]
+            for chi_muc, cac_khoa in (
+                (self._trigram_tu, trigrams(tu)),
+                (self._bien_the_tu, self._cac_bien_the(tu)),
+            ):
+                for khoa in cac_khoa:
+                    cac_tu = chi_muc.get(khoa)
+                    if cac_tu is not None:
+                        cac_tu.discard(tu)
+                        if not cac_tu:
+                            del chi_muc[khoa]
+
+    # =====================
+    # Tìm kiếm
+    # =====================
+    def _mo_rong(self, tu_khoa: str, tien_to: bool) -> Dict[str, float]:
+        """
+        Các từ trong từ vựng khớp với một từ của từ khóa, kèm độ tương đồng:
+        khớp chính xác 1.0, khớp tiền tố DIEM_TIEN_TO (chỉ khi tien_to,
+        dùng cho từ đang gõ dở), gần đúng HE_SO_GAN_DUNG * độ tương đồng:
+        Dice(trigram), hoặc 1 - 1 / độ dài với từ lệch một ký tự.
+        """
+        khop: Dict[str, float] = {}
+
+        if tu_khoa in self._tu_posting:
+            khop[tu_khoa] = 1.0
+
+        if tien_to and len(tu_khoa) >= 2:
+            tu_vung = self._tu_vung_sap_xep
+            i = bisect.bisect_left(tu_vung, tu_khoa)
+            het = min(len(tu_vung), i + self.SO_TU_TIEN_TO_TOI_DA)
+            while i < het and tu_vung[i].startswith(tu_khoa):
+                khop.setdefault(tu_vung[i], self.DIEM_TIEN_TO)
+                i += 1
+
+        q = trigrams(tu_khoa)
+        dem = Counter()
+        for g in q:
+            cac_tu = self._trigram_tu.get(g)
+            if cac_tu:
+                dem.update(cac_tu)
+
+        gan_dung = []
+        for tu, chung in dem.items():
+            # Từ có độ dài L (đệm hai đầu) có L trigram
+            dice = 2 * chung / (len(q) + len(tu))
+            if dice >= self.NGUONG_GAN_DUNG and tu not in khop:
+                gan_dung.append((dice, tu))
+
+        if len(tu_khoa) >= self.DO_DAI_SUA_LOI_TOI_THIEU:
+            # Từ ngắn: Dice trigram quá thấp sau một lỗi gõ ("sau" và "sua"
+            # không chung trigram nào), tra theo biến thể xóa một ký tự
+            lan_can: Set[str] = set()
+            for bien_the in bien_the_xoa(tu_khoa) | {tu_khoa}:
+                lan_can |= self._bien_the_tu.get(bien_the, set())
+            da_co = {tu for _, tu in gan_dung}
+            for tu in lan_can:
+                if tu in khop or tu in da_co or khoang_cach_sua(tu_khoa, tu) != 1:
+                    continue
+                gan_dung.append((1 - 1 / max(len(tu_khoa), len(tu)), tu))
+
+        tot_nhat: Dict[str, float] = {}
+        for diem, tu in gan_dung:
+            tot_nhat[tu] = max(diem, tot_nhat.get(tu, 0.0))
+        for diem, tu in heapq.nlargest(
+            self.SO_TU_GAN_DUNG_TOI_DA, ((diem, tu) for tu, diem in tot_nhat.items())
+        ):
+            khop[tu] = self.HE_SO_GAN_DUNG * diem
+
+        return khop
+
+    def _giao(self, cac_khop: List[Dict[str, float]]) -> Set[int]:
+        """
+        Các hàng hóa có ít nhất một từ khớp với MỌI từ của từ khóa.
+        Bắt đầu từ từ khóa hiếm nhất, mỗi bước chỉ giao tập ứng viên
+        hiện tại với từng danh sách (phép toán tập hợp trong C).
+        """
+        if not cac_khop:
+            return set()
+
+        cac_posting = sorted(
+            ([self._tu_posting[tu] for tu in khop] for khop in cac_khop),
+            key=lambda postings: sum(len(p) for p in postings)
+        )
+        ung_vien = set().union(*cac_posting[0])
+        for postings in cac_posting[1:]:
+            if not ung_vien:
+                break
+            ung_vien = set().union(*(ung_vien.intersection(p) for p in postings))
+        return ung_vien
+
+    def tim(self, tu_khoa: str, n: int = 20) -> List[Dict]:
+        """
+        Tìm n hàng hóa có tên gần với từ khóa nhất.
+
+        Điểm = trung bình độ tương đồng tốt nhất của từng từ khóa với
+        các từ trong tên (0..1), cộng 1.0 nếu tên chứa nguyên cụm từ khóa.
+        Từ cuối cùng được khớp cả theo tiền tố (người dùng đang gõ dở).
+        Chỉ lấy hàng hóa khớp đủ mọi từ; nếu không có hàng hóa nào
+        thì nhận hàng hóa thiếu đúng một từ.
+        Cùng điểm thì tên ngắn hơn, rồi mã hàng nhỏ hơn đứng trước.
+
+        Returns:
+            list[dict]: [{"ma_hang", "ten_hang", "diem"}, ...]
+        """
+        tu_khoa = chuan_hoa(tu_khoa)
+        cac_tu_khoa = tu_khoa.split()[:self.SO_TU_KHOA_TOI_DA]
+        if not cac_tu_khoa:
+            return []
+
+        self._dam_bao_da_nap()
+
+        with self._lock:
+            cac_khop = [
+                self._mo_rong(tu, tien_to=(i == len(cac_tu_khoa) - 1))
+                for i, tu in enumerate(cac_tu_khoa)
+            ]
+            co_khop = [khop for khop in cac_khop if khop]
+
+            ung_vien = (
+                self._giao(co_khop) if len(co_khop) == len(cac_khop) else set()
+            )
+            if not ung_vien and len(co_khop) >= max(2, len(cac_khop) - 1):
+                # Nới lỏng: thiếu đúng một từ khóa
+                for j in range(len(co_khop)):
+                    ung_vien |= self._giao(co_khop[:j] + co_khop[j + 1:])
+
+            ket_qua = []
+            so_tu_khoa = len(cac_khop)
+            for ma_hang in ung_vien:
+                ten_hang, ten_chuan_hoa, cac_tu = self._tai_lieu[ma_hang]
+                diem = sum(
+                    max([khop.get(tu, 0.0) for tu in cac_tu], default=0.0)
+                    for khop in co_khop
+                ) / so_tu_khoa
+                if tu_khoa in ten_chuan_hoa:
+                    diem += 1.0
+                ket_qua.append((diem, -len(ten_chuan_hoa), -ma_hang, ten_hang))
+
+        return [
+            {"ma_hang": -am_ma_hang, "ten_hang": ten_hang, "diem": round(diem, 4)}
+            for diem, _, am_ma_hang, ten_hang in heapq.nlargest(n, ket_qua)
+        ]
+
+    # =====================
+    # Thống kê
+    # =====================
+    def thong_ke(self) -> Dict:
+        """
+        Thống kê kích thước và bộ nhớ ước tính (byte, theo sys.getsizeof;
+        chuỗi / số dùng chung giữa nhiều cấu trúc có thể bị tính lặp).
+        """
+        with self._lock:
+            tai_lieu_byte = sys.getsizeof(self._tai_lieu) + sum(
+                sys.getsizeof(ma_hang) + sys.getsizeof(muc)
+                + sys.getsizeof(muc[0]) + sys.getsizeof(muc[1])
+                + sys.getsizeof(muc[2])
+                for ma_hang, muc in self._tai_lieu.items()
+            )
+            tu_posting_byte = sys.getsizeof(self._tu_posting) + sum(
+                sys.getsizeof(tu) + sys.getsizeof(posting)
+                for tu, posting in self._tu_posting.items()
+            )
+            trigram_byte = (
+                sys.getsizeof(self._trigram_tu)
+                + sys.getsizeof(self._tu_vung_sap_xep)
+                + sum(
+                    sys.getsizeof(g) + sys.getsizeof(cac_tu)
+                    for g, cac_tu in self._trigram_tu.items()
+                )
+            )
+            bien_the_byte = sys.getsizeof(self._bien_the_tu) + sum(
+                sys.getsizeof(bien_the) + sys.getsizeof(cac_tu)
+                for bien_the, cac_tu in self._bien_the_tu.items()
+            )
+            return {
+                "so_hang_hoa": len(self._tai_lieu),
+                "so_tu_vung": len(self._tu_posting),
+                "so_trigram": len(self._trigram_tu),
+                "so_bien_the": len(self._bien_the_tu),
+                "so_posting": sum(len(p) for p in self._tu_posting.values()),
+                "bo_nho_tai_lieu_byte": tai_lieu_byte,
+                "bo_nho_chi_muc_tu_byte": tu_posting_byte,
+                "bo_nho_chi_muc_trigram_byte": trigram_byte,
+                "bo_nho_chi_muc_bien_the_byte": bien_the_byte,
+                "bo_nho_tong_byte": tai_lieu_byte + tu_posting_byte + trigram_byte + bien_the_byte,
+            }
+
+
+# Chỉ mục dùng chung của process
+chi_muc_hang_hoa = ChiMucTrigram(HangHoaRepository.iter_ten_hang)
+
+
+class TimKiemHangHoaService:
+    """
+    Service tìm kiếm hàng hóa theo tên.
+    """
+
+    # Số kết quả tối đa mỗi lần tìm
+    SO_KET_QUA_TOI_DA = 100
+
+    @staticmethod
+    def tim_kiem(tu_khoa: str, n: int = 20) -> List[Dict]:
+        """
+        Tìm hàng hóa theo tên, không dấu, chịu lỗi gõ, xếp hạng theo độ khớp.
+
+        Args:
+            tu_khoa (str): Từ khóa người dùng nhập.
+            n (int): Số kết quả tối đa.
+
+        Raises:
+            ValueError: Từ khóa rỗng hoặc n không hợp lệ.
+
+        Returns:
+            list[dict]: [{"ma_hang", "ten_hang", "diem"}, ...]
+        """
+        if not tu_khoa or not tu_khoa.strip():
+            raise ValueError("Thiếu từ khóa tìm kiếm")
+        if not 1 <= n <= TimKiemHangHoaService.SO_KET_QUA_TOI_DA:
+            raise ValueError(
+                f"n phải trong khoảng 1..{TimKiemHangHoaService.SO_KET_QUA_TOI_DA}"
+            )
+        return chi_muc_hang_hoa.tim(tu_khoa, n)
@@ -0,0 +1,98 @@
+"""
+Phân mảnh tồn kho (escrow) cho hàng hóa bán chạy.
+
+Khi khuyến mãi, mọi quầy cùng trừ tồn kho của vài hàng hóa nên xếp
+hàng chờ khóa một dòng HANG_HOA suốt transaction tạo hóa đơn. Bật
+phân mảnh cho hàng hóa đó chia tồn kho thành N dòng TON_KHO_PHAN_MANH:
+mỗi hóa đơn chỉ khóa một phân mảnh ngẫu nhiên, N quầy gần như không
+chờ nhau. Phân mảnh hết hàng thì gom mọi phân mảnh và chia đều lại
+(TonKhoPhanManhRepository.dieu_chinh).
+
+Với hàng hóa phân mảnh, tồn kho thật là tổng các phân mảnh, được đọc
+khi hiển thị (HangHoaRepository.gan_ton_kho_phan_manh) và mỗi lần bán
+vẫn ghi nhật ký thay đổi HANG_HOA_THAY_DOI (ETag, đồng bộ gia tăng).
+HANG_HOA.SoLuongTon chỉ là bản sao để lọc / sắp xếp danh mục, được cập
+nhật bởi dong_bo_ton_kho() (lệnh dong_bo_ton_kho_phan_manh). Sửa trực
+tiếp so_luong_ton và kiểm kê bị từ chối cho tới khi tắt phân mảnh.
+"""
+
+from django.db import transaction
+
+from QuanLyHangHoa.models.hang_hoa import HangHoaRepository
+from QuanLyHangHoa.models.hang_hoa_thay_doi import HangHoaThayDoiRepository
+from QuanLyHangHoa.models.ton_kho_phan_manh import TonKhoPhanManhRepository, chia_deu
+from QuanLyHangHoa.services.canh_bao_ton_kho_service import CanhBaoTonKhoService
+from QuanLyHangHoa.services.ma_vach_service import bo_nho_dem_ma_vach
+
+
+class TonKhoPhanManhService:
+    """
+    Lớp Service bật / tắt phân mảnh tồn kho và đồng bộ bản sao tồn kho.
+    """
+
+    SO_PHAN_MANH_TOI_DA = 64
+
+    @staticmethod
+    @transaction.atomic
+    def dat(ma_hang: int, so_phan_manh: int) -> bool:
+        """
+        Đặt số phân mảnh tồn kho của hàng hóa: 0 là tắt (gộp tồn kho
+        về HANG_HOA), N > 0 là chia tồn kho hiện tại đều cho N phân mảnh.
+
+        Dòng HANG_HOA bị khóa suốt thao tác; hóa đơn đang trừ tồn kho
+        theo cách cũ phải commit xong trước.
+
+        Args:
+            ma_hang (int): Mã hàng hóa.
+            so_phan_manh (int): Số phân mảnh mới.
+
+        Raises:
+            ValueError: Số phân mảnh không hợp lệ.
+
+        Returns:
+            bool: False nếu hàng hóa không tồn tại.
+        """
+        if not 0 <= so_phan_manh <= TonKhoPhanManhService.SO_PHAN_MANH_TOI_DA:
+            raise ValueError(
+                f"so_phan_manh phải từ 0 đến {TonKhoPhanManhService.SO_PHAN_MANH_TOI_DA}"
+            )
+
+        row = HangHoaRepository.get_values_theo_ma(
+            [ma_hang], ("so_luong_ton", "so_phan_manh"), khoa=True
+        ).get(ma_hang)
+        if row is None:
+            return False
+
+        ton_kho = row["so_luong_ton"]
+        if row["so_phan_manh"]:
+            ton_kho = TonKhoPhanManhRepository.xoa(ma_hang)
+        if so_phan_manh:
+            TonKhoPhanManhRepository.tao(ma_hang, chia_deu(ton_kho, so_phan_manh))
+
+        HangHoaRepository.dat_phan_manh(ma_hang, so_phan_manh, so_luong_ton=ton_kho)
+        # Mục đệm quét mã vạch mang số phân mảnh cũ
+        bo_nho_dem_ma_vach.huy_hang_hoa([ma_hang])
+        return True
+
+    @staticmethod
+    @transaction.atomic
+    def dong_bo_ton_kho() -> int:
+        """
+        Ghi tổng các phân mảnh vào HANG_HOA.SoLuongTon của những hàng
+        hóa phân mảnh đã lệch (một câu UPDATE ... JOIN), kèm nhật ký
+        thay đổi và hủy bộ nhớ đệm.
+
+        Returns:
+            int: Số hàng hóa đã cập nhật.
+        """
+        ton_kho = TonKhoPhanManhRepository.dong_bo_hang_hoa()
+        cac_ma_hang = list(ton_kho)
+        if cac_ma_hang:
+            HangHoaThayDoiRepository.ghi(cac_ma_hang)
+            HangHoaRepository.huy_bo_nho_dem(cac_ma_hang)
+            # Quét mã vạch đọc tồn kho của hàng phân mảnh từ các phân
+            # mảnh, chỉ cần đẩy cảnh báo tồn kho thấp theo bản sao mới
+            transaction.on_commit(
+                lambda: CanhBaoTonKhoService.thong_bao(cac_ma_hang, ton_kho)
+            )
+        return len(cac_ma_hang)
@@ -1,3 +1,965 @@
-from django.test import TestCase
+import json
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from QuanLyHangHoa.models.bien_dong_kho import BienDongKho, BienDongKhoRepository
+from QuanLyHangHoa.models.don_vi_tinh import DonViTinh, DonViTinhRepository, du_lieu_don_vi_tinh
+from QuanLyHangHoa.models.hang_hoa import HangHoa, HangHoaRepository
+from QuanLyHangHoa.models.hang_hoa_thay_doi import HangHoaThayDoi, HangHoaThayDoiRepository
+from QuanLyHangHoa.models.loai_hang import LoaiHangRepository
+from QuanLyHangHoa.models.ma_vach import MaVachRepository
+from QuanLyHangHoa.models.thuong_hieu import ThuongHieuRepository
+from QuanLyHangHoa.models.ton_kho_phan_manh import TonKhoPhanManhRepository
+from QuanLyHangHoa.serializers import HangHoaSerializer
+from QuanLyHangHoa.services.canh_bao_ton_kho_service import CanhBaoTonKhoService, HangDoiGuiNen
+from QuanLyHangHoa.services.goi_y_service import ChiMucGoiY
+from QuanLyHangHoa.services.hang_hoa_service import HangHoaService
+from QuanLyHangHoa.services.lich_su_ton_kho_service import LichSuTonKhoService
+from QuanLyHangHoa.services.ma_vach_service import BoNhoDemQuetMaVach, MaVachService
+from QuanLyHangHoa.services.tim_kiem_service import ChiMucTrigram
+from QuanLyHangHoa.services.ton_kho_phan_manh_service import TonKhoPhanManhService
+from QuanLyTapHoa import phien_ban
+from QuanLyTapHoa.du_lieu_tham_chieu import DuLieuThamChieu
+from QuanLyTapHoa.pagination import KeysetPaginator
+from QuanLyTapHoa.query_guard import LazyLoadError, cam_truy_van
+
+
+def tao_danh_muc(so_hang: int = 3, **kwargs):
+    """
+    Tạo một đơn vị tính, loại hàng, thương hiệu và so_hang hàng hóa
+    (kwargs ghi đè giá trị mặc định của hàng hóa).
+    """
+    dvt = DonViTinhRepository.create("Chai")
+    loai = LoaiHangRepository.create("Nước giải khát", "Đồ uống")
+    thuong_hieu = ThuongHieuRepository.create("Lavie", "Việt Nam")
+
+    gia_tri = dict(
+        ma_dvt=dvt,
+        ma_loai_hang=loai,
+        ma_thuong_hieu=thuong_hieu,
+        gia_nhap=Decimal("4000"),
+        gia_ban=Decimal("5000"),
+        so_luong_ton=100,
+    )
+    gia_tri.update(kwargs)
+    hang_hoas = [
+        HangHoa.objects.create(ten_hang=f"Nước suối {i}", **gia_tri)
+        for i in range(so_hang)
+    ]
+    return dvt, loai, thuong_hieu, hang_hoas
+
+
+# =========================
+# Chặn lazy load khi serialize
+# =========================
+@override_settings(QUERY_GUARD_ENABLED=True)
+class ChanTruyVanTest(TestCase):
+    """
+    Các API đọc hàng hóa không phát sinh truy vấn khi serialize
+    (thiếu select_related thì LazyLoadError làm test thất bại).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        _, _, _, cls.hang_hoas = tao_danh_muc()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_bo_chan_phat_hien_lazy_load(self):
+        hang_hoas = list(HangHoa.objects.all())
+        with self.assertRaises(LazyLoadError):
+            with cam_truy_van("HangHoaSerializer"):
+                HangHoaSerializer(hang_hoas, many=True).data
+
+    def test_danh_sach(self):
+        for nhanh in (False, True):
+            with self.subTest(nhanh=nhanh), override_settings(HANG_HOA_DANH_SACH_NHANH=nhanh):
+                response = self.client.get("/api/hanghoa/")
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()), len(self.hang_hoas))
+                self.assertEqual(response.json()[0]["don_vi_tinh"]["ten_dvt"], "Chai")
+
+    def test_danh_sach_phan_trang(self):
+        response = self.client.get("/api/hanghoa/", {"page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 2)
+
+    def test_chi_tiet(self):
+        ma_hang = self.hang_hoas[0].ma_hang
+        response = self.client.get(f"/api/hanghoa/{ma_hang}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["ma_hang"], ma_hang)
+        self.assertEqual(response.json()["loai_hang"]["ten_loai"], "Nước giải khát")
+        self.assertEqual(response.json()["thuong_hieu"]["ten_thuong_hieu"], "Lavie")
+
+
+# =========================
+# Phân trang keyset danh mục
+# =========================
+class PhanTrangDanhMucTest(TestCase):
+    """
+    Duyệt hết các trang theo cursor không mất / lặp hàng hóa (kể cả cùng
+    giá trị sắp xếp); cursor dùng lại với cách sắp xếp khác hoặc bị sửa
+    là lỗi 400.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        _, _, _, hang_hoas = tao_danh_muc(so_hang=5)
+        for i, obj in enumerate(hang_hoas):
+            # Giá trùng nhau theo cặp: thứ tự phụ thuộc MaHang
+            HangHoa.objects.filter(pk=obj.pk).update(gia_ban=Decimal(5000 + 1000 * (i // 2)))
+        cls.ma_theo_gia = list(
+            HangHoa.objects.order_by("gia_ban", "ma_hang").values_list("ma_hang", flat=True)
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def duyet(self, **params):
+        ma, cursor = [], None
+        while True:
+            tham_so = dict(params, page_size=2)
+            if cursor:
+                tham_so["cursor"] = cursor
+            response = self.client.get("/api/hanghoa/", tham_so)
+            self.assertEqual(response.status_code, 200, response.content)
+            ma += [item["ma_hang"] for item in response.json()["results"]]
+            cursor = response.json()["next_cursor"]
+            if cursor is None:
+                return ma
+
+    def test_duyet_het(self):
+        for nhanh in (False, True):
+            with self.subTest(nhanh=nhanh), override_settings(HANG_HOA_DANH_SACH_NHANH=nhanh):
+                self.assertEqual(self.duyet(sap_xep="gia_ban"), self.ma_theo_gia)
+                self.assertEqual(self.duyet(sap_xep="-gia_ban"), self.ma_theo_gia[::-1])
+
+    def test_cursor_khac_cach_sap_xep(self):
+        response = self.client.get("/api/hanghoa/", {"sap_xep": "ten_hang", "page_size": 2})
+        cursor = response.json()["next_cursor"]
+
+        response = self.client.get("/api/hanghoa/", {"sap_xep": "gia_ban", "cursor": cursor})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_bi_sua(self):
+        paginator = KeysetPaginator(HangHoaService.CAC_CACH_SAP_XEP["gia_ban"])
+        for cursor in (paginator.ma_hoa(["khong-phai-so", 1]), "@@@", paginator.ma_hoa([1])):
+            with self.subTest(cursor=cursor):
+                response = self.client.get("/api/hanghoa/", {"sap_xep": "gia_ban", "cursor": cursor})
+                self.assertEqual(response.status_code, 400)
+
+
+# =========================
+# Sổ biến động kho
+# =========================
+class SoBienDongKhoTest(TestCase):
+    """
+    Các câu UPDATE tồn kho ghi sổ BIEN_DONG_KHO (OUTPUT ... INTO trên
+    SQL Server) và tồn kho tại thời điểm tính lại được từ sổ.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        _, _, _, cls.hang_hoas = tao_danh_muc(so_hang=2)
+
+    def so(self, ma_hang):
+        return list(
+            BienDongKho.objects.filter(ma_hang=ma_hang)
+            .order_by("ma_bien_dong")
+            .values_list("loai", "so_luong", "ma_tham_chieu")
+        )
+
+    def test_adjust_stock_ghi_so(self):
+        ma_hang = self.hang_hoas[0].ma_hang
+        obj = HangHoaRepository.adjust_stock(ma_hang, -5)
+        self.assertEqual(obj.so_luong_ton, 95)
+        self.assertEqual(self.so(ma_hang), [(BienDongKho.LOAI_DIEU_CHINH, -5, None)])
+
+        # Không đủ tồn kho: không sửa, không ghi sổ
+        self.assertIsNone(HangHoaRepository.adjust_stock(ma_hang, -1000))
+        self.assertEqual(len(self.so(ma_hang)), 1)
+
+    def test_dieu_chinh_hang_loat_ghi_so(self):
+        a, b = (obj.ma_hang for obj in self.hang_hoas)
+        da_dieu_chinh = HangHoaRepository.dieu_chinh_ton_kho_hang_loat(
+            {a: -2, b: 3}, loai=BienDongKho.LOAI_BAN, ma_tham_chieu=7
+        )
+        self.assertEqual(da_dieu_chinh, {a: (100, 98, 0), b: (100, 103, 0)})
+        self.assertEqual(self.so(a), [(BienDongKho.LOAI_BAN, -2, 7)])
+        self.assertEqual(self.so(b), [(BienDongKho.LOAI_BAN, 3, 7)])
+
+    def test_loai_khong_hop_le(self):
+        ma_hang = self.hang_hoas[0].ma_hang
+        with self.assertRaises(ValueError):
+            HangHoaRepository.dieu_chinh_ton_kho_hang_loat({ma_hang: 1}, loai="X")
+        with self.assertRaises(ValueError):
+            BienDongKhoRepository.ghi({ma_hang: 1}, "X")
+        self.assertEqual(self.so(ma_hang), [])
+
+    def test_ton_kho_tai(self):
+        ma_hang = self.hang_hoas[0].ma_hang
+        truoc = timezone.now()
+        HangHoaRepository.adjust_stock(ma_hang, -5)
+        HangHoaRepository.adjust_stock(ma_hang, 2)
+
+        self.assertEqual(LichSuTonKhoService.ton_kho_tai(ma_hang, truoc), 100)
+        self.assertEqual(
+            LichSuTonKhoService.ton_kho_tai(ma_hang, timezone.now() + timedelta(seconds=1)), 97
+        )
+
+
+# =========================
+# Bản chụp bảng tham chiếu
+# =========================
+class DuLieuThamChieuTest(TestCase):
+    """
+    Phiên bản bảng tham chiếu nằm trong CSDL: thay đổi ở worker khác
+    (mô phỏng bằng sửa bảng + tăng phiên bản, không nạp lại bản chụp
+    của process này) được nhận ra, kèm các hàm đăng ký khi thay đổi.
+    """
+
+    def sua_o_worker_khac(self, ten_dvt):
+        obj = DonViTinh.objects.create(ten_dvt=ten_dvt)
+        phien_ban.tang("thamchieu:donvitinh")
+        return obj
+
+    def test_khoa_moi_tu_worker_khac(self):
+        du_lieu_don_vi_tinh.lay()
+        obj = self.sua_o_worker_khac("Thùng")
+        self.assertEqual(du_lieu_don_vi_tinh.get(obj.ma_dvt).ten_dvt, "Thùng")
+
+    def test_tao_hang_hoa_voi_tham_chieu_moi(self):
+        dvt, loai, _, _ = tao_danh_muc(so_hang=0)
+        du_lieu_don_vi_tinh.lay()
+        moi = self.sua_o_worker_khac("Lốc")
+
+        response = APIClient().post("/api/hanghoa/create/", {
+            "ten_hang": "Sữa tươi",
+            "ma_dvt": moi.ma_dvt,
+            "ma_loai_hang": loai.ma_loai,
+            "gia_nhap": "6000",
+            "gia_ban": "8000",
+            "so_luong_ton": 10,
+        }, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+
+    @override_settings(THAM_CHIEU_THOI_GIAN_KIEM_TRA=0)
+    def test_nap_lai_goi_ham_dang_ky(self):
+        du_lieu = DuLieuThamChieu("donvitinh", lambda: list(DonViTinh.objects.order_by("ma_dvt")))
+        goi = []
+        du_lieu.dang_ky_khi_thay_doi(lambda: goi.append(1))
+
+        du_lieu.lay()
+        du_lieu.lay()
+        self.assertEqual(goi, [])
+
+        obj = self.sua_o_worker_khac("Gói")
+        self.assertEqual(du_lieu.lay().theo_khoa[obj.ma_dvt].ten_dvt, "Gói")
+        self.assertEqual(goi, [1])
+
+
+# =========================
+# Phân mảnh tồn kho
+# =========================
+class PhanManhTonKhoTest(TestCase):
+    """
+    Hàng hóa phân mảnh hiển thị tồn kho thật (tổng các phân mảnh) ở
+    mọi nơi đọc, dù bản sao HANG_HOA.SoLuongTon chưa được đồng bộ; bán
+    đúng lúc phân mảnh bị tắt không báo thiếu tồn kho giả.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        _, _, _, hang_hoas = tao_danh_muc(so_hang=2, muc_dat_lai=97)
+        cls.a, cls.b = (obj.ma_hang for obj in hang_hoas)
+        TonKhoPhanManhService.dat(cls.a, 4)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def ban(self, so_luong_map):
+        HangHoaService.tru_ton_kho_hang_loat(so_luong_map, ma_hd=1)
+
+    def test_doc_ton_kho_that(self):
+        HangHoaService.get_by_id(self.a)   # nạp bộ nhớ đệm trước khi bán
+        self.ban({self.a: 5, self.b: 3})
+
+        # Bản sao chưa đồng bộ
+        self.assertEqual(HangHoa.objects.get(pk=self.a).so_luong_ton, 100)
+        self.assertEqual(TonKhoPhanManhRepository.tong([self.a]), {self.a: 95})
+
+        self.assertEqual(self.client.get(f"/api/hanghoa/{self.a}/").json()["so_luong_ton"], 95)
+        for nhanh in (False, True):
+            with self.subTest(nhanh=nhanh), override_settings(HANG_HOA_DANH_SACH_NHANH=nhanh):
+                ton_kho = {
+                    row["ma_hang"]: row["so_luong_ton"]
+                    for row in self.client.get("/api/hanghoa/").json()
+                }
+                self.assertEqual(ton_kho, {self.a: 95, self.b: 97})
+
+    def test_quet_ma_vach(self):
+        MaVachService.create(self.a, "4006381333931")
+        self.assertEqual(MaVachService.quet("4006381333931")["so_luong_ton"], 100)
+        self.ban({self.a: 5})
+        self.assertEqual(MaVachService.quet("4006381333931")["so_luong_ton"], 95)
+
+    def test_can_dat_lai(self):
+        self.ban({self.a: 5})
+        self.assertEqual(
+            [(row["ma_hang"], row["so_luong_ton"]) for row in CanhBaoTonKhoService.danh_sach()],
+            [(self.a, 95)]
+        )
+
+    def tat_phan_manh_truoc(self):
+        """
+        Tắt phân mảnh của hàng a ngay trước lần điều chỉnh phân mảnh đầu
+        tiên, như một request dat(a, 0) chen vào giữa hai câu UPDATE.
+        """
+        goc = TonKhoPhanManhRepository.dieu_chinh
+
+        def dieu_chinh(*args, **kwargs):
+            TonKhoPhanManhService.dat(self.a, 0)
+            return goc(*args, **kwargs)
+
+        return mock.patch.object(TonKhoPhanManhRepository, "dieu_chinh", side_effect=dieu_chinh)
+
+    def test_ban_khi_phan_manh_vua_tat(self):
+        with self.tat_phan_manh_truoc():
+            self.ban({self.a: 5, self.b: 3})
+        self.assertEqual(
+            dict(HangHoa.objects.filter(pk__in=[self.a, self.b]).values_list("pk", "so_luong_ton")),
+            {self.a: 95, self.b: 97}
+        )
+        self.assertEqual(TonKhoPhanManhRepository.tong([self.a]), {})
+
+    def test_dieu_chinh_khi_phan_manh_vua_tat(self):
+        with self.tat_phan_manh_truoc():
+            obj = HangHoaService.adjust_stock(self.a, -5)
+        self.assertEqual(obj.so_luong_ton, 95)
+
+    def test_thieu_ton_kho(self):
+        with self.assertRaises(ValueError):
+            self.ban({self.a: 101})
+        with self.assertRaises(ValueError):
+            HangHoaService.adjust_stock(self.b, -101)
+
+
+class PhanManhDongBoTest(TransactionTestCase):
+    """
+    Bán trên phân mảnh ghi nhật ký thay đổi: đồng bộ gia tăng nhận tồn
+    kho thật. TransactionTestCase: nhật ký chỉ đọc thay đổi đã commit.
+    """
+
+    def test_changes_tra_ton_kho_that(self):
+        _, _, _, hang_hoas = tao_danh_muc(so_hang=1)
+        ma_hang = hang_hoas[0].ma_hang
+        TonKhoPhanManhService.dat(ma_hang, 4)
+        client = APIClient()
+        token = client.get("/api/hanghoa/changes/").json()["token"]
+
+        with transaction.atomic():
+            HangHoaService.tru_ton_kho_hang_loat({ma_hang: 5})
+
+        goi = client.get("/api/hanghoa/changes/", {"since": token}).json()
+        cot = goi["cot"].index("so_luong_ton")
+        self.assertEqual([row[cot] for row in goi["upserts"]], [95])
+
+
+class BoNhoDemDaWorkerTest(TransactionTestCase):
+    """
+    Worker khác sửa hàng hóa (commit HANG_HOA + nhật ký, không hủy bộ nhớ
+    đệm của process này): lần đọc sau không trả giá trị đã đệm.
+    """
+
+    MA_VACH = "4006381333931"
+
+    def sua_o_worker_khac(self, ma_hang, **gia_tri):
+        with transaction.atomic():
+            HangHoa.objects.filter(ma_hang=ma_hang).update(**gia_tri)
+            HangHoaThayDoiRepository.ghi([ma_hang])
+
+    def test_get_by_id_nhan_thay_doi(self):
+        _, _, _, hang_hoas = tao_danh_muc(so_hang=1)
+        ma_hang = hang_hoas[0].ma_hang
+        self.assertEqual(HangHoaRepository.get_by_id(ma_hang).gia_ban, Decimal("5000"))
+
+        self.sua_o_worker_khac(ma_hang, gia_ban=Decimal("6000"))
+        self.assertEqual(HangHoaRepository.get_by_id(ma_hang).gia_ban, Decimal("6000"))
+
+    def test_quet_nhan_thay_doi(self):
+        _, _, _, hang_hoas = tao_danh_muc(so_hang=1)
+        ma_hang = hang_hoas[0].ma_hang
+        MaVachRepository.create(self.MA_VACH, ma_hang)
+        try:
+            self.assertEqual(MaVachService.quet(self.MA_VACH)["so_luong_ton"], 100)
+            self.sua_o_worker_khac(ma_hang, so_luong_ton=90)
+            self.assertEqual(MaVachService.quet(self.MA_VACH)["so_luong_ton"], 90)
+        finally:
+            # MA_VACH không được flush (bảng do script tạo)
+            MaVachRepository.delete(self.MA_VACH)
+
+
+class DieuChinhTonKhoDongThoiTest(TransactionTestCase):
+    """
+    Nhiều luồng (mỗi luồng một kết nối) cùng cộng tồn kho một hàng hóa:
+    UPDATE có điều kiện không mất cập nhật, ghi đủ sổ biến động và nhật
+    ký thay đổi, và không chậm hơn cách đọc - sửa - ghi trước đây.
+    """
+
+    SO_LUONG = 4
+    SO_LAN = 50
+
+    def chay(self, ham, ma_hang):
+        """
+        Chạy ham(ma_hang) SO_LAN lần trên mỗi luồng, trả về thời gian.
+        """
+        bat_dau_cung_luc = threading.Barrier(self.SO_LUONG + 1)
+        loi = []
+
+        def chay_luong():
+            try:
+                bat_dau_cung_luc.wait()
+                for _ in range(self.SO_LAN):
+                    ham(ma_hang)
+            except Exception as e:
+                loi.append(e)
+            finally:
+                # Mỗi luồng có kết nối CSDL riêng
+                connection.close()
+
+        cac_luong = [threading.Thread(target=chay_luong) for _ in range(self.SO_LUONG)]
+        for luong in cac_luong:
+            luong.start()
+        bat_dau_cung_luc.wait()
+        bat_dau = time.perf_counter()
+        for luong in cac_luong:
+            luong.join()
+        thoi_gian = time.perf_counter() - bat_dau
+
+        self.assertEqual(loi, [])
+        return thoi_gian
+
+    @staticmethod
+    def doc_sua_ghi(ma_hang):
+        # Đường đi trước đây của HangHoaService.adjust_stock
+        obj = HangHoa.objects.get(pk=ma_hang)
+        if obj.so_luong_ton + 1 < 0:
+            raise ValueError("Không đủ tồn kho")
+        with transaction.atomic():
+            obj = HangHoa.objects.get(pk=ma_hang)
+            obj.so_luong_ton += 1
+            obj.save()
+
+    def test_khong_mat_cap_nhat(self):
+        _, _, _, (cu, moi) = tao_danh_muc(so_hang=2)
+        tong = self.SO_LUONG * self.SO_LAN
+        bien_dong_truoc = BienDongKho.objects.aggregate(m=Max("ma_bien_dong"))["m"] or 0
+        thay_doi_truoc = HangHoaThayDoi.objects.aggregate(m=Max("ma_thay_doi"))["m"] or 0
+
+        t_cu = self.chay(self.doc_sua_ghi, cu.ma_hang)
+        t_moi = self.chay(lambda ma_hang: HangHoaService.adjust_stock(ma_hang, 1), moi.ma_hang)
+
+        self.assertEqual(
+            HangHoaRepository.get_by_id(moi.ma_hang, dung_bo_nho_dem=False).so_luong_ton,
+            100 + tong
+        )
+        bien_dongs = BienDongKho.objects.filter(ma_hang=moi.ma_hang, ma_bien_dong__gt=bien_dong_truoc)
+        self.assertEqual(bien_dongs.count(), tong)
+        self.assertEqual(sum(bien_dongs.values_list("so_luong", flat=True)), tong)
+        self.assertEqual(
+            HangHoaThayDoi.objects.filter(ma_hang=moi.ma_hang, ma_thay_doi__gt=thay_doi_truoc).count(),
+            tong
+        )
+        # Một câu UPDATE (kèm sổ, nhật ký) so với hai lần đọc và save()
+        # cả dòng trong transaction
+        self.assertLessEqual(t_moi, t_cu)
+
+    def test_sua_ton_kho_dong_thoi_voi_ban(self):
+        """
+        Sửa so_luong_ton (ghi tuyệt đối) cùng lúc với một lần bán: lần bán
+        không bị ghi đè và sổ biến động cộng lại đúng tồn kho hiện tại.
+        """
+        _, _, _, (hang_hoa,) = tao_danh_muc(so_hang=1)
+        ma_hang = hang_hoa.ma_hang
+        bien_dong_truoc = BienDongKho.objects.aggregate(m=Max("ma_bien_dong"))["m"] or 0
+        da_doc = threading.Event()
+        loi = []
+
+        def ban():
+            try:
+                da_doc.wait()
+                with transaction.atomic():
+                    HangHoaService.tru_ton_kho_hang_loat({ma_hang: 2})
+            except Exception as e:
+                loi.append(e)
+            finally:
+                connection.close()
+
+        get_by_id = HangHoaRepository.get_by_id
+
+        def doc_roi_cho(*args, **kwargs):
+            # Lần bán chạy (và commit nếu không bị khóa chặn) giữa lúc
+            # update đọc tồn kho cũ và lúc ghi
+            obj = get_by_id(*args, **kwargs)
+            da_doc.set()
+            time.sleep(0.5)
+            return obj
+
+        luong_ban = threading.Thread(target=ban)
+        luong_ban.start()
+        with mock.patch.object(HangHoaRepository, "get_by_id", side_effect=doc_roi_cho):
+            HangHoaRepository.update(ma_hang, so_luong_ton=50)
+        luong_ban.join()
+
+        self.assertEqual(loi, [])
+        ton_kho = HangHoa.objects.get(pk=ma_hang).so_luong_ton
+        self.assertEqual(ton_kho, 48)
+        bien_dongs = BienDongKho.objects.filter(ma_hang=ma_hang, ma_bien_dong__gt=bien_dong_truoc)
+        self.assertEqual(100 + sum(bien_dongs.values_list("so_luong", flat=True)), ton_kho)
+
+
+@override_settings(CANH_BAO_TON_KHO_WEBHOOKS=["http://back-office.local/canh-bao"])
+class CanhBaoTonKhoTest(TestCase):
+    """
+    Cảnh báo tồn kho thấp dựa trên tồn kho trước / sau của chính câu
+    UPDATE, gửi qua một hàng đợi giới hạn.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        _, _, _, hang_hoas = tao_danh_muc(so_hang=2, muc_dat_lai=97)
+        cls.a, cls.b = (obj.ma_hang for obj in hang_hoas)
+
+    def noi_dung_gui(self, thao_tac):
+        """
+        Chạy thao_tac, commit, rồi chạy đồng bộ công việc gửi; trả về các
+        nội dung POST.
+        """
+        cong_viec = []
+        with mock.patch(
+            "QuanLyHangHoa.services.canh_bao_ton_kho_service.hang_doi_canh_bao.them",
+            side_effect=lambda ham: cong_viec.append(ham) or True
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                thao_tac()
+
+        with mock.patch("urllib.request.urlopen") as urlopen:
+            # Thay đổi sau commit không ảnh hưởng nội dung đã chụp
+            HangHoaService.adjust_stock(self.a, 50)
+            for ham in cong_viec:
+                ham()
+        return [json.loads(goi.args[0].data) for goi in urlopen.call_args_list]
+
+    def test_vao_ra_theo_ton_truoc_sau(self):
+        gui = self.noi_dung_gui(
+            lambda: HangHoaService.tru_ton_kho_hang_loat({self.a: 5, self.b: 1})
+        )
+        self.assertEqual(gui, [{
+            "vao": [{"ma_hang": self.a, "ten_hang": "Nước suối 0", "so_luong_ton": 95, "muc_dat_lai": 97}],
+            "ra": [],
+        }])
+
+        gui = self.noi_dung_gui(lambda: HangHoaService.adjust_stock(self.b, -10))
+        self.assertEqual(gui[0]["vao"][0]["so_luong_ton"], 89)
+
+    def test_hang_doi_gioi_han(self):
+        dang_chay, cho = threading.Event(), threading.Event()
+
+        def chan():
+            dang_chay.set()
+            cho.wait()
+
+        with override_settings(CANH_BAO_TON_KHO_HANG_DOI=1), \
+                mock.patch("QuanLyHangHoa.services.canh_bao_ton_kho_service.connections"):
+            hang_doi = HangDoiGuiNen()
+            self.assertTrue(hang_doi.them(chan))
+            dang_chay.wait(5)
+            self.assertTrue(hang_doi.them(lambda: None))
+            # Một thread gửi đang bận, hàng đợi đầy: bỏ, không tạo thread mới
+            self.assertFalse(hang_doi.them(lambda: None))
+            cho.set()
+            hang_doi._hang_doi.join()
+
+
+# =========================
+# Quét mã vạch
+# =========================
+class QuetMaVachTest(TestCase):
+    """
+    Thay đổi tồn kho hủy mục đệm quét mã vạch thay vì cộng chênh lệch:
+    mục nạp lại từ CSDL trước khi on_commit chạy không bị cộng hai lần.
+    """
+
+    MA_VACH = "4006381333931"
+
+    @classmethod
+    def setUpTestData(cls):
+        _, _, _, hang_hoas = tao_danh_muc(so_hang=1)
+        cls.ma_hang = hang_hoas[0].ma_hang
+        MaVachRepository.create(cls.MA_VACH, cls.ma_hang)
+
+    def ton_kho(self):
+        return MaVachService.quet(self.MA_VACH)["so_luong_ton"]
+
+    def test_khong_cong_hai_lan(self):
+        self.assertEqual(self.ton_kho(), 100)
+        with self.captureOnCommitCallbacks(execute=True):
+            HangHoaService.adjust_stock(self.ma_hang, -5)
+            # Quét chen giữa: nạp lại từ CSDL trước on_commit
+            self.assertEqual(self.ton_kho(), 95)
+        self.assertEqual(self.ton_kho(), 95)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            HangHoaService.tru_ton_kho_hang_loat({self.ma_hang: 3})
+        self.assertEqual(self.ton_kho(), 92)
+
+    def test_khong_luu_gia_tri_doc_truoc_khi_huy(self):
+        bo_nho_dem = BoNhoDemQuetMaVach()
+        moc = bo_nho_dem.moc()
+        bo_nho_dem.xoa_hang_hoa(1)
+        bo_nho_dem.dat("00000000000001", {"ma_hang": 1, "so_luong_ton": 100}, moc)
+        self.assertIsNone(bo_nho_dem.lay("00000000000001"))
+
+        bo_nho_dem.dat("00000000000001", {"ma_hang": 1, "so_luong_ton": 95}, bo_nho_dem.moc())
+        self.assertEqual(bo_nho_dem.lay("00000000000001")["so_luong_ton"], 95)
+
+
+# =========================
+# Nhập hàng hóa từ file
+# =========================
+class NhapHangHoaTest(TestCase):
+    """
+    Dòng sai (số vượt cột DECIMAL(18,2), tồn kho có phần lẻ) và dòng bị
+    CSDL từ chối chỉ vào báo cáo lỗi, các dòng khác vẫn được nhập.
+    """
+
+    TIEU_DE = "ten_hang,don_vi_tinh,loai_hang,thuong_hieu,gia_nhap,gia_ban,so_luong_ton,ma_vach\n"
+
+    @classmethod
+    def setUpTestData(cls):
+        _, _, _, hang_hoas = tao_danh_muc(so_hang=1)
+        cls.ma_hang = hang_hoas[0].ma_hang
+        MaVachRepository.create("4006381333931", cls.ma_hang)
+
+    def nhap(self, *dong):
+        tep = SimpleUploadedFile("hang.csv", (self.TIEU_DE + "\n".join(dong)).encode("utf-8"))
+        response = APIClient().post("/api/hanghoa/import/", {"file": tep}, format="multipart")
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_loi_theo_dong(self):
+        bao_cao = self.nhap(
+            "Sữa tươi,Chai,Nước giải khát,,6000,8000,10,",
+            "Bia,Chai,Nước giải khát,,6000,1e20,10,",
+            "Nước cam,Chai,Nước giải khát,,6000,8000.123,10,",
+            "Trà xanh,Chai,Nước giải khát,,6000,8000,1.7,",
+        )
+        self.assertEqual(bao_cao["so_tao_moi"], 1)
+        self.assertEqual([loi["dong"] for loi in bao_cao["loi"]], [3, 4, 5])
+        self.assertFalse(HangHoa.objects.filter(ten_hang="Trà xanh").exists())
+
+    def test_cap_nhat_theo_ma_vach(self):
+        bao_cao = self.nhap("Nước suối mới,Chai,Nước giải khát,Lavie,4000,5500,,4006381333931")
+        self.assertEqual((bao_cao["so_cap_nhat"], bao_cao["so_loi"]), (1, 0))
+        obj = HangHoa.objects.get(pk=self.ma_hang)
+        self.assertEqual((obj.ten_hang, obj.gia_ban, obj.so_luong_ton), ("Nước suối mới", Decimal("5500"), 100))
+
+    def test_loi_csdl_chi_bo_dong_loi(self):
+        # Mã vạch được gán ở request khác sau khi khối tra cứu: INSERT MA_VACH trùng khóa
+        with mock.patch.object(MaVachRepository, "tra_cuu_nhieu", return_value={}):
+            bao_cao = self.nhap(
+                "Sữa tươi,Chai,Nước giải khát,,6000,8000,10,4006381333931",
+                "Trà xanh,Chai,Nước giải khát,,6000,8000,10,",
+            )
+        self.assertEqual(bao_cao["so_tao_moi"], 1)
+        self.assertEqual([loi["dong"] for loi in bao_cao["loi"]], [2])
+        self.assertFalse(HangHoa.objects.filter(ten_hang="Sữa tươi").exists())
+        self.assertTrue(HangHoa.objects.filter(ten_hang="Trà xanh").exists())
+
+
+# =========================
+# Kiểm kê tồn kho
+# =========================
+class KiemKeTest(TestCase):
+    """
+    Body sai (số lẻ, không phải object, thiếu / thừa số lượng) trả 400
+    và không điều chỉnh hàng hóa nào.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        _, _, _, hang_hoas = tao_danh_muc(so_hang=2)
+        cls.ma_hangs = [hang_hoa.ma_hang for hang_hoa in hang_hoas]
+
+    def kiem_ke(self, body):
+        return APIClient().post("/api/hanghoa/stocktake/", body, format="json")
+
+    def test_kiem_ke(self):
+        ma_1, ma_2 = self.ma_hangs
+        response = self.kiem_ke({"items": [
+            {"ma_hang": ma_1, "so_luong_dem": 90},
+            {"ma_hang": ma_2, "so_luong": 5},
+        ]})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()["tong_chenh_lech"], -5)
+        self.assertEqual(
+            dict(HangHoa.objects.filter(pk__in=self.ma_hangs).values_list("ma_hang", "so_luong_ton")),
+            {ma_1: 90, ma_2: 105},
+        )
+
+    def test_du_lieu_sai(self):
+        ma_hang = self.ma_hangs[0]
+        for body in (
+            [{"ma_hang": ma_hang, "so_luong_dem": 90}],
+            {"items": []},
+            {"items": [{"ma_hang": ma_hang, "so_luong_dem": 1.5}]},
+            {"items": [{"ma_hang": ma_hang, "so_luong": "-2.5"}]},
+            {"items": [{"ma_hang": ma_hang, "so_luong_dem": -1}]},
+            {"items": [{"ma_hang": ma_hang}]},
+            {"items": [{"ma_hang": ma_hang, "so_luong_dem": 90, "so_luong": 1}]},
+            {"items": ["abc"]},
+        ):
+            with self.subTest(body=body):
+                self.assertEqual(self.kiem_ke(body).status_code, 400)
+        self.assertFalse(
+            HangHoa.objects.filter(pk__in=self.ma_hangs).exclude(so_luong_ton=100).exists()
+        )
+
+
+# =========================
+# ETag danh mục
+# =========================
+class ETagDanhMucTest(TransactionTestCase):
+    """
+    Phiên bản danh mục đọc từ nhật ký thay đổi trong CSDL (chỉ thay đổi
+    đã commit), nên mọi worker trả cùng ETag và đổi ngay sau thay đổi.
+    TransactionTestCase: thay đổi phải commit thật mới được tính.
+    """
+
+    def setUp(self):
+        _, _, _, self.hang_hoas = tao_danh_muc(so_hang=2)
+        self.client = APIClient()
+
+    def test_304_roi_doi_sau_thay_doi(self):
+        ma_hang = self.hang_hoas[0].ma_hang
+        for url in ("/api/hanghoa/", f"/api/hanghoa/{ma_hang}/"):
+            with self.subTest(url=url):
+                etag = self.client.get(url)["ETag"]
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+                HangHoaRepository.adjust_stock(ma_hang, -1)
+
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response["ETag"], etag)
+
+
+# =========================
+# Đồng bộ gia tăng
+# =========================
+class DongBoHangHoaTest(TransactionTestCase):
+    """
+    changes?since= trả hàng hóa đã sửa (giá trị hiện tại) và đã xóa sau
+    token; since / limit sai (kể cả ngoài khoảng BIGINT) trả 400.
+    TransactionTestCase: token chỉ tính thay đổi đã commit.
+    """
+
+    URL = "/api/hanghoa/changes/"
+
+    def setUp(self):
+        _, _, _, self.hang_hoas = tao_danh_muc(so_hang=2)
+        self.client = APIClient()
+
+    def dong_bo(self, **params):
+        response = self.client.get(self.URL, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_upsert_va_tombstone(self):
+        sua, xoa = (hang_hoa.ma_hang for hang_hoa in self.hang_hoas)
+        token = self.dong_bo()["token"]
+
+        HangHoaRepository.adjust_stock(sua, -1)
+        HangHoaRepository.adjust_stock(sua, -1)
+        HangHoaRepository.delete(xoa)
+
+        goi = self.dong_bo(since=token)
+        cot = goi["cot"]
+        self.assertEqual(
+            [dict(zip(cot, dong)) for dong in goi["upserts"]],
+            [{
+                "ma_hang": sua, "ten_hang": "Nước suối 0", "gia_ban": "5000.00",
+                "so_luong_ton": 98, "ma_dvt": self.hang_hoas[0].ma_dvt_id,
+                "ma_loai_hang": self.hang_hoas[0].ma_loai_hang_id,
+                "ma_thuong_hieu": self.hang_hoas[0].ma_thuong_hieu_id,
+            }],
+        )
+        self.assertEqual(goi["tombstones"], [xoa])
+        self.assertFalse(goi["con_nua"])
+
+        goi = self.dong_bo(since=goi["token"])
+        self.assertEqual((goi["upserts"], goi["tombstones"]), ([], []))
+
+    def test_con_nua(self):
+        token = self.dong_bo()["token"]
+        for hang_hoa in self.hang_hoas:
+            HangHoaRepository.adjust_stock(hang_hoa.ma_hang, -1)
+
+        goi = self.dong_bo(since=token, limit=1)
+        self.assertTrue(goi["con_nua"])
+        goi = self.dong_bo(since=goi["token"], limit=1)
+        self.assertEqual(len(goi["upserts"]), 1)
+
+    def test_tham_so_sai(self):
+        for params in (
+            {"since": "-1"},
+            {"since": "abc"},
+            {"since": str(2 ** 63)},
+            {"since": "9" * 30},
+            {"limit": "0"},
+            {"limit": "10001"},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.URL, params).status_code, 400)
+
+
+# =========================
+# Gợi ý khi gõ
+# =========================
+@override_settings(GOI_Y_THOI_GIAN_LAM_MOI=None)
+class ChiMucGoiYTest(SimpleTestCase):
+    """
+    Chỉ mục gợi ý trong bộ nhớ: top của tiền tố nặng luôn đúng sau khi
+    thêm / xóa, không tính lại dưới khóa, không mất thay đổi khi dựng lại.
+    """
+
+    def tao_chi_muc(self, ten_hang, do_pho_bien=None):
+        self.ten_hang = dict(ten_hang)
+        chi_muc = ChiMucGoiY(
+            lambda: list(self.ten_hang.items()),
+            lambda: do_pho_bien or {}
+        )
+        chi_muc.lam_moi()
+        return chi_muc
+
+    def cho_tinh_lai(self, chi_muc):
+        with chi_muc._lock_tinh_lai:
+            pass
+
+    def ma(self, goi_y):
+        return [item["ma_hang"] for item in goi_y]
+
+    def test_xoa_khoi_top_nang(self):
+        # 400 hàng "sua i", phổ biến tăng dần theo mã
+        chi_muc = self.tao_chi_muc(
+            {i: f"sua {i}" for i in range(1, 401)}, {i: i for i in range(1, 401)}
+        )
+        self.assertIn("s", chi_muc._top)
+        self.assertEqual(self.ma(chi_muc.goi_y("s", 3)), [400, 399, 398])
+
+        chi_muc.xoa(400)
+        self.assertEqual(self.ma(chi_muc.goi_y("s", 3)), [399, 398, 397])
+        self.assertEqual(chi_muc._can_tinh_lai, set())
+
+        # Hết dự phòng: tính lại ở thread nền, kết quả vẫn đúng
+        for ma_hang in range(399, 370, -1):
+            chi_muc.xoa(ma_hang)
+        self.cho_tinh_lai(chi_muc)
+        self.assertEqual(self.ma(chi_muc.goi_y("s", 3)), [370, 369, 368])
+        self.assertEqual(len(chi_muc._top["s"]), ChiMucGoiY.SO_GOI_Y_LUU + ChiMucGoiY.DU_PHONG)
+
+    def test_tien_to_thanh_nang_sau_khi_dung(self):
+        chi_muc = self.tao_chi_muc({i: f"banh {i}" for i in range(1, 201)})
+        self.assertNotIn("b", chi_muc._top)
+
+        for ma_hang in range(201, 301):
+            chi_muc.cap_nhat(ma_hang, f"banh {ma_hang}")
+        self.assertIn("b", chi_muc._top)
+        self.assertEqual(self.ma(chi_muc.goi_y("b", 2)), [1, 2])
+
+    def test_lam_moi_giu_thay_doi_dong_thoi(self):
+        chi_muc = self.tao_chi_muc({1: "sua tuoi"})
+        nap_cu = chi_muc._nap_ten_hang
+
+        def nap_cham():
+            # Hàng hóa được tạo (và commit) trong lúc đang đọc danh mục
+            chi_muc.cap_nhat(2, "sua chua")
+            return nap_cu()
+
+        chi_muc._nap_ten_hang = nap_cham
+        chi_muc.lam_moi()
+        self.assertEqual(sorted(self.ma(chi_muc.goi_y("sua"))), [1, 2])
+
+
+class ChiMucTrigramTest(SimpleTestCase):
+    """
+    Chỉ mục tìm kiếm: chịu lỗi gõ ở từ ngắn, xếp hạng mọi ứng viên,
+    không mất thay đổi khi dựng lại.
+    """
+
+    def tao_chi_muc(self, ten_hang):
+        self.ten_hang = dict(ten_hang)
+        chi_muc = ChiMucTrigram(lambda: list(self.ten_hang.items()))
+        chi_muc.lam_moi()
+        return chi_muc
+
+    def ma(self, ket_qua):
+        return [item["ma_hang"] for item in ket_qua]
+
+    def test_loi_go_tu_ngan(self):
+        chi_muc = self.tao_chi_muc({
+            1: "Sữa tươi Vinamilk 180ml",
+            2: "Nước suối Lavie 500ml",
+            3: "Mì Hảo Hảo",
+        })
+        # Đảo ký tự trong âm tiết ngắn: gần như không còn trigram chung
+        self.assertEqual(self.ma(chi_muc.tim("sua tuio")), [1])
+        self.assertEqual(self.ma(chi_muc.tim("sau tuoi")), [1])
+        self.assertEqual(self.ma(chi_muc.tim("lavei")), [2])
+
+    def test_xep_hang_moi_ung_vien(self):
+        # Rất nhiều hàng hóa khớp "vinamilk"; hàng hóa khớp nguyên cụm
+        # nằm ở cuối danh mục vẫn đứng đầu
+        ten_hang = {i: f"Vinamilk hop {i}" for i in range(1, 1001)}
+        ten_hang[5000] = "Sua tuoi Vinamilk"
+        chi_muc = self.tao_chi_muc(ten_hang)
+        self.assertEqual(self.ma(chi_muc.tim("sua tuoi vinamilk", 1)), [5000])
+        self.assertEqual(self.ma(chi_muc.tim("vinamilk", 3)), [1, 2, 3])
+
+    def test_lam_moi_giu_thay_doi_dong_thoi(self):
+        chi_muc = self.tao_chi_muc({1: "sua tuoi"})
+        nap_cu = chi_muc._nap_du_lieu
+
+        def nap_cham():
+            # Hàng hóa được tạo (và commit) trong lúc đang đọc danh mục
+            chi_muc.cap_nhat(2, "sua chua")
+            return nap_cu()
+
+        chi_muc._nap_du_lieu = nap_cham
+        chi_muc.lam_moi()
+        self.assertEqual(sorted(self.ma(chi_muc.tim("sua"))), [1, 2])
+
+    @override_settings(TIM_KIEM_THOI_GIAN_LAM_MOI=1)
+    def test_lam_moi_o_thread_nen(self):
+        chi_muc = self.tao_chi_muc({1: "sua tuoi"})
+        self.ten_hang[2] = "nuoc ngot pepsi"
+        chi_muc.danh_dau_cu()
+
+        with mock.patch("QuanLyHangHoa.services.tim_kiem_service.connections"):
+            # Request không chờ dựng lại: vẫn tìm trên chỉ mục cũ
+            chi_muc.tim("sua")
+            with chi_muc._lock_nap:
+                pass
+        self.assertEqual(self.ma(chi_muc.tim("pepsi")), [2])
@@ -3,9 +3,25 @@ from .views import *
 
 urlpatterns = [
     path('hanghoa/', hanghoa_get_all),
+    path('hanghoa/search/', hanghoa_search),
+    path('hanghoa/autocomplete/', hanghoa_autocomplete),
+    path('hanghoa/changes/', hanghoa_changes),
+    path('hanghoa/cache/stats/', hanghoa_cache_stats),
+    path('hanghoa/import/', hanghoa_import),
+    path('hanghoa/stocktake/', hanghoa_stocktake),
+    path('hanghoa/can-dat-lai/', hanghoa_can_dat_lai),
     path('hanghoa/<int:ma_hang>/', hanghoa_get_by_id),
     path('hanghoa/create/', hanghoa_create),
     path('hanghoa/<int:ma_hang>/update/', hanghoa_update),
     path('hanghoa/<int:ma_hang>/delete/', hanghoa_delete),
     path('hanghoa/<int:ma_hang>/adjust-stock/', hanghoa_adjust_stock),
+    path('hanghoa/<int:ma_hang>/phan-manh/', hanghoa_phan_manh),
+    path('hanghoa/<int:ma_hang>/ton-kho/', hanghoa_ton_kho_tai),
+    path('hanghoa/scan/<str:ma_vach>/', hanghoa_scan),
+    path('hanghoa/<int:ma_hang>/mavach/', hanghoa_ma_vach_get),
+    path('hanghoa/<int:ma_hang>/mavach/create/', hanghoa_ma_vach_create),
+    path('hanghoa/mavach/<str:ma_vach>/delete/', hanghoa_ma_vach_delete),
+    path('donvitinh/', donvitinh_get_all),
+    path('loaihang/', loaihang_get_all),
+    path('thuonghieu/', thuonghieu_get_all),
 ]
\ No newline at end of file
@@ -9,37 +9,335 @@ tuân theo kiến trúc phân tầng:
 
 Các API hỗ trợ:
 - Lấy danh sách hàng hóa
+- Tìm kiếm hàng hóa theo tên (không dấu, chịu lỗi gõ)
+- Gợi ý hàng hóa khi gõ (autocomplete) cho màn hình bán hàng
 - Lấy chi tiết hàng hóa theo mã
 - Tạo mới hàng hóa
+- Nhập danh mục hàng hóa hàng loạt từ file CSV / XLSX
 - Cập nhật thông tin hàng hóa
 - Xóa hàng hóa
-- Điều chỉnh tồn kho
+- Điều chỉnh tồn kho, kiểm kê tồn kho hàng loạt
+- Tồn kho của hàng hóa tại một thời điểm trong quá khứ
+- Danh sách hàng hóa cần đặt lại (tồn kho dưới mức đặt lại)
+- Bật / tắt phân mảnh tồn kho cho hàng bán chạy
+- Quét mã vạch, quản lý mã vạch của hàng hóa
+- Đồng bộ gia tăng danh mục cho máy bán hàng (changes?since=)
+- Danh sách đơn vị tính, loại hàng, thương hiệu
 """
 
+import hashlib
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
 from django.shortcuts import render
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
 from QuanLyHangHoa.services.hang_hoa_service import HangHoaService
-from QuanLyHangHoa.serializers import HangHoaSerializer
+from QuanLyHangHoa.services.canh_bao_ton_kho_service import CanhBaoTonKhoService
+from QuanLyHangHoa.services.dong_bo_service import DongBoHangHoaService
+from QuanLyHangHoa.services.goi_y_service import GoiYHangHoaService
+from QuanLyHangHoa.services.lich_su_ton_kho_service import LichSuTonKhoService, dau_ngay
+from QuanLyHangHoa.services.ma_vach_service import MaVachService
+from QuanLyHangHoa.services.nhap_hang_hoa_service import NhapHangHoaService
+from QuanLyHangHoa.services.tham_chieu_service import ThamChieuService
+from QuanLyHangHoa.services.tim_kiem_service import TimKiemHangHoaService
+from QuanLyHangHoa.services.ton_kho_phan_manh_service import TonKhoPhanManhService
+from QuanLyHangHoa.serializers import (
+    DonViTinhSerializer,
+    HangHoaProjection,
+    HangHoaSerializer,
+    KiemKeSerializer,
+    LoaiHangSerializer,
+    ThuongHieuSerializer,
+)
+from QuanLyTapHoa.query_guard import cam_truy_van
+from QuanLyTapHoa.pagination import KeysetPaginator
+
+
+# =====================
+# HTTP cache
+# =====================
+# Cache-Control theo nhóm endpoint:
+# - Danh mục hàng hóa: client được lưu nhưng phải hỏi lại mỗi lần,
+#   không đổi thì nhận 304 (ETag theo phiên bản danh mục)
+cache_danh_muc = cache_control(no_cache=True)
+# - Bảng tham chiếu: hiếm khi đổi, dùng lại 5 phút rồi mới hỏi lại
+cache_tham_chieu = cache_control(max_age=300)
+# - Tìm kiếm / gợi ý: kết quả cũ vài chục giây vẫn dùng được
+cache_tim_kiem = cache_control(private=True, max_age=30)
+# - Tồn kho khi quét, thống kê bộ nhớ đệm: luôn lấy mới
+khong_luu_cache = cache_control(no_store=True)
+
+
+def _etag_danh_muc(request, *args, **kwargs) -> str:
+    """
+    ETag cho danh sách / chi tiết hàng hóa: phiên bản danh mục (một lần
+    seek trên nhật ký thay đổi, dùng chung mọi worker), phiên bản các
+    bảng tham chiếu (object lồng trong output) và query string (lọc,
+    sắp xếp, cursor).
+    """
+    query = hashlib.blake2s(
+        repr(sorted(request.GET.lists())).encode(), digest_size=8
+    ).hexdigest()
+    dvt, lh, th = ThamChieuService.phien_ban()
+    return f"hh{HangHoaService.phien_ban()}.{dvt}.{lh}.{th}-{query}"
+
+
+def _etag_tham_chieu(vi_tri: int):
+    """
+    Hàm ETag cho danh sách tham chiếu thứ vi_tri trong ThamChieuService.phien_ban().
+    """
+    def etag(request, *args, **kwargs) -> str:
+        return f"tc{vi_tri}.{ThamChieuService.phien_ban()[vi_tri]}"
+    return etag
+
 
+# Mỗi cách sắp xếp cho phép có một bộ phân trang keyset riêng
+hang_hoa_paginators = {
+    sap_xep: KeysetPaginator(ordering=ordering)
+    for sap_xep, ordering in HangHoaService.CAC_CACH_SAP_XEP.items()
+}
 
+
+@cache_danh_muc
+@condition(etag_func=_etag_danh_muc)
 @api_view(['GET'])
 def hanghoa_get_all(request):
     """
-    Lấy danh sách tất cả hàng hóa.
+    Lấy danh sách hàng hóa, có lọc, sắp xếp và phân trang phía server.
 
     Method: GET
     URL: /api/hanghoa/
 
+    Query params (đều tùy chọn):
+        ma_loai_hang (int): Lọc theo loại hàng
+        ma_thuong_hieu (int): Lọc theo thương hiệu
+        gia_tu, gia_den (decimal): Khoảng giá bán (bao gồm hai đầu)
+        ton_kho_toi_da (int): Hàng sắp hết, tồn kho <= giá trị này
+        ten (str): Tiền tố tên hàng
+        sap_xep (str): ma_hang | ten_hang | gia_ban | so_luong_ton,
+            tiền tố '-' là giảm dần (mặc định ma_hang)
+        page_size (int), cursor (str): Phân trang keyset; giữ nguyên
+            các tham số lọc / sắp xếp khi lấy trang kế tiếp
+
+    Luôn tốn một truy vấn (JOIN đơn vị tính, loại hàng, thương hiệu),
+    thêm một truy vấn nếu trang có hàng hóa phân mảnh tồn kho.
+    Khi bật settings.HANG_HOA_DANH_SACH_NHANH, dữ liệu đọc bằng values()
+    và dựng output trực tiếp (HangHoaProjection), bỏ qua serializer DRF;
+    output giống hệt nhau.
+
+    GET có điều kiện: ETag theo phiên bản danh mục; client gửi
+    If-None-Match khớp thì nhận 304, không chạy truy vấn lẫn serializer.
+
     Response:
-        200 OK: Danh sách hàng hóa
+        200 OK: Danh sách hàng hóa; khi có page_size hoặc cursor thì là
+            {"results": [...], "next_cursor": "..." | null}
+        304 NOT MODIFIED: Danh mục chưa đổi từ lần lấy trước
+        400 BAD REQUEST: Tham số không hợp lệ
     """
-    qs = HangHoaService.get_all()
-    serializer = HangHoaSerializer(qs, many=True)
-    return Response(serializer.data)
+    params = request.query_params
+    nhanh = getattr(settings, "HANG_HOA_DANH_SACH_NHANH", False)
+    phan_trang = "page_size" in params or "cursor" in params
 
+    try:
+        sap_xep = params.get("sap_xep") or "ma_hang"
+        paginator = hang_hoa_paginators.get(sap_xep)
+        if paginator is None:
+            raise ValueError(
+                "sap_xep phải là một trong: " + ", ".join(hang_hoa_paginators)
+            )
+
+        if phan_trang:
+            cursor, page_size = paginator.doc_tham_so(params)
+
+        bo_loc = _doc_bo_loc(params)
+        qs = (
+            HangHoaService.get_all_values(**bo_loc) if nhanh
+            else HangHoaService.get_all(**bo_loc)
+        )
+        if phan_trang:
+            items, next_cursor = paginator.paginate(qs, cursor, page_size)
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=400
+        )
 
+    if not phan_trang:
+        items = list(qs.order_by(*paginator.ordering))
+    # Sau khi tính cursor: lọc / sắp xếp theo bản sao trong HANG_HOA,
+    # hiển thị tồn kho thật của hàng hóa phân mảnh
+    HangHoaService.gan_ton_kho_phan_manh(items)
+
+    if nhanh:
+        data = HangHoaProjection.many(items)
+    else:
+        with cam_truy_van("HangHoaSerializer"):
+            data = HangHoaSerializer(items, many=True).data
+
+    if phan_trang:
+        return Response({"results": data, "next_cursor": next_cursor})
+    return Response(data)
+
+
+def _doc_bo_loc(params) -> dict:
+    """
+    Đọc các tham số lọc danh mục từ query string.
+
+    Raises:
+        ValueError: Tham số sai kiểu
+    """
+    def so_nguyen(ten):
+        value = params.get(ten)
+        if value in (None, ""):
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"{ten} phải là số nguyên")
+
+    def so_thap_phan(ten):
+        value = params.get(ten)
+        if value in (None, ""):
+            return None
+        try:
+            value = Decimal(value)
+        except InvalidOperation:
+            raise ValueError(f"{ten} phải là số")
+        if not value.is_finite():
+            raise ValueError(f"{ten} phải là số")
+        return value
+
+    return {
+        "ma_loai_hang": so_nguyen("ma_loai_hang"),
+        "ma_thuong_hieu": so_nguyen("ma_thuong_hieu"),
+        "gia_tu": so_thap_phan("gia_tu"),
+        "gia_den": so_thap_phan("gia_den"),
+        "ton_kho_toi_da": so_nguyen("ton_kho_toi_da"),
+        "ten_bat_dau": params.get("ten") or None,
+    }
+
+
+@cache_tim_kiem
+@api_view(['GET'])
+def hanghoa_search(request):
+    """
+    Tìm kiếm hàng hóa theo tên: không phân biệt dấu / hoa thường,
+    chịu lỗi gõ, từ cuối được khớp theo tiền tố.
+
+    Method: GET
+    URL: /api/hanghoa/search/?q=sua tuoi&n=20
+
+    Tìm trên chỉ mục trong bộ nhớ, không truy vấn CSDL
+    (trừ lần nạp chỉ mục đầu tiên của process).
+
+    Response:
+        200 OK: [{"ma_hang", "ten_hang", "diem"}, ...] theo độ khớp giảm dần
+        400 BAD REQUEST: Thiếu q hoặc n không hợp lệ
+    """
+    try:
+        n = int(request.query_params.get("n") or 20)
+        data = TimKiemHangHoaService.tim_kiem(request.query_params.get("q"), n)
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=400
+        )
+
+    return Response(data)
+
+
+@cache_tim_kiem
+@api_view(['GET'])
+def hanghoa_autocomplete(request):
+    """
+    Gợi ý hàng hóa khi gõ: các hàng hóa có một từ trong tên bắt đầu
+    bằng chuỗi đã gõ, bán chạy nhất trước.
+
+    Method: GET
+    URL: /api/hanghoa/autocomplete/?q=sua t&n=10
+
+    Chỉ đọc chỉ mục tiền tố trong bộ nhớ, không truy vấn CSDL
+    (trừ lần nạp chỉ mục đầu tiên của process).
+
+    Response:
+        200 OK: [{"ma_hang", "ten_hang"}, ...], rỗng khi q rỗng
+        400 BAD REQUEST: n không hợp lệ
+    """
+    try:
+        n = int(request.query_params.get("n") or 10)
+        data = GoiYHangHoaService.goi_y(request.query_params.get("q"), n)
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=400
+        )
+
+    return Response(data)
+
+
+@khong_luu_cache
+@api_view(['GET'])
+def hanghoa_changes(request):
+    """
+    Đồng bộ gia tăng: các hàng hóa thay đổi sau token của lần đồng bộ trước.
+
+    Method: GET
+    URL: /api/hanghoa/changes/?since=<token>&limit=1000
+
+    Không truyền since: chỉ trả token hiện tại (lấy token trước rồi
+    mới tải toàn bộ danh mục). Nhiều thay đổi của một hàng hóa được
+    gộp thành một upsert mang giá trị hiện tại, hoặc một tombstone.
+
+    Response:
+        200 OK: {
+            "token": "...",          # since cho lần gọi sau
+            "con_nua": bool,         # còn thay đổi, gọi tiếp ngay
+            "cot": ["ma_hang", "ten_hang", "gia_ban", ...],
+            "upserts": [[...], ...], # mỗi dòng theo thứ tự "cot"
+            "tombstones": [ma_hang, ...]
+        }
+        400 BAD REQUEST: since / limit không hợp lệ
+    """
+    params = request.query_params
+    try:
+        since = params.get("since")
+        since = int(since) if since not in (None, "") else None
+        gioi_han = int(params.get("limit") or DongBoHangHoaService.GIOI_HAN_MAC_DINH)
+        data = DongBoHangHoaService.thay_doi_tu(since, gioi_han)
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=400
+        )
+
+    return Response(data)
+
+
+@khong_luu_cache
+@api_view(['GET'])
+def hanghoa_cache_stats(request):
+    """
+    Bộ đếm bộ nhớ đệm hàng hóa của worker đang xử lý request.
+
+    Method: GET
+    URL: /api/hanghoa/cache/stats/
+
+    Response:
+        200 OK: {"hang_hoa": {"so_lan_trung", "so_lan_truot", "so_lan_loai", ...},
+                 "ma_vach": {...}}
+    """
+    return Response(HangHoaService.thong_ke_bo_nho_dem())
+
+
+@cache_danh_muc
+@condition(etag_func=_etag_danh_muc)
 @api_view(['GET'])
 def hanghoa_get_by_id(request, ma_hang: int):
     """
@@ -51,8 +349,12 @@ def hanghoa_get_by_id(request, ma_hang: int):
     Params:
         ma_hang (int): Mã hàng hóa
 
+    Đọc qua bộ nhớ đệm hàng hóa (xem HangHoaRepository.get_by_id).
+    GET có điều kiện theo phiên bản danh mục như hanghoa_get_all.
+
     Response:
         200 OK: Thông tin hàng hóa
+        304 NOT MODIFIED: Danh mục chưa đổi từ lần lấy trước
         404 NOT FOUND: Hàng hóa không tồn tại
     """
     obj = HangHoaService.get_by_id(ma_hang)
@@ -62,8 +364,9 @@ def hanghoa_get_by_id(request, ma_hang: int):
             status=404
         )
 
-    serializer = HangHoaSerializer(obj)
-    return Response(serializer.data)
+    with cam_truy_van("HangHoaSerializer"):
+        data = HangHoaSerializer(obj).data
+    return Response(data)
 
 
 @api_view(["POST"])
@@ -92,6 +395,41 @@ def hanghoa_create(request):
     )
 
 
+@api_view(['POST'])
+def hanghoa_import(request):
+    """
+    Nhập danh mục hàng hóa hàng loạt từ file (catalog nhà cung cấp).
+
+    Method: POST
+    URL: /api/hanghoa/import/
+
+    Body (multipart/form-data):
+        file: File .csv hoặc .xlsx, dòng đầu là tiêu đề cột
+            (xem NhapHangHoaService)
+
+    Response:
+        200 OK: {"so_dong", "so_tao_moi", "so_cap_nhat", "so_loi", "loi"};
+            dòng lỗi bị bỏ qua, các dòng còn lại vẫn được nhập
+        400 BAD REQUEST: Thiếu file, sai định dạng hoặc thiếu cột
+    """
+    tep = request.FILES.get("file")
+    if tep is None:
+        return Response(
+            {"error": "Thiếu file"},
+            status=400
+        )
+
+    try:
+        bao_cao = NhapHangHoaService.nhap(tep, tep.name)
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=400
+        )
+
+    return Response(bao_cao)
+
+
 @api_view(['PUT'])
 def hanghoa_update(request, ma_hang: int):
     """
@@ -108,12 +446,19 @@ def hanghoa_update(request, ma_hang: int):
 
     Response:
         200 OK: Cập nhật thành công
+        400 BAD REQUEST: Sửa tồn kho của hàng hóa đang phân mảnh tồn kho
         404 NOT FOUND: Hàng hóa không tồn tại
     """
     serializer = HangHoaSerializer(data=request.data, partial=True)
     serializer.is_valid(raise_exception=True)
 
-    obj = HangHoaService.update(ma_hang, **serializer.validated_data)
+    try:
+        obj = HangHoaService.update(ma_hang, **serializer.validated_data)
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=400
+        )
     if not obj:
         return Response(
             {"error": "Hàng hóa không tồn tại"},
@@ -190,3 +535,329 @@ def hanghoa_adjust_stock(request, ma_hang: int):
             {"error": str(e)},
             status=400
         )
+
+
+@api_view(['POST'])
+def hanghoa_phan_manh(request, ma_hang: int):
+    """
+    Đặt số phân mảnh tồn kho của hàng hóa bán chạy
+    (nhiều quầy trừ tồn kho cùng lúc không chờ khóa nhau).
+
+    Method: POST
+    URL: /api/hanghoa/<ma_hang>/phan-manh/
+
+    Params:
+        ma_hang (int): Mã hàng hóa
+
+    Body:
+        so_phan_manh (int): Số phân mảnh, 0 là tắt
+
+    Response:
+        200 OK: Đặt thành công
+        400 BAD REQUEST: Thiếu dữ liệu hoặc số phân mảnh không hợp lệ
+        404 NOT FOUND: Hàng hóa không tồn tại
+    """
+    so_phan_manh = request.data.get("so_phan_manh")
+
+    if so_phan_manh is None:
+        return Response(
+            {"error": "Thiếu so_phan_manh"},
+            status=400
+        )
+
+    try:
+        if not TonKhoPhanManhService.dat(ma_hang, int(so_phan_manh)):
+            return Response(
+                {"error": "Hàng hóa không tồn tại"},
+                status=404
+            )
+
+        return Response({"ma_hang": ma_hang, "so_phan_manh": int(so_phan_manh)})
+
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=400
+        )
+
+
+@api_view(['POST'])
+def hanghoa_stocktake(request):
+    """
+    Kiểm kê: điều chỉnh tồn kho của nhiều hàng hóa trong một transaction.
+
+    Method: POST
+    URL: /api/hanghoa/stocktake/
+
+    Body:
+        items (list): [{"ma_hang", "so_luong_dem"} | {"ma_hang", "so_luong"}]
+            so_luong_dem: số lượng đếm được (tồn kho mới, số nguyên >= 0)
+            so_luong: số lượng điều chỉnh (số nguyên, có thể âm hoặc dương)
+
+    Response:
+        200 OK: Báo cáo chênh lệch (xem HangHoaService.kiem_ke)
+        400 BAD REQUEST: Dữ liệu không hợp lệ, hàng hóa không tồn tại
+            hoặc tồn kho âm; không hàng hóa nào bị điều chỉnh
+    """
+    serializer = KiemKeSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    try:
+        return Response(HangHoaService.kiem_ke(serializer.validated_data["items"]))
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=400
+        )
+
+
+@khong_luu_cache
+@api_view(['GET'])
+def hanghoa_can_dat_lai(request):
+    """
+    Danh sách hàng hóa cần đặt lại: tồn kho <= mức đặt lại (muc_dat_lai > 0).
+
+    Method: GET
+    URL: /api/hanghoa/can-dat-lai/
+
+    Đọc tập cảnh báo được duy trì sẵn (indexed view, xem
+    CanhBaoTonKhoService), chi phí theo số cảnh báo chứ không theo
+    kích thước danh mục.
+
+    Response:
+        200 OK: {"so_luong": int,
+                 "hang_hoa": [{"ma_hang", "ten_hang", "so_luong_ton",
+                               "muc_dat_lai", "can_nhap"}, ...]}
+    """
+    danh_sach = CanhBaoTonKhoService.danh_sach()
+    return Response({"so_luong": len(danh_sach), "hang_hoa": danh_sach})
+
+
+@khong_luu_cache
+@api_view(['GET'])
+def hanghoa_ton_kho_tai(request, ma_hang: int):
+    """
+    Tồn kho của hàng hóa tại một thời điểm (tính từ ảnh chụp cuối ngày
+    và sổ biến động kho).
+
+    Method: GET
+    URL: /api/hanghoa/<ma_hang>/ton-kho/?thoi_diem=2025-03-01T18:30
+
+    Query params:
+        thoi_diem: ngày giờ ISO (không múi giờ là giờ Việt Nam), hoặc
+            ngày (cuối ngày đó); mặc định hiện tại
+
+    Response:
+        200 OK: {"ma_hang", "thoi_diem", "so_luong_ton"}
+        400 BAD REQUEST: thoi_diem không hợp lệ
+        404 NOT FOUND: Hàng hóa không tồn tại
+    """
+    value = request.query_params.get("thoi_diem")
+    if not value:
+        thoi_diem = timezone.now()
+    else:
+        thoi_diem = parse_datetime(value)
+        if thoi_diem is None:
+            ngay = parse_date(value)
+            if ngay is None:
+                return Response(
+                    {"error": "thoi_diem không hợp lệ"},
+                    status=400
+                )
+            thoi_diem = dau_ngay(ngay + timedelta(days=1))
+        elif timezone.is_naive(thoi_diem):
+            thoi_diem = timezone.make_aware(thoi_diem)
+
+    so_luong_ton = LichSuTonKhoService.ton_kho_tai(ma_hang, thoi_diem)
+    if so_luong_ton is None:
+        return Response(
+            {"error": "Hàng hóa không tồn tại"},
+            status=404
+        )
+
+    return Response({
+        "ma_hang": ma_hang,
+        "thoi_diem": timezone.localtime(thoi_diem).isoformat(),
+        "so_luong_ton": so_luong_ton,
+    })
+
+
+@khong_luu_cache
+@api_view(['GET'])
+def hanghoa_scan(request, ma_vach: str):
+    """
+    Quét mã vạch tại quầy: trả về hàng hóa, giá bán và tồn kho.
+
+    Method: GET
+    URL: /api/hanghoa/scan/<ma_vach>/
+
+    Params:
+        ma_vach (str): Mã vạch EAN-8 / UPC-A / EAN-13 / GTIN-14
+
+    Đọc từ bộ nhớ đệm trong process, chỉ truy vấn CSDL khi trượt.
+
+    Response:
+        200 OK: {"ma_vach", "ma_hang", "ten_hang", "gia_ban", "so_luong_ton"}
+        400 BAD REQUEST: Mã vạch sai định dạng hoặc sai chữ số kiểm tra
+        404 NOT FOUND: Mã vạch chưa được gán cho hàng hóa nào
+    """
+    try:
+        data = MaVachService.quet(ma_vach)
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=400
+        )
+
+    if data is None:
+        return Response(
+            {"error": "Mã vạch không tồn tại"},
+            status=404
+        )
+
+    return Response(data)
+
+
+@api_view(['GET'])
+def hanghoa_ma_vach_get(request, ma_hang: int):
+    """
+    Lấy danh sách mã vạch của một hàng hóa.
+
+    Method: GET
+    URL: /api/hanghoa/<ma_hang>/mavach/
+
+    Response:
+        200 OK: ["08934563138165", ...] (dạng GTIN-14)
+        404 NOT FOUND: Hàng hóa không tồn tại
+    """
+    data = MaVachService.get_by_hang_hoa(ma_hang)
+    if data is None:
+        return Response(
+            {"error": "Hàng hóa không tồn tại"},
+            status=404
+        )
+
+    return Response(data)
+
+
+@api_view(['POST'])
+def hanghoa_ma_vach_create(request, ma_hang: int):
+    """
+    Gán một mã vạch cho hàng hóa.
+
+    Method: POST
+    URL: /api/hanghoa/<ma_hang>/mavach/create/
+
+    Body:
+        ma_vach (str): Mã vạch EAN-8 / UPC-A / EAN-13 / GTIN-14
+
+    Response:
+        201 CREATED: {"ma_vach", "ma_hang"}
+        400 BAD REQUEST: Mã vạch không hợp lệ hoặc đã được gán
+        404 NOT FOUND: Hàng hóa không tồn tại
+    """
+    try:
+        ma_vach = MaVachService.create(ma_hang, str(request.data.get("ma_vach") or ""))
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=400
+        )
+
+    if ma_vach is None:
+        return Response(
+            {"error": "Hàng hóa không tồn tại"},
+            status=404
+        )
+
+    return Response({"ma_vach": ma_vach, "ma_hang": ma_hang}, status=201)
+
+
+@api_view(['DELETE'])
+def hanghoa_ma_vach_delete(request, ma_vach: str):
+    """
+    Bỏ một mã vạch.
+
+    Method: DELETE
+    URL: /api/hanghoa/mavach/<ma_vach>/delete/
+
+    Response:
+        204 NO CONTENT: Xóa thành công
+        400 BAD REQUEST: Mã vạch sai định dạng hoặc sai chữ số kiểm tra
+        404 NOT FOUND: Mã vạch không tồn tại
+    """
+    try:
+        success = MaVachService.delete(ma_vach)
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=400
+        )
+
+    if not success:
+        return Response(
+            {"error": "Mã vạch không tồn tại"},
+            status=404
+        )
+
+    return Response({"message": "Xóa mã vạch thành công"}, status=204)
+
+
+@cache_tham_chieu
+@condition(etag_func=_etag_tham_chieu(0))
+@api_view(['GET'])
+def donvitinh_get_all(request):
+    """
+    Lấy danh sách đơn vị tính.
+
+    Method: GET
+    URL: /api/donvitinh/
+
+    Đọc từ bản chụp trong bộ nhớ, không truy vấn CSDL;
+    ETag theo phiên bản bản chụp.
+
+    Response:
+        200 OK: [{"ma_dvt", "ten_dvt"}, ...]
+    """
+    data = DonViTinhSerializer(ThamChieuService.get_all_don_vi_tinh(), many=True).data
+    return Response(data)
+
+
+@cache_tham_chieu
+@condition(etag_func=_etag_tham_chieu(1))
+@api_view(['GET'])
+def loaihang_get_all(request):
+    """
+    Lấy danh sách loại hàng.
+
+    Method: GET
+    URL: /api/loaihang/
+
+    Đọc từ bản chụp trong bộ nhớ, không truy vấn CSDL;
+    ETag theo phiên bản bản chụp.
+
+    Response:
+        200 OK: [{"ma_loai", "ten_loai", "mo_ta"}, ...]
+    """
+    data = LoaiHangSerializer(ThamChieuService.get_all_loai_hang(), many=True).data
+    return Response(data)
+
+
+@cache_tham_chieu
+@condition(etag_func=_etag_tham_chieu(2))
+@api_view(['GET'])
+def thuonghieu_get_all(request):
+    """
+    Lấy danh sách thương hiệu.
+
+    Method: GET
+    URL: /api/thuonghieu/
+
+    Đọc từ bản chụp trong bộ nhớ, không truy vấn CSDL;
+    ETag theo phiên bản bản chụp.
+
+    Response:
+        200 OK: [{"ma_thuong_hieu", "ten_thuong_hieu", "quoc_gia", "mo_ta"}, ...]
+    """
+    data = ThuongHieuSerializer(ThamChieuService.get_all_thuong_hieu(), many=True).data
+    return Response(data)
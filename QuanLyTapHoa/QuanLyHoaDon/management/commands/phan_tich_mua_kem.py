@@ -0,0 +1,77 @@
+"""
+Lệnh phân tích giỏ hàng: tính các hàng hóa thường được mua kèm
+và ghi lại toàn bộ bảng MUA_KEM.
+
+Cần numpy và scipy. Ví dụ:
+    python manage.py phan_tich_mua_kem
+    python manage.py phan_tich_mua_kem --tu-ngay 2025-01-01 --top-k 20 --xep-theo do_tin_cay
+"""
+
+from datetime import date, datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from QuanLyHoaDon.models.doanh_thu_ngay import MUI_GIO_BAO_CAO
+from QuanLyHoaDon.services.mua_kem_service import MuaKemService
+
+
+class Command(BaseCommand):
+    help = (
+        "Phân tích giỏ hàng trên CHI_TIET_HOA_DON (support, confidence, lift) "
+        "và lưu top K hàng hóa mua kèm của mỗi hàng hóa vào MUA_KEM."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tu-ngay", help="Ngày bắt đầu (YYYY-MM-DD), bao gồm")
+        parser.add_argument("--den-ngay", help="Ngày kết thúc (YYYY-MM-DD), không bao gồm")
+        parser.add_argument(
+            "--so-dong-moi-khoi", type=int, default=200000,
+            help="Số dòng chi tiết mỗi khối (giới hạn bộ nhớ đỉnh)"
+        )
+        parser.add_argument(
+            "--so-hoa-don-toi-thieu", type=int, default=5,
+            help="Số hóa đơn tối thiểu một cặp phải cùng xuất hiện"
+        )
+        parser.add_argument(
+            "--top-k", type=int, default=10,
+            help="Số hàng hóa mua kèm lưu cho mỗi hàng hóa"
+        )
+        parser.add_argument(
+            "--xep-theo", choices=MuaKemService.CAC_TIEU_CHI, default="do_nang",
+            help="Tiêu chí xếp hạng: do_nang (lift) hoặc do_tin_cay (confidence)"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            tu = self._doc_ngay(options["tu_ngay"])
+            den = self._doc_ngay(options["den_ngay"])
+        except ValueError:
+            raise CommandError("Ngày không hợp lệ (định dạng YYYY-MM-DD)")
+
+        if tu and den and tu >= den:
+            raise CommandError("--tu-ngay phải nhỏ hơn --den-ngay")
+
+        try:
+            ket_qua = MuaKemService.phan_tich(
+                tu=tu,
+                den=den,
+                so_dong_moi_khoi=options["so_dong_moi_khoi"],
+                so_hoa_don_toi_thieu=options["so_hoa_don_toi_thieu"],
+                top_k=options["top_k"],
+                xep_theo=options["xep_theo"],
+            )
+        except (ValueError, ImportError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Đã đọc {ket_qua['so_dong']} dòng / {ket_qua['so_hoa_don']} hóa đơn, "
+            f"{ket_qua['so_cap_dong_thoi']} phần tử đồng xuất hiện, "
+            f"ghi {ket_qua['so_quy_tac']} quy tắc mua kèm "
+            f"trong {ket_qua['thoi_gian_giay']} giây"
+        ))
+
+    @staticmethod
+    def _doc_ngay(value):
+        if not value:
+            return None
+        return datetime.combine(date.fromisoformat(value), time.min, tzinfo=MUI_GIO_BAO_CAO)
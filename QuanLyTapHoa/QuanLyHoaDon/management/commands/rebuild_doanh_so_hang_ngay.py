@@ -0,0 +1,41 @@
+"""
+Lệnh tính lại bảng tổng hợp doanh số theo ngày và hàng hóa
+(DOANH_SO_HANG_NGAY) từ CHI_TIET_HOA_DON.
+
+Ví dụ:
+    python manage.py rebuild_doanh_so_hang_ngay
+    python manage.py rebuild_doanh_so_hang_ngay --tu-ngay 2025-01-01 --den-ngay 2025-04-01
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from QuanLyHoaDon.models.doanh_so_hang_ngay import DoanhSoHangNgayRepository
+
+
+class Command(BaseCommand):
+    help = (
+        "Tính lại DOANH_SO_HANG_NGAY từ CHI_TIET_HOA_DON trong khoảng "
+        "[--tu-ngay, --den-ngay). Nên chạy ngoài giờ bán hàng khi khoảng "
+        "ngày bao gồm hôm nay."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tu-ngay", help="Ngày bắt đầu (YYYY-MM-DD), bao gồm")
+        parser.add_argument("--den-ngay", help="Ngày kết thúc (YYYY-MM-DD), không bao gồm")
+
+    def handle(self, *args, **options):
+        try:
+            tu_ngay = date.fromisoformat(options["tu_ngay"]) if options["tu_ngay"] else None
+            den_ngay = date.fromisoformat(options["den_ngay"]) if options["den_ngay"] else None
+        except ValueError:
+            raise CommandError("Ngày không hợp lệ (định dạng YYYY-MM-DD)")
+
+        if tu_ngay and den_ngay and tu_ngay >= den_ngay:
+            raise CommandError("--tu-ngay phải nhỏ hơn --den-ngay")
+
+        so_dong = DoanhSoHangNgayRepository.rebuild(tu_ngay, den_ngay)
+        self.stdout.write(self.style.SUCCESS(
+            f"Đã ghi {so_dong} dòng tổng hợp doanh số hàng hóa"
+        ))
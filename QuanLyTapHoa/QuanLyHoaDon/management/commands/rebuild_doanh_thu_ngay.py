@@ -0,0 +1,43 @@
+"""
+Lệnh tính lại bảng tổng hợp doanh thu theo ngày (DOANH_THU_NGAY) từ HOA_DON.
+
+Ví dụ:
+    python manage.py rebuild_doanh_thu_ngay
+    python manage.py rebuild_doanh_thu_ngay --tu-ngay 2025-01-01 --den-ngay 2025-02-01
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from QuanLyHoaDon.models.doanh_thu_ngay import DoanhThuNgayRepository
+from QuanLyHoaDon.services.thong_ke_cache import ThongKeDoanhThuCache
+
+
+class Command(BaseCommand):
+    help = (
+        "Tính lại DOANH_THU_NGAY từ HOA_DON trong khoảng [--tu-ngay, --den-ngay). "
+        "Nên chạy ngoài giờ bán hàng khi khoảng ngày bao gồm hôm nay."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tu-ngay", help="Ngày bắt đầu (YYYY-MM-DD), bao gồm")
+        parser.add_argument("--den-ngay", help="Ngày kết thúc (YYYY-MM-DD), không bao gồm")
+
+    def handle(self, *args, **options):
+        try:
+            tu_ngay = date.fromisoformat(options["tu_ngay"]) if options["tu_ngay"] else None
+            den_ngay = date.fromisoformat(options["den_ngay"]) if options["den_ngay"] else None
+        except ValueError:
+            raise CommandError("Ngày không hợp lệ (định dạng YYYY-MM-DD)")
+
+        if tu_ngay and den_ngay and tu_ngay >= den_ngay:
+            raise CommandError("--tu-ngay phải nhỏ hơn --den-ngay")
+
+        so_dong = DoanhThuNgayRepository.rebuild(tu_ngay, den_ngay)
+
+        # Dữ liệu tháng đã chốt có thể đã thay đổi
+        ThongKeDoanhThuCache.huy_tat_ca()
+        self.stdout.write(self.style.SUCCESS(
+            f"Đã ghi {so_dong} dòng tổng hợp doanh thu ngày"
+        ))
@@ -64,8 +64,20 @@ class ChiTietHoaDon(models.Model):
         """
         return f"HD {self.hoa_don_id} - HH {self.hang_hoa_id}"
 # repositories/chi_tiet_hoa_don_repo.py
-from typing import Optional
-from django.db.models import QuerySet
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from django.db.models import Q, QuerySet
+
+
+def _sau(truong_dau: str, truong_sau: str, cuoi: Tuple) -> Q:
+    """
+    Điều kiện keyset "nằm sau cặp cuoi" theo thứ tự (truong_dau, truong_sau)
+    tăng dần, kèm điều kiện thừa truong_dau >= giá trị đầu để seek.
+    """
+    dau, sau = cuoi
+    return Q(**{f"{truong_dau}__gte": dau}) & (
+        Q(**{f"{truong_dau}__gt": dau}) | Q(**{truong_dau: dau, f"{truong_sau}__gt": sau})
+    )
 
 class ChiTietHoaDonRepository:
     """
@@ -87,6 +99,109 @@ class ChiTietHoaDonRepository:
             hoa_don_id=ma_hd
         ).select_related('hang_hoa')
 
+    @staticmethod
+    def iter_theo_thoi_gian(
+        tu,
+        den,
+        so_hoa_don_moi_khoi: int = 500
+    ) -> Iterator[Tuple[Tuple, List[Tuple]]]:
+        """
+        Duyệt tuần tự các hóa đơn lập trong khoảng [tu, den) kèm chi tiết
+        (tên hàng), theo thứ tự (NgayLap, MaHD).
+
+        Đọc theo cửa sổ keyset: mỗi khối là một lần seek lấy tối đa
+        so_hoa_don_moi_khoi hóa đơn sau hóa đơn cuối của khối trước, rồi
+        một truy vấn chi tiết của các hóa đơn đó. Bộ nhớ chỉ phụ thuộc
+        kích thước khối (mssql-django không hỗ trợ đọc theo khối bằng
+        iterator(), sẽ nạp toàn bộ kết quả). Hóa đơn không có chi tiết
+        vẫn được trả về, với danh sách chi tiết rỗng.
+
+        Mỗi phần tử là cặp:
+        ((ma_hd, ngay_lap, ma_nv, tong_tien),
+         [(ma_hang, ten_hang, so_luong, don_gia, thanh_tien), ...])
+
+        :param tu: Thời điểm bắt đầu (bao gồm)
+        :param den: Thời điểm kết thúc (không bao gồm)
+        :param so_hoa_don_moi_khoi: Số hóa đơn mỗi lần đọc từ CSDL
+        :return: Iterator các cặp (hóa đơn, chi tiết)
+        """
+        from QuanLyHoaDon.models.hoa_don import HoaDon
+
+        hoa_dons = (
+            HoaDon.objects
+            .filter(ngay_lap__gte=tu, ngay_lap__lt=den)
+            .order_by('ngay_lap', 'ma_hd')
+            .values_list('ma_hd', 'ngay_lap', 'nhan_vien_id', 'tong_tien')
+        )
+
+        cuoi = None
+        while True:
+            qs = hoa_dons
+            if cuoi is not None:
+                qs = qs.filter(_sau('ngay_lap', 'ma_hd', cuoi))
+            khoi = list(qs[:so_hoa_don_moi_khoi])
+            if not khoi:
+                return
+
+            chi_tiets: Dict[int, List[Tuple]] = {}
+            for ma_hd, *chi_tiet in (
+                ChiTietHoaDon.objects
+                .filter(hoa_don_id__in=[hoa_don[0] for hoa_don in khoi])
+                .order_by('hoa_don_id', 'ma_cthd')
+                .values_list(
+                    'hoa_don_id',
+                    'hang_hoa_id',
+                    'hang_hoa__ten_hang',
+                    'so_luong',
+                    'don_gia',
+                    'thanh_tien',
+                )
+            ):
+                chi_tiets.setdefault(ma_hd, []).append(tuple(chi_tiet))
+
+            for hoa_don in khoi:
+                yield hoa_don, chi_tiets.get(hoa_don[0], [])
+
+            if len(khoi) < so_hoa_don_moi_khoi:
+                return
+            cuoi = (khoi[-1][1], khoi[-1][0])
+
+    @staticmethod
+    def iter_cap_hoa_don_hang_hoa(
+        tu: Optional[datetime] = None,
+        den: Optional[datetime] = None,
+        chunk_size: int = 10000
+    ) -> Iterator[Tuple[int, int]]:
+        """
+        Duyệt các cặp (ma_hd, ma_hang) sắp xếp theo mã hóa đơn,
+        đọc theo khối, phục vụ phân tích giỏ hàng.
+
+        Các dòng của cùng một hóa đơn luôn liền nhau; chỉ đọc hai cột
+        khóa nên truy vấn được phục vụ hoàn toàn từ chỉ mục duy nhất
+        (MaHD, MaHang). Mỗi khối là một lần seek keyset sau cặp cuối
+        của khối trước.
+
+        :param tu: Thời điểm lập hóa đơn bắt đầu (bao gồm), None = không giới hạn
+        :param den: Thời điểm lập hóa đơn kết thúc (không bao gồm), None = không giới hạn
+        :param chunk_size: Số dòng mỗi lần đọc từ CSDL
+        :return: Iterator các tuple (ma_hd, ma_hang)
+        """
+        qs = ChiTietHoaDon.objects.all()
+        if tu is not None:
+            qs = qs.filter(hoa_don__ngay_lap__gte=tu)
+        if den is not None:
+            qs = qs.filter(hoa_don__ngay_lap__lt=den)
+        qs = qs.order_by('hoa_don_id', 'hang_hoa_id').values_list('hoa_don_id', 'hang_hoa_id')
+
+        cuoi = None
+        while True:
+            khoi_qs = qs if cuoi is None else qs.filter(_sau('hoa_don_id', 'hang_hoa_id', cuoi))
+            khoi = list(khoi_qs[:chunk_size])
+            yield from khoi
+            if len(khoi) < chunk_size:
+                return
+            cuoi = khoi[-1]
+
     @staticmethod
     def get(
         ma_hd: int,
@@ -133,6 +248,33 @@ class ChiTietHoaDonRepository:
         obj.save()
         return obj
 
+    @staticmethod
+    def bulk_create(
+        ma_hd: int,
+        chi_tiets: List[Dict]
+    ) -> List[ChiTietHoaDon]:
+        """
+        Tạo nhiều chi tiết hóa đơn bằng một câu INSERT nhiều dòng.
+
+        Mỗi phần tử của chi_tiets gồm:
+        {"hang_hoa": HangHoa, "so_luong": int, "don_gia": Decimal}
+
+        :param ma_hd: Mã hóa đơn
+        :param chi_tiets: Danh sách chi tiết cần tạo
+        :return: Danh sách ChiTietHoaDon vừa tạo
+        """
+        objs = [
+            ChiTietHoaDon(
+                hoa_don_id=ma_hd,
+                hang_hoa=ct["hang_hoa"],
+                so_luong=ct["so_luong"],
+                don_gia=ct["don_gia"],
+                thanh_tien=ct["don_gia"] * ct["so_luong"],
+            )
+            for ct in chi_tiets
+        ]
+        return ChiTietHoaDon.objects.bulk_create(objs)
+
     @staticmethod
     def update(
         ma_hd: int,
@@ -0,0 +1,336 @@
+# models/doanh_so_hang_ngay.py
+"""
+Model DoanhSoHangNgay
+
+Bảng tổng hợp số lượng bán và doanh thu theo ngày (giờ Việt Nam)
+và hàng hóa, được cộng dồn trong transaction tạo hóa đơn.
+Các phân tích bán hàng theo sản phẩm / loại hàng / thương hiệu
+đọc từ bảng này thay vì quét CHI_TIET_HOA_DON.
+"""
+
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Dict, Iterator, Optional, Tuple
+
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Case, F, QuerySet, Sum, Value, When
+from django.db.models.functions import TruncDate
+
+from QuanLyHoaDon.models.doanh_thu_ngay import MUI_GIO_BAO_CAO
+
+
+class DoanhSoHangNgay(models.Model):
+    """
+    Model đại diện cho doanh số của một hàng hóa trong một ngày.
+    """
+
+    ma_dshn = models.AutoField(
+        primary_key=True,
+        db_column='MaDSHN'
+    )
+
+    ngay = models.DateField(
+        db_column='Ngay'
+    )
+
+    hang_hoa = models.ForeignKey(
+        'QuanLyHangHoa.HangHoa',
+        on_delete=models.PROTECT,
+        db_column='MaHang',
+        related_name='doanh_so_ngays'
+    )
+
+    so_luong = models.IntegerField(
+        default=0,
+        db_column='SoLuong'
+    )
+
+    doanh_thu = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        default=0,
+        db_column='DoanhThu'
+    )
+
+    class Meta:
+        """
+        Cấu hình ánh xạ model với bảng DOANH_SO_HANG_NGAY
+        (tạo bằng sql/03_doanh_so_hang_ngay.sql).
+        """
+        db_table = 'DOANH_SO_HANG_NGAY'
+        managed = False
+        unique_together = (('ngay', 'hang_hoa'),)
+
+    def __str__(self):
+        """
+        Hiển thị chuỗi đại diện của dòng tổng hợp.
+        """
+        return f"{self.ngay} - HH {self.hang_hoa_id}"
+
+
+class DoanhSoHangNgayRepository:
+    """
+    Repository cập nhật và truy vấn bảng tổng hợp doanh số hàng hóa theo ngày.
+    """
+
+    # Trường xếp hạng được phép
+    CAC_TIEU_CHI = ('so_luong', 'doanh_thu')
+
+    @staticmethod
+    def cong_don(
+        ngay: date,
+        doanh_so: Dict[int, Tuple[int, Decimal]],
+        chunk_size: int = 400
+    ) -> None:
+        """
+        Cộng doanh số của một hóa đơn vào bảng tổng hợp.
+
+        Trên SQL Server mỗi khối là một câu MERGE ... WITH (HOLDLOCK):
+        cộng vào dòng đã có và thêm dòng cho hàng hóa bán lần đầu trong
+        ngày, khóa khoảng khóa nên hai hóa đơn đồng thời không thể cùng
+        INSERT một (Ngay, MaHang). Backend khác khóa các dòng đã có
+        (SELECT ... FOR UPDATE), cộng dồn, rồi INSERT các dòng còn
+        thiếu; giao dịch khác vừa INSERT trước (vi phạm unique) thì lặp
+        lại với đúng các dòng chưa được cộng.
+        Phải được gọi trong transaction tạo hóa đơn.
+
+        :param ngay: Ngày báo cáo
+        :param doanh_so: {mã hàng: (số lượng, thành tiền)}
+        :param chunk_size: Số hàng hóa tối đa trong một câu lệnh
+        """
+        items = list(doanh_so.items())
+        for i in range(0, len(items), chunk_size):
+            chunk = dict(items[i:i + chunk_size])
+            if connection.vendor == 'microsoft':
+                DoanhSoHangNgayRepository._cong_don_merge(ngay, chunk)
+            else:
+                DoanhSoHangNgayRepository._cong_don_chunk(ngay, chunk)
+
+    @staticmethod
+    def _cong_don_merge(ngay: date, doanh_so: Dict[int, Tuple[int, Decimal]]) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                MERGE DOANH_SO_HANG_NGAY WITH (HOLDLOCK) AS t
+                USING (VALUES {', '.join(['(%s, %s, CAST(%s AS DECIMAL(18, 2)))'] * len(doanh_so))})
+                    AS v (MaHang, SoLuong, DoanhThu)
+                ON t.Ngay = %s AND t.MaHang = v.MaHang
+                WHEN MATCHED THEN
+                    UPDATE SET SoLuong = t.SoLuong + v.SoLuong,
+                               DoanhThu = t.DoanhThu + v.DoanhThu
+                WHEN NOT MATCHED THEN
+                    INSERT (Ngay, MaHang, SoLuong, DoanhThu)
+                    VALUES (%s, v.MaHang, v.SoLuong, v.DoanhThu);
+                """,
+                [x for ma_hang, (so_luong, thanh_tien) in doanh_so.items()
+                 for x in (ma_hang, so_luong, thanh_tien)]
+                + [ngay, ngay]
+            )
+
+    @staticmethod
+    def _cong_don_chunk(ngay: date, doanh_so: Dict[int, Tuple[int, Decimal]]) -> None:
+        def cap_nhat(ma_hangs) -> int:
+            return DoanhSoHangNgay.objects.filter(
+                ngay=ngay,
+                hang_hoa_id__in=ma_hangs
+            ).update(
+                so_luong=F('so_luong') + Case(
+                    *[When(hang_hoa_id=ma_hang, then=Value(doanh_so[ma_hang][0]))
+                      for ma_hang in ma_hangs],
+                    output_field=models.IntegerField()
+                ),
+                doanh_thu=F('doanh_thu') + Case(
+                    *[When(hang_hoa_id=ma_hang, then=Value(doanh_so[ma_hang][1]))
+                      for ma_hang in ma_hangs],
+                    output_field=models.DecimalField(max_digits=18, decimal_places=2)
+                ),
+            )
+
+        con_lai = list(doanh_so)
+        while con_lai:
+            # Dòng đã có bị khóa tới hết transaction, nên được cộng đúng một lần
+            da_co = set(
+                DoanhSoHangNgay.objects
+                .select_for_update()
+                .filter(ngay=ngay, hang_hoa_id__in=con_lai)
+                .values_list('hang_hoa_id', flat=True)
+            )
+            if da_co:
+                cap_nhat(list(da_co))
+
+            chua_co = [ma_hang for ma_hang in con_lai if ma_hang not in da_co]
+            if not chua_co:
+                return
+
+            try:
+                with transaction.atomic():
+                    DoanhSoHangNgay.objects.bulk_create([
+                        DoanhSoHangNgay(
+                            ngay=ngay,
+                            hang_hoa_id=ma_hang,
+                            so_luong=doanh_so[ma_hang][0],
+                            doanh_thu=doanh_so[ma_hang][1]
+                        )
+                        for ma_hang in chua_co
+                    ])
+                return
+            except IntegrityError:
+                # Giao dịch khác vừa tạo một số dòng: cả khối INSERT bị
+                # hủy, lặp lại với các hàng hóa chưa được cộng
+                con_lai = chua_co
+
+    @staticmethod
+    def _loc(
+        tu_ngay: date,
+        den_ngay: date,
+        ma_loai_hang: Optional[int] = None,
+        ma_thuong_hieu: Optional[int] = None
+    ) -> QuerySet:
+        qs = DoanhSoHangNgay.objects.filter(ngay__gte=tu_ngay, ngay__lt=den_ngay)
+        if ma_loai_hang is not None:
+            qs = qs.filter(hang_hoa__ma_loai_hang_id=ma_loai_hang)
+        if ma_thuong_hieu is not None:
+            qs = qs.filter(hang_hoa__ma_thuong_hieu_id=ma_thuong_hieu)
+        return qs
+
+    @staticmethod
+    def top_hang_hoa(
+        tu_ngay: date,
+        den_ngay: date,
+        theo: str,
+        n: int,
+        ma_loai_hang: Optional[int] = None,
+        ma_thuong_hieu: Optional[int] = None
+    ) -> QuerySet:
+        """
+        Top n hàng hóa theo số lượng bán hoặc doanh thu trong [tu_ngay, den_ngay).
+
+        Một truy vấn JOIN + GROUP BY + TOP n; CSDL chỉ giữ n dòng
+        tốt nhất khi sắp xếp, không trả toàn bộ về Python.
+
+        :param theo: 'so_luong' | 'doanh_thu'
+        :return: QuerySet [{"hang_hoa_id", "hang_hoa__ten_hang",
+                            "tong_so_luong", "tong_doanh_thu"}]
+        """
+        tieu_chi = 'tong_so_luong' if theo == 'so_luong' else 'tong_doanh_thu'
+        return (
+            DoanhSoHangNgayRepository._loc(
+                tu_ngay, den_ngay, ma_loai_hang, ma_thuong_hieu
+            )
+            .values('hang_hoa_id', 'hang_hoa__ten_hang')
+            .annotate(
+                tong_so_luong=Sum('so_luong'),
+                tong_doanh_thu=Sum('doanh_thu')
+            )
+            .order_by(f'-{tieu_chi}', 'hang_hoa_id')[:n]
+        )
+
+    @staticmethod
+    def so_luong_ban_theo_hang_hoa(tu_ngay: date) -> Dict[int, int]:
+        """
+        Tổng số lượng bán của từng hàng hóa từ tu_ngay đến nay,
+        dùng làm độ phổ biến (ví dụ xếp hạng gợi ý khi gõ).
+
+        :param tu_ngay: Ngày bắt đầu (bao gồm)
+        :return: {mã hàng: số lượng bán}
+        """
+        return dict(
+            DoanhSoHangNgay.objects
+            .filter(ngay__gte=tu_ngay)
+            .values('hang_hoa_id')
+            .annotate(tong_so_luong=Sum('so_luong'))
+            .order_by()
+            .values_list('hang_hoa_id', 'tong_so_luong')
+        )
+
+    @staticmethod
+    def iter_theo_hang_hoa(tu_ngay: date, den_ngay: date) -> Iterator[Dict]:
+        """
+        Duyệt doanh số đã gộp theo từng hàng hóa (kèm loại hàng,
+        thương hiệu) trong [tu_ngay, den_ngay), đọc theo khối.
+
+        :return: Iterator [{"hang_hoa_id", "hang_hoa__ten_hang",
+                            "ma_loai_hang", "ten_loai_hang",
+                            "ma_thuong_hieu", "ten_thuong_hieu",
+                            "tong_so_luong", "tong_doanh_thu"}]
+        """
+        return (
+            DoanhSoHangNgayRepository._loc(tu_ngay, den_ngay)
+            .values(
+                'hang_hoa_id',
+                'hang_hoa__ten_hang',
+                ma_loai_hang=F('hang_hoa__ma_loai_hang_id'),
+                ten_loai_hang=F('hang_hoa__ma_loai_hang__ten_loai'),
+                ma_thuong_hieu=F('hang_hoa__ma_thuong_hieu_id'),
+                ten_thuong_hieu=F('hang_hoa__ma_thuong_hieu__ten_thuong_hieu'),
+            )
+            .annotate(
+                tong_so_luong=Sum('so_luong'),
+                tong_doanh_thu=Sum('doanh_thu')
+            )
+            .order_by()
+            .iterator(chunk_size=2000)
+        )
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(
+        tu_ngay: Optional[date] = None,
+        den_ngay: Optional[date] = None
+    ) -> int:
+        """
+        Tính lại bảng tổng hợp từ CHI_TIET_HOA_DON trong khoảng ngày
+        [tu_ngay, den_ngay). Bỏ trống một đầu nghĩa là không giới hạn.
+
+        :param tu_ngay: Ngày bắt đầu (bao gồm)
+        :param den_ngay: Ngày kết thúc (không bao gồm)
+        :return: Số dòng tổng hợp được ghi
+        """
+        from QuanLyHoaDon.models.chi_tiet_hoa_don import ChiTietHoaDon
+
+        tong_hop = DoanhSoHangNgay.objects.all()
+        chi_tiets = ChiTietHoaDon.objects.all()
+
+        if tu_ngay:
+            tong_hop = tong_hop.filter(ngay__gte=tu_ngay)
+            chi_tiets = chi_tiets.filter(hoa_don__ngay_lap__gte=datetime.combine(
+                tu_ngay, time.min, tzinfo=MUI_GIO_BAO_CAO
+            ))
+        if den_ngay:
+            tong_hop = tong_hop.filter(ngay__lt=den_ngay)
+            chi_tiets = chi_tiets.filter(hoa_don__ngay_lap__lt=datetime.combine(
+                den_ngay, time.min, tzinfo=MUI_GIO_BAO_CAO
+            ))
+
+        tong_hop.delete()
+
+        rows = (
+            chi_tiets
+            .annotate(ngay=TruncDate('hoa_don__ngay_lap', tzinfo=MUI_GIO_BAO_CAO))
+            .values('ngay', 'hang_hoa_id')
+            .annotate(
+                tong_so_luong=Sum('so_luong'),
+                tong_doanh_thu=Sum('thanh_tien')
+            )
+            .order_by()
+        )
+
+        so_dong = 0
+        batch = []
+        for row in rows.iterator(chunk_size=2000):
+            batch.append(DoanhSoHangNgay(
+                ngay=row['ngay'],
+                hang_hoa_id=row['hang_hoa_id'],
+                so_luong=row['tong_so_luong'] or 0,
+                doanh_thu=row['tong_doanh_thu'] or Decimal(0)
+            ))
+            if len(batch) >= 2000:
+                DoanhSoHangNgay.objects.bulk_create(batch, batch_size=500)
+                so_dong += len(batch)
+                batch = []
+
+        if batch:
+            DoanhSoHangNgay.objects.bulk_create(batch, batch_size=500)
+            so_dong += len(batch)
+
+        return so_dong
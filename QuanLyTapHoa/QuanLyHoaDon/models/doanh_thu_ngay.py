@@ -0,0 +1,266 @@
+# models/doanh_thu_ngay.py
+"""
+Model DoanhThuNgay
+
+Bảng tổng hợp doanh thu theo ngày (giờ Việt Nam) và nhân viên,
+được cộng dồn ngay trong transaction tạo hóa đơn. Các thống kê
+doanh thu theo tháng / năm / nhân viên đọc từ bảng này thay vì
+quét toàn bộ HOA_DON.
+"""
+
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, QuerySet, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear, Trunc, TruncDate
+
+# Múi giờ dùng để xác định "ngày" của hóa đơn trong báo cáo
+MUI_GIO_BAO_CAO = ZoneInfo('Asia/Ho_Chi_Minh')
+
+
+class DoanhThuNgay(models.Model):
+    """
+    Model đại diện cho một dòng tổng hợp doanh thu
+    của một nhân viên trong một ngày.
+    """
+
+    ma_dtn = models.AutoField(
+        primary_key=True,
+        db_column='MaDTN'
+    )
+
+    ngay = models.DateField(
+        db_column='Ngay'
+    )
+
+    nhan_vien = models.ForeignKey(
+        'QuanLyNhanSu.NhanVien',
+        on_delete=models.PROTECT,
+        db_column='MaNV',
+        related_name='doanh_thu_ngays'
+    )
+
+    so_hoa_don = models.IntegerField(
+        default=0,
+        db_column='SoHoaDon'
+    )
+
+    tong_doanh_thu = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        default=0,
+        db_column='TongDoanhThu'
+    )
+
+    class Meta:
+        """
+        Cấu hình ánh xạ model với bảng DOANH_THU_NGAY
+        (tạo bằng sql/02_doanh_thu_ngay.sql).
+        """
+        db_table = 'DOANH_THU_NGAY'
+        managed = False
+        unique_together = (('ngay', 'nhan_vien'),)
+
+    def __str__(self):
+        """
+        Hiển thị chuỗi đại diện của dòng tổng hợp.
+        """
+        return f"{self.ngay} - NV {self.nhan_vien_id}"
+
+
+class DoanhThuNgayRepository:
+    """
+    Repository cập nhật và truy vấn bảng tổng hợp doanh thu theo ngày.
+    """
+
+    @staticmethod
+    def ngay_bao_cao(thoi_diem: datetime) -> date:
+        """
+        Đổi thời điểm lập hóa đơn sang ngày theo giờ Việt Nam.
+
+        :param thoi_diem: Thời điểm (aware datetime)
+        :return: Ngày dùng làm khóa tổng hợp
+        """
+        return thoi_diem.astimezone(MUI_GIO_BAO_CAO).date()
+
+    @staticmethod
+    def cong_don(ngay: date, ma_nv: int, tong_tien: Decimal) -> None:
+        """
+        Cộng một hóa đơn vào dòng tổng hợp (ngay, ma_nv).
+
+        Thông thường chỉ tốn một câu UPDATE; hóa đơn đầu tiên
+        trong ngày của nhân viên sẽ INSERT dòng mới. Nếu hai giao dịch
+        cùng INSERT, giao dịch thua (vi phạm unique) sẽ UPDATE lại.
+        Phải được gọi trong transaction tạo hóa đơn.
+
+        :param ngay: Ngày báo cáo
+        :param ma_nv: Mã nhân viên
+        :param tong_tien: Tổng tiền hóa đơn
+        """
+        def cap_nhat() -> int:
+            return DoanhThuNgay.objects.filter(
+                ngay=ngay,
+                nhan_vien_id=ma_nv
+            ).update(
+                so_hoa_don=F('so_hoa_don') + 1,
+                tong_doanh_thu=F('tong_doanh_thu') + tong_tien
+            )
+
+        if cap_nhat():
+            return
+
+        try:
+            with transaction.atomic():
+                DoanhThuNgay.objects.create(
+                    ngay=ngay,
+                    nhan_vien_id=ma_nv,
+                    so_hoa_don=1,
+                    tong_doanh_thu=tong_tien
+                )
+        except IntegrityError:
+            cap_nhat()
+
+    @staticmethod
+    def thong_ke_theo_thang(nam: int) -> QuerySet:
+        """
+        Doanh thu theo từng tháng trong năm.
+
+        Lọc theo khoảng ngày nên dùng được chỉ mục trên cột Ngay.
+
+        :param nam: Năm cần thống kê
+        :return: QuerySet [{"thang", "tong_doanh_thu", "so_hoa_don"}]
+        """
+        return (
+            DoanhThuNgay.objects
+            .filter(ngay__gte=date(nam, 1, 1), ngay__lt=date(nam + 1, 1, 1))
+            .annotate(thang=ExtractMonth('ngay'))
+            .values('thang')
+            .annotate(
+                tong_doanh_thu=Sum('tong_doanh_thu'),
+                so_hoa_don=Sum('so_hoa_don')
+            )
+            .order_by('thang')
+        )
+
+    @staticmethod
+    def thong_ke_theo_nam() -> QuerySet:
+        """
+        Doanh thu theo từng năm.
+
+        :return: QuerySet [{"nam", "tong_doanh_thu", "so_hoa_don"}]
+        """
+        return (
+            DoanhThuNgay.objects
+            .annotate(nam=ExtractYear('ngay'))
+            .values('nam')
+            .annotate(
+                tong_doanh_thu=Sum('tong_doanh_thu'),
+                so_hoa_don=Sum('so_hoa_don')
+            )
+            .order_by('nam')
+        )
+
+    @staticmethod
+    def thong_ke_theo_nhan_vien() -> QuerySet:
+        """
+        Số hóa đơn và tổng doanh thu theo nhân viên
+        (cùng cấu trúc với HoaDonRepository.thong_ke_theo_nhan_vien).
+
+        :return: QuerySet [{"nhan_vien_id", "nhan_vien__ho_ten",
+                            "so_hoa_don", "tong_doanh_thu"}]
+        """
+        return (
+            DoanhThuNgay.objects
+            .values('nhan_vien_id', 'nhan_vien__ho_ten')
+            .annotate(
+                so_hoa_don=Sum('so_hoa_don'),
+                tong_doanh_thu=Sum('tong_doanh_thu')
+            )
+            .order_by('nhan_vien_id')
+        )
+
+    @staticmethod
+    def chuoi_doanh_thu(tu_ngay: date, den_ngay: date, buoc: str) -> QuerySet:
+        """
+        Doanh thu và số hóa đơn theo mốc ngày / tuần / tháng / năm
+        trong khoảng ngày [tu_ngay, den_ngay), một truy vấn GROUP BY.
+
+        :param tu_ngay: Ngày bắt đầu (bao gồm)
+        :param den_ngay: Ngày kết thúc (không bao gồm)
+        :param buoc: 'day' | 'week' | 'month' | 'year'
+        :return: QuerySet [{"moc", "tong_doanh_thu", "so_hoa_don"}]
+        """
+        return (
+            DoanhThuNgay.objects
+            .filter(ngay__gte=tu_ngay, ngay__lt=den_ngay)
+            .annotate(moc=Trunc('ngay', buoc, output_field=models.DateField()))
+            .values('moc')
+            .annotate(
+                tong_doanh_thu=Sum('tong_doanh_thu'),
+                so_hoa_don=Sum('so_hoa_don')
+            )
+            .order_by('moc')
+        )
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(
+        tu_ngay: Optional[date] = None,
+        den_ngay: Optional[date] = None
+    ) -> int:
+        """
+        Tính lại bảng tổng hợp từ HOA_DON trong khoảng ngày [tu_ngay, den_ngay).
+        Bỏ trống một đầu nghĩa là không giới hạn đầu đó.
+
+        Dùng để nạp dữ liệu lần đầu hoặc sửa lệch sau khi hóa đơn
+        bị chỉnh sửa trực tiếp trong CSDL.
+
+        :param tu_ngay: Ngày bắt đầu (bao gồm)
+        :param den_ngay: Ngày kết thúc (không bao gồm)
+        :return: Số dòng tổng hợp được ghi
+        """
+        from QuanLyHoaDon.models.hoa_don import HoaDon
+
+        tong_hop = DoanhThuNgay.objects.all()
+        hoa_dons = HoaDon.objects.all()
+
+        if tu_ngay:
+            tong_hop = tong_hop.filter(ngay__gte=tu_ngay)
+            hoa_dons = hoa_dons.filter(ngay_lap__gte=datetime.combine(
+                tu_ngay, time.min, tzinfo=MUI_GIO_BAO_CAO
+            ))
+        if den_ngay:
+            tong_hop = tong_hop.filter(ngay__lt=den_ngay)
+            hoa_dons = hoa_dons.filter(ngay_lap__lt=datetime.combine(
+                den_ngay, time.min, tzinfo=MUI_GIO_BAO_CAO
+            ))
+
+        tong_hop.delete()
+
+        rows = (
+            hoa_dons
+            .annotate(ngay=TruncDate('ngay_lap', tzinfo=MUI_GIO_BAO_CAO))
+            .values('ngay', 'nhan_vien_id')
+            .annotate(
+                so_hoa_don=Count('ma_hd'),
+                tong_doanh_thu=Sum('tong_tien')
+            )
+            .order_by()
+        )
+
+        objs = DoanhThuNgay.objects.bulk_create(
+            [
+                DoanhThuNgay(
+                    ngay=row['ngay'],
+                    nhan_vien_id=row['nhan_vien_id'],
+                    so_hoa_don=row['so_hoa_don'],
+                    tong_doanh_thu=row['tong_doanh_thu'] or Decimal(0)
+                )
+                for row in rows.iterator()
+            ],
+            batch_size=500
+        )
+        return len(objs)
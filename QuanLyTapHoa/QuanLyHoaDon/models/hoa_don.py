@@ -1,7 +1,7 @@
 # models/hoa_don.py
 from django.db import models
 from django.db.models import Count, Sum
-from django.db.models.functions import ExtractMonth
+from django.db.models.functions import Trunc
 """
 Model HoaDon
 
@@ -11,7 +11,6 @@ Lưu thông tin hóa đơn bán hàng, nhân viên lập hóa đơn và tổng t
 
 from django.db import models
 from django.db.models import Count, Sum
-from django.db.models.functions import ExtractMonth
 
 
 class HoaDon(models.Model):
@@ -63,23 +62,49 @@ Cung cấp các phương thức thao tác dữ liệu cho model HoaDon.
 Bao gồm CRUD và các truy vấn thống kê.
 """
 from typing import Optional
-from django.db.models import QuerySet
+from django.db.models import Prefetch, QuerySet, prefetch_related_objects
 from django.utils import timezone
 from decimal import Decimal
 
 from QuanLyHoaDon.models.hoa_don import HoaDon
+from QuanLyHoaDon.models.chi_tiet_hoa_don import ChiTietHoaDon
 
 class HoaDonRepository:
     """
     Repository xử lý truy vấn và thao tác dữ liệu liên quan đến HoaDon.
     """
 
+    @staticmethod
+    def kem_chi_tiet(qs: QuerySet[HoaDon]) -> QuerySet[HoaDon]:
+        """
+        Gắn kế hoạch nạp dữ liệu đủ cho HoaDonSerializer:
+        chi tiết hóa đơn (1 truy vấn cho cả danh sách) kèm hàng hóa,
+        đơn vị tính, loại hàng, thương hiệu (JOIN trong cùng truy vấn).
+
+        Danh sách N hóa đơn luôn tốn đúng 2 truy vấn.
+
+        :param qs: QuerySet hóa đơn
+        :return: QuerySet đã gắn prefetch_related / select_related
+        """
+        return qs.prefetch_related(HoaDonRepository._prefetch_chi_tiet())
+
+    @staticmethod
+    def _prefetch_chi_tiet() -> Prefetch:
+        return Prefetch(
+            'chi_tiets',
+            queryset=ChiTietHoaDon.objects.select_related(
+                'hang_hoa__ma_dvt',
+                'hang_hoa__ma_loai_hang',
+                'hang_hoa__ma_thuong_hieu',
+            )
+        )
+
     @staticmethod
     def get_all() -> QuerySet[HoaDon]:
         """
-        Lấy danh sách tất cả hóa đơn.
+        Lấy danh sách tất cả hóa đơn (kèm chi tiết, xem kem_chi_tiet).
         """
-        return HoaDon.objects.all()
+        return HoaDonRepository.kem_chi_tiet(HoaDon.objects.all())
 
     @staticmethod
     def get_by_id(ma_hd: int) -> Optional[HoaDon]:
@@ -97,10 +122,10 @@ class HoaDonRepository:
     @staticmethod
     def get_by_nhan_vien(ma_nv: int) -> QuerySet[HoaDon]:
         """
-        Lấy danh sách hóa đơn theo nhân viên.
+        Lấy danh sách hóa đơn theo nhân viên (kèm chi tiết, xem kem_chi_tiet).
         """
-        return HoaDon.objects.filter(
-            nhan_vien_id=ma_nv
+        return HoaDonRepository.kem_chi_tiet(
+            HoaDon.objects.filter(nhan_vien_id=ma_nv)
         )
 
     @staticmethod
@@ -124,6 +149,21 @@ class HoaDonRepository:
         obj.save()
         return obj
 
+    @staticmethod
+    def nap_chi_tiet(hoa_don: HoaDon) -> HoaDon:
+        """
+        Nạp chi tiết (kèm hàng hóa) cho một hóa đơn đã có, giống
+        kem_chi_tiet: một truy vấn, HoaDonSerializer không truy vấn thêm.
+
+        Gọi trong transaction vừa ghi hóa đơn thì hàng hóa mang giá trị
+        sau khi ghi (vd. tồn kho sau khi bán).
+
+        :param hoa_don: Hóa đơn
+        :return: Chính hóa đơn đó
+        """
+        prefetch_related_objects([hoa_don], HoaDonRepository._prefetch_chi_tiet())
+        return hoa_don
+
     @staticmethod
     def update(ma_hd: int, **kwargs) -> Optional[HoaDon]:
         """
@@ -173,17 +213,28 @@ class HoaDonRepository:
         )
 
     @staticmethod
-    def thong_ke_doanh_thu_theo_nam(nam: int):
+    def chuoi_doanh_thu(tu, den, buoc: str, tzinfo):
         """
-        Thống kê doanh thu theo từng tháng trong năm.
+        Doanh thu và số hóa đơn theo từng mốc thời gian trong [tu, den).
+
+        Một truy vấn GROUP BY duy nhất; điều kiện lọc là khoảng
+        NgayLap >= tu AND NgayLap < den nên dùng được chỉ mục trên NgayLap
+        (không bọc cột trong hàm như ngay_lap__year).
 
-        :param nam: Năm cần thống kê
+        :param tu: Thời điểm bắt đầu (bao gồm)
+        :param den: Thời điểm kết thúc (không bao gồm)
+        :param buoc: 'hour' | 'day' | 'week' | 'month' | 'year'
+        :param tzinfo: Múi giờ dùng để cắt mốc
+        :return: QuerySet [{"moc", "tong_doanh_thu", "so_hoa_don"}]
         """
         return (
             HoaDon.objects
-            .filter(ngay_lap__year=nam)
-            .annotate(thang=ExtractMonth('ngay_lap'))
-            .values('thang')
-            .annotate(tong_doanh_thu=Sum('tong_tien'))
-            .order_by('thang')
+            .filter(ngay_lap__gte=tu, ngay_lap__lt=den)
+            .annotate(moc=Trunc('ngay_lap', buoc, tzinfo=tzinfo))
+            .values('moc')
+            .annotate(
+                tong_doanh_thu=Sum('tong_tien'),
+                so_hoa_don=Count('ma_hd')
+            )
+            .order_by('moc')
         )
@@ -0,0 +1,138 @@
+# models/mua_kem.py
+"""
+Model MuaKem
+
+Kết quả phân tích giỏ hàng: với mỗi hàng hóa, lưu các hàng hóa
+thường được mua kèm nhất (theo lift hoặc độ tin cậy).
+Bảng được ghi lại toàn bộ mỗi lần chạy lệnh phan_tich_mua_kem.
+"""
+
+from typing import Dict, Iterable, List
+
+from django.db import models, transaction
+from django.db.models import QuerySet
+
+
+class MuaKem(models.Model):
+    """
+    Model đại diện cho quy tắc "mua hàng A thì thường mua kèm hàng B".
+    """
+
+    ma_mk = models.AutoField(
+        primary_key=True,
+        db_column='MaMK'
+    )
+
+    hang_hoa = models.ForeignKey(
+        'QuanLyHangHoa.HangHoa',
+        on_delete=models.CASCADE,
+        db_column='MaHang',
+        related_name='mua_kems'
+    )
+
+    hang_hoa_kem = models.ForeignKey(
+        'QuanLyHangHoa.HangHoa',
+        on_delete=models.CASCADE,
+        db_column='MaHangKem',
+        related_name='+'
+    )
+
+    thu_hang = models.SmallIntegerField(
+        db_column='ThuHang'
+    )
+
+    so_hoa_don = models.IntegerField(
+        db_column='SoHoaDon'
+    )
+
+    ho_tro = models.FloatField(
+        db_column='HoTro'
+    )
+
+    do_tin_cay = models.FloatField(
+        db_column='DoTinCay'
+    )
+
+    do_nang = models.FloatField(
+        db_column='DoNang'
+    )
+
+    ngay_tinh = models.DateTimeField(
+        db_column='NgayTinh'
+    )
+
+    class Meta:
+        """
+        Cấu hình ánh xạ model với bảng MUA_KEM
+        (tạo bằng sql/04_mua_kem.sql).
+        """
+        db_table = 'MUA_KEM'
+        managed = False
+        unique_together = (('hang_hoa', 'thu_hang'),)
+
+    def __str__(self):
+        """
+        Hiển thị chuỗi đại diện của quy tắc mua kèm.
+        """
+        return f"HH {self.hang_hoa_id} -> HH {self.hang_hoa_kem_id}"
+
+
+class MuaKemRepository:
+    """
+    Repository ghi và tra cứu kết quả phân tích mua kèm.
+    """
+
+    @staticmethod
+    @transaction.atomic
+    def thay_the_toan_bo(ban_ghis: Iterable[MuaKem], batch_size: int = 1000) -> int:
+        """
+        Thay toàn bộ kết quả cũ bằng kết quả mới trong một transaction,
+        API tra cứu không bao giờ thấy bảng ở trạng thái dở dang.
+
+        :param ban_ghis: Các bản ghi MuaKem chưa lưu
+        :param batch_size: Số dòng mỗi câu INSERT
+        :return: Số dòng đã ghi
+        """
+        MuaKem.objects.all().delete()
+
+        so_dong = 0
+        batch: List[MuaKem] = []
+        for ban_ghi in ban_ghis:
+            batch.append(ban_ghi)
+            if len(batch) >= batch_size:
+                MuaKem.objects.bulk_create(batch)
+                so_dong += len(batch)
+                batch = []
+
+        if batch:
+            MuaKem.objects.bulk_create(batch)
+            so_dong += len(batch)
+
+        return so_dong
+
+    @staticmethod
+    def get_by_hang_hoa(ma_hang: int, n: int) -> QuerySet:
+        """
+        Lấy n hàng hóa mua kèm tốt nhất của một hàng hóa
+        (seek trên chỉ mục duy nhất (MaHang, ThuHang)).
+
+        :param ma_hang: Mã hàng hóa
+        :param n: Số hàng hóa mua kèm cần lấy
+        :return: QuerySet [{"hang_hoa_kem_id", "hang_hoa_kem__ten_hang",
+                            "so_hoa_don", "ho_tro", "do_tin_cay",
+                            "do_nang", "ngay_tinh"}]
+        """
+        return (
+            MuaKem.objects
+            .filter(hang_hoa_id=ma_hang)
+            .order_by('thu_hang')
+            .values(
+                'hang_hoa_kem_id',
+                'hang_hoa_kem__ten_hang',
+                'so_hoa_don',
+                'ho_tro',
+                'do_tin_cay',
+                'do_nang',
+                'ngay_tinh',
+            )[:n]
+        )
@@ -5,6 +5,9 @@ Serializers cho module Hóa Đơn.
     + READ: trả về thông tin hàng hóa dạng object
     + WRITE: nhận ID hàng hóa để tạo chi tiết hóa đơn
 
+- ChiTietHoaDonListSerializer:
+    + Nạp toàn bộ hàng hóa của danh sách chi tiết bằng một truy vấn
+
 - HoaDonSerializer:
     + Nhận danh sách chi tiết hóa đơn
     + Validate số lượng và nghiệp vụ cơ bản
@@ -17,6 +20,48 @@ from QuanLyHangHoa.serializers import HangHoaSerializer
 from QuanLyHoaDon.models.hoa_don import HoaDon
 
 
+class ChiTietHoaDonListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer cho danh sách chi tiết hóa đơn.
+
+    Thay vì mỗi dòng tự truy vấn hàng hóa của mình, toàn bộ
+    hang_hoa_id trong payload được gom lại và nạp bằng một truy vấn IN
+    (kèm select_related các quan hệ mà response cần). Mọi mã hàng
+    không tồn tại được báo lỗi cùng lúc, đúng vị trí từng dòng.
+    """
+
+    def to_internal_value(self, data):
+        """
+        Validate từng dòng, sau đó thay hang_hoa_id bằng đối tượng
+        HangHoa đã nạp sẵn (key "hang_hoa").
+        """
+        items = super().to_internal_value(data)
+
+        hang_hoas = (
+            HangHoa.objects
+            .select_related("ma_dvt", "ma_loai_hang", "ma_thuong_hieu")
+            .in_bulk({item["hang_hoa_id"] for item in items})
+        )
+
+        errors = []
+        for item in items:
+            ma_hang = item["hang_hoa_id"]
+            if ma_hang in hang_hoas:
+                errors.append({})
+            else:
+                errors.append({
+                    "hang_hoa_id": [f"Hàng hóa {ma_hang} không tồn tại"]
+                })
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        for item in items:
+            item["hang_hoa"] = hang_hoas[item.pop("hang_hoa_id")]
+
+        return items
+
+
 class ChiTietHoaDonSerializer(serializers.ModelSerializer):
     """
     Serializer cho ChiTietHoaDon.
@@ -25,20 +70,22 @@ class ChiTietHoaDonSerializer(serializers.ModelSerializer):
         - Trả về thông tin hàng hóa (object lồng).
     WRITE:
         - Nhận hang_hoa_id để tạo chi tiết hóa đơn.
+        - hang_hoa_id được ChiTietHoaDonListSerializer đổi thành
+          đối tượng HangHoa cho cả danh sách (many=True).
     """
 
     # READ
     hang_hoa = HangHoaSerializer(read_only=True)
 
     # WRITE
-    hang_hoa_id = serializers.PrimaryKeyRelatedField(
-        queryset=HangHoa.objects.all(),
-        source="hang_hoa",
+    hang_hoa_id = serializers.IntegerField(
+        min_value=1,
         write_only=True
     )
 
     class Meta:
         model = ChiTietHoaDon
+        list_serializer_class = ChiTietHoaDonListSerializer
         fields = [
             "hang_hoa",
             "hang_hoa_id",
@@ -7,12 +7,15 @@ Chịu trách nhiệm:
 - Kiểm tra tồn kho
 - Trừ tồn kho hàng hóa
 - Tính tổng tiền hóa đơn
+- Xuất dữ liệu hóa đơn theo khoảng thời gian
 - Gọi Repository để thao tác dữ liệu
 
 Service KHÔNG làm việc trực tiếp với request/response.
 """
 
-from typing import Dict
+import heapq
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterator, List, Optional
 from django.db import transaction
 from django.utils import timezone
 from django.db.models import QuerySet
@@ -21,6 +24,12 @@ from decimal import Decimal
 from QuanLyHoaDon.models.hoa_don import HoaDonRepository
 from QuanLyHoaDon.models.hoa_don import HoaDon
 from QuanLyHoaDon.models.chi_tiet_hoa_don import ChiTietHoaDonRepository
+from QuanLyHoaDon.models.doanh_thu_ngay import (
+    DoanhThuNgayRepository,
+    MUI_GIO_BAO_CAO
+)
+from QuanLyHoaDon.models.doanh_so_hang_ngay import DoanhSoHangNgayRepository
+from QuanLyHoaDon.services.thong_ke_cache import ThongKeDoanhThuCache
 from QuanLyHangHoa.services.hang_hoa_service import HangHoaService
 from QuanLyHangHoa.models.hang_hoa import HangHoa
 
@@ -30,18 +39,44 @@ class HoaDonService:
     Service xử lý toàn bộ nghiệp vụ liên quan đến Hóa Đơn.
     """
 
+    # Bước thời gian hỗ trợ cho chuỗi doanh thu (tên theo Trunc của Django)
+    CAC_BUOC_THOI_GIAN = ("hour", "day", "week", "month", "year")
+
+    # Giới hạn số mốc của một chuỗi (2 năm theo giờ ~ 17.520 mốc)
+    SO_MOC_TOI_DA = 50000
+
+    # Nhóm hỗ trợ cho phân tích bán hàng theo nhóm: (khóa mã, khóa tên)
+    CAC_NHOM_HANG_HOA = {
+        "loai_hang": ("ma_loai_hang", "ten_loai_hang"),
+        "thuong_hieu": ("ma_thuong_hieu", "ten_thuong_hieu"),
+    }
+
+    # Số hàng hóa tối đa trong một bảng xếp hạng
+    TOP_TOI_DA = 100
+
+    # Tiền trả về làm tròn 2 chữ số lẻ như DecimalField(decimal_places=2)
+    _HAI_CHU_SO = Decimal("0.01")
+
     @staticmethod
     @transaction.atomic
     def create_hoa_don(validated_data: Dict):
         """
         Tạo mới hóa đơn và các chi tiết hóa đơn.
 
-        Quy trình:
-        1. Kiểm tra tồn kho cho từng hàng hóa
-        2. Tạo hóa đơn
-        3. Tạo chi tiết hóa đơn
-        4. Trừ tồn kho hàng hóa
-        5. Tính và cập nhật tổng tiền
+        Quy trình (số câu lệnh SQL không phụ thuộc số dòng hóa đơn):
+        1. Gộp các dòng trùng hàng hóa, kiểm tra sơ bộ tồn kho
+           trên hàng hóa đã nạp khi validate (ChiTietHoaDonListSerializer),
+           hàng hóa phân mảnh lấy tổng các phân mảnh
+        2. Tính tổng tiền trước khi tạo hóa đơn
+        3. Tạo hóa đơn với tổng tiền đã tính
+        4. Trừ tồn kho bằng một câu UPDATE có điều kiện cho tất cả
+           hàng hóa, ghi sổ biến động kho (kèm mã hóa đơn) trong cùng
+           câu lệnh; thiếu tồn kho ở bất kỳ dòng nào sẽ hủy cả hóa đơn
+        5. Tạo toàn bộ chi tiết hóa đơn bằng một câu INSERT nhiều dòng,
+           nạp lại chi tiết kèm hàng hóa (một truy vấn, trong transaction)
+           để hóa đơn trả về có tồn kho sau khi bán
+        6. Cộng dồn doanh thu vào bảng tổng hợp DOANH_THU_NGAY
+           và doanh số từng hàng hóa vào DOANH_SO_HANG_NGAY
 
         Args:
             validated_data (Dict): dữ liệu đã được HoaDonSerializer validate
@@ -56,54 +91,80 @@ class HoaDonService:
         chi_tiet_hoa_dons = validated_data.pop("chi_tiets")
         nhan_vien = validated_data["nhan_vien"]
 
-        # Kiểm tra tồn kho trước khi tạo hóa đơn
+        # Gộp các dòng cùng hàng hóa (CHI_TIET_HOA_DON duy nhất theo MaHD, MaHang)
+        dong_theo_hang: Dict[int, Dict] = {}
         for ct in chi_tiet_hoa_dons:
             hang_hoa: HangHoa = ct["hang_hoa"]
-            so_luong = ct["so_luong"]
-
-            if hang_hoa.so_luong_ton < so_luong:
+            dong = dong_theo_hang.get(hang_hoa.ma_hang)
+            if dong:
+                dong["so_luong"] += ct["so_luong"]
+                continue
+
+            dong_theo_hang[hang_hoa.ma_hang] = {
+                "hang_hoa": hang_hoa,
+                "so_luong": ct["so_luong"],
+                "don_gia": Decimal(ct.get("don_gia", hang_hoa.gia_ban)),
+            }
+
+        # Kiểm tra sơ bộ để báo lỗi rõ ràng; UPDATE có điều kiện bên dưới
+        # mới là kiểm tra quyết định. so_luong_ton của hàng hóa phân mảnh
+        # là bản sao chỉ được đồng bộ định kỳ (vd. chưa tính lần nhập mới),
+        # nên thay bằng tổng các phân mảnh (một truy vấn, chỉ khi có)
+        HangHoaService.gan_ton_kho_phan_manh(
+            [dong["hang_hoa"] for dong in dong_theo_hang.values()]
+        )
+        tong_tien = Decimal(0)
+        for dong in dong_theo_hang.values():
+            hang_hoa: HangHoa = dong["hang_hoa"]
+            if hang_hoa.so_luong_ton < dong["so_luong"]:
                 raise ValueError(
                     f"Hàng '{hang_hoa.ten_hang}' không đủ tồn kho"
                 )
 
-        # Tạo hóa đơn
+            tong_tien += Decimal(dong["so_luong"]) * dong["don_gia"]
+
+        # Tạo hóa đơn với tổng tiền đã tính sẵn (trước khi trừ tồn kho
+        # để sổ biến động kho ghi được mã hóa đơn)
         hoa_don = HoaDonRepository.create(
             ma_nv=nhan_vien.ma_nv,
             ngay_lap=timezone.now(),
-            tong_tien=0
+            tong_tien=tong_tien
         )
 
-        tong_tien = Decimal(0)
-
-        # Tạo chi tiết hóa đơn và trừ tồn kho
-        for ct in chi_tiet_hoa_dons:
-            hang_hoa: HangHoa = ct["hang_hoa"]
-            so_luong = ct["so_luong"]
-            don_gia = ct.get("don_gia", hang_hoa.gia_ban)
+        # Trừ tồn kho cho tất cả hàng hóa trong một câu lệnh
+        HangHoaService.tru_ton_kho_hang_loat({
+            ma_hang: dong["so_luong"]
+            for ma_hang, dong in dong_theo_hang.items()
+        }, ma_hd=hoa_don.ma_hd)
 
-            # Trừ tồn kho
-            HangHoaService.adjust_stock(
-                ma_hang=hang_hoa.ma_hang,
-                so_luong=-so_luong
-            )
-
-            thanh_tien = Decimal(so_luong) * Decimal(don_gia)
-            tong_tien += thanh_tien
+        # Tạo toàn bộ chi tiết hóa đơn trong một câu lệnh
+        chi_tiets = ChiTietHoaDonRepository.bulk_create(
+            hoa_don.ma_hd,
+            list(dong_theo_hang.values())
+        )
 
-            ChiTietHoaDonRepository.create(
-                ma_hd=hoa_don.ma_hd,
-                ma_hang=hang_hoa.ma_hang,
-                so_luong=so_luong,
-                don_gia=don_gia
-            )
+        # Hàng hóa đã nạp khi validate mang tồn kho trước khi bán (và
+        # trước các hóa đơn đồng thời): nạp lại sau UPDATE, các dòng
+        # HANG_HOA đang bị transaction này khóa nên giá trị đọc được là
+        # tồn kho sau khi bán; hàng hóa phân mảnh lấy tổng các phân mảnh
+        HoaDonRepository.nap_chi_tiet(hoa_don)
+        HangHoaService.gan_ton_kho_phan_manh(
+            [ct.hang_hoa for ct in hoa_don.chi_tiets.all()]
+        )
 
-        # Cập nhật tổng tiền hóa đơn
-        HoaDonRepository.update(
-            hoa_don.ma_hd,
-            **{"tong_tien": tong_tien}
+        # Cộng dồn vào các bảng tổng hợp (cùng transaction)
+        ngay_bao_cao = DoanhThuNgayRepository.ngay_bao_cao(hoa_don.ngay_lap)
+        DoanhThuNgayRepository.cong_don(
+            ngay=ngay_bao_cao,
+            ma_nv=nhan_vien.ma_nv,
+            tong_tien=tong_tien
         )
+        DoanhSoHangNgayRepository.cong_don(ngay_bao_cao, {
+            ct.hang_hoa_id: (ct.so_luong, ct.thanh_tien)
+            for ct in chi_tiets
+        })
 
-        return HoaDonRepository.get_by_id(hoa_don.ma_hd)
+        return hoa_don
 
     @staticmethod
     def get_all_hoa_don() -> QuerySet[HoaDon]:
@@ -136,6 +197,11 @@ class HoaDonService:
         Đảm bảo luôn trả về đủ 12 tháng,
         tháng không có dữ liệu sẽ có doanh thu = 0.
 
+        Đọc từ bảng tổng hợp DOANH_THU_NGAY (tối đa 365 dòng / nhân viên)
+        thay vì quét HOA_DON của cả năm. Tháng đã chốt được cache
+        lâu, tháng hiện tại cache với TTL ngắn
+        (xem ThongKeDoanhThuCache).
+
         Args:
             nam (int): năm cần thống kê
 
@@ -143,12 +209,13 @@ class HoaDonService:
             list[dict]: danh sách doanh thu theo tháng
         """
 
-        raw_data = HoaDonRepository.thong_ke_doanh_thu_theo_nam(nam)
+        def tinh_lai(nam: int) -> Dict[int, Decimal]:
+            return {
+                item["thang"]: item["tong_doanh_thu"]
+                for item in DoanhThuNgayRepository.thong_ke_theo_thang(nam)
+            }
 
-        doanh_thu_map = {
-            item["thang"]: item["tong_doanh_thu"]
-            for item in raw_data
-        }
+        doanh_thu_map = ThongKeDoanhThuCache.doanh_thu_theo_thang(nam, tinh_lai)
 
         result = []
         for thang in range(1, 13):
@@ -158,3 +225,342 @@ class HoaDonService:
             })
 
         return result
+
+    @staticmethod
+    def doanh_thu_theo_nam():
+        """
+        Thống kê doanh thu và số hóa đơn theo từng năm
+        (đọc từ bảng tổng hợp DOANH_THU_NGAY).
+
+        Returns:
+            list[dict]: [{"nam", "tong_doanh_thu", "so_hoa_don"}, ...]
+        """
+        return [
+            {
+                "nam": item["nam"],
+                "tong_doanh_thu": item["tong_doanh_thu"] or Decimal(0),
+                "so_hoa_don": item["so_hoa_don"] or 0,
+            }
+            for item in DoanhThuNgayRepository.thong_ke_theo_nam()
+        ]
+
+    @staticmethod
+    def chuoi_doanh_thu(tu: datetime, den: datetime, buoc: str) -> Dict:
+        """
+        Chuỗi thời gian doanh thu trong khoảng [tu, den) theo bước
+        giờ / ngày / tuần / tháng / năm (giờ Việt Nam).
+
+        - Một truy vấn GROUP BY với điều kiện khoảng thời gian.
+          Khoảng tròn ngày và bước từ ngày trở lên đọc từ bảng tổng hợp
+          DOANH_THU_NGAY, còn lại đọc trực tiếp HOA_DON.
+        - Mốc không có dữ liệu được điền 0 (giống thống kê 12 tháng).
+        - Kết quả là các mảng song song, gọn hơn danh sách dict.
+
+        Args:
+            tu (datetime): thời điểm bắt đầu (aware, bao gồm)
+            den (datetime): thời điểm kết thúc (aware, không bao gồm)
+            buoc (str): 'hour' | 'day' | 'week' | 'month' | 'year'
+
+        Raises:
+            ValueError: tham số không hợp lệ hoặc quá nhiều mốc
+
+        Returns:
+            dict: {
+                "buoc": str,
+                "moc": [str, ...],          # ISO, thời điểm bắt đầu mốc
+                "doanh_thu": [str, ...],    # tiền, chuỗi 2 chữ số lẻ
+                "so_hoa_don": [int, ...]
+            }
+        """
+        if buoc not in HoaDonService.CAC_BUOC_THOI_GIAN:
+            raise ValueError(
+                "buoc phải là một trong: "
+                + ", ".join(HoaDonService.CAC_BUOC_THOI_GIAN)
+            )
+
+        tu = tu.astimezone(MUI_GIO_BAO_CAO)
+        den = den.astimezone(MUI_GIO_BAO_CAO)
+        if tu >= den:
+            raise ValueError("tu phải nhỏ hơn den")
+
+        cac_moc = HoaDonService._cac_moc(tu, den, buoc)
+
+        tron_ngay = tu.time() == time.min and den.time() == time.min
+        if buoc != "hour" and tron_ngay:
+            rows = DoanhThuNgayRepository.chuoi_doanh_thu(
+                tu.date(), den.date(), buoc
+            )
+            khoa = lambda moc: moc
+        else:
+            rows = HoaDonRepository.chuoi_doanh_thu(
+                tu, den, buoc, MUI_GIO_BAO_CAO
+            )
+            if buoc == "hour":
+                khoa = lambda moc: moc
+            else:
+                khoa = lambda moc: moc.astimezone(MUI_GIO_BAO_CAO).date()
+
+        theo_moc = {khoa(row["moc"]): row for row in rows}
+
+        # Tiền giữ Decimal, trả chuỗi như DecimalField của các API khác
+        # (float làm sai số tiền lớn)
+        doanh_thu, so_hoa_don = [], []
+        for moc in cac_moc:
+            row = theo_moc.get(moc)
+            tien = (row["tong_doanh_thu"] if row else None) or Decimal(0)
+            doanh_thu.append(format(tien.quantize(HoaDonService._HAI_CHU_SO), "f"))
+            so_hoa_don.append((row["so_hoa_don"] or 0) if row else 0)
+
+        return {
+            "buoc": buoc,
+            "moc": [moc.isoformat() for moc in cac_moc],
+            "doanh_thu": doanh_thu,
+            "so_hoa_don": so_hoa_don,
+        }
+
+    @staticmethod
+    def _cac_moc(tu: datetime, den: datetime, buoc: str) -> List:
+        """
+        Sinh danh sách mốc (thời điểm bắt đầu mỗi bước) phủ [tu, den).
+
+        Bước giờ trả về datetime (giờ Việt Nam), bước từ ngày trở lên
+        trả về date.
+
+        Raises:
+            ValueError: khi số mốc vượt SO_MOC_TOI_DA
+        """
+        cac_moc = []
+
+        if buoc == "hour":
+            moc = tu.replace(minute=0, second=0, microsecond=0)
+            while moc < den:
+                cac_moc.append(moc)
+                if len(cac_moc) > HoaDonService.SO_MOC_TOI_DA:
+                    raise ValueError("Khoảng thời gian quá dài cho bước đã chọn")
+                moc += timedelta(hours=1)
+            return cac_moc
+
+        moc = tu.date()
+        if buoc == "week":
+            moc -= timedelta(days=moc.weekday())
+        elif buoc == "month":
+            moc = moc.replace(day=1)
+        elif buoc == "year":
+            moc = moc.replace(month=1, day=1)
+
+        den_ngay = den.date() if den.time() == time.min else den.date() + timedelta(days=1)
+        while moc < den_ngay:
+            cac_moc.append(moc)
+            if len(cac_moc) > HoaDonService.SO_MOC_TOI_DA:
+                raise ValueError("Khoảng thời gian quá dài cho bước đã chọn")
+
+            if buoc == "day":
+                moc += timedelta(days=1)
+            elif buoc == "week":
+                moc += timedelta(days=7)
+            elif buoc == "month":
+                moc = (
+                    moc.replace(year=moc.year + 1, month=1)
+                    if moc.month == 12 else moc.replace(month=moc.month + 1)
+                )
+            else:
+                moc = moc.replace(year=moc.year + 1)
+
+        return cac_moc
+
+    @staticmethod
+    def _kiem_tra_xep_hang(tu_ngay: date, den_ngay: date, theo: str, n: int):
+        """
+        Kiểm tra tham số chung của các bảng xếp hạng hàng hóa.
+
+        Raises:
+            ValueError: tham số không hợp lệ
+        """
+        if tu_ngay >= den_ngay:
+            raise ValueError("tu_ngay phải nhỏ hơn den_ngay")
+        if theo not in DoanhSoHangNgayRepository.CAC_TIEU_CHI:
+            raise ValueError(
+                "theo phải là một trong: "
+                + ", ".join(DoanhSoHangNgayRepository.CAC_TIEU_CHI)
+            )
+        if not 1 <= n <= HoaDonService.TOP_TOI_DA:
+            raise ValueError(f"n phải trong khoảng 1..{HoaDonService.TOP_TOI_DA}")
+
+    @staticmethod
+    def top_san_pham(
+        tu_ngay: date,
+        den_ngay: date,
+        theo: str = "so_luong",
+        n: int = 10,
+        ma_loai_hang: Optional[int] = None,
+        ma_thuong_hieu: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Top n hàng hóa bán chạy trong khoảng ngày [tu_ngay, den_ngay),
+        có thể lọc theo loại hàng / thương hiệu.
+
+        Đọc từ bảng tổng hợp DOANH_SO_HANG_NGAY bằng một truy vấn
+        GROUP BY + TOP n, không quét CHI_TIET_HOA_DON.
+
+        Args:
+            tu_ngay (date): ngày bắt đầu (bao gồm)
+            den_ngay (date): ngày kết thúc (không bao gồm)
+            theo (str): 'so_luong' | 'doanh_thu'
+            n (int): số hàng hóa cần lấy
+            ma_loai_hang (int, optional): lọc theo loại hàng
+            ma_thuong_hieu (int, optional): lọc theo thương hiệu
+
+        Raises:
+            ValueError: tham số không hợp lệ
+
+        Returns:
+            list[dict]: [{"ma_hang", "ten_hang", "tong_so_luong",
+                          "tong_doanh_thu"}, ...]
+        """
+        HoaDonService._kiem_tra_xep_hang(tu_ngay, den_ngay, theo, n)
+
+        return [
+            {
+                "ma_hang": row["hang_hoa_id"],
+                "ten_hang": row["hang_hoa__ten_hang"],
+                "tong_so_luong": row["tong_so_luong"] or 0,
+                "tong_doanh_thu": row["tong_doanh_thu"] or Decimal(0),
+            }
+            for row in DoanhSoHangNgayRepository.top_hang_hoa(
+                tu_ngay, den_ngay, theo, n, ma_loai_hang, ma_thuong_hieu
+            )
+        ]
+
+    @staticmethod
+    def top_san_pham_theo_nhom(
+        tu_ngay: date,
+        den_ngay: date,
+        nhom: str = "loai_hang",
+        theo: str = "so_luong",
+        n: int = 5
+    ) -> List[Dict]:
+        """
+        Doanh số theo loại hàng hoặc thương hiệu, kèm top n hàng hóa
+        bán chạy của từng nhóm, trong khoảng ngày [tu_ngay, den_ngay).
+
+        Một truy vấn JOIN + GROUP BY trên bảng tổng hợp trả về doanh số
+        từng hàng hóa theo khối; mỗi nhóm giữ một heap giới hạn n phần tử,
+        nên bộ nhớ là O(số nhóm * n) thay vì O(số hàng hóa).
+
+        Args:
+            tu_ngay (date): ngày bắt đầu (bao gồm)
+            den_ngay (date): ngày kết thúc (không bao gồm)
+            nhom (str): 'loai_hang' | 'thuong_hieu'
+            theo (str): 'so_luong' | 'doanh_thu'
+            n (int): số hàng hóa mỗi nhóm
+
+        Raises:
+            ValueError: tham số không hợp lệ
+
+        Returns:
+            list[dict]: [{"ma_nhom", "ten_nhom", "tong_so_luong",
+                          "tong_doanh_thu", "top": [...]}, ...]
+                        sắp xếp giảm dần theo tiêu chí đã chọn
+        """
+        if nhom not in HoaDonService.CAC_NHOM_HANG_HOA:
+            raise ValueError(
+                "nhom phải là một trong: "
+                + ", ".join(HoaDonService.CAC_NHOM_HANG_HOA)
+            )
+        HoaDonService._kiem_tra_xep_hang(tu_ngay, den_ngay, theo, n)
+
+        khoa_ma, khoa_ten = HoaDonService.CAC_NHOM_HANG_HOA[nhom]
+        tieu_chi = "tong_so_luong" if theo == "so_luong" else "tong_doanh_thu"
+
+        cac_nhom: Dict = {}
+        for row in DoanhSoHangNgayRepository.iter_theo_hang_hoa(tu_ngay, den_ngay):
+            ma_nhom = row[khoa_ma]
+            muc = cac_nhom.get(ma_nhom)
+            if muc is None:
+                muc = cac_nhom[ma_nhom] = {
+                    "ma_nhom": ma_nhom,
+                    "ten_nhom": row[khoa_ten],
+                    "tong_so_luong": 0,
+                    "tong_doanh_thu": Decimal(0),
+                    "heap": [],
+                }
+
+            so_luong = row["tong_so_luong"] or 0
+            doanh_thu = row["tong_doanh_thu"] or Decimal(0)
+            muc["tong_so_luong"] += so_luong
+            muc["tong_doanh_thu"] += doanh_thu
+
+            # Heap nhỏ nhất kích thước n: đỉnh là hàng hóa yếu nhất trong top,
+            # mã hàng âm để cùng điểm thì mã nhỏ hơn được ưu tiên
+            phan_tu = (
+                so_luong if theo == "so_luong" else doanh_thu,
+                -row["hang_hoa_id"],
+                row["hang_hoa__ten_hang"],
+                so_luong,
+                doanh_thu,
+            )
+            if len(muc["heap"]) < n:
+                heapq.heappush(muc["heap"], phan_tu)
+            elif phan_tu > muc["heap"][0]:
+                heapq.heapreplace(muc["heap"], phan_tu)
+
+        result = []
+        for muc in cac_nhom.values():
+            heap = muc.pop("heap")
+            muc["top"] = [
+                {
+                    "ma_hang": -am_ma_hang,
+                    "ten_hang": ten_hang,
+                    "tong_so_luong": so_luong,
+                    "tong_doanh_thu": doanh_thu,
+                }
+                for _, am_ma_hang, ten_hang, so_luong, doanh_thu
+                in sorted(heap, reverse=True)
+            ]
+            result.append(muc)
+
+        result.sort(key=lambda muc: muc[tieu_chi], reverse=True)
+        return result
+
+    @staticmethod
+    def xuat_hoa_don(tu_ngay: date, den_ngay: date) -> Iterator[Dict]:
+        """
+        Xuất toàn bộ hóa đơn kèm chi tiết trong khoảng ngày [tu_ngay, den_ngay).
+
+        Là generator: dữ liệu được đọc theo khối từ CSDL và trả ra
+        từng hóa đơn một, bộ nhớ sử dụng không phụ thuộc độ dài
+        khoảng thời gian. Truy vấn chỉ bắt đầu khi lấy phần tử đầu tiên.
+
+        Ngày được hiểu theo múi giờ hiện tại (TIME_ZONE của hệ thống).
+
+        Args:
+            tu_ngay (date): ngày bắt đầu (bao gồm)
+            den_ngay (date): ngày kết thúc (không bao gồm)
+
+        Yields:
+            dict: {"ma_hd", "ngay_lap", "nhan_vien", "tong_tien",
+                   "chi_tiets": [{"ma_hang", "ten_hang", "so_luong",
+                                  "don_gia", "thanh_tien"}, ...]}
+        """
+        tu = timezone.make_aware(datetime.combine(tu_ngay, time.min))
+        den = timezone.make_aware(datetime.combine(den_ngay, time.min))
+
+        for (ma_hd, ngay_lap, ma_nv, tong_tien), chi_tiets in (
+            ChiTietHoaDonRepository.iter_theo_thoi_gian(tu, den)
+        ):
+            yield {
+                "ma_hd": ma_hd,
+                "ngay_lap": ngay_lap,
+                "nhan_vien": ma_nv,
+                "tong_tien": tong_tien,
+                "chi_tiets": [
+                    {
+                        "ma_hang": ma_hang,
+                        "ten_hang": ten_hang,
+                        "so_luong": so_luong,
+                        "don_gia": don_gia,
+                        "thanh_tien": thanh_tien,
+                    }
+                    for ma_hang, ten_hang, so_luong, don_gia, thanh_tien in chi_tiets
+                ],
+            }
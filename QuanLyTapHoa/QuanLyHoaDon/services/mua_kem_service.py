@@ -0,0 +1,276 @@
+# services/mua_kem_service.py
+"""
+Service phân tích giỏ hàng (hàng hóa thường được mua cùng nhau).
+
+Thuật toán:
+- Đọc các cặp (MaHD, MaHang) của CHI_TIET_HOA_DON theo khối cố định,
+  cắt khối đúng ranh giới hóa đơn.
+- Mỗi khối là ma trận thưa X (hóa đơn x hàng hóa, giá trị 0/1);
+  ma trận đồng xuất hiện được cộng dồn C += triu(X^T X).
+  Đường chéo của C là số hóa đơn chứa từng hàng hóa.
+- Từ C tính support, confidence, lift cho mọi cặp bằng phép toán
+  mảng NumPy, chọn top K hàng hóa mua kèm cho mỗi hàng hóa
+  bằng một lần sắp xếp, rồi ghi vào bảng MUA_KEM.
+
+Bộ nhớ sử dụng là O(kích thước khối + số cặp hàng hóa khác nhau
+từng được mua cùng nhau), không phụ thuộc tổng số dòng chi tiết.
+
+NumPy và SciPy là phụ thuộc tùy chọn, chỉ cần cho lệnh phân tích;
+API tra cứu chỉ đọc bảng MUA_KEM.
+"""
+
+import time as _time
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+from django.db.models import Max
+from django.utils import timezone
+
+from QuanLyHangHoa.models.hang_hoa import HangHoaRepository
+from QuanLyHoaDon.models.chi_tiet_hoa_don import ChiTietHoaDonRepository
+from QuanLyHoaDon.models.mua_kem import MuaKem, MuaKemRepository
+
+
+def _nap_thu_vien():
+    """
+    Import NumPy / SciPy khi cần.
+
+    Raises:
+        ImportError: khi chưa cài numpy hoặc scipy
+    """
+    try:
+        import numpy as np
+        import scipy.sparse as sp
+    except ImportError:
+        raise ImportError(
+            "Phân tích mua kèm cần numpy và scipy (pip install numpy scipy)"
+        )
+    return np, sp
+
+
+class MuaKemService:
+    """
+    Service phân tích và tra cứu hàng hóa mua kèm.
+    """
+
+    # Tiêu chí xếp hạng hàng hóa mua kèm
+    CAC_TIEU_CHI = ("do_nang", "do_tin_cay")
+
+    # Số hàng hóa mua kèm tối đa trả về qua API
+    SO_KEM_TOI_DA = 50
+
+    @staticmethod
+    def phan_tich(
+        tu: Optional[datetime] = None,
+        den: Optional[datetime] = None,
+        so_dong_moi_khoi: int = 200000,
+        so_hoa_don_toi_thieu: int = 5,
+        top_k: int = 10,
+        xep_theo: str = "do_nang"
+    ) -> Dict:
+        """
+        Chạy phân tích giỏ hàng trên các hóa đơn lập trong [tu, den)
+        và thay toàn bộ kết quả trong bảng MUA_KEM.
+
+        Args:
+            tu (datetime, optional): thời điểm bắt đầu (bao gồm)
+            den (datetime, optional): thời điểm kết thúc (không bao gồm)
+            so_dong_moi_khoi (int): số dòng chi tiết mỗi khối, quyết định
+                bộ nhớ đỉnh của bước tính X^T X
+            so_hoa_don_toi_thieu (int): cặp phải cùng xuất hiện trong ít nhất
+                bấy nhiêu hóa đơn mới được giữ (lọc nhiễu cho lift)
+            top_k (int): số hàng hóa mua kèm lưu cho mỗi hàng hóa
+            xep_theo (str): 'do_nang' (lift) | 'do_tin_cay' (confidence)
+
+        Raises:
+            ValueError: tham số không hợp lệ hoặc không có hóa đơn
+            ImportError: thiếu numpy / scipy
+
+        Returns:
+            dict: thống kê lần chạy {"so_dong", "so_hoa_don",
+                  "so_cap_dong_thoi", "so_quy_tac", "thoi_gian_giay"}
+        """
+        if xep_theo not in MuaKemService.CAC_TIEU_CHI:
+            raise ValueError(
+                "xep_theo phải là một trong: "
+                + ", ".join(MuaKemService.CAC_TIEU_CHI)
+            )
+        if so_dong_moi_khoi <= 0 or top_k <= 0 or so_hoa_don_toi_thieu <= 0:
+            raise ValueError("Các tham số kích thước phải > 0")
+
+        np, sp = _nap_thu_vien()
+        bat_dau = _time.monotonic()
+
+        # Dùng trực tiếp mã hàng làm chỉ số cột (mã tự tăng, gần liên tục)
+        so_cot = (
+            HangHoaRepository.get_all().aggregate(m=Max("ma_hang"))["m"] or 0
+        ) + 1
+
+        dong_thoi = sp.csr_matrix((so_cot, so_cot), dtype=np.int32)
+        so_dong = 0
+        so_hoa_don = 0
+
+        rows = ChiTietHoaDonRepository.iter_cap_hoa_don_hang_hoa(tu, den)
+        for khoi in MuaKemService._cac_khoi(rows, so_dong_moi_khoi, np):
+            so_dong += len(khoi)
+
+            # Bỏ hàng hóa tạo sau khi bắt đầu phân tích (vượt số cột)
+            khoi = khoi[khoi[:, 1] < so_cot]
+            if not len(khoi):
+                continue
+
+            ma_hd = khoi[:, 0]
+            # Khối đã sắp theo MaHD: chỉ số dòng = số lần đổi hóa đơn
+            dong = np.concatenate(([0], np.cumsum(ma_hd[1:] != ma_hd[:-1])))
+            so_hoa_don_khoi = int(dong[-1]) + 1
+
+            x = sp.csr_matrix(
+                (np.ones(len(khoi), dtype=np.int32), (dong, khoi[:, 1])),
+                shape=(so_hoa_don_khoi, so_cot)
+            )
+            # Mỗi hàng hóa chỉ tính một lần trong một hóa đơn
+            x.sum_duplicates()
+            x.data[:] = 1
+
+            dong_thoi = dong_thoi + sp.triu(x.T @ x, format="csr")
+            so_hoa_don += so_hoa_don_khoi
+
+        if not so_hoa_don:
+            # Không xóa kết quả cũ khi khoảng thời gian không có dữ liệu
+            raise ValueError("Không có hóa đơn trong khoảng thời gian đã chọn")
+
+        ban_ghis = MuaKemService._chon_top_k(
+            np, dong_thoi.tocoo(), so_hoa_don,
+            so_hoa_don_toi_thieu, top_k, xep_theo
+        )
+        so_quy_tac = MuaKemRepository.thay_the_toan_bo(ban_ghis)
+
+        return {
+            "so_dong": so_dong,
+            "so_hoa_don": so_hoa_don,
+            "so_cap_dong_thoi": int(dong_thoi.nnz),
+            "so_quy_tac": so_quy_tac,
+            "thoi_gian_giay": round(_time.monotonic() - bat_dau, 2),
+        }
+
+    @staticmethod
+    def _cac_khoi(rows: Iterator, so_dong: int, np) -> Iterator:
+        """
+        Gom các cặp (ma_hd, ma_hang) thành mảng NumPy khoảng so_dong dòng,
+        cắt tại ranh giới hóa đơn: các dòng của hóa đơn cuối khối
+        (có thể còn tiếp ở khối sau) được chuyển sang khối sau.
+        """
+        du = np.empty((0, 2), dtype=np.int64)
+
+        while True:
+            batch = list(islice(rows, so_dong))
+            if not batch:
+                break
+
+            khoi = np.array(batch, dtype=np.int64)
+            if len(du):
+                khoi = np.concatenate((du, khoi))
+
+            if len(batch) < so_dong:
+                # Khối cuối cùng
+                yield khoi
+                return
+
+            cat = int(np.searchsorted(khoi[:, 0], khoi[-1, 0], side="left"))
+            du = khoi[cat:]
+            if cat:
+                yield khoi[:cat]
+
+        if len(du):
+            yield du
+
+    @staticmethod
+    def _chon_top_k(
+        np,
+        dong_thoi,
+        so_hoa_don: int,
+        so_hoa_don_toi_thieu: int,
+        top_k: int,
+        xep_theo: str
+    ) -> List[MuaKem]:
+        """
+        Tính support / confidence / lift cho mọi cặp từ ma trận
+        đồng xuất hiện tam giác trên và chọn top K cho mỗi hàng hóa.
+        """
+        r, c, n = dong_thoi.row, dong_thoi.col, dong_thoi.data
+
+        # Đường chéo: số hóa đơn chứa từng hàng hóa
+        so_hd_hang = np.zeros(dong_thoi.shape[0], dtype=np.float64)
+        cheo = r == c
+        so_hd_hang[r[cheo]] = n[cheo]
+
+        cap = (r < c) & (n >= so_hoa_don_toi_thieu)
+        # Mỗi cặp sinh hai quy tắc: A -> B và B -> A
+        a = np.concatenate((r[cap], c[cap]))
+        b = np.concatenate((c[cap], r[cap]))
+        n_ab = np.concatenate((n[cap], n[cap])).astype(np.float64)
+
+        ho_tro = n_ab / so_hoa_don
+        do_tin_cay = n_ab / so_hd_hang[a]
+        do_nang = n_ab * so_hoa_don / (so_hd_hang[a] * so_hd_hang[b])
+        diem = do_nang if xep_theo == "do_nang" else do_tin_cay
+
+        # Sắp theo (A tăng, điểm giảm, số hóa đơn giảm, B tăng)
+        thu_tu = np.lexsort((b, -n_ab, -diem, a))
+        a, b, n_ab = a[thu_tu], b[thu_tu], n_ab[thu_tu]
+        ho_tro, do_tin_cay, do_nang = (
+            ho_tro[thu_tu], do_tin_cay[thu_tu], do_nang[thu_tu]
+        )
+
+        # Thứ hạng trong nhóm cùng A = vị trí - vị trí đầu nhóm
+        thu_hang = np.arange(len(a)) - np.searchsorted(a, a, side="left")
+        giu = np.flatnonzero(thu_hang < top_k)
+
+        ngay_tinh = timezone.now()
+        return [
+            MuaKem(
+                hang_hoa_id=int(a[k]),
+                hang_hoa_kem_id=int(b[k]),
+                thu_hang=int(thu_hang[k]) + 1,
+                so_hoa_don=int(n_ab[k]),
+                ho_tro=float(ho_tro[k]),
+                do_tin_cay=float(do_tin_cay[k]),
+                do_nang=float(do_nang[k]),
+                ngay_tinh=ngay_tinh,
+            )
+            for k in giu
+        ]
+
+    @staticmethod
+    def get_mua_kem(ma_hang: int, n: int = 10) -> List[Dict]:
+        """
+        Lấy các hàng hóa thường được mua kèm với một hàng hóa
+        (kết quả của lần phân tích gần nhất).
+
+        Args:
+            ma_hang (int): mã hàng hóa
+            n (int): số hàng hóa mua kèm cần lấy
+
+        Raises:
+            ValueError: n không hợp lệ
+
+        Returns:
+            list[dict]: [{"ma_hang", "ten_hang", "so_hoa_don", "ho_tro",
+                          "do_tin_cay", "do_nang", "ngay_tinh"}, ...]
+        """
+        if not 1 <= n <= MuaKemService.SO_KEM_TOI_DA:
+            raise ValueError(f"n phải trong khoảng 1..{MuaKemService.SO_KEM_TOI_DA}")
+
+        return [
+            {
+                "ma_hang": row["hang_hoa_kem_id"],
+                "ten_hang": row["hang_hoa_kem__ten_hang"],
+                "so_hoa_don": row["so_hoa_don"],
+                "ho_tro": row["ho_tro"],
+                "do_tin_cay": row["do_tin_cay"],
+                "do_nang": row["do_nang"],
+                "ngay_tinh": row["ngay_tinh"],
+            }
+            for row in MuaKemRepository.get_by_hang_hoa(ma_hang, n)
+        ]
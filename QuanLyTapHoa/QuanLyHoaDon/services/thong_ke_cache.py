@@ -0,0 +1,201 @@
+# services/thong_ke_cache.py
+"""
+Cache cho thống kê doanh thu theo tháng.
+
+Tháng đã kết thúc (đã qua thời gian chờ chốt sổ) hầu như không còn
+thay đổi, nên kết quả được lưu lâu (THONG_KE_CACHE_TTL_DA_CHOT); tháng
+hiện tại được tính lại sau một TTL ngắn. Tháng trong tương lai luôn
+bằng 0, không cần truy vấn.
+
+Khi dữ liệu quá khứ bị sửa muộn (sửa hóa đơn trực tiếp, chạy lại
+rebuild_doanh_thu_ngay...), gọi huy_thang() hoặc huy_tat_ca(): thế hệ
+cache nằm trong CSDL (bảng PHIEN_BAN, xem QuanLyTapHoa/phien_ban.py),
+nên lệnh chạy ở process riêng cũng hủy được cache của mọi worker, kể
+cả khi backend cache là cục bộ từng process (LocMemCache).
+
+Backend cache chọn bằng settings.THONG_KE_CACHE_BACKEND (alias trong
+CACHES, mặc định 'default'); backend dùng chung (Redis, Memcached...)
+giúp các worker dùng lại kết quả của nhau.
+"""
+
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Callable, Dict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from QuanLyHoaDon.models.doanh_thu_ngay import MUI_GIO_BAO_CAO
+from QuanLyTapHoa import phien_ban
+
+
+class ThongKeDoanhThuCache:
+    """
+    Cache doanh thu theo tháng, phân biệt tháng đã chốt và tháng đang mở.
+    """
+
+    # Tên phiên bản trong bảng PHIEN_BAN
+    TEN_THE_HE = "thongke:doanhthu"
+
+    THANG_DA_CHOT = "da_chot"
+    THANG_DANG_MO = "dang_mo"
+    THANG_TUONG_LAI = "tuong_lai"
+
+    @staticmethod
+    def _cache():
+        return caches[getattr(settings, "THONG_KE_CACHE_BACKEND", "default")]
+
+    @staticmethod
+    def _ttl_thang_da_chot() -> int:
+        """
+        TTL (giây) cho kết quả của tháng đã chốt.
+        """
+        return getattr(settings, "THONG_KE_CACHE_TTL_DA_CHOT", 86400)
+
+    @staticmethod
+    def _ttl_thang_dang_mo() -> int:
+        """
+        TTL (giây) cho kết quả của tháng hiện tại.
+        """
+        return getattr(settings, "THONG_KE_CACHE_TTL", 30)
+
+    @staticmethod
+    def _thoi_gian_chot_so() -> timedelta:
+        """
+        Thời gian chờ sau khi tháng kết thúc mới coi là đã chốt,
+        để các hóa đơn lập sát nửa đêm kịp ghi vào tổng hợp.
+        """
+        return timedelta(
+            seconds=getattr(settings, "THONG_KE_THOI_GIAN_CHOT_SO", 3600)
+        )
+
+    @staticmethod
+    def _dau_thang(nam: int, thang: int) -> datetime:
+        """
+        Thời điểm bắt đầu tháng theo giờ Việt Nam.
+        """
+        return datetime.combine(date(nam, thang, 1), time.min, tzinfo=MUI_GIO_BAO_CAO)
+
+    @staticmethod
+    def trang_thai_thang(nam: int, thang: int, bay_gio: datetime) -> str:
+        """
+        Xác định tháng đã chốt, đang mở hay thuộc tương lai.
+
+        Args:
+            nam (int): Năm
+            thang (int): Tháng
+            bay_gio (datetime): Thời điểm hiện tại (aware)
+
+        Returns:
+            str: THANG_DA_CHOT | THANG_DANG_MO | THANG_TUONG_LAI
+        """
+        if bay_gio < ThongKeDoanhThuCache._dau_thang(nam, thang):
+            return ThongKeDoanhThuCache.THANG_TUONG_LAI
+
+        nam_sau, thang_sau = (nam + 1, 1) if thang == 12 else (nam, thang + 1)
+        het_thang = ThongKeDoanhThuCache._dau_thang(nam_sau, thang_sau)
+        if bay_gio >= het_thang + ThongKeDoanhThuCache._thoi_gian_chot_so():
+            return ThongKeDoanhThuCache.THANG_DA_CHOT
+
+        return ThongKeDoanhThuCache.THANG_DANG_MO
+
+    @staticmethod
+    def _the_he() -> int:
+        """
+        Thế hệ hiện tại của cache, đọc từ CSDL (dùng chung mọi worker);
+        tăng thế hệ là hủy toàn bộ.
+        """
+        ten = ThongKeDoanhThuCache.TEN_THE_HE
+        return phien_ban.doc(ten)[ten]
+
+    @staticmethod
+    def _key(the_he: int, nam: int, thang: int) -> str:
+        return f"thongke:doanhthu:{the_he}:{nam}:{thang}"
+
+    @staticmethod
+    def doanh_thu_theo_thang(
+        nam: int,
+        tinh_lai: Callable[[int], Dict[int, Decimal]]
+    ) -> Dict[int, Decimal]:
+        """
+        Lấy doanh thu 12 tháng của năm, ưu tiên từ cache.
+
+        Chỉ khi thiếu ít nhất một tháng (đã chốt hoặc đang mở) trong cache
+        mới gọi tinh_lai(nam) - một truy vấn cho cả năm.
+
+        Args:
+            nam (int): Năm cần thống kê
+            tinh_lai (Callable): Hàm tính {tháng: doanh thu} từ CSDL
+
+        Returns:
+            Dict[int, Decimal]: {tháng: doanh thu} đủ 12 tháng
+        """
+        bay_gio = timezone.now()
+        the_he = ThongKeDoanhThuCache._the_he()
+
+        ket_qua: Dict[int, Decimal] = {}
+        trang_thai: Dict[int, str] = {}
+        keys: Dict[int, str] = {}
+
+        for thang in range(1, 13):
+            trang_thai[thang] = ThongKeDoanhThuCache.trang_thai_thang(
+                nam, thang, bay_gio
+            )
+            if trang_thai[thang] == ThongKeDoanhThuCache.THANG_TUONG_LAI:
+                ket_qua[thang] = Decimal(0)
+            else:
+                keys[thang] = ThongKeDoanhThuCache._key(the_he, nam, thang)
+
+        cache = ThongKeDoanhThuCache._cache()
+        da_co = cache.get_many(keys.values())
+        thieu = []
+        for thang, key in keys.items():
+            if key in da_co:
+                ket_qua[thang] = da_co[key]
+            else:
+                thieu.append(thang)
+
+        if not thieu:
+            return ket_qua
+
+        du_lieu = tinh_lai(nam)
+        da_chot, dang_mo = {}, {}
+        for thang in thieu:
+            ket_qua[thang] = du_lieu.get(thang, Decimal(0))
+            if trang_thai[thang] == ThongKeDoanhThuCache.THANG_DA_CHOT:
+                da_chot[keys[thang]] = ket_qua[thang]
+            else:
+                dang_mo[keys[thang]] = ket_qua[thang]
+
+        if da_chot:
+            cache.set_many(
+                da_chot,
+                timeout=ThongKeDoanhThuCache._ttl_thang_da_chot()
+            )
+        if dang_mo:
+            cache.set_many(
+                dang_mo,
+                timeout=ThongKeDoanhThuCache._ttl_thang_dang_mo()
+            )
+
+        return ket_qua
+
+    @staticmethod
+    def huy_thang(nam: int, thang: int) -> None:
+        """
+        Hủy cache của một tháng (hook khi dữ liệu tháng đó bị sửa muộn).
+
+        Không xóa được key trong cache cục bộ của worker khác, nên hủy
+        bằng cách tăng thế hệ như huy_tat_ca (sửa dữ liệu cũ hiếm khi
+        xảy ra, tính lại cả năm chỉ tốn một truy vấn).
+        """
+        ThongKeDoanhThuCache.huy_tat_ca()
+
+    @staticmethod
+    def huy_tat_ca() -> None:
+        """
+        Hủy toàn bộ cache thống kê doanh thu trên mọi worker bằng cách
+        tăng thế hệ trong CSDL.
+        """
+        phien_ban.tang(ThongKeDoanhThuCache.TEN_THE_HE)
@@ -1,3 +1,284 @@
-from django.test import TestCase
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.db.models import F
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from QuanLyHangHoa.models.hang_hoa import HangHoa
+from QuanLyHangHoa.models.ton_kho_phan_manh import TonKhoPhanManhRepository
+from QuanLyHangHoa.services.hang_hoa_service import HangHoaService
+from QuanLyHangHoa.services.ton_kho_phan_manh_service import TonKhoPhanManhService
+from QuanLyHangHoa.tests import tao_danh_muc
+from QuanLyHoaDon.models.chi_tiet_hoa_don import ChiTietHoaDon, ChiTietHoaDonRepository
+from QuanLyHoaDon.models.doanh_so_hang_ngay import DoanhSoHangNgay, DoanhSoHangNgayRepository
+from QuanLyHoaDon.models.hoa_don import HoaDon
+from QuanLyHoaDon.services.thong_ke_cache import ThongKeDoanhThuCache
+from QuanLyTapHoa import phien_ban
+from QuanLyNhanSu.models.chuc_vu import ChucVu
+from QuanLyNhanSu.models.nhan_vien import NhanVien
+
+
+def tao_nhan_vien() -> NhanVien:
+    """
+    Tạo một nhân viên bán hàng (kèm chức vụ).
+    """
+    chuc_vu = ChucVu.objects.create(ten_chuc_vu="Thu ngân")
+    return NhanVien.objects.create(ho_ten="Nguyễn Văn A", ma_chuc_vu=chuc_vu)
+
+
+# =========================
+# Chặn lazy load khi serialize
+# =========================
+@override_settings(QUERY_GUARD_ENABLED=True)
+class ChanTruyVanTest(TestCase):
+    """
+    Tạo hóa đơn và đọc danh sách hóa đơn không phát sinh truy vấn khi
+    serialize chi tiết / hàng hóa lồng bên trong.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        _, _, _, cls.hang_hoas = tao_danh_muc()
+        cls.nhan_vien = tao_nhan_vien()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def tao_hoa_don(self):
+        response = self.client.post("/api/hoadon/create/", {
+            "nhan_vien": self.nhan_vien.ma_nv,
+            "chi_tiets": [
+                {"hang_hoa_id": hang_hoa.ma_hang, "so_luong": 2}
+                for hang_hoa in self.hang_hoas
+            ],
+        }, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()
+
+    def test_tao_hoa_don(self):
+        hoa_don = self.tao_hoa_don()
+        self.assertEqual(len(hoa_don["chi_tiets"]), len(self.hang_hoas))
+
+    def test_ton_kho_sau_khi_ban(self):
+        """
+        Response mang tồn kho sau khi bán, kể cả khi một hóa đơn khác trừ
+        tồn kho giữa lúc validate và lúc trừ.
+        """
+        tru_ton_kho = HangHoaService.tru_ton_kho_hang_loat
+
+        def ban_dong_thoi(*args, **kwargs):
+            HangHoa.objects.update(so_luong_ton=F("so_luong_ton") - 5)
+            return tru_ton_kho(*args, **kwargs)
+
+        with mock.patch.object(HangHoaService, "tru_ton_kho_hang_loat", side_effect=ban_dong_thoi):
+            hoa_don = self.tao_hoa_don()
+
+        ton_kho = dict(HangHoa.objects.values_list("ma_hang", "so_luong_ton"))
+        for ct in hoa_don["chi_tiets"]:
+            self.assertEqual(ct["hang_hoa"]["so_luong_ton"], 100 - 5 - 2)
+            self.assertEqual(ct["hang_hoa"]["so_luong_ton"], ton_kho[ct["hang_hoa"]["ma_hang"]])
+
+    def test_danh_sach(self):
+        for _ in range(2):
+            self.tao_hoa_don()
+
+        for url in ("/api/hoadon/", f"/api/hoadon/nhanvien/{self.nhan_vien.ma_nv}/"):
+            with self.subTest(url=url):
+                response = self.client.get(url, {"page_size": 10})
+                self.assertEqual(response.status_code, 200)
+                ket_qua = response.json()["results"]
+                self.assertEqual(len(ket_qua), 2)
+                self.assertEqual(len(ket_qua[0]["chi_tiets"]), len(self.hang_hoas))
+
+
+# =========================
+# Bán hàng hóa phân mảnh tồn kho
+# =========================
+class BanHangPhanManhTest(TestCase):
+    """
+    Kiểm tra sơ bộ dùng tồn kho thật (tổng phân mảnh): vừa nhập thêm
+    hàng phân mảnh là bán được ngay, không chờ đồng bộ bản sao HANG_HOA.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        _, _, _, (hang_hoa,) = tao_danh_muc(so_hang=1)
+        cls.ma_hang = hang_hoa.ma_hang
+        cls.nhan_vien = tao_nhan_vien()
+        TonKhoPhanManhService.dat(cls.ma_hang, 4)
+
+    def test_ban_sau_khi_nhap(self):
+        HangHoaService.adjust_stock(self.ma_hang, 50)
+        # Bản sao chưa đồng bộ
+        self.assertEqual(HangHoa.objects.get(pk=self.ma_hang).so_luong_ton, 100)
+
+        response = APIClient().post("/api/hoadon/create/", {
+            "nhan_vien": self.nhan_vien.ma_nv,
+            "chi_tiets": [{"hang_hoa_id": self.ma_hang, "so_luong": 120}],
+        }, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()["chi_tiets"][0]["hang_hoa"]["so_luong_ton"], 30)
+        self.assertEqual(TonKhoPhanManhRepository.tong([self.ma_hang]), {self.ma_hang: 30})
+
+
+# =========================
+# Bảng tổng hợp doanh số theo ngày
+# =========================
+class CongDonDoanhSoTest(TestCase):
+    """
+    Cộng dồn doanh số: dòng đã có được cộng, dòng mới được thêm,
+    không mất dòng nào (cả câu MERGE lẫn đường ORM).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        _, _, _, hang_hoas = tao_danh_muc()
+        cls.a, cls.b, cls.c = (obj.ma_hang for obj in hang_hoas)
+
+    def tong_hop(self, ngay):
+        return {
+            ma_hang: (so_luong, doanh_thu)
+            for ma_hang, so_luong, doanh_thu in
+            DoanhSoHangNgay.objects.filter(ngay=ngay)
+            .values_list("hang_hoa_id", "so_luong", "doanh_thu")
+        }
+
+    def kiem_tra(self, cong_don):
+        ngay = date(2025, 3, 1)
+        cong_don(ngay, {self.a: (2, Decimal("10.00")), self.b: (1, Decimal("5.00"))})
+        cong_don(ngay, {self.a: (1, Decimal("5.50")), self.c: (3, Decimal("9.00"))})
+
+        self.assertEqual(self.tong_hop(ngay), {
+            self.a: (3, Decimal("15.50")),
+            self.b: (1, Decimal("5.00")),
+            self.c: (3, Decimal("9.00")),
+        })
+
+    def test_cong_don(self):
+        self.kiem_tra(DoanhSoHangNgayRepository.cong_don)
+
+    def test_cong_don_orm(self):
+        self.kiem_tra(DoanhSoHangNgayRepository._cong_don_chunk)
+
+
+# =========================
+# Cache thống kê doanh thu
+# =========================
+class ThongKeDoanhThuCacheTest(TestCase):
+    """
+    Thế hệ cache nằm trong CSDL: hủy cache ở một process (vd. lệnh
+    rebuild_doanh_thu_ngay) có hiệu lực với mọi worker.
+    """
+
+    def setUp(self):
+        ThongKeDoanhThuCache._cache().clear()
+        self.so_lan_tinh = 0
+
+    def tinh_lai(self, nam):
+        self.so_lan_tinh += 1
+        return {thang: Decimal(thang) for thang in range(1, 13)}
+
+    def test_dung_lai_roi_huy(self):
+        ket_qua = ThongKeDoanhThuCache.doanh_thu_theo_thang(2020, self.tinh_lai)
+        self.assertEqual(ket_qua[5], Decimal(5))
+        ThongKeDoanhThuCache.doanh_thu_theo_thang(2020, self.tinh_lai)
+        self.assertEqual(self.so_lan_tinh, 1)
+
+        ThongKeDoanhThuCache.huy_tat_ca()
+        ThongKeDoanhThuCache.doanh_thu_theo_thang(2020, self.tinh_lai)
+        self.assertEqual(self.so_lan_tinh, 2)
+
+    def test_huy_tu_process_khac(self):
+        ThongKeDoanhThuCache.doanh_thu_theo_thang(2020, self.tinh_lai)
+        # Process khác chỉ chạm được vào CSDL, không vào cache của process này
+        phien_ban.tang(ThongKeDoanhThuCache.TEN_THE_HE)
+        ThongKeDoanhThuCache.doanh_thu_theo_thang(2020, self.tinh_lai)
+        self.assertEqual(self.so_lan_tinh, 2)
+
+
+# =========================
+# Duyệt hóa đơn theo khối
+# =========================
+class DuyetHoaDonTheoKhoiTest(TestCase):
+    """
+    Duyệt keyset theo khối nhỏ: không mất / lặp hóa đơn ở ranh giới
+    khối (kể cả cùng NgayLap), hóa đơn không có chi tiết vẫn được trả.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        _, _, _, hang_hoas = tao_danh_muc()
+        nhan_vien = tao_nhan_vien()
+        cls.tu = datetime(2025, 3, 1, tzinfo=dt_timezone.utc)
+        cls.den = datetime(2025, 3, 2, tzinfo=dt_timezone.utc)
+
+        cls.hoa_dons = []
+        # Hai hóa đơn cùng thời điểm ở mỗi mốc, có hóa đơn không có chi tiết
+        for gio in (1, 2, 3):
+            for so_mat_hang in (0, 2):
+                hoa_don = HoaDon.objects.create(
+                    nhan_vien=nhan_vien, tong_tien=Decimal("0"),
+                    ngay_lap=cls.tu.replace(hour=gio)
+                )
+                for hang_hoa in hang_hoas[:so_mat_hang + gio % 2]:
+                    ChiTietHoaDon.objects.create(
+                        hoa_don=hoa_don, hang_hoa=hang_hoa, so_luong=1,
+                        don_gia=Decimal("5000"), thanh_tien=Decimal("5000")
+                    )
+                cls.hoa_dons.append(hoa_don)
+        # Ngoài khoảng
+        HoaDon.objects.create(
+            nhan_vien=nhan_vien, tong_tien=Decimal("0"), ngay_lap=cls.den
+        )
+
+    def test_iter_theo_thoi_gian(self):
+        ket_qua = list(ChiTietHoaDonRepository.iter_theo_thoi_gian(
+            self.tu, self.den, so_hoa_don_moi_khoi=2
+        ))
+        self.assertEqual(
+            [hoa_don[0] for hoa_don, _ in ket_qua],
+            [hoa_don.ma_hd for hoa_don in sorted(self.hoa_dons, key=lambda h: (h.ngay_lap, h.ma_hd))]
+        )
+        self.assertEqual(
+            {hoa_don[0]: len(chi_tiets) for hoa_don, chi_tiets in ket_qua},
+            {hoa_don.ma_hd: hoa_don.chi_tiets.count() for hoa_don in self.hoa_dons}
+        )
+        self.assertIn(0, [len(chi_tiets) for _, chi_tiets in ket_qua])
+
+    def test_iter_cap_hoa_don_hang_hoa(self):
+        self.assertEqual(
+            list(ChiTietHoaDonRepository.iter_cap_hoa_don_hang_hoa(self.tu, self.den, chunk_size=2)),
+            list(
+                ChiTietHoaDon.objects.order_by("hoa_don_id", "hang_hoa_id")
+                .values_list("hoa_don_id", "hang_hoa_id")
+            )
+        )
+
+
+# =========================
+# Chuỗi doanh thu
+# =========================
+class ChuoiDoanhThuTest(TestCase):
+    """
+    Doanh thu trả chuỗi 2 chữ số lẻ như các API tiền khác: số tiền lớn
+    không bị làm tròn như float, mốc trống là "0.00".
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        HoaDon.objects.create(
+            nhan_vien=tao_nhan_vien(), tong_tien=Decimal("9999999999999999.99"),
+            # 01:30 giờ Việt Nam
+            ngay_lap=datetime(2025, 2, 28, 18, 30, tzinfo=dt_timezone.utc)
+        )
+
+    def test_doanh_thu_la_chuoi(self):
+        response = APIClient().get("/api/thongke/doanhthu/chuoi/", {
+            "tu": "2025-03-01T00:00:00", "den": "2025-03-01T03:00:00", "buoc": "hour",
+        })
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()
+        self.assertEqual(data["doanh_thu"], ["0.00", "9999999999999999.99", "0.00"])
+        self.assertEqual(data["so_hoa_don"], [0, 1, 0])
@@ -4,7 +4,13 @@ from QuanLyHoaDon.views import (
     hoa_don_create,
     hoa_don_get_all,
     hoa_don_get_by_nhan_vien,
-    doanh_thu_theo_thang
+    hoa_don_export,
+    doanh_thu_theo_thang,
+    doanh_thu_theo_nam,
+    chuoi_doanh_thu,
+    top_san_pham,
+    top_san_pham_theo_nhom,
+    mua_kem
 )
 
 urlpatterns = [
@@ -15,5 +21,11 @@ urlpatterns = [
             hoa_don_get_by_nhan_vien,
             name='hoa_don_get_by_nhan_vien'
         ),
+    path('hoadon/export/', hoa_don_export, name='hoa_don_export'),
     path('thongke/doanhthu/', doanh_thu_theo_thang),
+    path('thongke/doanhthu/nam/', doanh_thu_theo_nam),
+    path('thongke/doanhthu/chuoi/', chuoi_doanh_thu),
+    path('thongke/sanpham/top/', top_san_pham),
+    path('thongke/sanpham/nhom/', top_san_pham_theo_nhom),
+    path('thongke/muakem/<int:ma_hang>/', mua_kem),
 ]
@@ -5,15 +5,36 @@ Bao gồm:
 - Tạo hóa đơn
 - Lấy danh sách hóa đơn
 - Lấy hóa đơn theo nhân viên
-- Thống kê doanh thu theo tháng
+- Xuất hóa đơn theo khoảng ngày (NDJSON / CSV, dạng stream)
+- Thống kê doanh thu theo tháng, theo năm
+- Chuỗi thời gian doanh thu (giờ / ngày / tuần / tháng / năm)
+- Top hàng hóa bán chạy, doanh số theo loại hàng / thương hiệu
+- Hàng hóa thường được mua kèm (kết quả phân tích giỏ hàng)
 """
 
+import csv
+import json
+from datetime import date, datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 
 from QuanLyHoaDon.serializers import HoaDonSerializer
 from QuanLyHoaDon.services.hoa_don_service import HoaDonService
+from QuanLyHoaDon.services.mua_kem_service import MuaKemService
+from QuanLyHoaDon.models.doanh_thu_ngay import MUI_GIO_BAO_CAO
+from QuanLyTapHoa.query_guard import cam_truy_van
+from QuanLyTapHoa.pagination import KeysetPaginator
+
+
+# Phân trang keyset theo (NgayLap, MaHD), hóa đơn mới nhất trước.
+# Hóa đơn mới lập trong lúc client đang duyệt luôn nằm trước cursor
+# nên không làm lệch hay lặp các trang phía sau.
+hoa_don_paginator = KeysetPaginator(ordering=("-ngay_lap", "-ma_hd"))
 
 
 @api_view(['POST'])
@@ -44,10 +65,11 @@ def hoa_don_create(request):
     if serializer.is_valid():
         try:
             hoa_don = HoaDonService.create_hoa_don(serializer.validated_data)
-            return Response(
-                HoaDonSerializer(hoa_don).data,
-                status=status.HTTP_201_CREATED
-            )
+
+            with cam_truy_van("hoa_don_create"):
+                data = HoaDonSerializer(hoa_don).data
+
+            return Response(data, status=status.HTTP_201_CREATED)
         except ValueError as e:
             return Response(
                 {"detail": str(e)},
@@ -60,38 +82,196 @@ def hoa_don_create(request):
 @api_view(['GET'])
 def hoa_don_get_all(request):
     """
-    Lấy danh sách toàn bộ hóa đơn.
+    Lấy danh sách hóa đơn, phân trang keyset theo (NgayLap, MaHD).
+
+    Query params:
+    ?page_size=50          (mặc định 50, tối đa 500)
+    &cursor=<next_cursor>  (lấy từ response trang trước)
 
     Response:
-    - Danh sách hóa đơn kèm chi tiết.
+    {
+        "results": [... hóa đơn kèm chi tiết ...],
+        "next_cursor": "..." | null
+    }
+    - 400: cursor hoặc page_size không hợp lệ
     """
-    qs = HoaDonService.get_all_hoa_don()
-    serializer = HoaDonSerializer(qs, many=True)
-    return Response(serializer.data)
+    return _hoa_don_page_response(
+        request,
+        HoaDonService.get_all_hoa_don(),
+        "hoa_don_get_all"
+    )
 
 
 @api_view(['GET'])
 def hoa_don_get_by_nhan_vien(request, ma_nv: int):
     """
-    Lấy danh sách hóa đơn theo mã nhân viên.
+    Lấy danh sách hóa đơn theo mã nhân viên,
+    phân trang giống hoa_don_get_all.
 
     URL:
-    GET /api/hoa-don/nhan-vien/<ma_nv>/
+    GET /api/hoadon/nhanvien/<ma_nv>/?page_size=50&cursor=...
 
     Response:
-    - 200: Danh sách hóa đơn
+    - 200: Một trang hóa đơn
+    - 400: cursor hoặc page_size không hợp lệ
     - 404: Nhân viên chưa có hóa đơn
     """
-    qs = HoaDonService.get_hoa_don_by_nhan_vien(ma_nv)
+    return _hoa_don_page_response(
+        request,
+        HoaDonService.get_hoa_don_by_nhan_vien(ma_nv),
+        "hoa_don_get_by_nhan_vien",
+        thong_bao_rong="Nhân viên chưa có hóa đơn nào"
+    )
 
-    if not qs.exists():
+
+def _hoa_don_page_response(request, qs, mo_ta: str, thong_bao_rong: str = None):
+    """
+    Phân trang QuerySet hóa đơn và serialize một trang.
+
+    QuerySet chỉ được thực thi một lần; trang đầu rỗng trả về 404
+    khi có thong_bao_rong.
+    """
+    try:
+        cursor, page_size = hoa_don_paginator.doc_tham_so(request.query_params)
+        hoa_dons, next_cursor = hoa_don_paginator.paginate(qs, cursor, page_size)
+    except ValueError as e:
         return Response(
-            {"detail": "Nhân viên chưa có hóa đơn nào"},
+            {"detail": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if not hoa_dons and cursor is None and thong_bao_rong:
+        return Response(
+            {"detail": thong_bao_rong},
             status=status.HTTP_404_NOT_FOUND
         )
 
-    serializer = HoaDonSerializer(qs, many=True)
-    return Response(serializer.data)
+    with cam_truy_van(mo_ta):
+        data = HoaDonSerializer(hoa_dons, many=True).data
+
+    return Response({
+        "results": data,
+        "next_cursor": next_cursor,
+    })
+
+
+@api_view(['GET'])
+def hoa_don_export(request):
+    """
+    Xuất toàn bộ hóa đơn kèm chi tiết trong một khoảng ngày,
+    phục vụ kế toán.
+
+    Dữ liệu được stream: đọc CSDL theo khối và gửi dần cho client,
+    bộ nhớ server không phụ thuộc độ lớn khoảng ngày.
+
+    Query params:
+    ?tu_ngay=2025-01-01        (bao gồm)
+    &den_ngay=2025-02-01       (không bao gồm)
+    &dinh_dang=ndjson | csv    (mặc định ndjson)
+
+    Response:
+    - 200 ndjson: mỗi dòng là một hóa đơn (JSON) kèm "chi_tiets"
+    - 200 csv: mỗi dòng là một chi tiết hóa đơn
+    - 400: Thiếu hoặc sai tham số
+    """
+    tu_ngay = request.query_params.get('tu_ngay')
+    den_ngay = request.query_params.get('den_ngay')
+    dinh_dang = request.query_params.get('dinh_dang', 'ndjson')
+
+    if not tu_ngay or not den_ngay:
+        return Response(
+            {"error": "Thiếu tham số tu_ngay hoặc den_ngay"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        tu_ngay = date.fromisoformat(tu_ngay)
+        den_ngay = date.fromisoformat(den_ngay)
+    except ValueError:
+        return Response(
+            {"error": "Ngày không hợp lệ (định dạng YYYY-MM-DD)"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if tu_ngay >= den_ngay:
+        return Response(
+            {"error": "tu_ngay phải nhỏ hơn den_ngay"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if dinh_dang not in _EXPORT_FORMATS:
+        return Response(
+            {"error": "dinh_dang phải là ndjson hoặc csv"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    content_type, tao_stream = _EXPORT_FORMATS[dinh_dang]
+    hoa_dons = HoaDonService.xuat_hoa_don(tu_ngay, den_ngay)
+
+    response = StreamingHttpResponse(
+        tao_stream(hoa_dons),
+        content_type=content_type
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="hoa_don_{tu_ngay}_{den_ngay}.{dinh_dang}"'
+    )
+    return response
+
+
+def _ndjson_stream(hoa_dons):
+    """
+    Mỗi hóa đơn là một dòng JSON.
+    """
+    for hoa_don in hoa_dons:
+        yield json.dumps(
+            hoa_don,
+            cls=DjangoJSONEncoder,
+            ensure_ascii=False
+        ) + "\n"
+
+
+class _Echo:
+    """
+    "File" giả cho csv.writer: trả lại ngay dòng vừa ghi
+    để generator gửi đi, không giữ lại trong bộ nhớ.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _csv_stream(hoa_dons):
+    """
+    Mỗi chi tiết hóa đơn là một dòng CSV.
+
+    Dòng tiêu đề được gửi trước khi truy vấn bắt đầu,
+    BOM UTF-8 giúp Excel hiển thị đúng tiếng Việt.
+    """
+    writer = csv.writer(_Echo())
+    yield "\ufeff" + writer.writerow([
+        "ma_hd", "ngay_lap", "ma_nv", "tong_tien",
+        "ma_hang", "ten_hang", "so_luong", "don_gia", "thanh_tien",
+    ])
+
+    for hoa_don in hoa_dons:
+        for ct in hoa_don["chi_tiets"]:
+            yield writer.writerow([
+                hoa_don["ma_hd"],
+                hoa_don["ngay_lap"].isoformat(),
+                hoa_don["nhan_vien"],
+                hoa_don["tong_tien"],
+                ct["ma_hang"],
+                ct["ten_hang"],
+                ct["so_luong"],
+                ct["don_gia"],
+                ct["thanh_tien"],
+            ])
+
+
+_EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson; charset=utf-8", _ndjson_stream),
+    "csv": ("text/csv; charset=utf-8", _csv_stream),
+}
 
 
 @api_view(['GET'])
@@ -127,3 +307,224 @@ def doanh_thu_theo_thang(request):
 
     data = HoaDonService.doanh_thu_theo_thang(nam)
     return Response(data)
+
+
+@api_view(['GET'])
+def doanh_thu_theo_nam(request):
+    """
+    Thống kê doanh thu và số hóa đơn theo từng năm.
+
+    Response:
+    [
+        {"nam": 2024, "tong_doanh_thu": 120000000, "so_hoa_don": 5400},
+        ...
+    ]
+    """
+    data = HoaDonService.doanh_thu_theo_nam()
+    return Response(data)
+
+
+@api_view(['GET'])
+def chuoi_doanh_thu(request):
+    """
+    Chuỗi thời gian doanh thu trong khoảng [tu, den), điền 0 cho mốc trống.
+
+    Query params:
+    ?tu=2024-01-01               (ngày hoặc ngày giờ ISO; không có múi giờ
+    &den=2026-01-01               thì hiểu theo giờ Việt Nam)
+    &buoc=hour|day|week|month|year
+
+    Response (mảng song song):
+    {
+        "buoc": "month",
+        "moc": ["2024-01-01", "2024-02-01", ...],
+        "doanh_thu": ["1500000.00", "0.00", ...],
+        "so_hoa_don": [42, 0, ...]
+    }
+    - 400: Thiếu hoặc sai tham số
+    """
+    try:
+        tu = _doc_thoi_diem(request.query_params.get('tu'), 'tu')
+        den = _doc_thoi_diem(request.query_params.get('den'), 'den')
+        data = HoaDonService.chuoi_doanh_thu(
+            tu, den, request.query_params.get('buoc', 'day')
+        )
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response(data)
+
+
+def _doc_thoi_diem(value: str, ten: str) -> datetime:
+    """
+    Đọc ngày hoặc ngày giờ ISO thành datetime có múi giờ.
+
+    Raises:
+        ValueError: Thiếu hoặc sai định dạng
+    """
+    if not value:
+        raise ValueError(f"Thiếu tham số {ten}")
+
+    thoi_diem = parse_datetime(value)
+    if thoi_diem is None:
+        ngay = parse_date(value)
+        if ngay is None:
+            raise ValueError(f"{ten} không hợp lệ")
+        thoi_diem = datetime.combine(ngay, time.min)
+
+    if thoi_diem.tzinfo is None:
+        thoi_diem = thoi_diem.replace(tzinfo=MUI_GIO_BAO_CAO)
+    return thoi_diem
+
+
+@api_view(['GET'])
+def top_san_pham(request):
+    """
+    Top hàng hóa bán chạy trong khoảng ngày [tu_ngay, den_ngay).
+
+    Query params:
+    ?tu_ngay=2025-01-01          (bao gồm)
+    &den_ngay=2025-04-01         (không bao gồm)
+    &theo=so_luong|doanh_thu     (mặc định so_luong)
+    &n=10                        (1..100)
+    &ma_loai_hang=3              (tùy chọn)
+    &ma_thuong_hieu=5            (tùy chọn)
+
+    Response:
+    [
+        {"ma_hang": 101, "ten_hang": "...", "tong_so_luong": 530,
+         "tong_doanh_thu": 7950000},
+        ...
+    ]
+    - 400: Thiếu hoặc sai tham số
+    """
+    params = request.query_params
+    try:
+        tu_ngay, den_ngay = _doc_khoang_ngay(params)
+        data = HoaDonService.top_san_pham(
+            tu_ngay,
+            den_ngay,
+            theo=params.get('theo', 'so_luong'),
+            n=_doc_so_nguyen(params, 'n', 10),
+            ma_loai_hang=_doc_so_nguyen(params, 'ma_loai_hang'),
+            ma_thuong_hieu=_doc_so_nguyen(params, 'ma_thuong_hieu'),
+        )
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response(data)
+
+
+@api_view(['GET'])
+def top_san_pham_theo_nhom(request):
+    """
+    Doanh số theo loại hàng hoặc thương hiệu, kèm top hàng hóa
+    bán chạy của từng nhóm, trong khoảng ngày [tu_ngay, den_ngay).
+
+    Query params:
+    ?tu_ngay=2025-01-01
+    &den_ngay=2025-04-01
+    &nhom=loai_hang|thuong_hieu  (mặc định loai_hang)
+    &theo=so_luong|doanh_thu     (mặc định so_luong)
+    &n=5                         (số hàng hóa mỗi nhóm, 1..100)
+
+    Response:
+    [
+        {
+            "ma_nhom": 3, "ten_nhom": "Đồ uống",
+            "tong_so_luong": 1200, "tong_doanh_thu": 18000000,
+            "top": [{"ma_hang": 101, "ten_hang": "...", ...}, ...]
+        },
+        ...
+    ]
+    - 400: Thiếu hoặc sai tham số
+    """
+    params = request.query_params
+    try:
+        tu_ngay, den_ngay = _doc_khoang_ngay(params)
+        data = HoaDonService.top_san_pham_theo_nhom(
+            tu_ngay,
+            den_ngay,
+            nhom=params.get('nhom', 'loai_hang'),
+            theo=params.get('theo', 'so_luong'),
+            n=_doc_so_nguyen(params, 'n', 5),
+        )
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response(data)
+
+
+@api_view(['GET'])
+def mua_kem(request, ma_hang: int):
+    """
+    Các hàng hóa thường được mua kèm với một hàng hóa,
+    theo lần chạy gần nhất của lệnh phan_tich_mua_kem.
+
+    Query params:
+    ?n=10                        (1..50)
+
+    Response:
+    [
+        {"ma_hang": 205, "ten_hang": "...", "so_hoa_don": 812,
+         "ho_tro": 0.0041, "do_tin_cay": 0.23, "do_nang": 3.7,
+         "ngay_tinh": "2025-04-01T02:00:00Z"},
+        ...
+    ]
+    - 400: Sai tham số
+    """
+    try:
+        data = MuaKemService.get_mua_kem(
+            ma_hang, _doc_so_nguyen(request.query_params, 'n', 10)
+        )
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response(data)
+
+
+def _doc_khoang_ngay(params):
+    """
+    Đọc tu_ngay, den_ngay (YYYY-MM-DD) từ query string.
+
+    Raises:
+        ValueError: Thiếu hoặc sai định dạng
+    """
+    tu_ngay = params.get('tu_ngay')
+    den_ngay = params.get('den_ngay')
+    if not tu_ngay or not den_ngay:
+        raise ValueError("Thiếu tham số tu_ngay hoặc den_ngay")
+
+    try:
+        return date.fromisoformat(tu_ngay), date.fromisoformat(den_ngay)
+    except ValueError:
+        raise ValueError("Ngày không hợp lệ (định dạng YYYY-MM-DD)")
+
+
+def _doc_so_nguyen(params, ten: str, mac_dinh=None):
+    """
+    Đọc tham số số nguyên tùy chọn từ query string.
+
+    Raises:
+        ValueError: Không phải số nguyên
+    """
+    value = params.get(ten)
+    if value in (None, ""):
+        return mac_dinh
+
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{ten} phải là số nguyên")
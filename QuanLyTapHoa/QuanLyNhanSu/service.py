@@ -3,7 +3,7 @@ from decimal import Decimal
 
 from QuanLyNhanSu.models.chuc_vu import ChucVuRepository, ChucVu
 from QuanLyNhanSu.models.nhan_vien import NhanVienRepository, NhanVien
-from QuanLyHoaDon.models.hoa_don import HoaDonRepository
+from QuanLyHoaDon.models.doanh_thu_ngay import DoanhThuNgayRepository
 from QuanLyNhanSu.models.tham_so import ThamSoLuongRepository
 
 
@@ -186,10 +186,12 @@ class NhanVienService:
         """
         Thống kê số hóa đơn và tổng doanh thu của mỗi nhân viên.
 
+        Đọc từ bảng tổng hợp DOANH_THU_NGAY thay vì quét HOA_DON.
+
         Returns:
             List[dict]: Danh sách thống kê
         """
-        raw_data = HoaDonRepository.thong_ke_theo_nhan_vien()
+        raw_data = DoanhThuNgayRepository.thong_ke_theo_nhan_vien()
 
         result = []
         for item in raw_data:
@@ -0,0 +1,192 @@
+"""
+Bộ nhớ đệm đọc xuyên (read-through) dùng chung cho các repository.
+
+Hai backend có cùng giao diện (lay / dat / xoa / xoa_tat_ca / thong_ke):
+- BoNhoDemLRU: bộ nhớ của process, giới hạn số mục, bỏ mục lâu không
+  dùng nhất (LRU). Mặc định, nhanh nhất nhưng mỗi worker một bản.
+- BoNhoDemDjango: một backend trong settings.CACHES (Redis,
+  Memcached...), dùng chung giữa các worker.
+
+Giá trị luôn được sao chép khi lưu / lấy (pickle), nên nơi gọi có thể
+sửa object nhận được mà không làm hỏng bản trong bộ nhớ đệm.
+
+Ví dụ:
+    bo_nho_dem = tao_bo_nho_dem("hanghoa", so_muc_toi_da=10000, ttl=300)
+    obj = bo_nho_dem.lay(ma_hang)
+    if obj is None:
+        obj = HangHoa.objects.get(pk=ma_hang)
+        bo_nho_dem.dat(ma_hang, obj)
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from django.core.cache import caches
+
+
+class BoNhoDemLRU:
+    """
+    Bộ nhớ đệm LRU trong bộ nhớ của process.
+    """
+
+    def __init__(self, so_muc_toi_da: int = 10000, ttl: Optional[float] = None):
+        """
+        Args:
+            so_muc_toi_da (int): Số mục tối đa, vượt quá thì bỏ mục
+                lâu không dùng nhất.
+            ttl (float, optional): Thời gian sống (giây) của mỗi mục,
+                None là không hết hạn.
+        """
+        self.so_muc_toi_da = so_muc_toi_da
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (hết hạn lúc hoặc None, giá trị đã pickle)
+        self._muc: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._so_lan_trung = 0
+        self._so_lan_truot = 0
+        self._so_lan_loai = 0
+
+    def lay(self, key: Hashable) -> Any:
+        """
+        Lấy bản sao giá trị của key, None nếu chưa có hoặc đã hết hạn.
+        """
+        with self._lock:
+            muc = self._muc.get(key)
+            if muc is not None and muc[0] is not None and muc[0] < time.monotonic():
+                del self._muc[key]
+                muc = None
+            if muc is None:
+                self._so_lan_truot += 1
+                return None
+            self._muc.move_to_end(key)
+            self._so_lan_trung += 1
+            du_lieu = muc[1]
+        return pickle.loads(du_lieu)
+
+    def dat(self, key: Hashable, gia_tri: Any) -> None:
+        """
+        Lưu bản sao của giá trị.
+        """
+        du_lieu = pickle.dumps(gia_tri, pickle.HIGHEST_PROTOCOL)
+        het_han = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._muc[key] = (het_han, du_lieu)
+            self._muc.move_to_end(key)
+            while len(self._muc) > self.so_muc_toi_da:
+                self._muc.popitem(last=False)
+                self._so_lan_loai += 1
+
+    def xoa(self, key: Hashable) -> None:
+        with self._lock:
+            self._muc.pop(key, None)
+
+    def xoa_tat_ca(self) -> None:
+        with self._lock:
+            self._muc.clear()
+
+    def thong_ke(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": "lru",
+                "so_muc": len(self._muc),
+                "so_muc_toi_da": self.so_muc_toi_da,
+                "so_lan_trung": self._so_lan_trung,
+                "so_lan_truot": self._so_lan_truot,
+                "so_lan_loai": self._so_lan_loai,
+            }
+
+
+class BoNhoDemDjango:
+    """
+    Bộ nhớ đệm trên một backend cache của Django.
+
+    Key được gắn tiền tố và thế hệ; tăng thế hệ là hủy toàn bộ
+    (giống ThongKeDoanhThuCache). Bộ đếm trúng / trượt là của riêng
+    process; backend không báo số mục bị loại nên so_lan_loai là None.
+    """
+
+    def __init__(self, tien_to: str, alias: str = "default", ttl: Optional[float] = None):
+        """
+        Args:
+            tien_to (str): Tiền tố key, phân biệt các bộ nhớ đệm dùng chung backend.
+            alias (str): Tên backend trong settings.CACHES.
+            ttl (float, optional): Thời gian sống (giây), None là không hết hạn.
+        """
+        self.tien_to = tien_to
+        self.alias = alias
+        self.ttl = ttl
+        self._key_the_he = f"{tien_to}:the_he"
+        self._lock = threading.Lock()
+        self._so_lan_trung = 0
+        self._so_lan_truot = 0
+
+    @property
+    def _cache(self):
+        return caches[self.alias]
+
+    def _the_he(self) -> int:
+        the_he = self._cache.get(self._key_the_he)
+        if the_he is None:
+            self._cache.add(self._key_the_he, 1, timeout=None)
+            the_he = self._cache.get(self._key_the_he, 1)
+        return the_he
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.tien_to}:{self._the_he()}:{key}"
+
+    def lay(self, key: Hashable) -> Any:
+        gia_tri = self._cache.get(self._key(key))
+        with self._lock:
+            if gia_tri is None:
+                self._so_lan_truot += 1
+            else:
+                self._so_lan_trung += 1
+        return gia_tri
+
+    def dat(self, key: Hashable, gia_tri: Any) -> None:
+        self._cache.set(self._key(key), gia_tri, timeout=self.ttl)
+
+    def xoa(self, key: Hashable) -> None:
+        self._cache.delete(self._key(key))
+
+    def xoa_tat_ca(self) -> None:
+        try:
+            self._cache.incr(self._key_the_he)
+        except ValueError:
+            self._cache.set(self._key_the_he, 2, timeout=None)
+
+    def thong_ke(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": f"django:{self.alias}",
+                "so_lan_trung": self._so_lan_trung,
+                "so_lan_truot": self._so_lan_truot,
+                "so_lan_loai": None,
+            }
+
+
+def tao_bo_nho_dem(
+    tien_to: str,
+    alias: Optional[str] = None,
+    so_muc_toi_da: int = 10000,
+    ttl: Optional[float] = None
+):
+    """
+    Tạo bộ nhớ đệm theo cấu hình.
+
+    Args:
+        tien_to (str): Tên / tiền tố key của bộ nhớ đệm.
+        alias (str, optional): Tên backend trong settings.CACHES;
+            None là dùng BoNhoDemLRU trong process.
+        so_muc_toi_da (int): Số mục tối đa của BoNhoDemLRU.
+        ttl (float, optional): Thời gian sống (giây) của mỗi mục.
+
+    Returns:
+        BoNhoDemLRU | BoNhoDemDjango
+    """
+    if alias:
+        return BoNhoDemDjango(tien_to, alias=alias, ttl=ttl)
+    return BoNhoDemLRU(so_muc_toi_da=so_muc_toi_da, ttl=ttl)
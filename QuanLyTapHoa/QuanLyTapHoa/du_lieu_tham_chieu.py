@@ -0,0 +1,154 @@
+"""
+Bản chụp bất biến trong bộ nhớ cho các bảng tham chiếu nhỏ, hiếm khi
+thay đổi (đơn vị tính, loại hàng, thương hiệu).
+
+Mỗi process giữ một BanChup: dict khóa chính -> object chỉ đọc, kèm
+số phiên bản. Tra cứu không tốn truy vấn nào. Khi repository sửa bảng,
+phiên bản trong CSDL (bảng PHIEN_BAN, xem QuanLyTapHoa/phien_ban.py)
+được tăng trong cùng transaction; bản chụp của process đó được nạp lại
+và hoán đổi nguyên khối sau commit (request đang chạy vẫn thấy bản cũ
+trọn vẹn). Các worker khác so phiên bản tối đa một lần mỗi
+settings.THAM_CHIEU_THOI_GIAN_KIEM_TRA giây, và ngay khi tra một khóa
+không có trong bản chụp (vd. đơn vị tính vừa tạo ở worker khác).
+Mọi lần nạp lại do dữ liệu đổi đều gọi các hàm đăng ký khi thay đổi.
+
+Object trong bản chụp dùng chung giữa các request: chỉ được đọc.
+Cần sửa thì đọc lại từ CSDL.
+"""
+
+import threading
+import time
+from types import MappingProxyType
+from typing import Callable, Iterable, List, Mapping, Optional, Tuple
+
+from django.conf import settings
+from django.db import models, transaction
+
+from QuanLyTapHoa import phien_ban
+
+
+class BanChup:
+    """
+    Một phiên bản bất biến của bảng tham chiếu.
+    """
+
+    __slots__ = ("phien_ban", "danh_sach", "theo_khoa")
+
+    def __init__(self, phien_ban: int, danh_sach: Iterable[models.Model]):
+        self.phien_ban = phien_ban
+        self.danh_sach: Tuple[models.Model, ...] = tuple(danh_sach)
+        self.theo_khoa: Mapping = MappingProxyType(
+            {obj.pk: obj for obj in self.danh_sach}
+        )
+
+
+class DuLieuThamChieu:
+    """
+    Bản chụp dùng chung trong process của một bảng tham chiếu.
+    """
+
+    def __init__(self, ten: str, nap: Callable[[], Iterable[models.Model]]):
+        """
+        Args:
+            ten (str): Tên bảng, dùng làm tên phiên bản (QuanLyTapHoa/phien_ban.py).
+            nap (Callable): Hàm đọc toàn bộ bảng từ CSDL (đã sắp xếp).
+        """
+        self.ten = ten
+        self._nap = nap
+        self._ten_phien_ban = f"thamchieu:{ten}"
+        self._lock = threading.Lock()
+        self._ban_chup: Optional[BanChup] = None
+        self._kiem_tra_luc = 0.0
+        self._khi_thay_doi: List[Callable[[], None]] = []
+
+    def __deepcopy__(self, memo):
+        # Dùng chung trong process: field của DRF deepcopy tham số khi
+        # khởi tạo serializer, không được tạo bản sao thứ hai
+        return self
+
+    def dang_ky_khi_thay_doi(self, ham: Callable[[], None]) -> None:
+        """
+        Đăng ký hàm được gọi sau khi bảng bị sửa (vd. hủy cache phụ thuộc).
+        """
+        self._khi_thay_doi.append(ham)
+
+    def _phien_ban_chung(self) -> int:
+        return phien_ban.doc(self._ten_phien_ban)[self._ten_phien_ban]
+
+    def _kiem_tra(self) -> Tuple[BanChup, bool]:
+        """
+        So phiên bản trong CSDL với bản chụp, nạp lại khi khác (gọi khi
+        đang giữ self._lock).
+
+        Returns:
+            Tuple[BanChup, bool]: Bản chụp hiện tại, và True nếu bản chụp
+            cũ vừa bị thay vì dữ liệu đã đổi.
+        """
+        ban_chup = self._ban_chup
+        phien_ban_moi = self._phien_ban_chung()
+        thay_doi = False
+        if ban_chup is None or ban_chup.phien_ban != phien_ban_moi:
+            thay_doi = ban_chup is not None
+            ban_chup = BanChup(phien_ban_moi, self._nap())
+            self._ban_chup = ban_chup
+        self._kiem_tra_luc = time.monotonic() + getattr(
+            settings, "THAM_CHIEU_THOI_GIAN_KIEM_TRA", 30
+        )
+        return ban_chup, thay_doi
+
+    def _sau_kiem_tra(self, ban_chup: BanChup, thay_doi: bool) -> BanChup:
+        # Mọi lần nạp lại do dữ liệu đổi (dù phát hiện ở đâu) đều gọi
+        # các hàm đăng ký, ngoài self._lock
+        if thay_doi:
+            for ham in self._khi_thay_doi:
+                ham()
+        return ban_chup
+
+    def lay(self) -> BanChup:
+        """
+        Bản chụp hiện tại; nạp lần đầu, hoặc nạp lại khi worker khác đã
+        tăng phiên bản (kiểm tra tối đa một lần mỗi
+        THAM_CHIEU_THOI_GIAN_KIEM_TRA giây).
+        """
+        ban_chup = self._ban_chup
+        if ban_chup is not None and time.monotonic() < self._kiem_tra_luc:
+            return ban_chup
+
+        with self._lock:
+            ban_chup = self._ban_chup
+            if ban_chup is not None and time.monotonic() < self._kiem_tra_luc:
+                return ban_chup
+            ban_chup, thay_doi = self._kiem_tra()
+        return self._sau_kiem_tra(ban_chup, thay_doi)
+
+    def get(self, khoa) -> Optional[models.Model]:
+        """
+        Tra cứu theo khóa chính, None nếu không tồn tại.
+        """
+        obj = self.lay().theo_khoa.get(khoa)
+        if obj is None:
+            # Có thể vừa được thêm ở worker khác: kiểm tra phiên bản ngay,
+            # không chờ hết THAM_CHIEU_THOI_GIAN_KIEM_TRA
+            obj = self.nap_lai().theo_khoa.get(khoa)
+        return obj
+
+    def danh_sach(self) -> Tuple[models.Model, ...]:
+        return self.lay().danh_sach
+
+    def nap_lai(self) -> BanChup:
+        """
+        Kiểm tra phiên bản trong CSDL ngay, nạp lại và hoán đổi bản chụp
+        nếu đã đổi.
+        """
+        with self._lock:
+            ban_chup, thay_doi = self._kiem_tra()
+        return self._sau_kiem_tra(ban_chup, thay_doi)
+
+    def da_thay_doi(self) -> None:
+        """
+        Gọi sau khi repository sửa bảng, trong cùng transaction: tăng
+        phiên bản trong CSDL (worker khác thấy khi transaction commit)
+        và nạp lại bản chụp của process này sau commit.
+        """
+        phien_ban.tang(self._ten_phien_ban)
+        transaction.on_commit(self.nap_lai)
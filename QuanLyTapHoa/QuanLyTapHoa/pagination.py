@@ -0,0 +1,188 @@
+"""
+Phân trang keyset (cursor) dùng chung cho các API danh sách.
+
+Khác với phân trang OFFSET (chi phí tăng tuyến tính theo số trang),
+phân trang keyset lọc theo giá trị khóa sắp xếp của dòng cuối trang
+trước, nên mỗi trang chỉ là một lần seek trên chỉ mục:
+
+    WHERE (NgayLap < @n) OR (NgayLap = @n AND MaHD < @m)
+    ORDER BY NgayLap DESC, MaHD DESC
+
+Cursor trả cho client là chuỗi base64 mờ (opaque), client chỉ việc
+gửi lại nguyên văn để lấy trang kế tiếp. Cursor mang theo cách sắp xếp
+đã tạo ra nó: gửi lại với cách sắp xếp khác (hoặc cursor bị sửa) là
+tham số không hợp lệ (ValueError, API trả 400), không phải lỗi truy vấn.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+
+
+class KeysetPaginator:
+    """
+    Phân trang keyset theo một danh sách trường sắp xếp.
+
+    Trường cuối cùng trong ordering phải là duy nhất (thường là khóa chính)
+    để thứ tự ổn định tuyệt đối, kể cả khi có dữ liệu mới được thêm vào
+    trong lúc client đang duyệt.
+    """
+
+    def __init__(
+        self,
+        ordering: Sequence[str],
+        page_size_mac_dinh: int = 50,
+        page_size_toi_da: int = 500
+    ):
+        """
+        Args:
+            ordering (Sequence[str]): Các trường sắp xếp, tiền tố '-' là giảm dần.
+                Ví dụ: ('-ngay_lap', '-ma_hd').
+            page_size_mac_dinh (int): Số dòng mỗi trang khi client không truyền.
+            page_size_toi_da (int): Số dòng tối đa mỗi trang.
+        """
+        self.ordering = tuple(ordering)
+        self.page_size_mac_dinh = page_size_mac_dinh
+        self.page_size_toi_da = page_size_toi_da
+
+    # =====================
+    # Tham số request
+    # =====================
+    def doc_tham_so(self, query_params) -> Tuple[Optional[List], int]:
+        """
+        Đọc cursor và page_size từ query string.
+
+        Returns:
+            tuple: (giá trị khóa đã giải mã hoặc None, page_size)
+
+        Raises:
+            ValueError: Khi cursor hoặc page_size không hợp lệ.
+        """
+        page_size = query_params.get("page_size")
+        if page_size in (None, ""):
+            page_size = self.page_size_mac_dinh
+        else:
+            try:
+                page_size = int(page_size)
+            except ValueError:
+                raise ValueError("page_size phải là số nguyên")
+            if page_size <= 0:
+                raise ValueError("page_size phải > 0")
+            page_size = min(page_size, self.page_size_toi_da)
+
+        cursor = query_params.get("cursor")
+        return (self.giai_ma(cursor) if cursor else None), page_size
+
+    # =====================
+    # Cursor
+    # =====================
+    def _sap_xep(self) -> str:
+        return ",".join(self.ordering)
+
+    def ma_hoa(self, gia_tri: Sequence[Any]) -> str:
+        """
+        Mã hóa cách sắp xếp và giá trị khóa sắp xếp thành cursor mờ.
+        """
+        raw = json.dumps(
+            {
+                "s": self._sap_xep(),
+                "v": [v if isinstance(v, (int, str)) or v is None else str(v)
+                      for v in gia_tri],
+            },
+            separators=(",", ":"), ensure_ascii=False
+        )
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def giai_ma(self, cursor: str) -> List:
+        """
+        Giải mã cursor do ma_hoa tạo ra.
+
+        Raises:
+            ValueError: Khi cursor không hợp lệ hoặc được tạo với cách
+                sắp xếp khác.
+        """
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            noi_dung = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        except (binascii.Error, ValueError, UnicodeDecodeError):
+            raise ValueError("cursor không hợp lệ")
+
+        if not isinstance(noi_dung, dict):
+            raise ValueError("cursor không hợp lệ")
+        if noi_dung.get("s") != self._sap_xep():
+            raise ValueError("cursor không thuộc cách sắp xếp hiện tại")
+        gia_tri = noi_dung.get("v")
+        if not isinstance(gia_tri, list) or len(gia_tri) != len(self.ordering):
+            raise ValueError("cursor không hợp lệ")
+        return gia_tri
+
+    # =====================
+    # Phân trang
+    # =====================
+    def _dieu_kien_sau(self, gia_tri: Sequence[Any]) -> Q:
+        """
+        Điều kiện "nằm sau vị trí cursor" theo thứ tự sắp xếp:
+            (a > x) OR (a = x AND b > y) OR ...
+        kèm điều kiện thừa a >= x giúp optimizer seek trên chỉ mục.
+        """
+        dieu_kien = Q()
+        bang_nhau = {}
+
+        for truong, v in zip(self.ordering, gia_tri):
+            ten = truong.lstrip("-")
+            phep_so_sanh = "lt" if truong.startswith("-") else "gt"
+            dieu_kien |= Q(**bang_nhau, **{f"{ten}__{phep_so_sanh}": v})
+            bang_nhau[ten] = v
+
+        dau = self.ordering[0]
+        ten_dau = dau.lstrip("-")
+        phep_dau = "lte" if dau.startswith("-") else "gte"
+        return Q(**{f"{ten_dau}__{phep_dau}": gia_tri[0]}) & dieu_kien
+
+    def _gia_tri_khoa(self, item) -> List:
+        """
+        Lấy giá trị khóa sắp xếp của một dòng (model hoặc dict từ values()).
+        """
+        ten_truong = [truong.lstrip("-") for truong in self.ordering]
+        if isinstance(item, dict):
+            return [item[ten] for ten in ten_truong]
+        return [getattr(item, ten) for ten in ten_truong]
+
+    def paginate(
+        self,
+        qs: QuerySet,
+        cursor: Optional[Sequence[Any]],
+        page_size: int
+    ) -> Tuple[List, Optional[str]]:
+        """
+        Lấy một trang dữ liệu.
+
+        Args:
+            qs (QuerySet): QuerySet nguồn (có thể đã lọc, prefetch).
+            cursor: Giá trị khóa đã giải mã của trang trước, None nếu trang đầu.
+            page_size (int): Số dòng mỗi trang.
+
+        Returns:
+            tuple: (danh sách dòng của trang, cursor trang kế tiếp hoặc None)
+
+        Raises:
+            ValueError: Giá trị trong cursor sai kiểu với trường sắp xếp.
+        """
+        qs = qs.order_by(*self.ordering)
+        if cursor is not None:
+            try:
+                qs = qs.filter(self._dieu_kien_sau(cursor))
+            except (ValidationError, TypeError, ValueError):
+                raise ValueError("cursor không hợp lệ")
+
+        # Lấy dư 1 dòng để biết còn trang sau hay không
+        items = list(qs[:page_size + 1])
+        if len(items) <= page_size:
+            return items, None
+
+        items = items[:page_size]
+        return items, self.ma_hoa(self._gia_tri_khoa(items[-1]))
@@ -0,0 +1,65 @@
+"""
+Phiên bản dùng chung giữa mọi worker, lưu trong CSDL (bảng PHIEN_BAN,
+sql/11_phien_ban.sql).
+
+Dữ liệu giữ trong bộ nhớ process (bản chụp bảng tham chiếu) hoặc trong
+cache (thống kê) được gắn với một phiên bản có tên. Nơi sửa dữ liệu
+gọi tang() trong cùng transaction; nơi đọc so phiên bản đã nạp với
+doc() để biết worker khác đã sửa. Khác cache cục bộ (LocMemCache),
+mọi worker đọc cùng một giá trị.
+
+Ví dụ:
+    with transaction.atomic():
+        ...sửa bảng...
+        phien_ban.tang("thamchieu:donvitinh")
+
+    phien_ban.doc("thamchieu:donvitinh")
+    # {"thamchieu:donvitinh": 35721}
+"""
+
+from typing import Dict
+
+from django.db import connection
+
+
+def doc(*cac_ten: str) -> Dict[str, int]:
+    """
+    Đọc phiên bản hiện tại (đã commit) của các tên.
+
+    Args:
+        *cac_ten (str): Tên các phiên bản.
+
+    Returns:
+        Dict[str, int]: {tên: phiên bản}, 0 nếu chưa từng tăng.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT Ten, CAST(PhienBan AS BIGINT) FROM PHIEN_BAN
+            WHERE Ten IN ({', '.join(['%s'] * len(cac_ten))})
+            """,
+            list(cac_ten)
+        )
+        ket_qua = dict(cursor.fetchall())
+    return {ten: ket_qua.get(ten, 0) for ten in cac_ten}
+
+
+def tang(ten: str) -> None:
+    """
+    Tăng phiên bản (tạo dòng nếu chưa có). Gọi trong transaction của
+    thay đổi dữ liệu: phiên bản mới chỉ hiện ra với worker khác cùng
+    lúc với dữ liệu mới.
+
+    Args:
+        ten (str): Tên phiên bản.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            MERGE PHIEN_BAN WITH (HOLDLOCK) AS t
+            USING (SELECT %s AS Ten) AS v ON t.Ten = v.Ten
+            WHEN MATCHED THEN UPDATE SET SoLan = t.SoLan + 1
+            WHEN NOT MATCHED THEN INSERT (Ten, SoLan) VALUES (v.Ten, 1);
+            """,
+            [ten]
+        )
@@ -0,0 +1,53 @@
+"""
+Công cụ phát hiện truy vấn phát sinh ngoài ý muốn (lazy load / N+1).
+
+Dùng quanh bước serialize dữ liệu đã nạp sẵn: nếu serializer truy cập
+một quan hệ chưa được select_related / prefetch_related, Django sẽ
+tự động truy vấn thêm. Khi bật QUERY_GUARD_ENABLED (trong test),
+truy vấn đó bị chặn và ném LazyLoadError để test thất bại ngay.
+
+Ví dụ:
+    hoa_dons = list(HoaDonService.get_all_hoa_don())
+    with cam_truy_van("HoaDonSerializer"):
+        data = HoaDonSerializer(hoa_dons, many=True).data
+"""
+
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+
+class LazyLoadError(AssertionError):
+    """
+    Lỗi khi có truy vấn CSDL trong vùng đã bị cấm truy vấn.
+    """
+
+
+@contextmanager
+def cam_truy_van(mo_ta: str = "", using: str = "default"):
+    """
+    Cấm mọi truy vấn CSDL trong khối lệnh.
+
+    Chỉ có hiệu lực khi settings.QUERY_GUARD_ENABLED = True,
+    ở chế độ thường khối lệnh chạy như bình thường.
+
+    Args:
+        mo_ta (str): Mô tả vùng được bảo vệ, dùng trong thông báo lỗi.
+        using (str): Alias kết nối CSDL cần theo dõi.
+
+    Raises:
+        LazyLoadError: Khi có truy vấn phát sinh trong khối lệnh.
+    """
+    if not getattr(settings, "QUERY_GUARD_ENABLED", False):
+        yield
+        return
+
+    def chan_truy_van(execute, sql, params, many, context):
+        raise LazyLoadError(
+            f"{mo_ta or 'Vùng cấm truy vấn'}: phát sinh truy vấn "
+            f"ngoài ý muốn (thiếu select_related/prefetch_related?): {sql}"
+        )
+
+    with connections[using].execute_wrapper(chan_truy_van):
+        yield
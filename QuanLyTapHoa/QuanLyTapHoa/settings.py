@@ -127,6 +127,25 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# Mặc định dùng bộ nhớ của từng process; khi chạy nhiều worker nên đổi sang
+# backend dùng chung (Redis, Memcached...) để việc hủy cache đồng bộ giữa các worker.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Thống kê doanh thu: TTL (giây) cho tháng đang mở và tháng đã chốt, thời
+# gian chờ (giây) sau khi hết tháng mới coi tháng đó đã chốt sổ, và alias
+# trong CACHES (nên là backend dùng chung). Thế hệ cache nằm trong CSDL nên
+# việc hủy cache luôn có hiệu lực trên mọi worker.
+THONG_KE_CACHE_TTL = 30
+THONG_KE_CACHE_TTL_DA_CHOT = 86400
+THONG_KE_THOI_GIAN_CHOT_SO = 3600
+THONG_KE_CACHE_BACKEND = 'default'
+
 # Không bắt buộc, nhưng chuẩn backend API thì nên thêm:
 
 REST_FRAMEWORK = {
@@ -134,3 +153,61 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
     ],
 }
+
+# Chặn truy vấn phát sinh khi serialize dữ liệu đã nạp sẵn (lazy load / N+1).
+# Bật trong test (override_settings) để phát hiện thiếu select_related /
+# prefetch_related, xem QuanLyTapHoa/query_guard.py
+QUERY_GUARD_ENABLED = False
+
+# Test: tạo bảng cho các model managed = False và chạy các script sql/
+# trên CSDL test, xem QuanLyTapHoa/test_runner.py
+TEST_RUNNER = "QuanLyTapHoa.test_runner.QuanLyTapHoaTestRunner"
+
+# API danh sách hàng hóa: dựng JSON trực tiếp từ values() thay vì qua
+# HangHoaSerializer (nhanh hơn nhiều với danh mục lớn, output giống hệt).
+# Đo bằng: python manage.py benchmark_hang_hoa_serializer
+HANG_HOA_DANH_SACH_NHANH = False
+
+# Tìm kiếm hàng hóa: chỉ mục trong bộ nhớ của mỗi process được nạp lại
+# sau số giây này để nhận thay đổi từ các worker khác (None: không nạp lại).
+# Thay đổi trong chính process được cập nhật ngay sau commit.
+TIM_KIEM_THOI_GIAN_LAM_MOI = 300
+
+# Gợi ý hàng hóa khi gõ (autocomplete): độ phổ biến là số lượng bán trong
+# GOI_Y_SO_NGAY_PHO_BIEN ngày gần nhất, chỉ mục được dựng lại ở thread nền
+# sau GOI_Y_THOI_GIAN_LAM_MOI giây (None: không dựng lại).
+GOI_Y_THOI_GIAN_LAM_MOI = 900
+GOI_Y_SO_NGAY_PHO_BIEN = 90
+
+# Quét mã vạch: thông tin hàng hóa (giá, tồn kho) theo mã vạch được đệm
+# trong mỗi process tối đa MA_VACH_THOI_GIAN_SONG giây. Thay đổi ở mọi
+# worker hủy mục đệm qua nhật ký HANG_HOA_THAY_DOI (xem HANG_HOA_CACHE_*).
+MA_VACH_THOI_GIAN_SONG = 60
+MA_VACH_SO_MUC_TOI_DA = 100000
+
+# Bộ nhớ đệm hàng hóa theo mã (HangHoaRepository.get_by_id):
+# HANG_HOA_CACHE_BACKEND = None dùng LRU trong bộ nhớ của process
+# (tối đa HANG_HOA_CACHE_SO_MUC_TOI_DA mục); đặt tên một backend trong
+# CACHES (vd. 'default' khi là Redis) để các worker dùng chung.
+# Bộ nhớ đệm trong process (LRU, mã vạch) đọc nhật ký HANG_HOA_THAY_DOI
+# trước mỗi lần đọc để hủy mục mà worker khác vừa sửa; đặt
+# HANG_HOA_CACHE_THOI_GIAN_KIEM_TRA > 0 để kiểm tra thưa hơn (chấp nhận
+# dữ liệu cũ tối đa ngần ấy giây).
+HANG_HOA_CACHE_BACKEND = None
+HANG_HOA_CACHE_SO_MUC_TOI_DA = 10000
+HANG_HOA_CACHE_TTL = 300
+HANG_HOA_CACHE_THOI_GIAN_KIEM_TRA = 0
+
+# Bảng tham chiếu (đơn vị tính, loại hàng, thương hiệu) giữ bản chụp trong
+# bộ nhớ; mỗi process so phiên bản trong CSDL (bảng PHIEN_BAN) tối đa một
+# lần mỗi THAM_CHIEU_THOI_GIAN_KIEM_TRA giây để nạp lại khi worker khác sửa.
+THAM_CHIEU_THOI_GIAN_KIEM_TRA = 30
+
+# Cảnh báo tồn kho thấp: sau mỗi thay đổi tồn kho đã commit, các hàng hóa
+# vừa vào / ra danh sách cần đặt lại được POST (JSON) tới từng URL sau ở
+# một thread nền, chờ tối đa CANH_BAO_TON_KHO_THOI_GIAN_CHO giây ([]: không
+# gửi). Hàng đợi chờ gửi giữ tối đa CANH_BAO_TON_KHO_HANG_DOI thông báo,
+# đầy thì bỏ thông báo mới. Danh sách đầy đủ: GET /api/hanghoa/can-dat-lai/
+CANH_BAO_TON_KHO_WEBHOOKS = []
+CANH_BAO_TON_KHO_THOI_GIAN_CHO = 5
+CANH_BAO_TON_KHO_HANG_DOI = 1000
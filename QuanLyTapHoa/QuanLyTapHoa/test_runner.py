@@ -0,0 +1,87 @@
+"""
+Test runner cho CSDL có sẵn.
+
+Các model của dự án đều managed = False (bảng do DBA tạo), nên CSDL
+test Django tạo ra không có bảng nào. Runner này dựng CSDL test giống
+CSDL thật:
+
+1. Bỏ qua migrations của các app trong dự án và tạm bật managed cho
+   các model có bảng gốc (HANG_HOA, HOA_DON, NHAN_VIEN...), để Django
+   tạo bảng từ model.
+2. Chạy lần lượt các script sql/*.sql (tách lô theo GO như sqlcmd):
+   bảng tổng hợp, ROWVERSION, chỉ mục, indexed view... Bảng nào do
+   script tạo thì không được tạo từ model ở bước 1.
+
+Dùng qua settings.TEST_RUNNER:
+    python manage.py test
+"""
+
+import re
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.test.runner import DiscoverRunner
+
+# Các app có model trỏ vào bảng của CSDL quản lý tạp hóa
+APP_DU_AN = ("QuanLyHangHoa", "QuanLyHoaDon", "QuanLyNhanSu")
+
+THU_MUC_SQL = settings.BASE_DIR / "sql"
+
+
+def _cac_script_sql():
+    """
+    Nội dung các script sql/*.sql theo thứ tự tên file.
+    """
+    return [
+        duong_dan.read_text(encoding="utf-8")
+        for duong_dan in sorted(THU_MUC_SQL.glob("*.sql"))
+    ]
+
+
+def _tach_lo(script: str):
+    """
+    Tách script thành các lô theo dòng GO, bỏ lô chỉ có chú thích.
+    """
+    for lo in re.split(r"^\s*GO\s*$", script, flags=re.MULTILINE | re.IGNORECASE):
+        noi_dung = re.sub(r"--[^\n]*", "", lo).strip()
+        if noi_dung:
+            yield lo
+
+
+class QuanLyTapHoaTestRunner(DiscoverRunner):
+    """
+    DiscoverRunner tạo bảng cho các model managed = False và chạy các
+    script sql/ trên CSDL test.
+    """
+
+    def setup_databases(self, **kwargs):
+        scripts = _cac_script_sql()
+        bang_tu_script = {
+            ten.upper()
+            for script in scripts
+            for ten in re.findall(r"CREATE TABLE dbo\.(\w+)", script)
+        }
+
+        settings.MIGRATION_MODULES = {app: None for app in APP_DU_AN}
+        for app in APP_DU_AN:
+            for model in apps.get_app_config(app).get_models():
+                if not model._meta.managed and model._meta.db_table.upper() not in bang_tu_script:
+                    model._meta.managed = True
+
+        old_config = super().setup_databases(**kwargs)
+
+        for alias in connections:
+            connection = connections[alias]
+            connection.ensure_connection()
+            cursor = connection.connection.cursor()
+            try:
+                for script in scripts:
+                    for lo in _tach_lo(script):
+                        # Chạy trực tiếp trên driver: script có '%' và
+                        # không có tham số
+                        cursor.execute(lo)
+            finally:
+                cursor.close()
+
+        return old_config
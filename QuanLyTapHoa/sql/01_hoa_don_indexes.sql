@@ -0,0 +1,29 @@
+-- =========================================================
+-- Chỉ mục cho phân trang keyset danh sách hóa đơn
+-- (ORDER BY NgayLap DESC, MaHD DESC)
+--
+-- Các model dùng managed = False nên Django không tạo chỉ mục,
+-- chạy script này trực tiếp trên CSDL QuanLyTapHoa.
+-- =========================================================
+
+-- GET /api/hoadon/
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_HOA_DON_NgayLap_MaHD'
+      AND object_id = OBJECT_ID('dbo.HOA_DON')
+)
+    CREATE INDEX IX_HOA_DON_NgayLap_MaHD
+        ON dbo.HOA_DON (NgayLap DESC, MaHD DESC)
+        INCLUDE (MaNV, TongTien);
+GO
+
+-- GET /api/hoadon/nhanvien/<ma_nv>/
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_HOA_DON_MaNV_NgayLap_MaHD'
+      AND object_id = OBJECT_ID('dbo.HOA_DON')
+)
+    CREATE INDEX IX_HOA_DON_MaNV_NgayLap_MaHD
+        ON dbo.HOA_DON (MaNV, NgayLap DESC, MaHD DESC)
+        INCLUDE (TongTien);
+GO
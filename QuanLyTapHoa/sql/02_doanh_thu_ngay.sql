@@ -0,0 +1,27 @@
+-- =========================================================
+-- Bảng tổng hợp doanh thu theo ngày (giờ Việt Nam) và nhân viên
+-- Được cộng dồn trong transaction tạo hóa đơn
+-- (HoaDonService.create_hoa_don).
+--
+-- Nạp dữ liệu lần đầu sau khi tạo bảng:
+--     python manage.py rebuild_doanh_thu_ngay
+-- =========================================================
+
+IF OBJECT_ID('dbo.DOANH_THU_NGAY', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.DOANH_THU_NGAY (
+        MaDTN        INT IDENTITY(1, 1) NOT NULL
+            CONSTRAINT PK_DOANH_THU_NGAY PRIMARY KEY NONCLUSTERED,
+        Ngay         DATE           NOT NULL,
+        MaNV         INT            NOT NULL
+            CONSTRAINT FK_DOANH_THU_NGAY_NHAN_VIEN
+            REFERENCES dbo.NHAN_VIEN (MaNV),
+        SoHoaDon     INT            NOT NULL DEFAULT 0,
+        TongDoanhThu DECIMAL(18, 2) NOT NULL DEFAULT 0
+    );
+
+    -- Khóa tổng hợp, đồng thời là chỉ mục cho truy vấn theo khoảng ngày
+    CREATE UNIQUE CLUSTERED INDEX UX_DOANH_THU_NGAY_Ngay_MaNV
+        ON dbo.DOANH_THU_NGAY (Ngay, MaNV);
+END
+GO
@@ -0,0 +1,28 @@
+-- =========================================================
+-- Bảng tổng hợp doanh số theo ngày (giờ Việt Nam) và hàng hóa
+-- Được cộng dồn trong transaction tạo hóa đơn
+-- (HoaDonService.create_hoa_don), phục vụ top hàng hóa bán chạy
+-- và doanh số theo loại hàng / thương hiệu.
+--
+-- Nạp dữ liệu lần đầu sau khi tạo bảng:
+--     python manage.py rebuild_doanh_so_hang_ngay
+-- =========================================================
+
+IF OBJECT_ID('dbo.DOANH_SO_HANG_NGAY', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.DOANH_SO_HANG_NGAY (
+        MaDSHN    INT IDENTITY(1, 1) NOT NULL
+            CONSTRAINT PK_DOANH_SO_HANG_NGAY PRIMARY KEY NONCLUSTERED,
+        Ngay      DATE           NOT NULL,
+        MaHang    INT            NOT NULL
+            CONSTRAINT FK_DOANH_SO_HANG_NGAY_HANG_HOA
+            REFERENCES dbo.HANG_HOA (MaHang),
+        SoLuong   INT            NOT NULL DEFAULT 0,
+        DoanhThu  DECIMAL(18, 2) NOT NULL DEFAULT 0
+    );
+
+    -- Khóa tổng hợp, đồng thời là chỉ mục cho truy vấn theo khoảng ngày
+    CREATE UNIQUE CLUSTERED INDEX UX_DOANH_SO_HANG_NGAY_Ngay_MaHang
+        ON dbo.DOANH_SO_HANG_NGAY (Ngay, MaHang);
+END
+GO
@@ -0,0 +1,30 @@
+-- =========================================================
+-- Kết quả phân tích giỏ hàng (hàng hóa thường được mua kèm)
+-- Ghi lại toàn bộ mỗi lần chạy:
+--     python manage.py phan_tich_mua_kem
+-- =========================================================
+
+IF OBJECT_ID('dbo.MUA_KEM', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.MUA_KEM (
+        MaMK       INT IDENTITY(1, 1) NOT NULL
+            CONSTRAINT PK_MUA_KEM PRIMARY KEY NONCLUSTERED,
+        MaHang     INT       NOT NULL
+            CONSTRAINT FK_MUA_KEM_HANG_HOA
+            REFERENCES dbo.HANG_HOA (MaHang),
+        MaHangKem  INT       NOT NULL
+            CONSTRAINT FK_MUA_KEM_HANG_HOA_KEM
+            REFERENCES dbo.HANG_HOA (MaHang),
+        ThuHang    SMALLINT  NOT NULL,
+        SoHoaDon   INT       NOT NULL,
+        HoTro      FLOAT     NOT NULL,
+        DoTinCay   FLOAT     NOT NULL,
+        DoNang     FLOAT     NOT NULL,
+        NgayTinh   DATETIME2 NOT NULL
+    );
+
+    -- Tra cứu top mua kèm của một hàng hóa là một lần seek
+    CREATE UNIQUE CLUSTERED INDEX UX_MUA_KEM_MaHang_ThuHang
+        ON dbo.MUA_KEM (MaHang, ThuHang);
+END
+GO
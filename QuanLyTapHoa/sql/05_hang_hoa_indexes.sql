@@ -0,0 +1,67 @@
+-- =========================================================
+-- Chỉ mục cho lọc / sắp xếp / phân trang keyset danh mục hàng hóa
+-- (GET /api/hanghoa/?ma_loai_hang=&ma_thuong_hieu=&gia_tu=&gia_den=
+--                   &ton_kho_toi_da=&ten=&sap_xep=)
+--
+-- Mỗi chỉ mục kết thúc bằng MaHang, khớp với ordering
+-- (cột sắp xếp, MaHang) của phân trang keyset.
+--
+-- Đây là chỉ mục seek, KHÔNG phải chỉ mục bao phủ (không INCLUDE):
+-- trang danh sách đọc mọi cột của HANG_HOA, nên mỗi dòng của trang tốn
+-- một key lookup vào clustered index (tối đa page_size lookup mỗi trang,
+-- chi phí không tăng theo độ sâu trang). Bao phủ sẽ phải INCLUDE cả
+-- SoLuongTon, làm mỗi lần bán / điều chỉnh tồn kho ghi thêm vào từng
+-- chỉ mục; với đường ghi nóng này, key lookup theo trang rẻ hơn.
+-- Các model dùng managed = False nên Django không tạo chỉ mục,
+-- chạy script này trực tiếp trên CSDL QuanLyTapHoa.
+-- =========================================================
+
+-- Lọc theo loại hàng (kèm khoảng giá trong loại)
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_HANG_HOA_MaLoaiHang_GiaBan_MaHang'
+      AND object_id = OBJECT_ID('dbo.HANG_HOA')
+)
+    CREATE INDEX IX_HANG_HOA_MaLoaiHang_GiaBan_MaHang
+        ON dbo.HANG_HOA (MaLoaiHang, GiaBan, MaHang);
+GO
+
+-- Lọc theo thương hiệu
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_HANG_HOA_MaThuongHieu_MaHang'
+      AND object_id = OBJECT_ID('dbo.HANG_HOA')
+)
+    CREATE INDEX IX_HANG_HOA_MaThuongHieu_MaHang
+        ON dbo.HANG_HOA (MaThuongHieu, MaHang);
+GO
+
+-- Khoảng giá bán, sap_xep=gia_ban
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_HANG_HOA_GiaBan_MaHang'
+      AND object_id = OBJECT_ID('dbo.HANG_HOA')
+)
+    CREATE INDEX IX_HANG_HOA_GiaBan_MaHang
+        ON dbo.HANG_HOA (GiaBan, MaHang);
+GO
+
+-- Hàng sắp hết (ton_kho_toi_da), sap_xep=so_luong_ton
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_HANG_HOA_SoLuongTon_MaHang'
+      AND object_id = OBJECT_ID('dbo.HANG_HOA')
+)
+    CREATE INDEX IX_HANG_HOA_SoLuongTon_MaHang
+        ON dbo.HANG_HOA (SoLuongTon, MaHang);
+GO
+
+-- Tiền tố tên hàng (LIKE N'abc%'), sap_xep=ten_hang
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_HANG_HOA_TenHang_MaHang'
+      AND object_id = OBJECT_ID('dbo.HANG_HOA')
+)
+    CREATE INDEX IX_HANG_HOA_TenHang_MaHang
+        ON dbo.HANG_HOA (TenHang, MaHang);
+GO
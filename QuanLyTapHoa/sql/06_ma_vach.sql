@@ -0,0 +1,25 @@
+-- =========================================================
+-- Mã vạch hàng hóa (EAN-8 / UPC-A / EAN-13 / GTIN-14),
+-- một hàng hóa có thể có nhiều mã vạch.
+--
+-- Mã vạch lưu dạng GTIN-14 (đệm 0 bên trái) và là khóa chính
+-- clustered: quét mã vạch (GET /api/hanghoa/scan/<ma_vach>/)
+-- khi trượt bộ nhớ đệm là một lần seek.
+-- =========================================================
+
+IF OBJECT_ID('dbo.MA_VACH', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.MA_VACH (
+        MaVach  CHAR(14) NOT NULL
+            CONSTRAINT PK_MA_VACH PRIMARY KEY CLUSTERED,
+        MaHang  INT      NOT NULL
+            CONSTRAINT FK_MA_VACH_HANG_HOA
+            REFERENCES dbo.HANG_HOA (MaHang)
+            ON DELETE CASCADE
+    );
+
+    -- Danh sách mã vạch của một hàng hóa
+    CREATE INDEX IX_MA_VACH_MaHang
+        ON dbo.MA_VACH (MaHang);
+END
+GO
@@ -0,0 +1,36 @@
+-- =========================================================
+-- Nhật ký thay đổi hàng hóa cho đồng bộ gia tăng
+-- (GET /api/hanghoa/changes/?since=<token>)
+--
+-- HangHoaRepository ghi một dòng cho mỗi lần tạo / sửa / xóa /
+-- điều chỉnh tồn kho, cùng transaction với thay đổi trên HANG_HOA.
+-- PhienBan (ROWVERSION) do SQL Server tự tăng; token đồng bộ là
+-- CAST(PhienBan AS BIGINT), chỉ đọc tới MIN_ACTIVE_ROWVERSION() để
+-- không vượt qua thay đổi của transaction chưa commit.
+--
+-- Nén định kỳ (xóa dòng đã có dòng mới hơn cùng hàng hóa):
+--     python manage.py nen_thay_doi_hang_hoa
+-- =========================================================
+
+IF OBJECT_ID('dbo.HANG_HOA_THAY_DOI', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.HANG_HOA_THAY_DOI (
+        MaThayDoi   BIGINT IDENTITY(1, 1) NOT NULL
+            CONSTRAINT PK_HANG_HOA_THAY_DOI PRIMARY KEY NONCLUSTERED,
+        -- Không khóa ngoại: dòng xóa (tombstone) giữ mã hàng đã bị xóa
+        MaHang      INT        NOT NULL,
+        LoaiThayDoi CHAR(1)    NOT NULL
+            CONSTRAINT CK_HANG_HOA_THAY_DOI_Loai CHECK (LoaiThayDoi IN ('U', 'D')),
+        ThoiDiem    DATETIME2  NOT NULL,
+        PhienBan    ROWVERSION NOT NULL
+    );
+
+    -- Đọc thay đổi sau token là một lần seek + quét theo thứ tự
+    CREATE UNIQUE CLUSTERED INDEX UX_HANG_HOA_THAY_DOI_PhienBan
+        ON dbo.HANG_HOA_THAY_DOI (PhienBan);
+
+    -- Nén nhật ký theo hàng hóa
+    CREATE INDEX IX_HANG_HOA_THAY_DOI_MaHang_MaThayDoi
+        ON dbo.HANG_HOA_THAY_DOI (MaHang, MaThayDoi);
+END
+GO
@@ -0,0 +1,38 @@
+-- =========================================================
+-- Chia tồn kho hàng bán chạy thành nhiều phân mảnh (escrow)
+--
+-- Khi khuyến mãi, mọi quầy cùng trừ tồn kho của vài hàng hóa
+-- (nước suối, gạo...) nên xếp hàng chờ khóa dòng HANG_HOA trong
+-- transaction tạo hóa đơn. Hàng hóa được bật chế độ phân mảnh
+-- (HANG_HOA.SoPhanManh = N > 0) có tồn kho chia thành N dòng
+-- TON_KHO_PHAN_MANH; mỗi lần bán chỉ khóa một phân mảnh ngẫu nhiên,
+-- phân mảnh hết hàng thì gom và chia đều lại.
+--
+-- Với hàng hóa phân mảnh: tồn kho thật = SUM(TON_KHO_PHAN_MANH.SoLuong),
+-- được ứng dụng đọc khi hiển thị (danh mục, chi tiết, quét mã vạch,
+-- đồng bộ gia tăng, cảnh báo). HANG_HOA.SoLuongTon là bản sao chỉ dùng
+-- để lọc / sắp xếp danh mục, cập nhật bởi
+--     python manage.py dong_bo_ton_kho_phan_manh --lap 5
+--
+-- Bật / tắt: POST /api/hanghoa/<ma_hang>/phan-manh/ {"so_phan_manh": N}
+-- =========================================================
+
+IF COL_LENGTH('dbo.HANG_HOA', 'SoPhanManh') IS NULL
+    ALTER TABLE dbo.HANG_HOA
+        ADD SoPhanManh INT NOT NULL
+            CONSTRAINT DF_HANG_HOA_SoPhanManh DEFAULT 0;
+GO
+
+IF OBJECT_ID('dbo.TON_KHO_PHAN_MANH', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.TON_KHO_PHAN_MANH (
+        MaHang   INT NOT NULL
+            CONSTRAINT FK_TON_KHO_PHAN_MANH_HANG_HOA
+            REFERENCES dbo.HANG_HOA (MaHang) ON DELETE CASCADE,
+        PhanManh INT NOT NULL,
+        SoLuong  INT NOT NULL
+            CONSTRAINT CK_TON_KHO_PHAN_MANH_SoLuong CHECK (SoLuong >= 0),
+        CONSTRAINT PK_TON_KHO_PHAN_MANH PRIMARY KEY (MaHang, PhanManh)
+    );
+END
+GO
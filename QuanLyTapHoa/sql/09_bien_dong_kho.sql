@@ -0,0 +1,62 @@
+-- =========================================================
+-- Sổ biến động kho và ảnh chụp tồn kho cuối ngày
+--
+-- BIEN_DONG_KHO: mỗi lần tồn kho thay đổi ghi một dòng (chỉ thêm,
+-- không sửa): bán (B), điều chỉnh (D), nhập file / tạo mới (N),
+-- kiểm kê (K). Các câu UPDATE tồn kho ghi sổ bằng OUTPUT ... INTO
+-- trong chính câu lệnh, không tốn thêm lượt đi về CSDL.
+-- ThoiDiem là giờ UTC.
+--
+-- Loai không có CHECK constraint: bảng đích của OUTPUT ... INTO không
+-- được có CHECK đang bật (lỗi 333), loại được kiểm tra ở ứng dụng
+-- (BienDongKhoRepository.kiem_tra_loai).
+--
+-- TON_KHO_NGAY: tồn kho cuối ngày (giờ Việt Nam) của từng hàng hóa,
+-- chụp hằng đêm sau 0 giờ:
+--     python manage.py chup_ton_kho_ngay
+-- Tồn kho tại thời điểm T = ảnh chụp gần nhất trước T
+--                        + biến động từ cuối ngày chụp tới T
+-- (GET /api/hanghoa/<ma_hang>/ton-kho/?thoi_diem=).
+-- =========================================================
+
+IF OBJECT_ID('dbo.BIEN_DONG_KHO', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.BIEN_DONG_KHO (
+        MaBienDong  BIGINT IDENTITY(1, 1) NOT NULL
+            CONSTRAINT PK_BIEN_DONG_KHO PRIMARY KEY CLUSTERED,
+        -- Không khóa ngoại: sổ giữ lịch sử cả hàng hóa đã xóa
+        MaHang      INT          NOT NULL,
+        ThoiDiem    DATETIME2(3) NOT NULL
+            CONSTRAINT DF_BIEN_DONG_KHO_ThoiDiem DEFAULT SYSUTCDATETIME(),
+        Loai        CHAR(1)      NOT NULL,
+        SoLuong     INT          NOT NULL,
+        -- Mã hóa đơn với dòng bán
+        MaThamChieu INT          NULL
+    );
+
+    -- Tồn kho tại thời điểm của một hàng hóa: seek + quét ngắn
+    CREATE INDEX IX_BIEN_DONG_KHO_MaHang_ThoiDiem
+        ON dbo.BIEN_DONG_KHO (MaHang, ThoiDiem) INCLUDE (SoLuong);
+
+    -- Chụp tồn kho cuối ngày: biến động của mọi hàng hóa sau một mốc
+    CREATE INDEX IX_BIEN_DONG_KHO_ThoiDiem
+        ON dbo.BIEN_DONG_KHO (ThoiDiem) INCLUDE (MaHang, SoLuong);
+END
+GO
+
+-- CSDL đã tạo bảng bằng bản script cũ
+IF OBJECT_ID('dbo.CK_BIEN_DONG_KHO_Loai', 'C') IS NOT NULL
+    ALTER TABLE dbo.BIEN_DONG_KHO DROP CONSTRAINT CK_BIEN_DONG_KHO_Loai;
+GO
+
+IF OBJECT_ID('dbo.TON_KHO_NGAY', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.TON_KHO_NGAY (
+        MaHang     INT  NOT NULL,
+        Ngay       DATE NOT NULL,
+        SoLuongTon INT  NOT NULL,
+        -- Ảnh chụp gần nhất trước một ngày: một lần seek ngược
+        CONSTRAINT PK_TON_KHO_NGAY PRIMARY KEY (MaHang, Ngay)
+    );
+END
+GO
@@ -0,0 +1,74 @@
+-- =========================================================
+-- Cảnh báo tồn kho thấp (hàng cần đặt lại)
+--
+-- HANG_HOA.MucDatLai: mức đặt lại của từng hàng hóa, 0 là không
+-- cảnh báo. Hàng hóa cần đặt lại khi SoLuongTon <= MucDatLai.
+--
+-- Tập hàng cần đặt lại là indexed view V_HANG_HOA_CAN_DAT_LAI:
+-- SQL Server cập nhật view ngay trong câu lệnh sửa HANG_HOA (bán,
+-- điều chỉnh, nhập file, kiểm kê...), chỉ khi dòng vào / ra tập này.
+-- Đọc view (WITH (NOEXPAND)) tốn chi phí theo số cảnh báo, không
+-- theo kích thước danh mục:
+--     GET /api/hanghoa/can-dat-lai/
+--
+-- (Không dùng filtered index: điều kiện lọc không so sánh được hai
+-- cột, cũng không tham chiếu được cột tính toán.)
+--
+-- Hàng hóa phân mảnh tồn kho (SoPhanManh > 0) không nằm trong view:
+-- HANG_HOA.SoLuongTon của chúng chỉ là bản sao. Ứng dụng đọc chúng qua
+-- chỉ mục lọc IX_HANG_HOA_PhanManh (vài hàng bán chạy) và so tổng các
+-- phân mảnh với MucDatLai (HangHoaRepository.can_dat_lai).
+--
+-- Indexed view yêu cầu mọi kết nối sửa HANG_HOA bật ANSI_NULLS,
+-- QUOTED_IDENTIFIER, ANSI_WARNINGS... (mặc định của ODBC / mssql-django).
+-- =========================================================
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+GO
+
+IF COL_LENGTH('dbo.HANG_HOA', 'MucDatLai') IS NULL
+    ALTER TABLE dbo.HANG_HOA
+        ADD MucDatLai INT NOT NULL
+            CONSTRAINT DF_HANG_HOA_MucDatLai DEFAULT 0
+            CONSTRAINT CK_HANG_HOA_MucDatLai CHECK (MucDatLai >= 0);
+GO
+
+-- Bản cũ của view có cả hàng hóa phân mảnh: xóa để tạo lại
+-- (chỉ mục của view bị xóa theo, được tạo lại ở dưới)
+IF OBJECT_ID('dbo.V_HANG_HOA_CAN_DAT_LAI', 'V') IS NOT NULL
+   AND OBJECT_DEFINITION(OBJECT_ID('dbo.V_HANG_HOA_CAN_DAT_LAI')) NOT LIKE '%SoPhanManh%'
+    DROP VIEW dbo.V_HANG_HOA_CAN_DAT_LAI;
+GO
+
+IF OBJECT_ID('dbo.V_HANG_HOA_CAN_DAT_LAI', 'V') IS NULL
+    EXEC('
+    CREATE VIEW dbo.V_HANG_HOA_CAN_DAT_LAI
+    WITH SCHEMABINDING
+    AS
+    SELECT MaHang, TenHang, SoLuongTon, MucDatLai
+    FROM dbo.HANG_HOA
+    WHERE MucDatLai > 0 AND SoLuongTon <= MucDatLai AND SoPhanManh = 0
+    ');
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_V_HANG_HOA_CAN_DAT_LAI'
+      AND object_id = OBJECT_ID('dbo.V_HANG_HOA_CAN_DAT_LAI')
+)
+    CREATE UNIQUE CLUSTERED INDEX IX_V_HANG_HOA_CAN_DAT_LAI
+        ON dbo.V_HANG_HOA_CAN_DAT_LAI (MaHang);
+GO
+
+-- Hàng hóa phân mảnh tồn kho có mức đặt lại
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_HANG_HOA_PhanManh'
+      AND object_id = OBJECT_ID('dbo.HANG_HOA')
+)
+    CREATE INDEX IX_HANG_HOA_PhanManh
+        ON dbo.HANG_HOA (MaHang)
+        INCLUDE (TenHang, SoLuongTon, SoPhanManh, MucDatLai)
+        WHERE SoPhanManh > 0 AND MucDatLai > 0;
+GO
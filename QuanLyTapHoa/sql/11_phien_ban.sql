@@ -0,0 +1,24 @@
+-- =========================================================
+-- Phiên bản dùng chung giữa các worker
+--
+-- Mỗi dòng là một phiên bản có tên (bảng tham chiếu, thống kê...).
+-- Process giữ dữ liệu trong bộ nhớ / cache so PhienBan đã nạp với
+-- giá trị trong bảng để biết worker khác đã sửa dữ liệu
+-- (QuanLyTapHoa/phien_ban.py).
+--
+-- PhienBan là ROWVERSION: tăng mỗi khi dòng bị sửa, không lặp lại kể
+-- cả khi transaction rollback, và chỉ hiện ra với kết nối khác sau
+-- khi transaction tăng nó commit.
+-- =========================================================
+
+IF OBJECT_ID('dbo.PHIEN_BAN', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.PHIEN_BAN (
+        Ten      VARCHAR(100) NOT NULL
+            CONSTRAINT PK_PHIEN_BAN PRIMARY KEY CLUSTERED,
+        SoLan    BIGINT       NOT NULL
+            CONSTRAINT DF_PHIEN_BAN_SoLan DEFAULT 0,
+        PhienBan ROWVERSION   NOT NULL
+    );
+END
+GO